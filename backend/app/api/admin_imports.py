@@ -123,7 +123,7 @@ def _resolve_tenant_and_bu(
 
 
 @router.post("/limpar-dados")
-async def limpar_dados(
+def limpar_dados(
     payload: ResetDataPayload,
     current_user: User = Depends(require_super_admin),
     db: Session = Depends(get_db),
@@ -204,7 +204,7 @@ async def limpar_dados(
 
 
 @router.post("/importar-plano-contas-planilha")
-async def importar_plano_contas_planilha(
+def importar_plano_contas_planilha(
     payload: SpreadsheetImportPayload,
     current_user: User = Depends(require_super_admin),
     db: Session = Depends(get_db),
@@ -242,7 +242,7 @@ async def importar_plano_contas_planilha(
 
 
 @router.post("/importar-lancamentos-planilha")
-async def importar_lancamentos_planilha(
+def importar_lancamentos_planilha(
     payload: SpreadsheetImportPayload,
     current_user: User = Depends(require_super_admin),
     db: Session = Depends(get_db),
@@ -282,7 +282,7 @@ async def importar_lancamentos_planilha(
 
 
 @router.post("/importar-previsoes-planilha")
-async def importar_previsoes_planilha(
+def importar_previsoes_planilha(
     payload: SpreadsheetImportPayload,
     current_user: User = Depends(require_super_admin),
     db: Session = Depends(get_db),
@@ -322,7 +322,7 @@ async def importar_previsoes_planilha(
 
 
 @router.post("/importar-contas-bancarias-planilha")
-async def importar_contas_bancarias_planilha(
+def importar_contas_bancarias_planilha(
     payload: SpreadsheetImportPayload,
     current_user: User = Depends(require_super_admin),
     db: Session = Depends(get_db),
@@ -363,7 +363,7 @@ async def importar_contas_bancarias_planilha(
 
 
 @router.post("/importar-google-sheets")
-async def importar_google_sheets(
+def importar_google_sheets(
     payload: SpreadsheetImportPayload,
     current_user: User = Depends(require_super_admin),
     db: Session = Depends(get_db),
@@ -373,9 +373,9 @@ async def importar_google_sheets(
     """
     tenant_id, business_unit_id = _resolve_tenant_and_bu(payload, current_user, db)
 
-    plano_result = await importar_plano_contas_planilha(payload, current_user, db)
-    lanc_result = await importar_lancamentos_planilha(payload, current_user, db)
-    previsoes_result = await importar_previsoes_planilha(payload, current_user, db)
+    plano_result = importar_plano_contas_planilha(payload, current_user, db)
+    lanc_result = importar_lancamentos_planilha(payload, current_user, db)
+    previsoes_result = importar_previsoes_planilha(payload, current_user, db)
 
     return {
         "success": True,
@@ -390,7 +390,7 @@ async def importar_google_sheets(
 
 
 @compat_router.get("/api/v1/import/google-sheets/sample")
-async def google_sheets_sample_info(
+def google_sheets_sample_info(
     current_user: User = Depends(require_super_admin),
 ):
     """Compatibilidade para a tela legada de Google Sheets."""
@@ -403,7 +403,7 @@ async def google_sheets_sample_info(
 
 
 @compat_router.post("/api/v1/import/google-sheets/validate")
-async def validate_google_sheets_compatibility(
+def validate_google_sheets_compatibility(
     spreadsheet_id: str,
     current_user: User = Depends(require_super_admin),
 ):
@@ -418,7 +418,7 @@ async def validate_google_sheets_compatibility(
 
 
 @compat_router.post("/api/v1/import/google-sheets")
-async def import_google_sheets_compatibility(
+def import_google_sheets_compatibility(
     payload: GoogleSheetsCompatibilityPayload,
     current_user: User = Depends(require_super_admin),
     db: Session = Depends(get_db),
@@ -429,11 +429,11 @@ async def import_google_sheets_compatibility(
             "success": True,
             "message": "Validação concluída. Importação completa deve usar o onboarding principal.",
         }
-    return await importar_google_sheets(payload, current_user, db)
+    return importar_google_sheets(payload, current_user, db)
 
 
 @compat_router.get("/api/v1/import/status/{import_id}")
-async def get_import_status_compatibility(
+def get_import_status_compatibility(
     import_id: str,
     current_user: User = Depends(require_super_admin),
 ):
@@ -4,7 +4,7 @@ from datetime import timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, run_in_db_threadpool
 from app.models.auth import (
     User,
     UserCreate,
@@ -26,6 +26,7 @@ from app.models.auth import (
     AuditLog,
 )
 from app.services.security import SecurityService
+from app.services.user_cache import AuthenticatedUserCache
 from app.services.dependencies import get_current_active_user, get_super_admin, log_audit_event
 from app.models.auth import UserSession
 from app.models.permissions import UserPermission
@@ -57,6 +58,73 @@ class BusinessUnitSelectionRequest(BaseModel):
     business_unit_id: str
 
 
+def _authenticate_and_issue_tokens(
+    db: Session,
+    credentials: UserLogin,
+    ip_address: Optional[str],
+    user_agent: Optional[str],
+) -> TokenResponse:
+    """
+    Parte síncrona do login: autentica, cria sessão, emite tokens e audita.
+    """
+    # Autenticar usuário
+    user = SecurityService.authenticate_user(
+        db=db,
+        username=credentials.username,
+        password=credentials.password,
+        ip_address=ip_address,
+        user_agent=user_agent
+    )
+    
+    # Criar sessão
+    session = SecurityService.create_user_session(
+        db=db,
+        user=user,
+        ip_address=ip_address,
+        user_agent=user_agent
+    )
+    
+    # Criar tokens
+    access_token = SecurityService.create_access_token(
+        data={
+            "sub": str(user.id),
+            "username": user.username,
+            "email": user.email,
+            "role": user.role,
+            "tenant_id": str(user.tenant_id),
+            "business_unit_id": str(user.business_unit_id) if user.business_unit_id else None,
+            "department_id": str(user.department_id) if user.department_id else None
+        }
+    )
+    
+    refresh_token = SecurityService.create_refresh_token(
+        data={
+            "sub": str(user.id),
+            "session_id": str(session.id)
+        }
+    )
+    
+    # Log de auditoria
+    SecurityService.log_audit_event(
+        db=db,
+        user_id=user.id,
+        tenant_id=user.tenant_id,
+        action="LOGIN_SUCCESS",
+        resource_type="USER",
+        resource_id=user.username,
+        details="Login realizado com sucesso",
+        ip_address=ip_address,
+        user_agent=user_agent
+    )
+    
+    return TokenResponse(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        token_type="bearer",
+        expires_in=30 * 60  # 30 minutos
+    )
+
+
 @router.post("/login", response_model=TokenResponse)
 async def login(
     request: Request,
@@ -95,61 +163,13 @@ async def login(
 
         credentials = UserLogin(username=username, password=password)
 
-        # Autenticar usuário
-        user = SecurityService.authenticate_user(
-            db=db,
-            username=credentials.username,
-            password=credentials.password,
-            ip_address=request.client.host if request else None,
-            user_agent=request.headers.get("user-agent") if request else None
-        )
-        
-        # Criar sessão
-        session = SecurityService.create_user_session(
-            db=db,
-            user=user,
-            ip_address=request.client.host if request else None,
-            user_agent=request.headers.get("user-agent") if request else None
-        )
-        
-        # Criar tokens
-        access_token = SecurityService.create_access_token(
-            data={
-                "sub": str(user.id),
-                "username": user.username,
-                "email": user.email,
-                "role": user.role,
-                "tenant_id": str(user.tenant_id),
-                "business_unit_id": str(user.business_unit_id) if user.business_unit_id else None,
-                "department_id": str(user.department_id) if user.department_id else None
-            }
-        )
-        
-        refresh_token = SecurityService.create_refresh_token(
-            data={
-                "sub": str(user.id),
-                "session_id": str(session.id)
-            }
-        )
-        
-        # Log de auditoria
-        SecurityService.log_audit_event(
-            db=db,
-            user_id=user.id,
-            tenant_id=user.tenant_id,
-            action="LOGIN_SUCCESS",
-            resource_type="USER",
-            resource_id=user.username,
-            details="Login realizado com sucesso",
-            ip_address=request.client.host if request else None,
-            user_agent=request.headers.get("user-agent") if request else None
-        )
-        
-        return TokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            token_type="bearer",
-            expires_in=30 * 60  # 30 minutos
+        # Hash de senha (bcrypt) e consultas são síncronos: fora do event loop
+        return await run_in_db_threadpool(
+            _authenticate_and_issue_tokens,
+            db,
+            credentials,
+            request.client.host if request.client else None,
+            request.headers.get("user-agent"),
         )
         
     except HTTPException:
@@ -165,7 +185,7 @@ async def login(
 
 
 @router.get("/needs-business-unit-selection")
-async def needs_business_unit_selection(
+def needs_business_unit_selection(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -201,7 +221,7 @@ async def needs_business_unit_selection(
 
 
 @router.get("/user-business-units")
-async def list_user_business_units(
+def list_user_business_units(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -271,7 +291,7 @@ async def list_user_business_units(
 
 
 @router.post("/select-business-unit", response_model=TokenResponse)
-async def select_business_unit(
+def select_business_unit(
     payload: BusinessUnitSelectionRequest,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -344,7 +364,7 @@ async def select_business_unit(
 
 
 @router.get("/user-info")
-async def get_user_info(
+def get_user_info(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -380,7 +400,7 @@ async def get_user_info(
         ) from exc
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(
+def refresh_token(
     refresh_request: RefreshTokenRequest,
     request: Request = None,
     db: Session = Depends(get_db)
@@ -450,7 +470,7 @@ async def refresh_token(
         )
 
 @router.post("/logout")
-async def logout(
+def logout(
     current_user: User = Depends(get_current_active_user),
     request: Request = None,
     db: Session = Depends(get_db)
@@ -487,7 +507,7 @@ async def logout(
         )
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(
+def get_current_user_info(
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -496,7 +516,7 @@ async def get_current_user_info(
     return current_user
 
 @router.post("/tenants", response_model=TenantResponse)
-async def create_tenant(
+def create_tenant(
     tenant_data: TenantCreate,
     current_user: User = Depends(get_super_admin),
     db: Session = Depends(get_db)
@@ -552,7 +572,7 @@ async def create_tenant(
 
 
 @router.get("/tenants", response_model=List[TenantResponse])
-async def list_tenants(
+def list_tenants(
     current_user: User = Depends(get_super_admin),
     db: Session = Depends(get_db),
     include_inactive: bool = False,
@@ -573,7 +593,7 @@ async def list_tenants(
 
 
 @router.put("/tenants/{tenant_id}", response_model=TenantResponse)
-async def update_tenant(
+def update_tenant(
     tenant_id: str,
     tenant_data: TenantUpdate,
     current_user: User = Depends(get_super_admin),
@@ -625,7 +645,7 @@ async def update_tenant(
 
 
 @router.delete("/tenants/{tenant_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_tenant(
+def delete_tenant(
     tenant_id: str,
     current_user: User = Depends(get_super_admin),
     db: Session = Depends(get_db),
@@ -698,7 +718,7 @@ async def delete_tenant(
         ) from exc
 
 @router.post("/users", response_model=UserResponse)
-async def create_user(
+def create_user(
     user_data: UserCreate,
     current_user: User = Depends(get_super_admin),
     db: Session = Depends(get_db)
@@ -767,7 +787,7 @@ async def create_user(
         )
 
 @router.put("/users/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: str,
     user_data: UserUpdate,
     current_user: User = Depends(get_super_admin),
@@ -805,6 +825,7 @@ async def update_user(
             user.hashed_password = SecurityService.hash_password(user_data.password)
 
         db.commit()
+        AuthenticatedUserCache.invalidate(user.id)
         db.refresh(user)
 
         SecurityService.log_audit_event(
@@ -828,7 +849,7 @@ async def update_user(
         )
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(
+def delete_user(
     user_id: str,
     current_user: User = Depends(get_super_admin),
     db: Session = Depends(get_db),
@@ -849,6 +870,7 @@ async def delete_user(
 
         user.status = UserStatus.INACTIVE
         db.commit()
+        AuthenticatedUserCache.invalidate(user.id)
 
         SecurityService.log_audit_event(
             db=db,
@@ -870,7 +892,7 @@ async def delete_user(
         )
 
 @router.post("/create-qa-user")
-async def create_qa_user_endpoint(
+def create_qa_user_endpoint(
     db: Session = Depends(get_db)
 ):
     """
@@ -940,6 +962,7 @@ async def create_qa_user_endpoint(
             action = "criado"
         
         db.commit()
+        AuthenticatedUserCache.invalidate(qa_user.id)
         db.refresh(qa_user)
         
         return {
@@ -968,7 +991,7 @@ async def create_qa_user_endpoint(
         )
 
 @router.get("/users", response_model=List[UserResponse])
-async def list_users(
+def list_users(
     current_user: User = Depends(get_super_admin),
     db: Session = Depends(get_db)
 ):
@@ -17,6 +17,7 @@ from app.models.auth import User
 from app.models.conta_bancaria import ContaBancaria, TipoContaBancaria
 from app.models.lancamento_diario import LancamentoDiario, TransactionType
 from app.services.dependencies import get_current_active_user
+from app.services.sheet_reader_service import DAILY_BALANCE_FIRST_ROW, SheetReaderService
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 
@@ -327,14 +328,23 @@ def _build_daily_entries(lancamentos: List[LancamentoDiario]) -> List[Dict[str,
 def _build_sheet_extract(
     account_name: str, start: datetime, end: datetime
 ) -> List[Dict[str, Any]]:
-    service = _get_sheet_service()
-    if service is None or not DEFAULT_SHEET_ID:
+    if not DEFAULT_SHEET_ID:
         return []
 
     normalized_target = _normalize_label(account_name)
     if not normalized_target:
         return []
 
+    # Autenticação só quando o snapshot não está em cache; None (credenciais
+    # indisponíveis) faz get_daily_grid retornar None
+    grid = SheetReaderService.get_daily_grid(
+        _get_sheet_service,
+        DEFAULT_SHEET_ID,
+        [suffix for suffix, _ in MONTH_SHEETS],
+    )
+    if not grid:
+        return []
+
     month_cursor = datetime(start.year, start.month, 1)
     end_month = datetime(end.year, end.month, 1)
 
@@ -342,30 +352,9 @@ def _build_sheet_extract(
 
     while month_cursor <= end_month:
         suffix = _sheet_suffix(month_cursor.year, month_cursor.month)
-        if not suffix:
-            month_cursor = (month_cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
-            continue
-
-        range_label = f"'FC-diário-{suffix}'!B175:AF184"
-        try:
-            result = (
-                service.spreadsheets()
-                .values()
-                .get(spreadsheetId=DEFAULT_SHEET_ID, range=range_label)
-                .execute()
-            )
-        except Exception:
-            month_cursor = (month_cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
-            continue
-
-        values = result.get("values", [])
-        target_row: Optional[List[str]] = None
-        for row in values:
-            if not row:
-                continue
-            if _normalize_label(row[0]) == normalized_target:
-                target_row = row
-                break
+        # Extrato bancário considera o bloco a partir da linha 175
+        rows = grid.get(suffix, [])[175 - DAILY_BALANCE_FIRST_ROW:] if suffix else []
+        target_row = SheetReaderService.find_row(rows, normalized_target, _normalize_label)
 
         if not target_row:
             month_cursor = (month_cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
@@ -23,7 +23,7 @@ router = APIRouter(prefix="/business-units", tags=["business-units"])
 
 @router.get("", response_model=List[BusinessUnitResponse])
 @router.get("/", response_model=List[BusinessUnitResponse])
-async def list_business_units(
+def list_business_units(
     tenant_id: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -40,7 +40,7 @@ async def list_business_units(
 
 @router.post("", response_model=BusinessUnitResponse, status_code=status.HTTP_201_CREATED)
 @router.post("/", response_model=BusinessUnitResponse, status_code=status.HTTP_201_CREATED)
-async def create_business_unit(
+def create_business_unit(
     payload: BusinessUnitCreate,
     current_user: User = Depends(get_super_admin),
     db: Session = Depends(get_db),
@@ -58,7 +58,7 @@ async def create_business_unit(
 
 
 @router.put("/{business_unit_id}", response_model=BusinessUnitResponse)
-async def update_business_unit(
+def update_business_unit(
     business_unit_id: str,
     payload: BusinessUnitUpdate,
     current_user: User = Depends(get_super_admin),
@@ -81,7 +81,7 @@ async def update_business_unit(
 
 
 @router.delete("/{business_unit_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_business_unit(
+def delete_business_unit(
     business_unit_id: str,
     current_user: User = Depends(get_super_admin),
     db: Session = Depends(get_db),
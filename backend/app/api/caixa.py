@@ -16,7 +16,6 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from googleapiclient.errors import HttpError
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
@@ -26,6 +25,7 @@ from app.config import Settings
 from app.models.caixa import Caixa, MovimentacaoCaixa, TipoMovimentacaoCaixa
 from app.models.auth import User
 from app.services.llm_sheet_importer import LLMSheetImporter
+from app.services.sheet_reader_service import DailyGrid, SheetReaderService
 
 router = APIRouter(prefix="/api/v1/caixa", tags=["Caixa"])
 
@@ -87,21 +87,36 @@ def _parse_sheet_amount(value: str) -> Decimal:
     return Decimal(cleaned)
 
 
+def _get_daily_grid() -> Optional[DailyGrid]:
+    """Snapshot (em cache) das abas FC-diário-* da planilha compartilhada"""
+
+    def _service_factory():
+        importer = LLMSheetImporter()
+        return importer.service if importer.authenticate() else None
+
+    return SheetReaderService.get_daily_grid(
+        _service_factory,
+        _get_spreadsheet_id(),
+        [suffix for suffix, _ in MONTH_SHEETS],
+    )
+
+
 def _collect_sheet_balances(
     label: str,
     start: datetime,
     end: datetime,
+    grid: Optional[DailyGrid] = None,
 ) -> Dict[date, Decimal]:
     """
     Lê os saldos diários do caixa na planilha. Retorna um dicionário
     {data: saldo}, limitado ao intervalo solicitado.
     """
-    importer = LLMSheetImporter()
-    if not importer.authenticate():
+    if grid is None:
+        grid = _get_daily_grid()
+    if not grid:
         return {}
 
     normalized_label = _normalize_label(label)
-    spreadsheet_id = _get_spreadsheet_id()
 
     balances: Dict[date, Decimal] = {}
     month_cursor = datetime(start.year, start.month, 1)
@@ -112,25 +127,10 @@ def _collect_sheet_balances(
             (suffix for suffix, number in MONTH_SHEETS if number == month_cursor.month),
             None,
         )
-        if not sheet_suffix:
-            month_cursor = (month_cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
-            continue
-
-        try:
-            result = importer.service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=f"'FC-diário-{sheet_suffix}'!B174:AF184",
-            ).execute()
-        except HttpError:
-            month_cursor = (month_cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
-            continue
-
-        rows = result.get("values", [])
-        target_row: Optional[List[str]] = None
-        for row in rows:
-            if row and _normalize_label(row[0]) == normalized_label:
-                target_row = row
-                break
+        rows = grid.get(sheet_suffix) if sheet_suffix else None
+        target_row = (
+            SheetReaderService.find_row(rows, normalized_label, _normalize_label) if rows else None
+        )
 
         if not target_row:
             month_cursor = (month_cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
@@ -204,8 +204,10 @@ def _aggregate_monthly_totals(
         for month in range(1, 13)
     }
 
+    # Um único snapshot da planilha atende todos os rótulos
+    grid = _get_daily_grid()
     for label in labels:
-        balances = _collect_sheet_balances(label, start, end)
+        balances = _collect_sheet_balances(label, start, end, grid=grid)
         if not balances:
             continue
         sorted_items = sorted(balances.items())
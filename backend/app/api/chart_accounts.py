@@ -12,6 +12,7 @@ from app.models.chart_of_accounts import (
     ChartAccountGroup,
     ChartAccountSubgroup,
 )
+from app.services.chart_hierarchy_cache import ChartHierarchyCache
 from app.services.dependencies import get_current_active_user
 
 router = APIRouter(tags=["chart-accounts"])
@@ -154,133 +155,84 @@ def get_chart_accounts_hierarchy(
     db: Session = Depends(get_db),
 ) -> Dict[str, List[Dict[str, object]]]:
     tenant_id = _tenant_id(current_user)
+    tree = ChartHierarchyCache.visible(db, tenant_id)
 
-    groups = (
-        db.query(ChartAccountGroup)
-        .filter(ChartAccountGroup.is_active.is_(True))
-        .filter((ChartAccountGroup.tenant_id == tenant_id) | (ChartAccountGroup.tenant_id.is_(None)))
-        .order_by(ChartAccountGroup.code)
-        .all()
-    )
+    def _iso(value) -> Optional[str]:
+        return value.isoformat() if value else None
 
-    subgroups = (
-        db.query(ChartAccountSubgroup)
-        .options(joinedload(ChartAccountSubgroup.group))
-        .filter(ChartAccountSubgroup.is_active.is_(True))
-        .filter((ChartAccountSubgroup.tenant_id == tenant_id) | (ChartAccountSubgroup.tenant_id.is_(None)))
-        .order_by(ChartAccountSubgroup.code)
-        .all()
-    )
+    def _group_payload(group) -> Dict[str, object]:
+        return {
+            "id": group.id,
+            "code": group.code,
+            "name": group.name,
+            "description": group.description,
+            "tenant_id": group.tenant_id,
+            "is_active": group.is_active,
+            "created_at": _iso(group.created_at),
+            "updated_at": _iso(group.updated_at),
+        }
 
-    accounts = (
-        db.query(ChartAccount)
-        .options(joinedload(ChartAccount.subgroup).joinedload(ChartAccountSubgroup.group))
-        .filter(ChartAccount.is_active.is_(True))
-        .filter((ChartAccount.tenant_id == tenant_id) | (ChartAccount.tenant_id.is_(None)))
-        .order_by(ChartAccount.code)
-        .all()
-    )
+    def _subgroup_payload(subgroup) -> Dict[str, object]:
+        group = tree.group_by_id.get(subgroup.group_id)
+        return {
+            "id": subgroup.id,
+            "code": subgroup.code,
+            "name": subgroup.name,
+            "description": subgroup.description,
+            "group_id": subgroup.group_id,
+            "group_name": group.name if group else None,
+            "tenant_id": subgroup.tenant_id,
+            "is_active": subgroup.is_active,
+            "created_at": _iso(subgroup.created_at),
+            "updated_at": _iso(subgroup.updated_at),
+        }
+
+    def _account_payload(account) -> Dict[str, object]:
+        subgroup = tree.subgroup_by_id.get(account.subgroup_id)
+        group = tree.group_by_id.get(subgroup.group_id) if subgroup else None
+        return {
+            "id": account.id,
+            "code": account.code,
+            "name": account.name,
+            "description": account.description,
+            "subgroup_id": account.subgroup_id,
+            "subgroup_name": subgroup.name if subgroup else None,
+            "group_id": subgroup.group_id if group else None,
+            "group_name": group.name if group else None,
+            "account_type": account.account_type,
+            "tenant_id": account.tenant_id,
+            "is_active": account.is_active,
+            "created_at": _iso(account.created_at),
+            "updated_at": _iso(account.updated_at),
+        }
+
+    def _by_code(nodes):
+        return sorted(nodes, key=lambda node: node.code or "")
 
-    # Ordenar e estruturar hierarquia: grupo → subgrupo → conta
-    # Filtrar subgrupos e contas para garantir que todos estejam incluídos
-    from collections import defaultdict
-    subgroup_by_group = defaultdict(list)
-    account_by_subgroup = defaultdict(list)
-    
-    # Organizar subgrupos por grupo
-    for subgroup in subgroups:
-        if subgroup.group_id:
-            subgroup_by_group[str(subgroup.group_id)].append(subgroup)
-    
-    # Organizar contas por subgrupo
-    for account in accounts:
-        if account.subgroup_id:
-            account_by_subgroup[str(account.subgroup_id)].append(account)
-    
-    # Garantir que todos os grupos tenham seus subgrupos e contas
+    # Hierarquia ordenada por código: grupo → subgrupo → conta
     groups_list = []
     subgroups_list = []
     accounts_list = []
-    
-    for group in sorted(groups, key=lambda g: g.code or ""):
-        groups_list.append({
-            "id": str(group.id),
-            "code": group.code,
-            "name": group.name,
-            "description": group.description,
-            "tenant_id": str(group.tenant_id) if group.tenant_id else None,
-            "is_active": group.is_active,
-            "created_at": group.created_at.isoformat() if group.created_at else None,
-            "updated_at": group.updated_at.isoformat() if group.updated_at else None,
-        })
-        
-        # Adicionar subgrupos deste grupo
-        for subgroup in sorted(subgroup_by_group.get(str(group.id), []), key=lambda s: s.code or ""):
-            subgroups_list.append({
-                "id": str(subgroup.id),
-                "code": subgroup.code,
-                "name": subgroup.name,
-                "description": subgroup.description,
-                "group_id": str(subgroup.group_id) if subgroup.group_id else None,
-                "group_name": subgroup.group.name if subgroup.group else None,
-                "tenant_id": str(subgroup.tenant_id) if subgroup.tenant_id else None,
-                "is_active": subgroup.is_active,
-                "created_at": subgroup.created_at.isoformat() if subgroup.created_at else None,
-                "updated_at": subgroup.updated_at.isoformat() if subgroup.updated_at else None,
-            })
-            
-            # Adicionar contas deste subgrupo
-            for account in sorted(account_by_subgroup.get(str(subgroup.id), []), key=lambda a: a.code or ""):
-                accounts_list.append({
-                    "id": str(account.id),
-                    "code": account.code,
-                    "name": account.name,
-                    "description": account.description,
-                    "subgroup_id": str(account.subgroup_id) if account.subgroup_id else None,
-                    "subgroup_name": account.subgroup.name if account.subgroup else None,
-                    "group_id": str(account.subgroup.group_id) if account.subgroup and account.subgroup.group else None,
-                    "group_name": account.subgroup.group.name if account.subgroup and account.subgroup.group else None,
-                    "account_type": account.account_type,
-                    "tenant_id": str(account.tenant_id) if account.tenant_id else None,
-                    "is_active": account.is_active,
-                    "created_at": account.created_at.isoformat() if account.created_at else None,
-                    "updated_at": account.updated_at.isoformat() if account.updated_at else None,
-                })
-    
-    # Incluir subgrupos e contas órfãos (sem grupo/subgrupo pai)
-    for subgroup in subgroups:
-        if str(subgroup.id) not in [s["id"] for s in subgroups_list]:
-            subgroups_list.append({
-                "id": str(subgroup.id),
-                "code": subgroup.code,
-                "name": subgroup.name,
-                "description": subgroup.description,
-                "group_id": str(subgroup.group_id) if subgroup.group_id else None,
-                "group_name": subgroup.group.name if subgroup.group else None,
-                "tenant_id": str(subgroup.tenant_id) if subgroup.tenant_id else None,
-                "is_active": subgroup.is_active,
-                "created_at": subgroup.created_at.isoformat() if subgroup.created_at else None,
-                "updated_at": subgroup.updated_at.isoformat() if subgroup.updated_at else None,
-            })
-    
-    for account in accounts:
-        if str(account.id) not in [a["id"] for a in accounts_list]:
-            accounts_list.append({
-                "id": str(account.id),
-                "code": account.code,
-                "name": account.name,
-                "description": account.description,
-                "subgroup_id": str(account.subgroup_id) if account.subgroup_id else None,
-                "subgroup_name": account.subgroup.name if account.subgroup else None,
-                "group_id": str(account.subgroup.group_id) if account.subgroup and account.subgroup.group else None,
-                "group_name": account.subgroup.group.name if account.subgroup and account.subgroup.group else None,
-                "account_type": account.account_type,
-                "tenant_id": str(account.tenant_id) if account.tenant_id else None,
-                "is_active": account.is_active,
-                "created_at": account.created_at.isoformat() if account.created_at else None,
-                "updated_at": account.updated_at.isoformat() if account.updated_at else None,
-            })
-    
+    placed_subgroups = set()
+    placed_accounts = set()
+
+    for group in _by_code(tree.groups):
+        groups_list.append(_group_payload(group))
+        for subgroup in _by_code(tree.subgroups_by_group.get(group.id, ())):
+            subgroups_list.append(_subgroup_payload(subgroup))
+            placed_subgroups.add(subgroup.id)
+            for account in _by_code(tree.accounts_by_subgroup.get(subgroup.id, ())):
+                accounts_list.append(_account_payload(account))
+                placed_accounts.add(account.id)
+
+    # Incluir subgrupos e contas órfãos (sem grupo/subgrupo pai), por código
+    for subgroup in _by_code(tree.subgroups):
+        if subgroup.id not in placed_subgroups:
+            subgroups_list.append(_subgroup_payload(subgroup))
+    for account in _by_code(tree.accounts):
+        if account.id not in placed_accounts:
+            accounts_list.append(_account_payload(account))
+
     return {
         "groups": groups_list,
         "subgroups": subgroups_list,
@@ -289,7 +241,7 @@ def get_chart_accounts_hierarchy(
 
 
 @router.post("/api/v1/chart-accounts/import")
-async def import_chart_accounts(
+def import_chart_accounts(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -299,7 +251,8 @@ async def import_chart_accounts(
         raise HTTPException(status_code=403, detail="Sem permissão para importar plano de contas")
 
     tenant_id = _tenant_id(current_user)
-    content = await file.read()
+    # Rota síncrona (threadpool): leitura direta do arquivo temporário do upload
+    content = file.file.read()
     if not content:
         raise HTTPException(status_code=400, detail="Arquivo vazio")
 
@@ -361,7 +361,7 @@ async def import_plan_accounts_csv(
 
 
 @router.get("/template/accounts")
-async def get_accounts_template():
+def get_accounts_template():
     """Retorna template CSV para importação de contas."""
     template = """Conta,Subgrupo,Saldo,Descrição
 Conta Exemplo,Subgrupo Exemplo,1000.00,Descrição da conta
@@ -370,7 +370,7 @@ Conta Exemplo,Subgrupo Exemplo,1000.00,Descrição da conta
 
 
 @router.get("/template/transactions")
-async def get_transactions_template():
+def get_transactions_template():
     """Retorna template CSV para importação de transações."""
     template = """Data Movimentação,Conta,Valor,Descrição
 02/01/2025,Conta Exemplo,100.00,Descrição da transação
@@ -379,7 +379,7 @@ async def get_transactions_template():
 
 
 @router.get("/template/plan-accounts")
-async def get_plan_accounts_template():
+def get_plan_accounts_template():
     """Retorna template CSV para importação do plano de contas."""
     template = """Conta,Subgrupo,Grupo,Escolha
 Conta Exemplo,Subgrupo Exemplo,Grupo Exemplo,Usar
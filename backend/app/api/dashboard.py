@@ -2,18 +2,14 @@ from __future__ import annotations
 
 from collections import defaultdict
 from datetime import datetime, timedelta, date
-import json
-import io
 import calendar
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 import re
-import time
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 import pandas as pd
-import requests
-from sqlalchemy import func, case
+from sqlalchemy import func, case, select
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -29,11 +25,20 @@ from app.models.chart_of_accounts import (
 from app.models.lancamento_diario import LancamentoDiario, TransactionType
 from app.models.lancamento_previsto import LancamentoPrevisto, TransactionStatus
 from app.models.cash_flow_settings import CashFlowYearSettings
-from app.models.cash_flow_forecast_values import CashFlowForecastValue
+from app.services.bulk_export import EXPORT_FORMAT_PATTERN, BulkExportService
 from app.services.dependencies import get_current_active_user
 from app.services.financial_aggregation_service import FinancialAggregationService
 from app.services.monthly_drilldown_service import MonthlyDrilldownService
 from app.services.cash_flow_service import CashFlowService
+from app.services.forecast_sheet import ForecastRows, extract_forecast_rows
+from app.services.keyset_pagination import InvalidCursorError, decode_cursor, fetch_page
+from app.services.spreadsheet_cache import SpreadsheetCache
+from app.services.cash_flow_matrix_service import (
+    MONTH_LABELS,
+    CashFlowMatrixService,
+    decimal_to_float as _decimal_to_float,
+    load_cash_flow_settings as _load_cash_flow_settings,
+)
 
 router = APIRouter(tags=["dashboard"])
 
@@ -60,34 +65,6 @@ def _require_business_unit(user: User) -> Optional[str]:
     return str(business_unit_id)
 
 
-def _decimal_to_float(value: Optional[Decimal]) -> float:
-    if value is None:
-        return 0.0
-    if isinstance(value, Decimal):
-        return float(value.quantize(Decimal("0.01")))
-    return float(Decimal(str(value)).quantize(Decimal("0.01")))
-
-
-def _to_cent(value: float) -> float:
-    return float(Decimal(str(value)).quantize(Decimal("0.01")))
-
-
-MONTH_LABELS = [
-    "JANEIRO",
-    "FEVEREIRO",
-    "MARÇO",
-    "ABRIL",
-    "MAIO",
-    "JUNHO",
-    "JULHO",
-    "AGOSTO",
-    "SETEMBRO",
-    "OUTUBRO",
-    "NOVEMBRO",
-    "DEZEMBRO",
-]
-
-
 @router.get("/financial/transactions")
 def list_transactions(
     year: Optional[int] = Query(default=None, ge=1900),
@@ -122,17 +99,19 @@ def list_transactions(
         LancamentoDiario.data_movimentacao <= end_dt,
     )
 
-    if cursor:
-        try:
-            cursor_dt = datetime.fromisoformat(cursor.replace("Z", "+00:00"))
-            query = query.filter(LancamentoDiario.data_movimentacao < cursor_dt)
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail="Cursor inválido.") from exc
-
-    query = query.order_by(
-        LancamentoDiario.data_movimentacao.desc(), LancamentoDiario.created_at.desc()
+    try:
+        page_cursor = decode_cursor(cursor) if cursor else None
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail="Cursor inválido.") from exc
+
+    # Keyset em (data_movimentacao, id): lançamentos com a mesma data não são pulados
+    items, next_cursor = fetch_page(
+        query,
+        LancamentoDiario.data_movimentacao,
+        LancamentoDiario.id,
+        limit,
+        cursor=page_cursor,
     )
-    items = query.limit(limit).all()
 
     def map_type(tx_type: Optional[TransactionType]) -> str:
         if tx_type == TransactionType.RECEITA:
@@ -155,10 +134,6 @@ def list_transactions(
         for item in items
     ]
 
-    next_cursor: Optional[str] = None
-    if items and len(items) == limit:
-        next_cursor = items[-1].data_movimentacao.isoformat()
-
     return {
         "year": target_year,
         "items": formatted,
@@ -575,195 +550,24 @@ def cash_flow(
     return payload
 
 
-def _load_plan_structure(
-    db: Session, tenant_id: str
-) -> tuple[
-    List[ChartAccountGroup],
-    List[ChartAccountSubgroup],
-    List[ChartAccount],
-    Dict[str, List[ChartAccountSubgroup]],
-    Dict[str, List[ChartAccount]],
-]:
-    def _load(model):
-        tenant_items = (
-            db.query(model)
-            .filter(
-                model.tenant_id == tenant_id,
-                model.is_active.is_(True),
-            )
-            .order_by(model.created_at.asc(), model.id.asc())
-            .all()
-        )
-        if tenant_items:
-            return tenant_items
-        return (
-            db.query(model)
-            .filter(
-                model.tenant_id.is_(None),
-                model.is_active.is_(True),
-            )
-            .order_by(model.created_at.asc(), model.id.asc())
-            .all()
-        )
-
-    groups = _load(ChartAccountGroup)
-    subgroups = _load(ChartAccountSubgroup)
-    accounts = _load(ChartAccount)
-
-    subgroup_by_group: Dict[str, List[ChartAccountSubgroup]] = defaultdict(list)
-    for sub in subgroups:
-        subgroup_by_group[str(sub.group_id)].append(sub)
-
-    account_by_subgroup: Dict[str, List[ChartAccount]] = defaultdict(list)
-    for account in accounts:
-        account_by_subgroup[str(account.subgroup_id)].append(account)
-
-    for group_id, items in subgroup_by_group.items():
-        subgroup_by_group[group_id] = sorted(
-            items,
-            key=lambda sg: (sg.created_at or datetime.min, sg.id),
-        )
-
-    for subgroup_id, items in account_by_subgroup.items():
-        account_by_subgroup[subgroup_id] = sorted(
-            items,
-            key=lambda acc: (acc.created_at or datetime.min, acc.id),
-        )
-
-    return groups, subgroups, accounts, subgroup_by_group, account_by_subgroup
-
-
-def _empty_months() -> Dict[str, Dict[str, float]]:
-    return {
-        label: {"previsto": 0.0, "realizado": 0.0, "ah": 0.0, "av": 0.0}
-        for label in MONTH_LABELS
-    }
-
-
 def _empty_days(last_day: int) -> Dict[int, float]:
     return {day: 0.0 for day in range(1, last_day + 1)}
 
 
-_SHEET_CACHE: Dict[str, Tuple[float, bytes]] = {}
-_SHEET_CACHE_TTL_SECONDS = 300
-
-
-def _load_cash_flow_settings(
-    db: Session,
-    tenant_id: str,
-    business_unit_id: Optional[str],
-    year: int,
-) -> Tuple[Optional[List[str]], float]:
-    settings_query = (
-        db.query(CashFlowYearSettings)
-        .filter(
-            CashFlowYearSettings.tenant_id == tenant_id,
-            CashFlowYearSettings.year == year,
-        )
-    )
-    if business_unit_id:
-        settings_query = settings_query.filter(
-            CashFlowYearSettings.business_unit_id == business_unit_id
-        )
-    settings = settings_query.first()
-    if not settings:
-        # fallback: usar a ordem mais recente disponível para manter o espelhamento da planilha
-        fallback_query = (
-            db.query(CashFlowYearSettings)
-            .filter(CashFlowYearSettings.tenant_id == tenant_id)
-            .order_by(CashFlowYearSettings.year.desc())
-        )
-        if business_unit_id:
-            fallback_query = fallback_query.filter(
-                CashFlowYearSettings.business_unit_id == business_unit_id
-            )
-        settings = fallback_query.first()
-        if not settings:
-            return None, 0.0
-        line_order = None
-        if settings.line_order:
-            try:
-                line_order = json.loads(settings.line_order)
-            except Exception:
-                line_order = None
-        # saldo do ano anterior não deve ser reutilizado quando o ano solicitado não tem settings
-        return line_order, 0.0
-
-    line_order = None
-    if settings.line_order:
-        try:
-            line_order = json.loads(settings.line_order)
-        except Exception:
-            line_order = None
-
-    saldo_ano_anterior = _decimal_to_float(settings.saldo_ano_anterior)
-    return line_order, saldo_ano_anterior
-
-
-def _load_forecast_values(
-    db: Session,
-    tenant_id: str,
-    business_unit_id: Optional[str],
-    year: int,
-) -> Dict[str, Dict[str, float]]:
-    query = (
-        db.query(CashFlowForecastValue)
-        .filter(
-            CashFlowForecastValue.tenant_id == tenant_id,
-            CashFlowForecastValue.year == year,
-        )
-    )
-    if business_unit_id:
-        query = query.filter(CashFlowForecastValue.business_unit_id == business_unit_id)
-
-    values: Dict[str, Dict[str, float]] = defaultdict(dict)
-    for row in query.all():
-        label_key = (row.label or "").strip().lower()
-        if not label_key:
-            continue
-        if row.month and 1 <= row.month <= 12:
-            month_label = MONTH_LABELS[row.month - 1]
-            values[label_key][month_label] = _decimal_to_float(row.value)
-
-    return values
-
-
-def _normalize_spreadsheet_url(spreadsheet_url: str) -> str:
-    if "docs.google.com/spreadsheets" not in spreadsheet_url:
-        return spreadsheet_url
-    match = re.search(r"/spreadsheets/d/([a-zA-Z0-9_-]+)", spreadsheet_url)
-    if match:
-        sheet_id = match.group(1)
-        return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=xlsx"
-    base_url = spreadsheet_url.split("?")[0].split("#")[0]
-    if base_url.endswith("/edit"):
-        base_url = base_url[:-5]
-    return f"{base_url}/export?format=xlsx"
-
-
 def _load_spreadsheet_bytes(spreadsheet_url: str) -> bytes:
-    normalized_url = _normalize_spreadsheet_url(spreadsheet_url)
-    cached = _SHEET_CACHE.get(normalized_url)
-    now = time.time()
-    if cached and now - cached[0] < _SHEET_CACHE_TTL_SECONDS:
-        return cached[1]
-    response = requests.get(normalized_url, timeout=30)
-    response.raise_for_status()
-    content = response.content
-    _SHEET_CACHE[normalized_url] = (now, content)
-    return content
+    return SpreadsheetCache.get_workbook(spreadsheet_url).content
 
 
 def _load_forecast_sheet(spreadsheet_url: str, year: int) -> pd.DataFrame:
-    content = _load_spreadsheet_bytes(spreadsheet_url)
-    excel = pd.ExcelFile(io.BytesIO(content))
+    workbook = SpreadsheetCache.get_workbook(spreadsheet_url)
     candidates = [
         f"Fluxo de caixa-{year}",
         f"Previsão Fluxo de caixa-{year}",
     ]
+    sheet_names = workbook.sheet_names
     for sheet_name in candidates:
-        if sheet_name in excel.sheet_names:
-            return pd.read_excel(excel, sheet_name=sheet_name, header=None)
+        if sheet_name in sheet_names:
+            return workbook.frame(sheet_name, header=None)
     raise HTTPException(
         status_code=400,
         detail="Planilha não contém aba de previsão/fluxo para o ano selecionado.",
@@ -771,10 +575,9 @@ def _load_forecast_sheet(spreadsheet_url: str, year: int) -> pd.DataFrame:
 
 
 def _get_forecast_years(spreadsheet_url: str) -> List[int]:
-    content = _load_spreadsheet_bytes(spreadsheet_url)
-    excel = pd.ExcelFile(io.BytesIO(content))
+    workbook = SpreadsheetCache.get_workbook(spreadsheet_url)
     years: set[int] = set()
-    for name in excel.sheet_names:
+    for name in workbook.sheet_names:
         match = re.search(r"(?:Fluxo de caixa|Previsão Fluxo de caixa)-(\d{4})", name, re.IGNORECASE)
         if match:
             try:
@@ -792,15 +595,6 @@ def _resolve_forecast_year(spreadsheet_url: str, desired_year: int) -> int:
     return max(eligible) if eligible else max(years)
 
 
-def _find_month_header_row(df: pd.DataFrame) -> Optional[int]:
-    max_scan = min(10, len(df))
-    for idx in range(max_scan):
-        row = df.iloc[idx].astype(str).str.strip().str.upper()
-        if "JANEIRO" in row.values and "FEVEREIRO" in row.values:
-            return idx
-    return None
-
-
 def _resolve_business_unit_id(
     db: Session,
     tenant_id: str,
@@ -834,77 +628,10 @@ def _resolve_year_from_settings(
     return int(row[0]) if row else fallback_year
 
 
-def _detect_label_column(df: pd.DataFrame, start_row: int) -> int:
-    best_col = 1
-    best_count = -1
-    for col in df.columns:
-        series = df.iloc[start_row:, col]
-        count = int(series.apply(lambda v: isinstance(v, str) and v.strip() != "").sum())
-        if count > best_count:
-            best_count = count
-            best_col = int(col)
-    return best_col
-
-
-def _parse_numeric(value: Any) -> float:
-    if value is None:
-        return 0.0
-    if isinstance(value, float) and pd.isna(value):
-        return 0.0
-    if isinstance(value, Decimal):
-        return float(value)
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = (
-            value.replace("R$", "")
-            .replace(" ", "")
-            .replace(".", "")
-            .replace(",", ".")
-            .strip()
-        )
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
-    return 0.0
-
-
-def _extract_forecast_rows(df: pd.DataFrame, year: int) -> List[Dict[str, Any]]:
-    header_row_idx = _find_month_header_row(df)
-    if header_row_idx is None:
+def _extract_forecast_rows(df: pd.DataFrame, year: int) -> ForecastRows:
+    rows = extract_forecast_rows(df, year)
+    if rows is None:
         raise HTTPException(status_code=400, detail="Não foi possível localizar cabeçalhos de meses na planilha.")
-
-    header_row = df.iloc[header_row_idx].astype(str).str.strip().str.upper()
-    month_columns = {month: idx for idx, month in enumerate(header_row) if month in MONTH_LABELS}
-
-    data_start = header_row_idx + 2
-    label_col = _detect_label_column(df, data_start)
-
-    rows: List[Dict[str, Any]] = []
-    for row_idx in range(data_start, len(df)):
-        raw_label = df.iloc[row_idx, label_col]
-        if raw_label is None or (isinstance(raw_label, float) and pd.isna(raw_label)):
-            continue
-        label = str(raw_label).strip()
-        if not label:
-            continue
-        if label.lower() in {"previsão de fluxo de caixa", "ano do fluxo:"}:
-            continue
-        if label.isdigit() and int(label) == year:
-            continue
-
-        months = {}
-        realized_months = {}
-        for month in MONTH_LABELS:
-            col_idx = month_columns.get(month)
-            value = df.iloc[row_idx, col_idx] if col_idx is not None else 0
-            months[month] = _parse_numeric(value)
-            realized_value = df.iloc[row_idx, col_idx + 1] if col_idx is not None else 0
-            realized_months[month] = _parse_numeric(realized_value)
-
-        rows.append({"label": label, "previstos": months, "realizados": realized_months})
-
     return rows
 
 
@@ -931,424 +658,17 @@ def cash_flow_previsto_realizado(
     else:
         target_year = year
 
-    line_order, saldo_ano_anterior = _load_cash_flow_settings(
-        db=db,
-        tenant_id=tenant_id,
-        business_unit_id=business_unit_id,
-        year=target_year,
-    )
-    forecast_values = _load_forecast_values(
+    matrix = CashFlowMatrixService.get_matrix(
         db=db,
         tenant_id=tenant_id,
         business_unit_id=business_unit_id,
         year=target_year,
     )
 
-    groups, subgroups, accounts, subgroup_by_group, account_by_subgroup = _load_plan_structure(db, tenant_id)
-    group_map = {g.name.strip().lower(): str(g.id) for g in groups}
-    subgroup_map = {sg.name.strip().lower(): str(sg.id) for sg in subgroups}
-    account_map = {acc.name.strip().lower(): str(acc.id) for acc in accounts}
-
-    subtotal_labels = {
-        "receita líquida",
-        "lucro bruto",
-        "lucro antes dos investimentos",
-        "desembolso total",
-        "lucro operacional",
-        "lucro líquido de caixa mensal",
-        "lucro líquido acumulado (reservas)",
-        "saldo do ano anterior",
-    }
-
-    rows: List[Dict[str, Any]] = []
-    row_by_label: Dict[str, Dict[str, Any]] = {}
-    row_meta: List[Dict[str, Any]] = []
-    current_group_id: Optional[str] = None
-
-    def _make_row(name: str, level: int, row_type: str) -> Dict[str, Any]:
-        return {
-            "categoria": name,
-            "nivel": level,
-            "tipo": row_type,
-            "meses": _empty_months(),
-        }
-
-    def _append_row(label: str, level: int, row_type: str, group_id=None, subgroup_id=None, account_id=None) -> None:
-        row = _make_row(label, level, row_type)
-        rows.append(row)
-        row_by_label[label.strip().lower()] = row
-        row_meta.append(
-            {
-                "row": row,
-                "type": row_type,
-                "group_id": group_id,
-                "subgroup_id": subgroup_id,
-                "account_id": account_id,
-                "label_key": label.strip().lower(),
-            }
-        )
-
-    # Montar ordem de linhas (preferir ordem salva no onboarding)
-    order_labels: List[str] = []
-    if line_order:
-        order_labels = [str(label) for label in line_order if str(label).strip()]
-    else:
-        for group in groups:
-            order_labels.append(group.name)
-            for subgroup in subgroup_by_group.get(str(group.id), []):
-                order_labels.append(subgroup.name)
-                for account in account_by_subgroup.get(str(subgroup.id), []):
-                    order_labels.append(account.name)
-        for subtotal in [
-            "Receita Líquida",
-            "Lucro Bruto",
-            "Lucro antes dos investimentos",
-            "Desembolso Total",
-            "LUCRO OPERACIONAL",
-            "Lucro Líquido de caixa mensal",
-            "Lucro líquido acumulado (Reservas)",
-            "Saldo do ano anterior",
-        ]:
-            if subtotal.strip().lower() not in {l.strip().lower() for l in order_labels}:
-                order_labels.append(subtotal)
-
-    used_labels: set[str] = set()
-    for label in order_labels:
-        label = str(label).strip()
-        if not label:
-            continue
-        label_key = label.lower()
-
-        group_id = group_map.get(label_key)
-        subgroup_id = subgroup_map.get(label_key)
-        account_id = account_map.get(label_key)
-
-        if group_id:
-            row_type = "grupo"
-            level = 0
-            current_group_id = group_id
-        elif subgroup_id:
-            row_type = "subgrupo"
-            level = 1
-        elif account_id:
-            row_type = "conta"
-            level = 2
-        elif label_key in subtotal_labels:
-            row_type = "subtotal"
-            level = 0
-        else:
-            row_type = "subgrupo" if current_group_id else "subtotal"
-            level = 1 if current_group_id else 0
-
-        _append_row(label, level, row_type, group_id, subgroup_id, account_id)
-        used_labels.add(label_key)
-
-    # Adicionar itens do plano de contas ausentes na ordem
-    # Quando a ordem vem da planilha (line_order), não incluir itens fora dela
-    # para manter espelhamento exato da estrutura do cliente.
-    if not line_order:
-        for group in groups:
-            key = group.name.strip().lower()
-            if key not in used_labels:
-                _append_row(group.name, 0, "grupo", group_id=str(group.id))
-                used_labels.add(key)
-            for subgroup in subgroup_by_group.get(str(group.id), []):
-                sub_key = subgroup.name.strip().lower()
-                if sub_key not in used_labels:
-                    _append_row(subgroup.name, 1, "subgrupo", subgroup_id=str(subgroup.id))
-                    used_labels.add(sub_key)
-                for account in account_by_subgroup.get(str(subgroup.id), []):
-                    acc_key = account.name.strip().lower()
-                    if acc_key not in used_labels:
-                        _append_row(account.name, 2, "conta", account_id=str(account.id))
-                        used_labels.add(acc_key)
-
-    start_dt = datetime(target_year, 1, 1)
-    end_dt = datetime(target_year, 12, 31, 23, 59, 59)
-
-    def _init_months_decimal() -> Dict[str, Decimal]:
-        return {label: Decimal("0") for label in MONTH_LABELS}
-
-    # Previstos
-    previstos_query = (
-        db.query(LancamentoPrevisto)
-        .filter(
-            LancamentoPrevisto.tenant_id == tenant_id,
-            LancamentoPrevisto.is_active.is_(True),
-            LancamentoPrevisto.data_prevista >= start_dt,
-            LancamentoPrevisto.data_prevista <= end_dt,
-            LancamentoPrevisto.status != TransactionStatus.CANCELADO,
-        )
-    )
-    if business_unit_id:
-        previstos_query = previstos_query.filter(LancamentoPrevisto.business_unit_id == business_unit_id)
-    previstos = previstos_query.all()
-
-    previsto_group_totals: Dict[str, Dict[str, Decimal]] = defaultdict(_init_months_decimal)
-    previsto_subgroup_totals: Dict[str, Dict[str, Decimal]] = defaultdict(_init_months_decimal)
-    previsto_account_totals: Dict[str, Dict[str, Decimal]] = defaultdict(_init_months_decimal)
-
-    for tx in previstos:
-        if not tx.data_prevista or tx.valor is None:
-            continue
-        month_label = MONTH_LABELS[tx.data_prevista.month - 1]
-        amount = Decimal(str(tx.valor))
-        if tx.conta_id:
-            previsto_account_totals[str(tx.conta_id)][month_label] += amount
-        if tx.subgrupo_id:
-            previsto_subgroup_totals[str(tx.subgrupo_id)][month_label] += amount
-        if tx.grupo_id:
-            previsto_group_totals[str(tx.grupo_id)][month_label] += amount
-
-    # Realizados
-    realizados_query = (
-        db.query(LancamentoDiario)
-        .filter(
-            LancamentoDiario.tenant_id == tenant_id,
-            LancamentoDiario.is_active.is_(True),
-            LancamentoDiario.data_movimentacao >= start_dt,
-            LancamentoDiario.data_movimentacao <= end_dt,
-            LancamentoDiario.status != TransactionStatus.CANCELADO,
-        )
-    )
-    if business_unit_id:
-        realizados_query = realizados_query.filter(LancamentoDiario.business_unit_id == business_unit_id)
-    realizados = realizados_query.all()
-
-    realized_group_totals: Dict[str, Dict[str, Decimal]] = defaultdict(_init_months_decimal)
-    realized_subgroup_totals: Dict[str, Dict[str, Decimal]] = defaultdict(_init_months_decimal)
-    realized_account_totals: Dict[str, Dict[str, Decimal]] = defaultdict(_init_months_decimal)
-
-    for tx in realizados:
-        if not tx.data_movimentacao or tx.valor is None:
-            continue
-        month_label = MONTH_LABELS[tx.data_movimentacao.month - 1]
-        amount = Decimal(str(tx.valor))
-        if tx.conta_id:
-            realized_account_totals[str(tx.conta_id)][month_label] += amount
-        if tx.subgrupo_id:
-            realized_subgroup_totals[str(tx.subgrupo_id)][month_label] += amount
-        if tx.grupo_id:
-            realized_group_totals[str(tx.grupo_id)][month_label] += amount
-
-    for meta in row_meta:
-        row = meta["row"]
-        if meta["type"] == "grupo" and meta["group_id"]:
-            totals_prev = previsto_group_totals.get(meta["group_id"], _init_months_decimal())
-            totals_real = realized_group_totals.get(meta["group_id"], _init_months_decimal())
-        elif meta["type"] == "subgrupo" and meta["subgroup_id"]:
-            totals_prev = previsto_subgroup_totals.get(meta["subgroup_id"], _init_months_decimal())
-            totals_real = realized_subgroup_totals.get(meta["subgroup_id"], _init_months_decimal())
-        elif meta["type"] == "conta" and meta["account_id"]:
-            totals_prev = previsto_account_totals.get(meta["account_id"], _init_months_decimal())
-            totals_real = realized_account_totals.get(meta["account_id"], _init_months_decimal())
-        else:
-            continue
-        for label in MONTH_LABELS:
-            row["meses"][label]["previsto"] = float(totals_prev[label])
-            row["meses"][label]["realizado"] = float(totals_real[label])
-
-    def _get_row_by_name(name: str, row_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
-        key = name.strip().lower()
-        row = row_by_label.get(key)
-        if row_type and row and row.get("tipo") != row_type:
-            return None
-        return row
-
-    def _sum_groups_by_predicate(group_totals, predicate) -> Dict[str, Decimal]:
-        totals = {label: Decimal("0") for label in MONTH_LABELS}
-        for group in groups:
-            if not predicate(group.name):
-                continue
-            data = group_totals.get(str(group.id), _init_months_decimal())
-            for label in MONTH_LABELS:
-                totals[label] += data[label]
-        return totals
-
-    def _sum_group_by_name(group_totals, name: str) -> Dict[str, Decimal]:
-        group = next((g for g in groups if g.name.strip().lower() == name.strip().lower()), None)
-        if not group:
-            return {label: Decimal("0") for label in MONTH_LABELS}
-        return group_totals.get(str(group.id), _init_months_decimal())
-
-    def _sum_subgroup_by_name(subgroup_totals, name: str) -> Dict[str, Decimal]:
-        subgroup = next((sg for sg in subgroups if sg.name.strip().lower() == name.strip().lower()), None)
-        if not subgroup:
-            return {label: Decimal("0") for label in MONTH_LABELS}
-        return subgroup_totals.get(str(subgroup.id), _init_months_decimal())
-
-    receita_totais_prev = _sum_groups_by_predicate(
-        previsto_group_totals,
-        lambda name: "receita" in name.lower() and "dedu" not in name.lower(),
-    )
-    deducoes_totais_prev = _sum_groups_by_predicate(previsto_group_totals, lambda name: "dedu" in name.lower())
-    custos_totais_prev = _sum_groups_by_predicate(previsto_group_totals, lambda name: "custo" in name.lower())
-    despesas_operacionais_totais_prev = _sum_group_by_name(previsto_group_totals, "Despesas Operacionais")
-    investimentos_totais_prev = _sum_groups_by_predicate(previsto_group_totals, lambda name: "investimento" in name.lower())
-
-    entradas_nao_op_prev = _sum_subgroup_by_name(previsto_subgroup_totals, "Entradas não Operacionais")
-    saidas_nao_op_prev = _sum_subgroup_by_name(previsto_subgroup_totals, "Saídas não Operacionais")
-
-    receita_totais_real = _sum_groups_by_predicate(
-        realized_group_totals,
-        lambda name: "receita" in name.lower() and "dedu" not in name.lower(),
-    )
-    deducoes_totais_real = _sum_groups_by_predicate(realized_group_totals, lambda name: "dedu" in name.lower())
-    custos_totais_real = _sum_groups_by_predicate(realized_group_totals, lambda name: "custo" in name.lower())
-    despesas_operacionais_totais_real = _sum_group_by_name(realized_group_totals, "Despesas Operacionais")
-    investimentos_totais_real = _sum_groups_by_predicate(realized_group_totals, lambda name: "investimento" in name.lower())
-
-    entradas_nao_op_real = _sum_subgroup_by_name(realized_subgroup_totals, "Entradas não Operacionais")
-    saidas_nao_op_real = _sum_subgroup_by_name(realized_subgroup_totals, "Saídas não Operacionais")
-
-    mov_group_row = _get_row_by_name("Movimentações Não Operacionais", "grupo")
-    if mov_group_row:
-        for label in MONTH_LABELS:
-            mov_group_row["meses"][label]["previsto"] = float(
-                entradas_nao_op_prev[label] - saidas_nao_op_prev[label]
-            )
-            mov_group_row["meses"][label]["realizado"] = float(
-                entradas_nao_op_real[label] - saidas_nao_op_real[label]
-            )
-
-    receita_liquida_prev = {label: Decimal("0") for label in MONTH_LABELS}
-    lucro_bruto_prev = {label: Decimal("0") for label in MONTH_LABELS}
-    lucro_antes_invest_prev = {label: Decimal("0") for label in MONTH_LABELS}
-    desembolso_total_prev = {label: Decimal("0") for label in MONTH_LABELS}
-    lucro_operacional_prev = {label: Decimal("0") for label in MONTH_LABELS}
-    lucro_liquido_prev = {label: Decimal("0") for label in MONTH_LABELS}
-
-    receita_liquida_real = {label: Decimal("0") for label in MONTH_LABELS}
-    lucro_bruto_real = {label: Decimal("0") for label in MONTH_LABELS}
-    lucro_antes_invest_real = {label: Decimal("0") for label in MONTH_LABELS}
-    desembolso_total_real = {label: Decimal("0") for label in MONTH_LABELS}
-    lucro_operacional_real = {label: Decimal("0") for label in MONTH_LABELS}
-    lucro_liquido_real = {label: Decimal("0") for label in MONTH_LABELS}
-
-    for label in MONTH_LABELS:
-        receita_total_prev = receita_totais_prev[label]
-        ded_prev = deducoes_totais_prev[label]
-        custo_prev = custos_totais_prev[label]
-        desp_prev = despesas_operacionais_totais_prev[label]
-        inv_prev = investimentos_totais_prev[label]
-
-        receita_liquida_prev[label] = receita_total_prev - ded_prev
-        lucro_bruto_prev[label] = receita_liquida_prev[label] - custo_prev
-        lucro_antes_invest_prev[label] = lucro_bruto_prev[label] - desp_prev
-        desembolso_total_prev[label] = ded_prev + custo_prev + desp_prev + inv_prev
-        lucro_operacional_prev[label] = receita_total_prev - desembolso_total_prev[label]
-
-        mov_prev = entradas_nao_op_prev[label] - saidas_nao_op_prev[label]
-        lucro_liquido_prev[label] = lucro_operacional_prev[label] + mov_prev
-
-        receita_total_real = receita_totais_real[label]
-        ded_real = deducoes_totais_real[label]
-        custo_real = custos_totais_real[label]
-        desp_real = despesas_operacionais_totais_real[label]
-        inv_real = investimentos_totais_real[label]
-
-        receita_liquida_real[label] = receita_total_real - ded_real
-        lucro_bruto_real[label] = receita_liquida_real[label] - custo_real
-        lucro_antes_invest_real[label] = lucro_bruto_real[label] - desp_real
-        desembolso_total_real[label] = ded_real + custo_real + desp_real + inv_real
-        lucro_operacional_real[label] = receita_total_real - desembolso_total_real[label]
-
-        mov_real = entradas_nao_op_real[label] - saidas_nao_op_real[label]
-        lucro_liquido_real[label] = lucro_operacional_real[label] + mov_real
-
-    def _apply_values(label: str, previsto_values: Dict[str, Decimal], realizado_values: Dict[str, Decimal]) -> None:
-        row = _get_row_by_name(label)
-        if not row:
-            return
-        for month in MONTH_LABELS:
-            row["meses"][month]["previsto"] = float(previsto_values[month])
-            row["meses"][month]["realizado"] = float(realizado_values[month])
-
-    _apply_values("Receita Líquida", receita_liquida_prev, receita_liquida_real)
-    _apply_values("Lucro Bruto", lucro_bruto_prev, lucro_bruto_real)
-    _apply_values("Lucro antes dos investimentos", lucro_antes_invest_prev, lucro_antes_invest_real)
-    _apply_values("Desembolso Total", desembolso_total_prev, desembolso_total_real)
-    _apply_values("LUCRO OPERACIONAL", lucro_operacional_prev, lucro_operacional_real)
-    _apply_values("Lucro Líquido de caixa mensal", lucro_liquido_prev, lucro_liquido_real)
-
-    if forecast_values:
-        for row in rows:
-            label_key = str(row.get("categoria", "")).strip().lower()
-            if label_key not in forecast_values:
-                continue
-            for month in MONTH_LABELS:
-                row["meses"][month]["previsto"] = float(forecast_values[label_key].get(month, 0.0))
-
-    saldo_row = _get_row_by_name("Saldo do ano anterior")
-    if not saldo_row and saldo_ano_anterior:
-        _append_row("Saldo do ano anterior", 0, "subtotal")
-        saldo_row = _get_row_by_name("Saldo do ano anterior")
-
-    if saldo_row:
-        if (saldo_row.get("categoria") or "").strip().lower() in forecast_values:
-            for month in MONTH_LABELS:
-                saldo_row["meses"][month]["previsto"] = float(
-                    forecast_values[saldo_row["categoria"].strip().lower()].get(month, 0.0)
-                )
-        else:
-            for month in MONTH_LABELS:
-                saldo_row["meses"][month]["previsto"] = 0.0
-                saldo_row["meses"][month]["realizado"] = 0.0
-            saldo_row["meses"][MONTH_LABELS[0]]["previsto"] = float(saldo_ano_anterior)
-            saldo_row["meses"][MONTH_LABELS[0]]["realizado"] = float(saldo_ano_anterior)
-
-    lucro_acumulado_prev = {label: Decimal("0") for label in MONTH_LABELS}
-    lucro_acumulado_real = {label: Decimal("0") for label in MONTH_LABELS}
-    acc_prev = Decimal(str(saldo_ano_anterior))
-    acc_real = Decimal(str(saldo_ano_anterior))
-    lucro_liquido_row = _get_row_by_name("Lucro Líquido de caixa mensal")
-    for label in MONTH_LABELS:
-        prev_value = lucro_liquido_prev[label]
-        if lucro_liquido_row:
-            prev_value = Decimal(str(lucro_liquido_row["meses"][label]["previsto"]))
-        acc_prev += prev_value
-        acc_real += Decimal(str(lucro_liquido_real[label]))
-        lucro_acumulado_prev[label] = acc_prev
-        lucro_acumulado_real[label] = acc_real
-
-    _apply_values("Lucro líquido acumulado (Reservas)", lucro_acumulado_prev, lucro_acumulado_real)
-
-    total_realizado_por_mes: Dict[str, float] = {
-        label: sum(
-            row["meses"][label]["realizado"]
-            for row in rows
-            if row.get("nivel") == 0 and row.get("tipo") == "grupo"
-        )
-        for label in MONTH_LABELS
-    }
-
-    for row in rows:
-        for month_label in MONTH_LABELS:
-            bucket = row["meses"][month_label]
-            previsto = bucket["previsto"]
-            realizado = bucket["realizado"]
-            if previsto > 0:
-                bucket["ah"] = (realizado / previsto) * 100
-            elif realizado > 0:
-                bucket["ah"] = 100.0
-            else:
-                bucket["ah"] = 0.0
-
-            total_mes = total_realizado_por_mes.get(month_label, 0.0)
-            if total_mes > 0:
-                bucket["av"] = (realizado / total_mes) * 100
-            else:
-                bucket["av"] = 0.0
-
-            bucket["previsto"] = _to_cent(bucket["previsto"])
-            bucket["realizado"] = _to_cent(bucket["realizado"])
-            bucket["ah"] = _to_cent(bucket["ah"])
-            bucket["av"] = _to_cent(bucket["av"])
-
     return {
         "success": True,
         "year": target_year,
-        "data": rows,
+        "data": matrix.as_rows(),
     }
 
 
@@ -1535,12 +855,17 @@ def saldo_disponivel(
 @router.get("/lancamentos-diarios")
 def listar_lancamentos_simples(
     limit: int = Query(default=100, ge=1, le=10000),
+    format: Optional[str] = Query(default=None, pattern=EXPORT_FORMAT_PATTERN),
+    accept: Optional[str] = Header(default=None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
-) -> List[Dict[str, Any]]:
+):
     """
     Retorna uma lista simplificada de lançamentos diários.
     Utilizado como fallback pelo frontend.
+
+    Com ``format=ndjson|csv`` (ou ``Accept: application/x-ndjson``) as linhas
+    são enviadas em streaming, planas (conta_id/conta_nome em vez de ``conta``).
     """
     tenant_id = str(current_user.tenant_id)
     business_unit_id = _require_business_unit(current_user)
@@ -1554,10 +879,29 @@ def listar_lancamentos_simples(
     )
     if business_unit_id:
         query = query.filter(LancamentoDiario.business_unit_id == business_unit_id)
-    
+
+    export_format = BulkExportService.requested_format(accept, format)
+    if export_format:
+        statement = (
+            select(
+                LancamentoDiario.id,
+                LancamentoDiario.data_movimentacao,
+                LancamentoDiario.valor,
+                LancamentoDiario.observacoes,
+                LancamentoDiario.transaction_type,
+                LancamentoDiario.conta_id,
+                ChartAccount.name.label("conta_nome"),
+            )
+            .outerjoin(ChartAccount, ChartAccount.id == LancamentoDiario.conta_id)
+            .where(query.whereclause)
+            .order_by(LancamentoDiario.data_movimentacao.desc(), LancamentoDiario.id.desc())
+            .limit(limit)
+        )
+        return BulkExportService.response(statement, export_format, filename="lancamentos_diarios")
+
     lancamentos = (
         query
-        .order_by(LancamentoDiario.data_movimentacao.desc())
+        .order_by(LancamentoDiario.data_movimentacao.desc(), LancamentoDiario.id.desc())
         .limit(limit)
         .all()
     )
@@ -1738,30 +1082,12 @@ def operational_availability(
         custos += Decimal(str(month_data.get("cost", 0)))
 
     # Alinhar total disponível com o fluxo de caixa mensal (Lucro líquido acumulado - Reservas)
-    month_label = MONTH_LABELS[current_month - 1]
-    cash_rows: List[Dict[str, Any]] = []
-    try:
-        cash_flow = cash_flow_previsto_realizado(
-            year=effective_year,
-            current_user=current_user,
-            db=db,
-        )
-        cash_rows = cash_flow.get("data") or []
-    except HTTPException:
-        cash_rows = []
-
-    def _find_row(label: str) -> Optional[Dict[str, Any]]:
-        key = label.strip().lower()
-        for row in cash_rows:
-            if str(row.get("categoria", "")).strip().lower() == key:
-                return row
-        return None
-
-    def _sum_row_realizado(row: Dict[str, Any]) -> Decimal:
-        total = Decimal("0")
-        for label in MONTH_LABELS[:current_month]:
-            total += Decimal(str(row["meses"][label]["realizado"]))
-        return total
+    matrix = CashFlowMatrixService.get_matrix(
+        db=db,
+        tenant_id=tenant_id,
+        business_unit_id=_require_business_unit(current_user),
+        year=effective_year,
+    )
 
     _, saldo_ano_anterior = _load_cash_flow_settings(
         db=db,
@@ -1771,21 +1097,20 @@ def operational_availability(
     )
     saldo_inicial = Decimal(str(saldo_ano_anterior))
 
-    acumulado_row = _find_row("Lucro líquido acumulado (Reservas)")
-    total_disponivel = Decimal("0")
+    acumulado_row = matrix.row("Lucro líquido acumulado (Reservas)")
     if acumulado_row:
-        total_disponivel = Decimal(str(acumulado_row["meses"][month_label]["realizado"]))
+        total_disponivel = acumulado_row.realizado[current_month - 1]
     else:
-        total_disponivel = saldo_inicial + saldo_consolidado
+        total_disponivel = saldo_inicial + (receitas - despesas - custos)
 
     # Se houver dados do fluxo de caixa, alinhar receitas/despesas/custos à planilha
-    receita_liquida_row = _find_row("Receita Líquida")
-    despesas_row = _find_row("Despesas Operacionais")
-    custos_row = _find_row("Custos")
+    receita_liquida_row = matrix.row("Receita Líquida")
+    despesas_row = matrix.row("Despesas Operacionais")
+    custos_row = matrix.row("Custos")
     if receita_liquida_row and despesas_row and custos_row:
-        receitas = _sum_row_realizado(receita_liquida_row)
-        despesas = _sum_row_realizado(despesas_row)
-        custos = _sum_row_realizado(custos_row)
+        receitas = receita_liquida_row.total_realizado(current_month)
+        despesas = despesas_row.total_realizado(current_month)
+        custos = custos_row.total_realizado(current_month)
 
     saldo_consolidado = total_disponivel - saldo_inicial
     saldo_acumulado = total_disponivel
@@ -2235,24 +1560,20 @@ def operational_forecast_vs_realized(
     if year is not None:
         months = 12
     
-    cash_flow = cash_flow_previsto_realizado(
-        year=effective_year,
-        current_user=current_user,
+    matrix = CashFlowMatrixService.get_matrix(
         db=db,
+        tenant_id=tenant_id,
+        business_unit_id=_require_business_unit(current_user),
+        year=effective_year,
     )
-    cash_rows = cash_flow.get("data") or []
-    target_label = "lucro líquido de caixa mensal"
-    target_row = next(
-        (row for row in cash_rows if str(row.get("categoria", "")).strip().lower() == target_label),
-        None,
-    )
+    target_row = matrix.row("Lucro Líquido de caixa mensal")
     if target_row:
         months_list = []
         total_realizado = Decimal(0)
         total_previsto = Decimal(0)
         for idx, label in enumerate(MONTH_LABELS):
-            realized = Decimal(str(target_row["meses"][label]["realizado"]))
-            forecast = Decimal(str(target_row["meses"][label]["previsto"]))
+            realized = target_row.realizado[idx]
+            forecast = target_row.previsto[idx]
             total_realizado += realized
             total_previsto += forecast
             months_list.append({
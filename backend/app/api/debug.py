@@ -24,7 +24,7 @@ async def debug_user(username: str):
         }
 
 @router.get("/config")
-async def debug_config():
+def debug_config():
     """Endpoint de debug para verificar configurações do banco"""
     try:
         settings = get_settings()
@@ -40,7 +40,7 @@ async def debug_config():
         }
 
 @router.get("/auth-test")
-async def debug_auth_test(current=Depends(get_current_user)):
+def debug_auth_test(current=Depends(get_current_user)):
     """Endpoint de debug para testar autenticação"""
     return {
         "authenticated": True,
@@ -51,7 +51,7 @@ async def debug_auth_test(current=Depends(get_current_user)):
     }
 
 @router.get("/jwt-config")
-async def debug_jwt_config():
+def debug_jwt_config():
     """Endpoint de debug para verificar configuração JWT"""
     from app.config import Settings
     settings = Settings()
@@ -62,7 +62,7 @@ async def debug_jwt_config():
     }
 
 @router.post("/test-token")
-async def test_token_decode(request: dict):
+def test_token_decode(request: dict):
     """Endpoint de debug para testar decodificação de token"""
     try:
         from app.config import Settings
@@ -108,7 +108,7 @@ async def test_token_decode(request: dict):
         }
 
 @router.get("/test-accounts")
-async def test_accounts():
+def test_accounts():
     """Endpoint de teste para verificar dados sem autenticação"""
     try:
         from app.db.bq_client import get_client
@@ -135,7 +135,7 @@ async def test_accounts():
         }
 
 @router.get("/temp/accounts")
-async def temp_accounts():
+def temp_accounts():
     """Endpoint temporário para listar contas sem autenticação"""
     try:
         from app.db.bq_client import get_client
@@ -163,7 +163,7 @@ async def temp_accounts():
         }
 
 @router.get("/temp/transactions")
-async def temp_transactions():
+def temp_transactions():
     """Endpoint temporário para listar transações sem autenticação"""
     try:
         from app.db.bq_client import get_client
@@ -192,7 +192,7 @@ async def temp_transactions():
         }
 
 @router.get("/temp/summary")
-async def temp_summary():
+def temp_summary():
     """Endpoint temporário para resumo dos dados sem autenticação"""
     try:
         from app.db.bq_client import get_client
@@ -240,7 +240,7 @@ async def temp_summary():
         }
 
 @router.get("/routes-info")
-async def routes_info():
+def routes_info():
     """Endpoint para verificar informações das rotas"""
     return {
         "success": True,
@@ -257,7 +257,7 @@ async def routes_info():
     }
 
 @router.get("/test-auth-simple")
-async def test_auth_simple(authorization: str = Header(None)):
+def test_auth_simple(authorization: str = Header(None)):
     """Endpoint de teste simples para autenticação"""
     if not authorization or not authorization.startswith("Bearer "):
         return {"error": "No Bearer token provided"}
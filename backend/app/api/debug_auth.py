@@ -6,7 +6,7 @@ from app.services.dependencies import get_current_user, tenant
 router = APIRouter(prefix="/debug-auth", tags=["debug-auth"])
 
 @router.get("/test-get-current-user")
-async def test_get_current_user(current=Depends(get_current_user)):
+def test_get_current_user(current=Depends(get_current_user)):
     """Endpoint de teste para get_current_user"""
     return {
         "success": True,
@@ -19,7 +19,7 @@ async def test_get_current_user(current=Depends(get_current_user)):
     }
 
 @router.get("/test-tenant")
-async def test_tenant(tenant_id: str = Depends(tenant)):
+def test_tenant(tenant_id: str = Depends(tenant)):
     """Endpoint de teste para função tenant"""
     return {
         "success": True,
@@ -27,7 +27,7 @@ async def test_tenant(tenant_id: str = Depends(tenant)):
     }
 
 @router.get("/test-both")
-async def test_both(current=Depends(get_current_user), tenant_id: str = Depends(tenant)):
+def test_both(current=Depends(get_current_user), tenant_id: str = Depends(tenant)):
     """Endpoint de teste para ambas as funções"""
     return {
         "success": True,
@@ -36,7 +36,7 @@ def _serialize_forecast(transaction: Transaction) -> dict:
 
 
 @router.get("/forecasts")
-async def list_forecasts(
+def list_forecasts(
     account_id: Optional[str] = Query(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -53,7 +53,7 @@ async def list_forecasts(
 
 
 @router.post("/forecasts", status_code=status.HTTP_201_CREATED)
-async def create_forecast(
+def create_forecast(
     forecast_data: dict,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -105,7 +105,7 @@ async def create_forecast(
 
 
 @router.put("/forecasts/{forecast_id}")
-async def update_forecast(
+def update_forecast(
     forecast_id: str,
     forecast_data: dict,
     current_user: User = Depends(get_current_active_user),
@@ -154,7 +154,7 @@ async def update_forecast(
 
 
 @router.delete("/forecasts/{forecast_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_forecast(
+def delete_forecast(
     forecast_id: str,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -173,7 +173,7 @@ async def delete_forecast(
 
 # Account Groups
 @router.post("/account-groups", response_model=AccountGroupResponse)
-async def create_account_group(
+def create_account_group(
     group_data: AccountGroupCreate,
     current_user: User = Depends(get_tenant_admin),
     db: Session = Depends(get_db)
@@ -226,7 +226,7 @@ async def create_account_group(
         )
 
 @router.get("/account-groups", response_model=List[AccountGroupResponse])
-async def list_account_groups(
+def list_account_groups(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -244,7 +244,7 @@ async def list_account_groups(
         )
 
 @router.put("/account-groups/{group_id}", response_model=AccountGroupResponse)
-async def update_account_group(
+def update_account_group(
     group_id: str,
     group_data: AccountGroupUpdate,
     current_user: User = Depends(get_tenant_admin),
@@ -279,7 +279,7 @@ async def update_account_group(
     return group
 
 @router.delete("/account-groups/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_account_group(
+def delete_account_group(
     group_id: str,
     current_user: User = Depends(get_tenant_admin),
     db: Session = Depends(get_db),
@@ -313,7 +313,7 @@ async def delete_account_group(
 
 # Account Subgroups
 @router.post("/account-subgroups", response_model=AccountSubgroupResponse)
-async def create_account_subgroup(
+def create_account_subgroup(
     subgroup_data: AccountSubgroupCreate,
     current_user: User = Depends(get_tenant_admin),
     db: Session = Depends(get_db)
@@ -380,7 +380,7 @@ async def create_account_subgroup(
         )
 
 @router.get("/account-subgroups", response_model=List[AccountSubgroupResponse])
-async def list_account_subgroups(
+def list_account_subgroups(
     group_id: Optional[str] = Query(None, description="ID do grupo para filtrar"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -404,7 +404,7 @@ async def list_account_subgroups(
         )
 
 @router.put("/account-subgroups/{subgroup_id}", response_model=AccountSubgroupResponse)
-async def update_account_subgroup(
+def update_account_subgroup(
     subgroup_id: str,
     subgroup_data: AccountSubgroupUpdate,
     current_user: User = Depends(get_tenant_admin),
@@ -448,7 +448,7 @@ async def update_account_subgroup(
     return subgroup
 
 @router.delete("/account-subgroups/{subgroup_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_account_subgroup(
+def delete_account_subgroup(
     subgroup_id: str,
     current_user: User = Depends(get_tenant_admin),
     db: Session = Depends(get_db),
@@ -470,7 +470,7 @@ async def delete_account_subgroup(
 
 # Accounts
 @router.post("/accounts", response_model=AccountResponse)
-async def create_account(
+def create_account(
     account_data: AccountCreate,
     current_user: User = Depends(get_tenant_admin),
     db: Session = Depends(get_db)
@@ -538,7 +538,7 @@ async def create_account(
         )
 
 @router.get("/accounts", response_model=List[AccountResponse])
-async def list_accounts(
+def list_accounts(
     subgroup_id: Optional[str] = Query(None, description="ID do subgrupo para filtrar"),
     account_type: Optional[str] = Query(None, description="Tipo de conta para filtrar"),
     current_user: User = Depends(get_current_active_user),
@@ -566,7 +566,7 @@ async def list_accounts(
         )
 
 @router.put("/accounts/{account_id}", response_model=AccountResponse)
-async def update_account(
+def update_account(
     account_id: str,
     account_data: AccountUpdate,
     current_user: User = Depends(get_tenant_admin),
@@ -612,7 +612,7 @@ async def update_account(
     return account
 
 @router.delete("/accounts/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_account(
+def delete_account(
     account_id: str,
     current_user: User = Depends(get_tenant_admin),
     db: Session = Depends(get_db),
@@ -630,7 +630,7 @@ async def delete_account(
 
 # Transactions
 @router.post("/transactions", response_model=TransactionResponse)
-async def create_transaction(
+def create_transaction(
     transaction_data: TransactionCreate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -698,7 +698,7 @@ async def create_transaction(
         )
 
 @router.get("/transactions", response_model=List[TransactionResponse])
-async def list_transactions(
+def list_transactions(
     start_date: Optional[datetime] = Query(None, description="Data inicial"),
     end_date: Optional[datetime] = Query(None, description="Data final"),
     account_id: Optional[str] = Query(None, description="ID da conta"),
@@ -741,7 +741,7 @@ async def list_transactions(
         )
 
 @router.put("/transactions/{transaction_id}", response_model=TransactionResponse)
-async def update_transaction(
+def update_transaction(
     transaction_id: str,
     transaction_data: TransactionUpdate,
     current_user: User = Depends(get_current_active_user),
@@ -787,7 +787,7 @@ async def update_transaction(
     return transaction
 
 @router.delete("/transactions/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_transaction(
+def delete_transaction(
     transaction_id: str,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -808,7 +808,7 @@ async def delete_transaction(
 
 # Cash Flow
 @router.get("/cash-flow", response_model=List[CashFlowResponse])
-async def get_cash_flow(
+def get_cash_flow(
     start_date: datetime = Query(..., description="Data inicial"),
     end_date: datetime = Query(..., description="Data final"),
     period_type: str = Query("daily", description="Tipo de período (daily, monthly, yearly)"),
@@ -894,7 +894,7 @@ async def get_cash_flow(
 
 # Bank Accounts
 @router.post("/bank-accounts", response_model=BankAccountResponse)
-async def create_bank_account(
+def create_bank_account(
     account_data: BankAccountCreate,
     current_user: User = Depends(get_tenant_admin),
     db: Session = Depends(get_db)
@@ -949,7 +949,7 @@ async def create_bank_account(
         )
 
 @router.get("/bank-accounts", response_model=List[BankAccountResponse])
-async def list_bank_accounts(
+def list_bank_accounts(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -16,7 +16,6 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from googleapiclient.errors import HttpError
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
@@ -26,6 +25,7 @@ from app.config import Settings
 from app.models.investimento import Investimento, TipoInvestimento
 from app.models.auth import User
 from app.services.llm_sheet_importer import LLMSheetImporter
+from app.services.sheet_reader_service import SheetReaderService
 
 router = APIRouter(prefix="/api/v1/investimentos", tags=["Investimentos"])
 
@@ -91,11 +91,18 @@ def _collect_sheet_balances(
     start: datetime,
     end: datetime,
 ) -> Dict[date, Decimal]:
-    importer = LLMSheetImporter()
-    if not importer.authenticate():
+    def _service_factory():
+        importer = LLMSheetImporter()
+        return importer.service if importer.authenticate() else None
+
+    grid = SheetReaderService.get_daily_grid(
+        _service_factory,
+        _get_spreadsheet_id(),
+        [suffix for suffix, _ in MONTH_SHEETS],
+    )
+    if not grid:
         return {}
 
-    spreadsheet_id = _get_spreadsheet_id()
     normalized_targets = {_normalize_label(label) for label in labels}
 
     balances: Dict[date, Decimal] = defaultdict(lambda: Decimal("0"))
@@ -108,20 +115,7 @@ def _collect_sheet_balances(
             (suffix for suffix, number in MONTH_SHEETS if number == month_cursor.month),
             None,
         )
-        if not sheet_suffix:
-            month_cursor = (month_cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
-            continue
-
-        try:
-            result = importer.service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=f"'FC-diário-{sheet_suffix}'!B174:AF184",
-            ).execute()
-        except HttpError:
-            month_cursor = (month_cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
-            continue
-
-        rows = result.get("values", [])
+        rows = grid.get(sheet_suffix, []) if sheet_suffix else []
         relevant_rows = [
             row for row in rows if row and _normalize_label(row[0]) in normalized_targets
         ]
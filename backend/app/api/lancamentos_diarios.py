@@ -5,12 +5,19 @@ from datetime import datetime
 from app.database import get_db
 from app.models.auth import User
 from app.models.lancamento_diario import (
+    LancamentoDiarioBatchCreate,
+    LancamentoDiarioBatchDelete,
+    LancamentoDiarioBatchUpdate,
     LancamentoDiarioCreate,
     LancamentoDiarioUpdate,
     TransactionType,
 )
 from app.services.dependencies import get_current_active_user
+from app.services.keyset_pagination import InvalidCursorError, decode_cursor
+from app.services.lancamento_batch_service import DIARIO_BATCH, LancamentoBatchService
 from app.services.lancamento_diario_service import LancamentoDiarioService
+from app.services.lancamento_rollup_service import LancamentoRollupService
+from app.services.transaction_type_resolver import TransactionTypeResolver
 
 router = APIRouter()
 
@@ -26,7 +33,7 @@ def _user_context(user: User) -> tuple[str, str]:
     return tenant_id, str(business_unit_id)
 
 @router.post("/api/v1/lancamentos-diarios", response_model=dict)
-async def create_lancamento_diario(
+def create_lancamento_diario(
     lancamento_data: LancamentoDiarioCreate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -50,8 +57,58 @@ async def create_lancamento_diario(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
+@router.post("/api/v1/lancamentos-diarios/batch", response_model=dict)
+def create_lancamentos_diarios_batch(
+    payload: LancamentoDiarioBatchCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Criar lançamentos diários em lote (resultado por item; idempotente por import_ref)"""
+    try:
+        tenant_id, business_unit_id = _user_context(current_user)
+        return LancamentoBatchService.create(
+            db, DIARIO_BATCH, payload.items, tenant_id, business_unit_id, str(current_user.id)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
+@router.put("/api/v1/lancamentos-diarios/batch", response_model=dict)
+def update_lancamentos_diarios_batch(
+    payload: LancamentoDiarioBatchUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Atualizar lançamentos diários em lote"""
+    try:
+        tenant_id, business_unit_id = _user_context(current_user)
+        return LancamentoBatchService.update(db, DIARIO_BATCH, payload.items, tenant_id, business_unit_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
+@router.post("/api/v1/lancamentos-diarios/batch/delete", response_model=dict)
+def delete_lancamentos_diarios_batch(
+    payload: LancamentoDiarioBatchDelete,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Excluir lançamentos diários em lote (soft delete)"""
+    try:
+        tenant_id, business_unit_id = _user_context(current_user)
+        return LancamentoBatchService.delete(db, DIARIO_BATCH, payload.ids, tenant_id, business_unit_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
 @router.get("/api/v1/lancamentos-diarios", response_model=dict)
-async def get_lancamentos_diarios(
+def get_lancamentos_diarios(
     start_date: Optional[str] = Query(None, description="Data inicial (ISO format)"),
     end_date: Optional[str] = Query(None, description="Data final (ISO format)"),
     group_id: Optional[str] = Query(None, description="ID do grupo"),
@@ -65,10 +122,17 @@ async def get_lancamentos_diarios(
     cost_center_id: Optional[str] = Query(None, description="ID do centro de custo"),
     page: int = Query(1, ge=1, description="Página"),
     per_page: int = Query(50, ge=1, le=100, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco da próxima página (next_cursor)"),
+    include_total: bool = Query(True, description="Calcular total de registros (COUNT)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Buscar lançamentos diários com filtros"""
+    try:
+        page_cursor = decode_cursor(cursor) if cursor else None
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
     try:
         # Converter datas se fornecidas
         start_dt = None
@@ -99,7 +163,9 @@ async def get_lancamentos_diarios(
             status=status,
             cost_center_id=cost_center_id,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=page_cursor,
+            include_total=include_total,
         )
         
         if result["success"]:
@@ -107,11 +173,13 @@ async def get_lancamentos_diarios(
         else:
             raise HTTPException(status_code=400, detail=result["message"])
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @router.get("/api/v1/lancamentos-diarios/plano-contas", response_model=dict)
-async def get_plano_contas_hierarchy(
+def get_plano_contas_hierarchy(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -132,7 +200,7 @@ async def get_plano_contas_hierarchy(
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @router.get("/api/v1/lancamentos-diarios/{lancamento_id}", response_model=dict)
-async def get_lancamento_diario(
+def get_lancamento_diario(
     lancamento_id: str,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -185,7 +253,7 @@ async def get_lancamento_diario(
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @router.put("/api/v1/lancamentos-diarios/{lancamento_id}", response_model=dict)
-async def update_lancamento_diario(
+def update_lancamento_diario(
     lancamento_id: str,
     lancamento_data: LancamentoDiarioUpdate,
     current_user: User = Depends(get_current_active_user),
@@ -205,6 +273,8 @@ async def update_lancamento_diario(
         if not lancamento:
             raise HTTPException(status_code=404, detail="Lançamento não encontrado")
         
+        rollup_before = LancamentoRollupService.snapshot(lancamento)
+        
         # Atualizar campos fornecidos
         if lancamento_data.data_movimentacao:
             lancamento.data_movimentacao = datetime.fromisoformat(lancamento_data.data_movimentacao.replace('Z', '+00:00'))
@@ -237,16 +307,13 @@ async def update_lancamento_diario(
                 lancamento.subgrupo_id = lancamento_data.subgrupo_id
             if lancamento_data.grupo_id:
                 lancamento.grupo_id = lancamento_data.grupo_id
-                
-                # Recalcular tipo de transação
-                from app.models.chart_of_accounts import ChartAccountGroup
-                grupo = db.query(ChartAccountGroup).filter(
-                    ChartAccountGroup.id == lancamento_data.grupo_id
-                ).first()
-                
-                if grupo:
-                    lancamento.transaction_type = LancamentoDiarioService.determine_transaction_type(grupo.name)
+            
+            # Recalcular tipo de transação pela conta (plano de contas em cache)
+            lancamento.transaction_type = TransactionTypeResolver.resolve(
+                db, tenant_id, lancamento.conta_id, TransactionType, default=lancamento.transaction_type
+            )
         
+        LancamentoRollupService.apply_change(db, rollup_before, LancamentoRollupService.snapshot(lancamento))
         db.commit()
         
         return {
@@ -261,7 +328,7 @@ async def update_lancamento_diario(
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @router.delete("/api/v1/lancamentos-diarios/{lancamento_id}", response_model=dict)
-async def delete_lancamento_diario(
+def delete_lancamento_diario(
     lancamento_id: str,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -279,7 +346,9 @@ async def delete_lancamento_diario(
         if not lancamento:
             raise HTTPException(status_code=404, detail="Lançamento não encontrado")
         
+        rollup_before = LancamentoRollupService.snapshot(lancamento)
         lancamento.is_active = False
+        LancamentoRollupService.apply_change(db, rollup_before, None)
         db.commit()
         
         return {
@@ -294,7 +363,7 @@ async def delete_lancamento_diario(
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @router.get("/api/v1/lancamentos-diarios/resumo", response_model=dict)
-async def get_lancamentos_resumo(
+def get_lancamentos_resumo(
     start_date: Optional[str] = Query(None, description="Data inicial (ISO format)"),
     end_date: Optional[str] = Query(None, description="Data final (ISO format)"),
     current_user: User = Depends(get_current_active_user),
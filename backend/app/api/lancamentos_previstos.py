@@ -4,19 +4,29 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session, joinedload
 
 from app.database import get_db
 from app.models.auth import User
+from app.models.chart_of_accounts import ChartAccount, ChartAccountGroup, ChartAccountSubgroup
 from app.models.lancamento_previsto import (
     LancamentoPrevisto,
+    LancamentoPrevistoBatchCreate,
+    LancamentoPrevistoBatchDelete,
+    LancamentoPrevistoBatchUpdate,
     LancamentoPrevistoCreate,
     LancamentoPrevistoUpdate,
     TransactionStatus,
     TransactionType,
 )
+from app.services.bulk_export import EXPORT_FORMAT_PATTERN, BulkExportService
 from app.services.dependencies import get_current_active_user
+from app.services.keyset_pagination import InvalidCursorError, decode_cursor, fetch_page, keyset_filter
+from app.services.lancamento_batch_service import PREVISTO_BATCH, LancamentoBatchService
+from app.services.lancamento_diario_service import LancamentoDiarioService
+from app.services.transaction_type_resolver import TransactionTypeResolver
 
 router = APIRouter()
 
@@ -32,24 +42,41 @@ def _user_context(user: User) -> tuple[str, str]:
     return tenant_id, str(business_unit_id)
 
 
-def _classify_transaction_type(
-    grupo_nome: str,
-    subgrupo_nome: Optional[str] = None,
-) -> TransactionType:
-    grupo_lower = grupo_nome.lower()
-    subgrupo_lower = (subgrupo_nome or "").lower()
-
-    if any(keyword in grupo_lower for keyword in ["receita", "venda", "renda", "faturamento", "vendas"]):
-        return TransactionType.RECEITA
-    if any(keyword in grupo_lower for keyword in ["custo", "custos"]) or any(
-        keyword in subgrupo_lower for keyword in ["custo", "custos", "mercadoria", "produto"]
-    ):
-        return TransactionType.CUSTO
-    if any(keyword in grupo_lower for keyword in ["despesa", "gasto", "operacional", "administrativa"]) or any(
-        keyword in subgrupo_lower for keyword in ["despesa", "gasto", "marketing", "administrativa"]
-    ):
-        return TransactionType.DESPESA
-    return TransactionType.DESPESA
+def _previstos_export_statement(whereclause, skip: int, limit: int, page_cursor):
+    """Mesmas linhas da listagem, projetando só as colunas do payload (sem ORM)"""
+    lp = LancamentoPrevisto
+    statement = (
+        select(
+            lp.id,
+            lp.data_prevista,
+            lp.valor,
+            lp.observacoes,
+            lp.conta_id,
+            func.coalesce(ChartAccount.name, "N/A").label("conta_nome"),
+            func.coalesce(ChartAccount.code, "N/A").label("conta_codigo"),
+            lp.subgrupo_id,
+            func.coalesce(ChartAccountSubgroup.name, "N/A").label("subgrupo_nome"),
+            func.coalesce(ChartAccountSubgroup.code, "N/A").label("subgrupo_codigo"),
+            lp.grupo_id,
+            func.coalesce(ChartAccountGroup.name, "N/A").label("grupo_nome"),
+            func.coalesce(ChartAccountGroup.code, "N/A").label("grupo_codigo"),
+            lp.transaction_type,
+            lp.status,
+            lp.created_at,
+        )
+        .outerjoin(ChartAccount, ChartAccount.id == lp.conta_id)
+        .outerjoin(ChartAccountSubgroup, ChartAccountSubgroup.id == lp.subgrupo_id)
+        .outerjoin(ChartAccountGroup, ChartAccountGroup.id == lp.grupo_id)
+        .where(whereclause)
+        .order_by(lp.data_prevista.desc(), lp.id.desc())
+    )
+    if page_cursor:
+        statement = statement.where(keyset_filter(lp.data_prevista, lp.id, page_cursor))
+    elif skip:
+        statement = statement.offset(skip)
+    if limit > 0:
+        statement = statement.limit(limit)
+    return statement
 
 
 @router.get("/api/v1/lancamentos-previstos")
@@ -64,10 +91,17 @@ def list_lancamentos_previstos(
     transaction_type: Optional[str] = None,
     status: Optional[str] = None,
     cost_center_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    format: Optional[str] = Query(None, pattern=EXPORT_FORMAT_PATTERN, description="json (padrão), ndjson ou csv (streaming)"),
+    accept: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
-) -> Dict[str, object]:
+):
     tenant_id, business_unit_id = _user_context(current_user)
+    try:
+        page_cursor = decode_cursor(cursor) if cursor else None
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
     query = (
         db.query(LancamentoPrevisto)
@@ -104,7 +138,6 @@ def list_lancamentos_previstos(
         except ValueError:
             query = query.filter(LancamentoPrevisto.transaction_type == transaction_type)
     if status:
-        from app.models.lancamento_previsto import TransactionStatus
         try:
             status_enum = TransactionStatus(status)
             query = query.filter(LancamentoPrevisto.status == status_enum)
@@ -114,12 +147,27 @@ def list_lancamentos_previstos(
     # if cost_center_id:
     #     query = query.filter(LancamentoPrevisto.cost_center_id == cost_center_id)
     
-    query = query.order_by(LancamentoPrevisto.data_prevista.desc())
+    export_format = BulkExportService.requested_format(accept, format)
+    if export_format:
+        return BulkExportService.response(
+            _previstos_export_statement(query.whereclause, skip, limit, page_cursor),
+            export_format,
+            filename="lancamentos_previstos",
+        )
 
+    # (data_prevista, id) decrescente; com cursor, busca por chave em vez de skip
+    next_cursor: Optional[str] = None
     if limit > 0:
-        query = query.offset(skip).limit(limit)
-
-    previsoes = query.all()
+        previsoes, next_cursor = fetch_page(
+            query,
+            LancamentoPrevisto.data_prevista,
+            LancamentoPrevisto.id,
+            limit,
+            cursor=page_cursor,
+            offset=0 if page_cursor else skip,
+        )
+    else:
+        previsoes = query.order_by(LancamentoPrevisto.data_prevista.desc(), LancamentoPrevisto.id.desc()).all()
 
     def _safe_name(obj, default: str = "N/A") -> str:
         return getattr(obj, "name", default) if obj else default
@@ -153,42 +201,26 @@ def list_lancamentos_previstos(
         "success": True,
         "previsoes": payload,
         "total": len(payload),
+        "next_cursor": next_cursor,
     }
 
 
 @router.post("/api/v1/lancamentos-previstos")
-async def create_lancamento_previsto(
+def create_lancamento_previsto(
     previsao: LancamentoPrevistoCreate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ) -> Dict[str, object]:
     tenant_id, business_unit_id = _user_context(current_user)
 
-    from app.models.chart_of_accounts import ChartAccountGroup, ChartAccountSubgroup
-
-    grupo = (
-        db.query(ChartAccountGroup)
-        .filter(
-            ChartAccountGroup.id == previsao.grupo_id,
-            ChartAccountGroup.tenant_id.in_([tenant_id, None]),
-        )
-        .first()
-    )
-    if not grupo:
-        raise HTTPException(status_code=400, detail="Grupo não encontrado")
-
-    subgrupo = (
-        db.query(ChartAccountSubgroup)
-        .filter(
-            ChartAccountSubgroup.id == previsao.subgrupo_id,
-            ChartAccountSubgroup.tenant_id.in_([tenant_id, None]),
-        )
-        .first()
+    # Hierarquia validada contra o plano em cache (próprio ou global), sem consultas
+    is_valid, message = LancamentoDiarioService.validate_plano_contas_consistency(
+        db, previsao.conta_id, previsao.subgrupo_id, previsao.grupo_id, tenant_id, allow_shared=True
     )
-    if not subgrupo:
-        raise HTTPException(status_code=400, detail="Subgrupo não encontrado")
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=message)
 
-    transaction_type = _classify_transaction_type(grupo.name, subgrupo.name)
+    transaction_type = TransactionTypeResolver.resolve(db, tenant_id, previsao.conta_id, TransactionType)
 
     data_prevista = datetime.fromisoformat(previsao.data_prevista.replace("Z", "+00:00"))
 
@@ -218,8 +250,41 @@ async def create_lancamento_previsto(
     }
 
 
+@router.post("/api/v1/lancamentos-previstos/batch")
+def create_lancamentos_previstos_batch(
+    payload: LancamentoPrevistoBatchCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, object]:
+    """Criar previsões em lote (resultado por item; idempotente por import_ref)"""
+    tenant_id, business_unit_id = _user_context(current_user)
+    return LancamentoBatchService.create(
+        db, PREVISTO_BATCH, payload.items, tenant_id, business_unit_id, str(current_user.id)
+    )
+
+
+@router.put("/api/v1/lancamentos-previstos/batch")
+def update_lancamentos_previstos_batch(
+    payload: LancamentoPrevistoBatchUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, object]:
+    tenant_id, business_unit_id = _user_context(current_user)
+    return LancamentoBatchService.update(db, PREVISTO_BATCH, payload.items, tenant_id, business_unit_id)
+
+
+@router.post("/api/v1/lancamentos-previstos/batch/delete")
+def delete_lancamentos_previstos_batch(
+    payload: LancamentoPrevistoBatchDelete,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, object]:
+    tenant_id, business_unit_id = _user_context(current_user)
+    return LancamentoBatchService.delete(db, PREVISTO_BATCH, payload.ids, tenant_id, business_unit_id)
+
+
 @router.put("/api/v1/lancamentos-previstos/{previsao_id}")
-async def update_lancamento_previsto(
+def update_lancamento_previsto(
     previsao_id: str,
     payload: LancamentoPrevistoUpdate,
     current_user: User = Depends(get_current_active_user),
@@ -255,13 +320,15 @@ async def update_lancamento_previsto(
     if payload.grupo_id:
         previsao.grupo_id = payload.grupo_id
 
-    if payload.grupo_id or payload.subgrupo_id:
-        from app.models.chart_of_accounts import ChartAccountGroup, ChartAccountSubgroup
-
-        grupo = db.query(ChartAccountGroup).filter(ChartAccountGroup.id == previsao.grupo_id).first()
-        subgrupo = db.query(ChartAccountSubgroup).filter(ChartAccountSubgroup.id == previsao.subgrupo_id).first()
-        if grupo:
-            previsao.transaction_type = _classify_transaction_type(grupo.name, subgrupo.name if subgrupo else None)
+    if payload.conta_id or payload.grupo_id or payload.subgrupo_id:
+        is_valid, message = LancamentoDiarioService.validate_plano_contas_consistency(
+            db, previsao.conta_id, previsao.subgrupo_id, previsao.grupo_id, tenant_id, allow_shared=True
+        )
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=message)
+        previsao.transaction_type = TransactionTypeResolver.resolve(
+            db, tenant_id, previsao.conta_id, TransactionType, default=previsao.transaction_type
+        )
 
     previsao.updated_at = datetime.utcnow()
 
@@ -274,7 +341,7 @@ async def update_lancamento_previsto(
 
 
 @router.delete("/api/v1/lancamentos-previstos/{previsao_id}")
-async def delete_lancamento_previsto(
+def delete_lancamento_previsto(
     previsao_id: str,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
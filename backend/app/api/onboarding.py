@@ -3,8 +3,9 @@ API de Onboarding para novas empresas
 Permite importação de dados de planilha Excel/Google Sheets em etapas
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Body, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Body, BackgroundTasks, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, HttpUrl, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
@@ -14,15 +15,29 @@ import sys
 import re
 import uuid
 from pathlib import Path
-import requests
-import tempfile
 import json
 import logging
 import time
+import asyncio
 
 from app.services.dependencies import get_current_active_user, require_super_admin
 from app.models.auth import User, Tenant, BusinessUnit, AuditLog
-from app.database import SessionLocal
+from app.database import SessionLocal, run_in_db_threadpool
+from app.models.onboarding_job import FINISHED_JOB_STATUSES, OnboardingJob
+from app.services.forecast_sheet import MONTH_LABELS
+from app.services.onboarding_job_service import OnboardingJobService
+from app.services.onboarding_progress import ImportProgressReporter, OnboardingProgressBroker
+from app.services.spreadsheet_downloader import (
+    SpreadsheetDownloadError,
+    SpreadsheetTooLargeError,
+    throttled_progress,
+)
+from app.services.spreadsheet_snapshot_store import (
+    SPREADSHEET_SNAPSHOT_REUSE_SECONDS,
+    SpreadsheetSnapshotStore,
+)
+from app.services.workbook_process_pool import WorkbookPoolBusyError, WorkbookProcessPool
+from app.services.workbook_validation import WorkbookValidationService
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
@@ -38,20 +53,6 @@ def ensure_backend_path() -> None:
     if backend_path_str not in sys.path:
         sys.path.insert(0, backend_path_str)
 
-MONTH_LABELS = [
-    "JANEIRO",
-    "FEVEREIRO",
-    "MARÇO",
-    "ABRIL",
-    "MAIO",
-    "JUNHO",
-    "JULHO",
-    "AGOSTO",
-    "SETEMBRO",
-    "OUTUBRO",
-    "NOVEMBRO",
-    "DEZEMBRO",
-]
 
 class SpreadsheetUrlRequest(BaseModel):
     url: HttpUrl
@@ -64,6 +65,7 @@ class ImportRequest(BaseModel):
     spreadsheet_url: HttpUrl
     reset_data: bool = False
     corrections: Optional[Dict[str, Any]] = None
+    snapshot_id: Optional[str] = None  # retornado por /validate-spreadsheet
 
 class StartOnboardingRequest(BaseModel):
     tenant_name: str
@@ -73,6 +75,7 @@ class StartOnboardingRequest(BaseModel):
     spreadsheet_url: HttpUrl
     reset_data: bool = False
     corrections: Optional[Dict[str, Any]] = None
+    snapshot_id: Optional[str] = None  # retornado por /validate-spreadsheet
 
 class ClearDataRequest(BaseModel):
     tenant_id: str
@@ -88,13 +91,22 @@ class OnboardingStatus(BaseModel):
     message: Optional[str] = None
     errors: List[str] = Field(default_factory=list)
     stats: Optional[Dict[str, Any]] = None
+    live: Optional[Dict[str, Any]] = None  # último evento de progresso (aba, linhas, taxa, ETA)
     run_id: Optional[str] = None
     started_at: Optional[str] = None
     finished_at: Optional[str] = None
     last_updated_at: Optional[str] = None
 
-# Armazenamento temporário do status (em produção, usar Redis ou banco)
-onboarding_status: Dict[str, OnboardingStatus] = {}
+# O status fica na tabela onboarding_jobs (visível por todas as instâncias).
+# Com ONBOARDING_INLINE_WORKER=1 (padrão: o deploy no Cloud Run ainda não tem
+# worker dedicado) a própria API consome a fila em background. Onde houver
+# `python -m scripts.onboarding_worker` rodando (ex.: docker-compose), use 0
+# para tirar as importações dos processos que atendem requisições.
+ONBOARDING_INLINE_WORKER = os.getenv("ONBOARDING_INLINE_WORKER", "1") == "1"
+# Stream SSE: eventos desta instância chegam na hora; o banco é consultado a
+# cada ONBOARDING_STREAM_POLL_SECONDS para jobs executados em outra instância
+ONBOARDING_STREAM_POLL_SECONDS = float(os.getenv("ONBOARDING_STREAM_POLL_SECONDS", "1.0"))
+ONBOARDING_STREAM_KEEPALIVE_SECONDS = 15.0
 
 
 def log_onboarding(event: str, **context: Any) -> None:
@@ -102,23 +114,8 @@ def log_onboarding(event: str, **context: Any) -> None:
     logger.info("onboarding_event=%s", json.dumps(payload, ensure_ascii=True))
 
 
-def init_status(tenant_id: str, business_unit_id: str, message: str, run_id: str) -> OnboardingStatus:
-    now = datetime.utcnow().isoformat()
-    return OnboardingStatus(
-        tenant_id=str(tenant_id),
-        business_unit_id=str(business_unit_id),
-        status="validating",
-        current_step="Validando planilha",
-        progress=0,
-        message=message,
-        run_id=run_id,
-        started_at=now,
-        last_updated_at=now,
-    )
-
-
 def update_status(
-    status_key: str,
+    run_id: str,
     *,
     status: Optional[str] = None,
     current_step: Optional[str] = None,
@@ -126,27 +123,25 @@ def update_status(
     message: Optional[str] = None,
     stats: Optional[Dict[str, Any]] = None,
     error: Optional[str] = None,
+    checkpoint: Optional[Dict[str, Any]] = None,
     finished: bool = False,
 ) -> None:
-    status_obj = onboarding_status.get(status_key)
-    if not status_obj:
-        return
-
-    if status is not None:
-        status_obj.status = status
-    if current_step is not None:
-        status_obj.current_step = current_step
-    if progress is not None:
-        status_obj.progress = progress
-    if message is not None:
-        status_obj.message = message
-    if stats is not None:
-        status_obj.stats = stats
-    if error:
-        status_obj.errors.append(error)
-    status_obj.last_updated_at = datetime.utcnow().isoformat()
-    if finished:
-        status_obj.finished_at = status_obj.last_updated_at
+    OnboardingJobService.update(
+        run_id,
+        status=status,
+        current_step=current_step,
+        progress=progress,
+        message=message,
+        stats=stats,
+        error=error,
+        checkpoint=checkpoint,
+        finished=finished,
+    )
+
+
+def run_pending_onboarding_jobs() -> int:
+    """Consome a fila de onboarding (worker dedicado ou background task da API)"""
+    return OnboardingJobService.run_pending(execute_import)
 
 def normalize_spreadsheet_url(spreadsheet_url: str) -> str:
     """Normaliza URL do Google Sheets para download em XLSX."""
@@ -195,7 +190,7 @@ def get_db():
         db.close()
 
 @router.post("/clear-data")
-async def clear_data(
+def clear_data(
     request: ClearDataRequest,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -278,6 +273,9 @@ async def clear_data(
             ).delete(synchronize_session=False)
             deleted_counts["lancamentos_previstos"] = deleted_previstos
         
+        from app.services.lancamento_rollup_service import LancamentoRollupService
+        LancamentoRollupService.rebuild(db, request.tenant_id, request.business_unit_id)
+        
         db.commit()
         
         return {
@@ -293,474 +291,110 @@ async def clear_data(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao limpar dados: {str(e)}")
 
+def _check_validation_scope(request: SpreadsheetUrlRequest, db: Session) -> None:
+    """Normaliza tenant/BU vindos do frontend e verifica se existem"""
+    # Normalizar strings vazias vindas do frontend
+    if isinstance(request.tenant_id, str) and request.tenant_id.strip().lower() in {"", "undefined", "null"}:
+        request.tenant_id = None
+    if isinstance(request.business_unit_id, str) and request.business_unit_id.strip().lower() in {"", "undefined", "null"}:
+        request.business_unit_id = None
+
+    # Verificar se tenant e BU existem (quando informados)
+    if request.tenant_id:
+        tenant = db.query(Tenant).filter(
+            Tenant.id == request.tenant_id,
+            Tenant.status == "active",
+        ).first()
+        if not tenant:
+            raise HTTPException(status_code=404, detail="Tenant não encontrado")
+
+        if request.business_unit_id:
+            business_unit = db.query(BusinessUnit).filter(
+                BusinessUnit.id == request.business_unit_id,
+                BusinessUnit.tenant_id == request.tenant_id,
+                BusinessUnit.status == "active",
+            ).first()
+            if not business_unit:
+                raise HTTPException(status_code=404, detail="Business Unit não encontrada")
+
+
 @router.post("/validate-spreadsheet")
 async def validate_spreadsheet(
     request: SpreadsheetUrlRequest,
+    wait: bool = Query(True, description="Aguardar o relatório (até o timeout) ou retornar o job_id"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Valida se a URL da planilha é acessível e contém as abas necessárias
+
+    O download é assíncrono (streaming, com limite de tamanho). As abas são
+    validadas em paralelo no pool de processos: com ``wait`` a resposta traz o
+    relatório, ou 202 com ``job_id`` se o timeout expirar; sem ``wait`` o
+    ``job_id`` volta imediatamente. Consultar em
+    ``/validate-spreadsheet/jobs/{job_id}``.
     """
     try:
-        # Normalizar strings vazias vindas do frontend
-        if isinstance(request.tenant_id, str) and request.tenant_id.strip().lower() in {"", "undefined", "null"}:
-            request.tenant_id = None
-        if isinstance(request.business_unit_id, str) and request.business_unit_id.strip().lower() in {"", "undefined", "null"}:
-            request.business_unit_id = None
-
-        # Verificar se tenant e BU existem (quando informados)
-        if request.tenant_id:
-            tenant = db.query(Tenant).filter(
-                Tenant.id == request.tenant_id,
-                Tenant.status == "active",
-            ).first()
-            if not tenant:
-                raise HTTPException(status_code=404, detail="Tenant não encontrado")
+        await run_in_db_threadpool(_check_validation_scope, request, db)
 
-            if request.business_unit_id:
-                business_unit = db.query(BusinessUnit).filter(
-                    BusinessUnit.id == request.business_unit_id,
-                    BusinessUnit.tenant_id == request.tenant_id,
-                    BusinessUnit.status == "active",
-                ).first()
-                if not business_unit:
-                    raise HTTPException(status_code=404, detail="Business Unit não encontrada")
-        
-        # Baixar planilha temporariamente
+        # Baixar planilha (snapshot reaproveitado pela importação e conciliação)
         try:
             spreadsheet_url = normalize_spreadsheet_url(str(request.url))
-            
-            response = requests.get(spreadsheet_url, timeout=30)
-            response.raise_for_status()
-            
-            # Salvar temporariamente
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp_file:
-                tmp_file.write(response.content)
-                tmp_file_path = tmp_file.name
-            
-            # Validar estrutura da planilha + consistência básica
-            import pandas as pd
-            from collections import defaultdict
-            
-            try:
-                excel_file = pd.ExcelFile(tmp_file_path)
-                required_sheets = ["Plano de contas", "Lançamento Diário", "Lançamentos Previstos"]
-                available_sheets = excel_file.sheet_names
-                
-                # Verificar variações de nomes
-                found_sheets = {}
-                for req_sheet in required_sheets:
-                    for avail_sheet in available_sheets:
-                        if req_sheet.lower() in avail_sheet.lower() or avail_sheet.lower() in req_sheet.lower():
-                            found_sheets[req_sheet] = avail_sheet
-                            break
-                
-                missing_sheets = [s for s in required_sheets if s not in found_sheets]
-                
-                # Limpar arquivo temporário
-                os.unlink(tmp_file_path)
-                
-                issues = []
-                summary = {
-                    "missing_sheets": missing_sheets,
-                    "errors": 0,
-                    "warnings": 0,
-                }
-
-                def add_issue(severity: str, code: str, message: str, sheet: str = None, row: int = None, data: dict = None):
-                    issue_id = f"{code}:{sheet or 'sheet'}:{row or 'na'}"
-                    issues.append(
-                        {
-                            "id": issue_id,
-                            "severity": severity,
-                            "code": code,
-                            "message": message,
-                            "sheet": sheet,
-                            "row": row,
-                            "data": data or {},
-                        }
-                    )
-                    if severity == "error":
-                        summary["errors"] += 1
-                    elif severity == "warning":
-                        summary["warnings"] += 1
-
-                if missing_sheets:
-                    return JSONResponse(
-                        status_code=400,
-                        content={
-                            "valid": False,
-                            "error": f"Abas faltantes: {', '.join(missing_sheets)}",
-                            "available_sheets": available_sheets,
-                            "found_sheets": found_sheets
-                        }
-                    )
+            snapshot = await SpreadsheetSnapshotStore.fetch_async(spreadsheet_url)
+        except SpreadsheetTooLargeError as e:
+            raise HTTPException(status_code=413, detail=f"Erro ao acessar planilha: {str(e)}")
+        except SpreadsheetDownloadError as e:
+            raise HTTPException(status_code=400, detail=f"Erro ao acessar planilha: {str(e)}")
 
-                # ======== Carregar abas ========
-                plano_df = pd.read_excel(excel_file, found_sheets["Plano de contas"])
-                diarios_df = pd.read_excel(excel_file, found_sheets["Lançamento Diário"])
-                previstos_df = pd.read_excel(excel_file, found_sheets["Lançamentos Previstos"])
-
-                # ======== Helpers de colunas ========
-                def _find_col(cols, includes):
-                    for col in cols:
-                        c = str(col).lower().strip()
-                        if all(x in c for x in includes):
-                            return col
-                    return None
-
-                # Plano de contas
-                plano_cols = list(plano_df.columns)
-                plano_conta_col = _find_col(plano_cols, ["conta"])
-                plano_subgrupo_col = _find_col(plano_cols, ["subgrupo"])
-                plano_grupo_col = _find_col(plano_cols, ["grupo"])
-
-                plano_contas = set()
-                if plano_conta_col:
-                    plano_contas = {
-                        str(v).strip().lower()
-                        for v in plano_df[plano_conta_col].dropna().tolist()
-                        if str(v).strip()
-                    }
-
-                # Lançamento Diário
-                diarios_cols = list(diarios_df.columns)
-                di_data_col = _find_col(diarios_cols, ["data", "moviment"])
-                di_grupo_col = _find_col(diarios_cols, ["grupo"])
-                di_subgrupo_col = _find_col(diarios_cols, ["subgrupo"])
-                di_valor_col = _find_col(diarios_cols, ["valor"])
-
-                if not di_data_col or not di_valor_col or not di_grupo_col or not di_subgrupo_col:
-                    add_issue(
-                        "error",
-                        "DIARIO_COLUMNS_MISSING",
-                        "Colunas obrigatórias não encontradas em Lançamento Diário (data, grupo, subgrupo, valor).",
-                        sheet=found_sheets["Lançamento Diário"],
-                    )
-                else:
-                    for idx, row in diarios_df.iterrows():
-                        row_num = idx + 2
-                        data_val = row.get(di_data_col)
-                        valor_val = row.get(di_valor_col)
-                        grupo_val = row.get(di_grupo_col)
-                        subgrupo_val = row.get(di_subgrupo_col)
-
-                        if pd.isna(data_val):
-                            add_issue("error", "DIARIO_DATA_MISSING", "Data movimentação ausente.", found_sheets["Lançamento Diário"], row_num)
-                            continue
-                        if pd.isna(valor_val):
-                            add_issue("error", "DIARIO_VALOR_MISSING", "Valor ausente.", found_sheets["Lançamento Diário"], row_num)
-                            continue
-                        if pd.isna(grupo_val) or pd.isna(subgrupo_val):
-                            add_issue("error", "DIARIO_GRUPO_SUBGRUPO_MISSING", "Grupo/Subgrupo ausentes.", found_sheets["Lançamento Diário"], row_num)
-                            continue
-
-                # Lançamentos Previstos
-                prev_cols = list(previstos_df.columns)
-                prev_data_col = _find_col(prev_cols, ["data"]) or _find_col(prev_cols, ["mês"]) or _find_col(prev_cols, ["mes"])
-                prev_conta_col = _find_col(prev_cols, ["conta"])
-                prev_grupo_col = _find_col(prev_cols, ["grupo"])
-                prev_subgrupo_col = _find_col(prev_cols, ["subgrupo"])
-                prev_valor_col = _find_col(prev_cols, ["valor"])
-
-                # Heurística para coluna de data: priorizar coluna com dia ≠ 1
-                date_candidates = []
-                for col in prev_cols:
-                    try:
-                        series = pd.to_datetime(previstos_df[col], errors="coerce")
-                    except Exception:
-                        continue
-                    valid_ratio = series.notna().mean()
-                    if valid_ratio >= 0.6:
-                        day_not_one_ratio = (series.dt.day != 1).mean()
-                        date_candidates.append((day_not_one_ratio, col))
-                if date_candidates:
-                    date_candidates.sort(reverse=True, key=lambda x: x[0])
-                    best_ratio, best_col = date_candidates[0]
-                    if best_ratio >= 0.1:
-                        prev_data_col = best_col
-
-                if not prev_data_col or not prev_conta_col or not prev_valor_col:
-                    add_issue(
-                        "error",
-                        "PREVISTO_COLUMNS_MISSING",
-                        "Colunas obrigatórias não encontradas em Lançamentos Previstos (data, conta, valor).",
-                        sheet=found_sheets["Lançamentos Previstos"],
-                    )
-                else:
-                    for idx, row in previstos_df.iterrows():
-                        row_num = idx + 2
-                        data_val = row.get(prev_data_col)
-                        valor_val = row.get(prev_valor_col)
-                        conta_val = row.get(prev_conta_col)
-                        grupo_val = row.get(prev_grupo_col) if prev_grupo_col else None
-                        subgrupo_val = row.get(prev_subgrupo_col) if prev_subgrupo_col else None
-
-                        if pd.isna(data_val):
-                            add_issue("error", "PREVISTO_DATA_MISSING", "Data prevista ausente.", found_sheets["Lançamentos Previstos"], row_num)
-                            continue
-                        if pd.isna(valor_val):
-                            add_issue("error", "PREVISTO_VALOR_MISSING", "Valor ausente.", found_sheets["Lançamentos Previstos"], row_num)
-                            continue
-                        if pd.isna(conta_val) or str(conta_val).strip() == "":
-                            add_issue("error", "PREVISTO_CONTA_MISSING", "Conta ausente.", found_sheets["Lançamentos Previstos"], row_num)
-                            continue
-                        if prev_grupo_col and prev_subgrupo_col and (pd.isna(grupo_val) or pd.isna(subgrupo_val)):
-                            add_issue("error", "PREVISTO_GRUPO_SUBGRUPO_MISSING", "Grupo/Subgrupo ausentes.", found_sheets["Lançamentos Previstos"], row_num)
-                            continue
-                        if plano_contas and str(conta_val).strip().lower() not in plano_contas:
-                            add_issue(
-                                "error",
-                                "PREVISTO_CONTA_FORA_PLANO",
-                                f"Conta '{conta_val}' não encontrada no Plano de Contas.",
-                                found_sheets["Lançamentos Previstos"],
-                                row_num,
-                            )
+        found_sheets, missing_sheets = WorkbookValidationService.find_required_sheets(snapshot.sheets)
+        if missing_sheets:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "valid": False,
+                    "error": f"Abas faltantes: {', '.join(missing_sheets)}",
+                    "available_sheets": snapshot.sheets,
+                    "found_sheets": found_sheets
+                }
+            )
 
-                # ======== Consistência Mensal (se existir Fluxo de caixa-2025) ========
-                fluxo_sheet = None
-                previsao_sheet = None
-                for sheet in available_sheets:
-                    sheet_lower = sheet.lower()
-                    if "fluxo de caixa" in sheet_lower and "2025" in sheet_lower and "previs" not in sheet_lower:
-                        fluxo_sheet = sheet
-                        break
-                if not fluxo_sheet:
-                    for sheet in available_sheets:
-                        sheet_lower = sheet.lower()
-                        if "fluxo de caixa" in sheet_lower and "2025" in sheet_lower:
-                            fluxo_sheet = sheet
-                            break
-                for sheet in available_sheets:
-                    sheet_lower = sheet.lower()
-                    if "fluxo de caixa" in sheet_lower and "2025" in sheet_lower and "previs" in sheet_lower:
-                        previsao_sheet = sheet
-                        break
-                if fluxo_sheet:
-                    fluxo_df = pd.read_excel(excel_file, fluxo_sheet, header=None)
-                    # Encontrar linha de meses e linha de labels (Previsto/Realizado)
-                    months_row = None
-                    labels_row = None
-                    for idx in range(min(10, len(fluxo_df))):
-                        row = fluxo_df.iloc[idx]
-                        if any(isinstance(val, str) and val.strip().upper() in MONTH_LABELS for val in row.values):
-                            months_row = row
-                            if idx + 1 < len(fluxo_df):
-                                labels_row = fluxo_df.iloc[idx + 1]
-                            break
-                    if months_row is None:
-                        months_row = fluxo_df.iloc[2]
-                    if labels_row is None:
-                        labels_row = fluxo_df.iloc[3] if len(fluxo_df) > 3 else fluxo_df.iloc[2]
-                    month_cols = {}
-                    for idx, val in months_row.items():
-                        if isinstance(val, str) and val.strip():
-                            month = val.strip().upper()
-                            if str(labels_row.get(idx, "")) == "Previsto":
-                                month_cols[month] = (idx, idx + 1)
-
-                    label_col = 1
-                    for col in fluxo_df.columns:
-                        col_series = fluxo_df[col].astype(str).str.strip().str.lower()
-                        if (col_series == "receita").any():
-                            label_col = col
-                            break
-
-                    import unicodedata
-
-                    def _norm(value: Any) -> str:
-                        text = str(value or "")
-                        normalized = unicodedata.normalize("NFKD", text)
-                        normalized = "".join(ch for ch in normalized if not unicodedata.combining(ch))
-                        return normalized.strip().lower()
-
-                    label_row_index = {}
-                    label_series = fluxo_df[label_col].astype(str).map(_norm)
-                    for idx, val in label_series.items():
-                        if val:
-                            label_row_index[val] = idx
-                    def get_row_value(label: str, month: str, kind: str) -> float:
-                        row = fluxo_df[fluxo_df[label_col].astype(str).str.strip().str.lower() == label.strip().lower()]
-                        if row.empty:
-                            return 0.0
-                        row = row.iloc[0]
-                        col_prev, col_real = month_cols.get(month, (None, None))
-                        val = row[col_real] if kind == "realizado" else row[col_prev]
-                        if pd.isna(val):
-                            return 0.0
-                        return float(val)
-
-                    # Agregar diários por grupo
-                    if di_data_col and di_grupo_col and di_valor_col:
-                        diarios_df["_data"] = pd.to_datetime(diarios_df[di_data_col], errors="coerce")
-                        diarios_df["_mes"] = diarios_df["_data"].dt.month
-                        diarios_df["_grupo"] = diarios_df[di_grupo_col].astype(str).map(_norm)
-                        diarios_df["_valor"] = pd.to_numeric(diarios_df[di_valor_col], errors="coerce").fillna(0.0)
-
-                        group_month_totals = defaultdict(lambda: defaultdict(float))
-                        subgroup_month_totals = defaultdict(lambda: defaultdict(float))
-                        diario_groups = set()
-                        for _, row in diarios_df.iterrows():
-                            if pd.isna(row.get("_data")):
-                                continue
-                            month = row["_mes"]
-                            group = row["_grupo"]
-                            if group:
-                                diario_groups.add(group)
-                            group_month_totals[group][month] += float(row["_valor"])
-                            subgrupo_val = ""
-                            if di_subgrupo_col:
-                                subgrupo_val = _norm(row.get(di_subgrupo_col))
-                            if group == _norm("movimentações não operacionais") and subgrupo_val:
-                                subgroup_month_totals[subgrupo_val][month] += float(row["_valor"])
-
-                        labels_to_check = [
-                            "Receita",
-                            "Deduções",
-                            "Custos",
-                            "Despesas Operacionais",
-                            "Investimentos",
-                            "Movimentações Não Operacionais",
-                            "Entradas não Operacionais",
-                            "Saídas não Operacionais",
-                        ]
-                        month_label_map = {i + 1: m for i, m in enumerate(MONTH_LABELS)}
-
-                        child_labels_map = {
-                            _norm("entradas não operacionais"): [
-                                "Empréstimos/Financiamentos obtidos",
-                                "Aporte dos sócios",
-                                "Venda de equipamentos usados",
-                                "Outros entradas não operacionais",
-                            ],
-                            _norm("saídas não operacionais"): [
-                                "Giro Pronampe",
-                                "Juros Bancários e por Atraso",
-                                "Pagamento de Empréstimos",
-                                "Retirada de Lucros",
-                                "Juros de Antecipação de Recebíveis",
-                                "Outras saídas não operacionais",
-                            ],
-                        }
-
-                        for label in labels_to_check:
-                            label_key = _norm(label)
-                            if label_key in {"entradas não operacionais", "saídas não operacionais"}:
-                                # Se existirem linhas filhas, comparar com elas e ignorar o totalizador
-                                child_labels = child_labels_map.get(label_key, [])
-                                has_child_rows = False
-                                for child in child_labels:
-                                    child_key = _norm(child)
-                                    if child_key in label_row_index:
-                                        has_child_rows = True
-                                        for month_num, month_name in month_label_map.items():
-                                            sheet_real = get_row_value(child, month_name, "realizado")
-                                            diario_real = subgroup_month_totals.get(child_key, {}).get(month_num, 0.0)
-                                            diff = round(diario_real - sheet_real, 2)
-                                            if abs(diff) > 0.0:
-                                                row_idx = label_row_index.get(child_key)
-                                                row_ref = (row_idx + 1) if row_idx is not None else None
-                                                add_issue(
-                                                    "error",
-                                                    "MENSAL_DIARIO_DIVERGENCE",
-                                                    f"'{child}' {month_name}: planilha={sheet_real:.2f} vs diário={diario_real:.2f} (dif={diff:.2f})",
-                                                    sheet=fluxo_sheet,
-                                                    row=row_ref,
-                                                    data={"label": child, "month": month_name},
-                                                )
-                                if has_child_rows:
-                                    continue
-                                # Se a linha da planilha não possui valores preenchidos, não comparar
-                                total_sheet = 0.0
-                                for month_name in month_label_map.values():
-                                    total_sheet += abs(get_row_value(label, month_name, "realizado"))
-                                if total_sheet == 0.0:
-                                    continue
-                                # Comparar pelo subgrupo quando grupo for Movimentações Não Operacionais
-                                for month_num, month_name in month_label_map.items():
-                                    sheet_real = get_row_value(label, month_name, "realizado")
-                                    diario_real = subgroup_month_totals.get(label_key, {}).get(month_num, 0.0)
-                                    diff = round(diario_real - sheet_real, 2)
-                                    if abs(diff) > 0.0:
-                                        row_idx = label_row_index.get(label_key)
-                                        row_ref = (row_idx + 1) if row_idx is not None else None
-                                        add_issue(
-                                            "error",
-                                            "MENSAL_DIARIO_DIVERGENCE",
-                                            f"'{label}' {month_name}: planilha={sheet_real:.2f} vs diário={diario_real:.2f} (dif={diff:.2f})",
-                                            sheet=fluxo_sheet,
-                                            row=row_ref,
-                                            data={"label": label, "month": month_name},
-                                        )
-                                continue
-
-                            if label_key not in diario_groups:
-                                # Não comparar linhas totalizadoras que não existem no diário
-                                continue
-                            for month_num, month_name in month_label_map.items():
-                                sheet_real = get_row_value(label, month_name, "realizado")
-                                diario_real = group_month_totals[label_key].get(month_num, 0.0)
-                                diff = round(diario_real - sheet_real, 2)
-                                if abs(diff) > 0.0:
-                                    row_idx = label_row_index.get(label_key)
-                                    row_ref = (row_idx + 1) if row_idx is not None else None
-                                    add_issue(
-                                        "error",
-                                        "MENSAL_DIARIO_DIVERGENCE",
-                                        f"'{label}' {month_name}: planilha={sheet_real:.2f} vs diário={diario_real:.2f} (dif={diff:.2f})",
-                                        sheet=fluxo_sheet,
-                                        row=row_ref,
-                                        data={"label": label, "month": month_name},
-                                    )
-                if previsao_sheet:
-                    previsao_df = pd.read_excel(excel_file, previsao_sheet, header=None)
-                    previsao_months_row = None
-                    for idx in range(min(10, len(previsao_df))):
-                        row = previsao_df.iloc[idx]
-                        if any(isinstance(val, str) and val.strip().upper() in MONTH_LABELS for val in row.values):
-                            previsao_months_row = row
-                            break
-                    if previsao_months_row is None:
-                        add_issue(
-                            "error",
-                            "FORECAST_SHEET_INVALID",
-                            "Não foi possível identificar os meses na aba de Previsão Fluxo de caixa-2025.",
-                            sheet=previsao_sheet,
-                        )
+        try:
+            future = WorkbookValidationService.submit(snapshot, found_sheets)
+        except WorkbookPoolBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        job_id = WorkbookProcessPool.register_job(future)
+        pending = {"job_id": job_id, "status": "running", "snapshot_id": snapshot.id}
+        if not wait:
+            return JSONResponse(status_code=202, content=pending)
 
-                # Resultado final
-                summary.update(
-                    {
-                        "available_sheets": available_sheets,
-                        "found_sheets": found_sheets,
-                    }
-                )
+        try:
+            return await WorkbookProcessPool.wait(future)
+        except asyncio.TimeoutError:
+            return JSONResponse(status_code=202, content=pending)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Erro ao validar planilha: {str(e)}")
 
-                return {
-                    "valid": summary["errors"] == 0,
-                    "message": "Planilha validada com relatório de inconsistências",
-                    "available_sheets": available_sheets,
-                    "found_sheets": found_sheets,
-                    "summary": summary,
-                    "issues": issues,
-                }
-                
-            except Exception as e:
-                if os.path.exists(tmp_file_path):
-                    os.unlink(tmp_file_path)
-                raise HTTPException(status_code=400, detail=f"Erro ao validar planilha: {str(e)}")
-                
-        except requests.RequestException as e:
-            raise HTTPException(status_code=400, detail=f"Erro ao acessar planilha: {str(e)}")
-            
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao validar planilha: {str(e)}")
 
+
+@router.get("/validate-spreadsheet/jobs/{job_id}")
+def get_validation_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+):
+    """Estado de uma validação em andamento (``result`` com o relatório ao concluir)"""
+    job = WorkbookProcessPool.job_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Validação não encontrada")
+    if job["status"] == "error":
+        job["error"] = f"Erro ao validar planilha: {job['error']}"
+    return job
+
 @router.post("/start")
-async def start_onboarding(
+def start_onboarding(
     request: StartOnboardingRequest,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(require_super_admin),
@@ -823,13 +457,18 @@ async def start_onboarding(
             db.refresh(business_unit)
 
         status_key = f"{tenant.id}_{business_unit.id}"
-        run_id = str(uuid.uuid4())
-        onboarding_status[status_key] = init_status(
-            str(tenant.id),
-            str(business_unit.id),
-            "Iniciando validação da planilha...",
-            run_id,
+        job = OnboardingJobService.enqueue(
+            db,
+            tenant_id=str(tenant.id),
+            business_unit_id=str(business_unit.id),
+            spreadsheet_url=normalized_spreadsheet_url,
+            reset_data=request.reset_data,
+            user_id=str(current_user.id),
+            corrections=request.corrections,
+            source_snapshot_id=request.snapshot_id,
+            message="Iniciando validação da planilha...",
         )
+        run_id = job.id
         log_onboarding(
             "onboarding_started",
             status_key=status_key,
@@ -841,15 +480,8 @@ async def start_onboarding(
             user_id=str(current_user.id),
         )
 
-        background_tasks.add_task(
-            execute_import,
-            str(tenant.id),
-            str(business_unit.id),
-            normalized_spreadsheet_url,
-            request.reset_data,
-            str(current_user.id),
-            request.corrections,
-        )
+        if ONBOARDING_INLINE_WORKER:
+            background_tasks.add_task(run_pending_onboarding_jobs)
 
         return {
             "success": True,
@@ -866,7 +498,7 @@ async def start_onboarding(
         raise HTTPException(status_code=500, detail=f"Erro ao iniciar onboarding: {str(e)}")
 
 @router.post("/import")
-async def import_data(
+def import_data(
     request: ImportRequest,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
@@ -919,19 +551,25 @@ async def import_data(
 
         status_key = f"{request.tenant_id}_{request.business_unit_id}"
         
-        # Inicializar status
-        run_id = str(uuid.uuid4())
-        onboarding_status[status_key] = init_status(
-            request.tenant_id,
-            request.business_unit_id,
-            "Iniciando validação da planilha...",
-            run_id,
-        )
         normalized_spreadsheet_url = normalize_spreadsheet_url(str(request.spreadsheet_url))
         if tenant.spreadsheet_url != normalized_spreadsheet_url:
             tenant.spreadsheet_url = normalized_spreadsheet_url
             db.commit()
 
+        # Enfileirar job (status persistido)
+        job = OnboardingJobService.enqueue(
+            db,
+            tenant_id=request.tenant_id,
+            business_unit_id=request.business_unit_id,
+            spreadsheet_url=normalized_spreadsheet_url,
+            reset_data=request.reset_data,
+            user_id=str(current_user.id),
+            corrections=corrections,
+            source_snapshot_id=request.snapshot_id,
+            message="Iniciando validação da planilha...",
+        )
+        run_id = job.id
+
         log_onboarding(
             "import_started",
             status_key=status_key,
@@ -943,16 +581,9 @@ async def import_data(
             user_id=str(current_user.id),
         )
         
-        # Executar importação em background
-        background_tasks.add_task(
-            execute_import,
-            request.tenant_id,
-            request.business_unit_id,
-            normalized_spreadsheet_url,
-            request.reset_data,
-            current_user.id,
-            corrections,
-        )
+        # Executar importação fora da requisição (worker ou background task)
+        if ONBOARDING_INLINE_WORKER:
+            background_tasks.add_task(run_pending_onboarding_jobs)
         
         return {
             "success": True,
@@ -967,7 +598,7 @@ async def import_data(
         raise HTTPException(status_code=500, detail=f"Erro ao iniciar importação: {str(e)}")
 
 @router.get("/status/{tenant_id}/{business_unit_id}")
-async def get_onboarding_status(
+def get_onboarding_status(
     tenant_id: str,
     business_unit_id: str,
     current_user: User = Depends(get_current_active_user),
@@ -985,20 +616,105 @@ async def get_onboarding_status(
     if not business_unit:
         raise HTTPException(status_code=404, detail="Tenant ou Business Unit não encontrada")
 
-    status_key = f"{tenant_id}_{business_unit_id}"
-    status = onboarding_status.get(status_key)
+    job = OnboardingJobService.latest(db, tenant_id, business_unit_id)
     
-    if not status:
+    if not job:
         return {
             "status": "not_started",
             "progress": 0,
             "message": "Onboarding não iniciado"
         }
     
-    return status.dict()
+    return OnboardingStatus(**OnboardingJobService.to_status(job)).dict()
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=True, default=str)}\n\n"
+
+
+def _load_job_status(run_id: str) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        job = db.get(OnboardingJob, run_id)
+        return OnboardingStatus(**OnboardingJobService.to_status(job)).dict() if job else None
+    finally:
+        db.close()
+
+
+async def _stream_job_events(run_id: str, snapshot: Dict[str, Any]):
+    """Eventos ``progress`` (publicados pelo seed) e ``status`` (mudanças no job) até o fim do job"""
+    queue = OnboardingProgressBroker.subscribe(run_id)
+    loop = asyncio.get_running_loop()
+    try:
+        yield _sse("status", snapshot)
+        last_sent = next_poll = loop.time() + ONBOARDING_STREAM_POLL_SECONDS
+        while snapshot["status"] not in FINISHED_JOB_STATUSES:
+            timeout = next_poll - loop.time()
+            if timeout > 0:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    event = None
+                if event is not None:
+                    yield _sse("progress", event)
+                    last_sent = loop.time()
+                    continue
+
+            next_poll = loop.time() + ONBOARDING_STREAM_POLL_SECONDS
+            current = await run_in_threadpool(_load_job_status, run_id)
+            if current is None:
+                break
+            if current["last_updated_at"] != snapshot["last_updated_at"]:
+                snapshot = current
+                yield _sse("status", snapshot)
+                last_sent = loop.time()
+            elif loop.time() - last_sent >= ONBOARDING_STREAM_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = loop.time()
+    finally:
+        OnboardingProgressBroker.unsubscribe(run_id, queue)
+
+
+@router.get("/status/{tenant_id}/{business_unit_id}/stream")
+def stream_onboarding_status(
+    tenant_id: str,
+    business_unit_id: str,
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Stream (text/event-stream) do progresso do onboarding
+
+    Substitui o polling de /status: envia ``status`` a cada mudança do job e
+    ``progress`` a cada lote gravado (aba, linhas lidas/gravadas, taxa, ETA).
+    """
+    db = SessionLocal()
+    try:
+        business_unit = db.query(BusinessUnit).join(Tenant, BusinessUnit.tenant_id == Tenant.id).filter(
+            Tenant.id == tenant_id,
+            Tenant.status == "active",
+            BusinessUnit.id == business_unit_id,
+            BusinessUnit.status == "active",
+        ).first()
+        if not business_unit:
+            raise HTTPException(status_code=404, detail="Tenant ou Business Unit não encontrada")
+        job = OnboardingJobService.latest(db, tenant_id, business_unit_id)
+        snapshot = OnboardingStatus(**OnboardingJobService.to_status(job)).dict() if job else None
+    finally:
+        # Não manter conexão aberta durante o stream
+        db.close()
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if snapshot is None:
+        not_started = {"status": "not_started", "progress": 0, "message": "Onboarding não iniciado"}
+        return StreamingResponse(iter([_sse("status", not_started)]), media_type="text/event-stream", headers=headers)
+    return StreamingResponse(
+        _stream_job_events(snapshot["run_id"], snapshot),
+        media_type="text/event-stream",
+        headers=headers,
+    )
 
 @router.get("/reconciliation/{tenant_id}/{business_unit_id}")
-async def get_reconciliation(
+def get_reconciliation(
     tenant_id: str,
     business_unit_id: str,
     current_user: User = Depends(get_current_active_user),
@@ -1017,13 +733,19 @@ async def get_reconciliation(
         if not business_unit:
             raise HTTPException(status_code=404, detail="Tenant ou Business Unit não encontrada")
 
-        # Buscar última planilha importada para este tenant/BU
-        data_dir = backend_path / "data"
-        excel_files = sorted(
-            [f for f in data_dir.glob(f"onboarding_{tenant_id}_{business_unit_id}_*.xlsx")],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
+        # Snapshot da planilha usada na última importação deste tenant/BU
+        snapshot = SpreadsheetSnapshotStore.get(
+            OnboardingJobService.latest_snapshot_id(db, tenant_id, business_unit_id)
         )
+        excel_files = [snapshot.path] if snapshot else []
+        if not excel_files:
+            # Importações anteriores ao armazenamento de snapshots
+            data_dir = backend_path / "data"
+            excel_files = sorted(
+                [f for f in data_dir.glob(f"onboarding_{tenant_id}_{business_unit_id}_*.xlsx")],
+                key=lambda x: x.stat().st_mtime,
+                reverse=True
+            )
         
         if not excel_files:
             return {
@@ -1042,8 +764,10 @@ async def get_reconciliation(
         import requests
         import os
         
-        # Extrair totais da planilha
-        excel_totals_dict = extract_fluxo_caixa_totals(excel_file_path)
+        # Extrair totais da planilha (uma leitura por arquivo)
+        excel_totals_dict = SpreadsheetSnapshotStore.memoize(
+            excel_file_path, ("fluxo_caixa_totals",), extract_fluxo_caixa_totals
+        )
         
         # Converter para formato esperado
         excel_totals = {
@@ -1237,70 +961,100 @@ def apply_corrections_to_excel(excel_file_path: Path, corrections: Optional[Dict
     return {"applied": applied, "skipped": skipped}
 
 
-def execute_import(
-    tenant_id: str,
-    business_unit_id: str,
-    spreadsheet_url: str,
-    reset_data: bool,
-    user_id: str,
-    corrections: Optional[Dict[str, Any]] = None,
-):
+def execute_import(run_id: str):
     """
-    Executa importação em etapas (background task)
+    Executa importação em etapas para o job ``run_id`` (worker)
+
+    Etapas já registradas em ``checkpoints`` (download, reset, previstos,
+    diários) são puladas quando um job interrompido é retomado.
     """
+    job_db = SessionLocal()
+    try:
+        job = job_db.get(OnboardingJob, run_id)
+        if job is None:
+            print(f"⚠️ [ONBOARDING] Job {run_id} não encontrado")
+            return
+        tenant_id = job.tenant_id
+        business_unit_id = job.business_unit_id
+        spreadsheet_url = job.spreadsheet_url
+        reset_data = job.reset_data
+        user_id = job.user_id
+        corrections = OnboardingJobService.corrections(job)
+        checkpoints = OnboardingJobService.checkpoints(job)
+    finally:
+        job_db.close()
+
     status_key = f"{tenant_id}_{business_unit_id}"
     start_time = time.monotonic()
+    if checkpoints:
+        log_onboarding("job_resumed", status_key=status_key, run_id=run_id, checkpoints=sorted(checkpoints))
     
     try:
-        # Etapa 1: Baixar planilha
-        update_status(
-            status_key,
-            status="validating",
-            current_step="Baixando planilha",
-            progress=10,
-            message="Baixando planilha da URL...",
-        )
-        
-        spreadsheet_url = normalize_spreadsheet_url(spreadsheet_url)
-        log_onboarding(
-            "download_started",
-            status_key=status_key,
-            spreadsheet_url=spreadsheet_url,
-            tenant_id=tenant_id,
-            business_unit_id=business_unit_id,
-            user_id=user_id,
-        )
-        
-        response = requests.get(spreadsheet_url, timeout=60)
-        response.raise_for_status()
-        
-        # Salvar planilha temporariamente
-        data_dir = backend_path / "data"
-        data_dir.mkdir(exist_ok=True)
-        excel_file_path = data_dir / f"onboarding_{tenant_id}_{business_unit_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        
-        with open(excel_file_path, "wb") as f:
-            f.write(response.content)
-        log_onboarding(
-            "download_completed",
-            status_key=status_key,
-            file_path=str(excel_file_path),
-            file_size=len(response.content),
-        )
-        
-        # Aplicar correções manuais (se houver)
-        correction_stats = apply_corrections_to_excel(Path(excel_file_path), corrections)
-        if correction_stats.get("applied") or correction_stats.get("skipped"):
+        snapshot = SpreadsheetSnapshotStore.get(checkpoints.get("snapshot"))
+        if snapshot is None:
+            # Etapa 1: Obter planilha (snapshot da validação ou novo download)
+            update_status(
+                run_id,
+                status="validating",
+                current_step="Baixando planilha",
+                progress=10,
+                message="Baixando planilha da URL...",
+            )
+            
+            spreadsheet_url = normalize_spreadsheet_url(spreadsheet_url)
             log_onboarding(
-                "corrections_applied",
+                "download_started",
                 status_key=status_key,
-                applied=correction_stats.get("applied"),
-                skipped=correction_stats.get("skipped"),
+                spreadsheet_url=spreadsheet_url,
+                tenant_id=tenant_id,
+                business_unit_id=business_unit_id,
+                user_id=user_id,
             )
+            
+            def report_download(received: int, total: Optional[int]) -> None:
+                received_mb = received / (1024 * 1024)
+                if total:
+                    message = f"Baixando planilha... {received_mb:.1f}/{total / (1024 * 1024):.1f} MB"
+                    progress = 10 + int(10 * min(received / total, 1.0))
+                else:
+                    message = f"Baixando planilha... {received_mb:.1f} MB"
+                    progress = 10
+                update_status(run_id, progress=progress, message=message)
+
+            source = SpreadsheetSnapshotStore.get(checkpoints.get("source_snapshot"))
+            if source is None or source.url != spreadsheet_url:
+                source = SpreadsheetSnapshotStore.fetch(
+                    spreadsheet_url,
+                    max_age=SPREADSHEET_SNAPSHOT_REUSE_SECONDS,
+                    progress=throttled_progress(report_download),
+                )
+            log_onboarding(
+                "download_completed",
+                status_key=status_key,
+                snapshot_id=source.id,
+                file_size=source.size,
+            )
+            snapshot = source
+            
+            # Aplicar correções manuais (se houver) em um snapshot derivado
+            if corrections and corrections.get("row_updates"):
+                snapshot, correction_stats = SpreadsheetSnapshotStore.derive(
+                    source, lambda path: apply_corrections_to_excel(path, corrections)
+                )
+                if correction_stats.get("applied") or correction_stats.get("skipped"):
+                    log_onboarding(
+                        "corrections_applied",
+                        status_key=status_key,
+                        applied=correction_stats.get("applied"),
+                        skipped=correction_stats.get("skipped"),
+                        snapshot_id=snapshot.id,
+                    )
+            update_status(run_id, checkpoint={"snapshot": snapshot.id})
+        excel_file_path = snapshot.path
 
         # Etapa 2: Importar Plano de Contas
         update_status(
-            status_key,
+            run_id,
             status="importing_plan",
             current_step="Importando Plano de Contas",
             progress=30,
@@ -1310,7 +1064,6 @@ def execute_import(
         # Executar seed do plano de contas
         ensure_backend_path()
         from scripts.seed_from_client_sheet import seed_plano_contas
-        from app.database import SessionLocal
         from app.models.auth import Tenant, BusinessUnit
         from app.models.lancamento_diario import LancamentoDiario
         from app.models.lancamento_previsto import LancamentoPrevisto
@@ -1333,10 +1086,15 @@ def execute_import(
             if not business_unit:
                 raise Exception(f"Business Unit {business_unit_id} não encontrada")
             
-            grupos_map, subgrupos_map, contas_map = seed_plano_contas(db, tenant, excel_file_path)
+            # Progresso publicado pelas próprias funções de seed (stream SSE);
+            # cada evento persistido também renova o heartbeat do job
+            progress_reporter = ImportProgressReporter(run_id, progress_range=(30, 50))
+            grupos_map, subgrupos_map, contas_map = seed_plano_contas(
+                db, tenant, excel_file_path, progress=progress_reporter,
+            )
             
             update_status(
-                status_key,
+                run_id,
                 progress=50,
                 message=f"Plano de contas importado: {len(contas_map)} contas",
                 stats={
@@ -1353,7 +1111,7 @@ def execute_import(
             
             # Etapa 3: Importar Lançamentos
             update_status(
-                status_key,
+                run_id,
                 status="importing_transactions",
                 current_step="Importando Lançamentos Financeiros",
                 progress=60,
@@ -1363,8 +1121,9 @@ def execute_import(
             # Executar seed diretamente (sem subprocess para evitar timeout)
             from scripts.seed_from_client_sheet import seed_lancamentos_previstos, seed_lancamentos_diarios
             
-            # Resetar dados se solicitado
-            if reset_data:
+            # Resetar dados se solicitado (uma única vez: na retomada o reset
+            # apagaria o que o job já importou)
+            if reset_data and not checkpoints.get("reset"):
                 from datetime import date
                 from sqlalchemy import and_
                 
@@ -1384,29 +1143,42 @@ def execute_import(
                     )
                 ).delete(synchronize_session=False)
                 
+                from app.services.lancamento_rollup_service import LancamentoRollupService
+                LancamentoRollupService.rebuild(db, tenant.id)
+                
                 db.commit()
                 update_status(
-                    status_key,
+                    run_id,
                     message=f"Dados resetados: {deleted_diarios} diários, {deleted_prev} previstos",
+                    checkpoint={"reset": True},
                 )
             
+            progress_reporter.progress_range = (65, 80)
+
             # Importar lançamentos previstos
             update_status(
-                status_key,
+                run_id,
                 progress=65,
                 message="Importando lançamentos previstos...",
             )
             try:
-                # Usar logger global do módulo seed
-                from scripts.seed_from_client_sheet import logger as seed_logger
-                previstos_before = seed_logger.stats.get('lancamentos_previstos_criados', 0)
-                seed_lancamentos_previstos(db, tenant, business_unit, user, grupos_map, subgrupos_map, contas_map, Path(excel_file_path))
-                db.commit()  # Commit após previstos
-                previstos_after = seed_logger.stats.get('lancamentos_previstos_criados', 0)
-                previstos_count = previstos_after - previstos_before
+                if "previstos" in checkpoints:
+                    previstos_count = checkpoints["previstos"]
+                else:
+                    # Usar logger global do módulo seed
+                    from scripts.seed_from_client_sheet import logger as seed_logger
+                    previstos_before = seed_logger.stats.get('lancamentos_previstos_criados', 0)
+                    seed_lancamentos_previstos(
+                        db, tenant, business_unit, user, grupos_map, subgrupos_map, contas_map, Path(excel_file_path),
+                        progress=progress_reporter,
+                    )
+                    db.commit()  # Commit após previstos
+                    previstos_after = seed_logger.stats.get('lancamentos_previstos_criados', 0)
+                    previstos_count = previstos_after - previstos_before
                 update_status(
-                    status_key,
+                    run_id,
                     message=f"Lançamentos previstos importados: {previstos_count}",
+                    checkpoint={"previstos": previstos_count},
                 )
             except Exception as e:
                 db.rollback()
@@ -1416,77 +1188,62 @@ def execute_import(
             
             # Importar lançamentos diários
             update_status(
-                status_key,
+                run_id,
                 progress=80,
                 message="Importando lançamentos diários (pode levar alguns minutos)...",
             )
             try:
-                # Usar logger global do módulo seed
-                from scripts.seed_from_client_sheet import logger as seed_logger
-                import threading
-                import time as time_module
-                
-                # Resetar stats do logger para esta execução
-                diarios_before = seed_logger.stats.get('lancamentos_diarios_criados', 0)
-                previstos_before = seed_logger.stats.get('lancamentos_previstos_criados', 0)
-                
-                print(f"🔍 [ONBOARDING] Antes da importação: Diários={diarios_before}, Previstos={previstos_before}")
+                if "diarios" in checkpoints:
+                    diarios_count = checkpoints["diarios"]
+                else:
+                    # Usar logger global do módulo seed
+                    from scripts.seed_from_client_sheet import logger as seed_logger
                 
-                # Função para atualizar progresso periodicamente durante importação
-                def update_progress():
-                    while True:
-                        time_module.sleep(15)  # Atualizar a cada 15 segundos
-                        current_diarios = seed_logger.stats.get('lancamentos_diarios_criados', 0)
-                        current_previstos = seed_logger.stats.get('lancamentos_previstos_criados', 0)
-                        current_created_diarios = current_diarios - diarios_before
-                        current_created_previstos = current_previstos - previstos_before
-                        update_status(
-                            status_key,
-                            message=f"Importando... Diários: {current_created_diarios} | Previstos: {current_created_previstos}",
-                        )
-                        print(f"📊 [ONBOARDING] Progresso: Diários={current_created_diarios}, Previstos={current_created_previstos}")
-                        if onboarding_status[status_key].status == "completed" or onboarding_status[status_key].status == "error":
-                            break
+                    # Resetar stats do logger para esta execução
+                    diarios_before = seed_logger.stats.get('lancamentos_diarios_criados', 0)
+                    previstos_before = seed_logger.stats.get('lancamentos_previstos_criados', 0)
                 
-                # Iniciar thread de atualização de progresso
-                progress_thread = threading.Thread(target=update_progress, daemon=True)
-                progress_thread.start()
+                    print(f"🔍 [ONBOARDING] Antes da importação: Diários={diarios_before}, Previstos={previstos_before}")
                 
-                # Executar importação com logging detalhado
-                print(f"🚀 [ONBOARDING] Iniciando seed_lancamentos_diarios...")
-                print(f"   Excel file: {excel_file_path}")
-                print(f"   Tenant: {tenant.name} ({tenant.id})")
-                print(f"   BU: {business_unit.name} ({business_unit.id})")
-                print(f"   Grupos: {len(grupos_map)}, Subgrupos: {len(subgrupos_map)}, Contas: {len(contas_map)}")
+                    # Executar importação com logging detalhado
+                    print(f"🚀 [ONBOARDING] Iniciando seed_lancamentos_diarios...")
+                    print(f"   Excel file: {excel_file_path}")
+                    print(f"   Tenant: {tenant.name} ({tenant.id})")
+                    print(f"   BU: {business_unit.name} ({business_unit.id})")
+                    print(f"   Grupos: {len(grupos_map)}, Subgrupos: {len(subgrupos_map)}, Contas: {len(contas_map)}")
                 
-                seed_lancamentos_diarios(db, tenant, business_unit, user, grupos_map, subgrupos_map, contas_map, Path(excel_file_path))
+                    progress_reporter.progress_range = (80, 90)
+                    seed_lancamentos_diarios(
+                        db, tenant, business_unit, user, grupos_map, subgrupos_map, contas_map, Path(excel_file_path),
+                        progress=progress_reporter,
+                    )
                 
-                print(f"✅ [ONBOARDING] seed_lancamentos_diarios concluído")
-                print(f"   Stats após execução: {seed_logger.stats}")
+                    print(f"✅ [ONBOARDING] seed_lancamentos_diarios concluído")
+                    print(f"   Stats após execução: {seed_logger.stats}")
                 
-                # Commit final (a função já faz commits em lotes, mas garantimos o commit final)
-                try:
-                    db.commit()
-                    print(f"✅ [ONBOARDING] Commit final realizado")
-                except Exception as commit_error:
-                    print(f"⚠️ [ONBOARDING] Erro no commit final (pode ser que já foi commitado): {commit_error}")
-                    db.rollback()
-                    # Tentar novamente
+                    # Commit final (a função já faz commits em lotes, mas garantimos o commit final)
                     try:
                         db.commit()
-                        print(f"✅ [ONBOARDING] Commit final realizado na segunda tentativa")
-                    except:
-                        pass
+                        print(f"✅ [ONBOARDING] Commit final realizado")
+                    except Exception as commit_error:
+                        print(f"⚠️ [ONBOARDING] Erro no commit final (pode ser que já foi commitado): {commit_error}")
+                        db.rollback()
+                        # Tentar novamente
+                        try:
+                            db.commit()
+                            print(f"✅ [ONBOARDING] Commit final realizado na segunda tentativa")
+                        except:
+                            pass
                 
-                diarios_after = seed_logger.stats.get('lancamentos_diarios_criados', 0)
-                previstos_after = seed_logger.stats.get('lancamentos_previstos_criados', 0)
-                diarios_count = diarios_after - diarios_before
-                previstos_count = previstos_after - previstos_before
+                    diarios_after = seed_logger.stats.get('lancamentos_diarios_criados', 0)
+                    previstos_after = seed_logger.stats.get('lancamentos_previstos_criados', 0)
+                    diarios_count = diarios_after - diarios_before
+                    previstos_count += previstos_after - previstos_before
                 
-                print(f"📊 [ONBOARDING] Resultado final: Diários criados={diarios_count}, Previstos criados={previstos_count}")
+                    print(f"📊 [ONBOARDING] Resultado final: Diários criados={diarios_count}, Previstos criados={previstos_count}")
                 
                 update_status(
-                    status_key,
+                    run_id,
                     progress=90,
                     message=f"Lançamentos importados! Diários: {diarios_count}, Previstos: {previstos_count}",
                     stats={
@@ -1496,6 +1253,7 @@ def execute_import(
                         "lancamentos_diarios_criados": diarios_count,
                         "lancamentos_previstos_criados": previstos_count,
                     },
+                    checkpoint={"diarios": diarios_count},
                 )
 
                 # Persistir configurações do fluxo de caixa (ordem e saldo inicial)
@@ -1509,6 +1267,7 @@ def execute_import(
                 settings_by_year = extract_cash_flow_settings(Path(excel_file_path))
                 forecast_by_year = extract_cash_flow_forecast_values(Path(excel_file_path))
                 for year_key, data in settings_by_year.items():
+                    progress_reporter.heartbeat()
                     line_order = data.get("line_order") or []
                     saldo_ano_anterior = Decimal(str(data.get("saldo_ano_anterior") or 0))
                     existing = (
@@ -1537,14 +1296,8 @@ def execute_import(
                 # Atualizar valores previstos do fluxo de caixa
                 for year_key, values in forecast_by_year.items():
                     for label, months in values.items():
-                        for month_label, value in months.items():
-                            month_index = None
-                            try:
-                                month_index = MONTH_LABELS.index(month_label) + 1
-                            except Exception:
-                                month_index = None
-                            if not month_index:
-                                continue
+                        progress_reporter.heartbeat()
+                        for month_index, value in enumerate(months.tolist(), start=1):
                             existing_value = (
                                 db.query(CashFlowForecastValue)
                                 .filter(
@@ -1578,33 +1331,33 @@ def execute_import(
                 print(f"❌ [ONBOARDING] ERRO DETALHADO na importação de lançamentos diários:")
                 print(error_trace)
                 update_status(
-                    status_key,
+                    run_id,
                     status="error",
                     message=f"Erro ao importar lançamentos diários: {str(e)}",
                     error=str(e),
                     finished=True,
                 )
-                update_status(status_key, error=error_trace)
+                update_status(run_id, error=error_trace)
                 return
                 
         except Exception as e:
             db.rollback()
             import traceback
             update_status(
-                status_key,
+                run_id,
                 status="error",
                 message=f"Erro ao importar lançamentos: {str(e)}",
                 error=str(e),
                 finished=True,
             )
-            update_status(status_key, error=traceback.format_exc())
+            update_status(run_id, error=traceback.format_exc())
             return
         finally:
             db.close()
         
         # Etapa 4: Conciliação
         update_status(
-            status_key,
+            run_id,
             status="reconciling",
             current_step="Conciliação",
             progress=95,
@@ -1616,7 +1369,7 @@ def execute_import(
         # Finalizar
         duration_seconds = round(time.monotonic() - start_time, 2)
         update_status(
-            status_key,
+            run_id,
             status="completed",
             current_step="Concluído",
             progress=100,
@@ -1639,7 +1392,7 @@ def execute_import(
         
     except Exception as e:
         update_status(
-            status_key,
+            run_id,
             status="error",
             message=f"Erro durante onboarding: {str(e)}",
             error=str(e),
@@ -19,7 +19,7 @@ from app.models.auth import User
 router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
 
 @router.post("/run-migration-liquidation")
-async def run_migration_liquidation(
+def run_migration_liquidation(
     # Temporariamente sem autenticação para poder executar antes do login funcionar
     # TODO: Adicionar autenticação após migration
 ):
@@ -146,7 +146,7 @@ async def run_migration_liquidation(
         )
 
 @router.post("/init-database")
-async def init_database():
+def init_database():
     """
     Inicializa o banco de dados - cria tabelas e usuário inicial
     ATENÇÃO: Endpoint temporário sem autenticação - remover após uso
@@ -248,7 +248,7 @@ async def init_database():
         )
 
 @router.post("/seed-staging")
-async def execute_seed_staging(
+def execute_seed_staging(
     reset_data: Optional[bool] = Body(False, description="Resetar dados antes do seed"),
     cost_debug: Optional[bool] = Body(False, description="Ativar debug de classificação de CUSTO"),
     current_user: User = Depends(get_current_active_user)
@@ -392,7 +392,7 @@ async def execute_seed_staging(
         )
 
 @router.post("/clean-duplicate-business-units", summary="Remove Business Units duplicadas (APENAS STAGING)", status_code=200)
-async def clean_duplicate_business_units():
+def clean_duplicate_business_units():
     """
     Remove Business Units duplicadas, mantendo apenas uma por tenant (a mais antiga).
     Migra usuários e acessos para a BU mantida.
@@ -492,6 +492,9 @@ async def clean_duplicate_business_units():
                         ).update({
                             LancamentoDiario.business_unit_id: keep_bu.id
                         })
+                        from app.services.lancamento_rollup_service import LancamentoRollupService
+                        LancamentoRollupService.rebuild(db, bu.tenant_id, bu.id)
+                        LancamentoRollupService.rebuild(db, keep_bu.tenant_id, keep_bu.id)
                     
                     # Deletar BU (agora que todos os dados foram migrados)
                     db.delete(bu)
@@ -501,6 +504,9 @@ async def clean_duplicate_business_units():
                 details.append(detail)
         
         db.commit()
+        # Usuários podem ter sido movidos de BU (update em massa)
+        from app.services.user_cache import AuthenticatedUserCache
+        AuthenticatedUserCache.invalidate()
         
         return JSONResponse(content={
             "success": True,
@@ -524,7 +530,7 @@ async def clean_duplicate_business_units():
         db.close()
 
 @router.post("/clean-duplicate-tenants", summary="Remove Tenants duplicados por nome (APENAS STAGING)", status_code=200)
-async def clean_duplicate_tenants():
+def clean_duplicate_tenants():
     """
     Remove Tenants duplicados, mantendo apenas um por nome (o que tem mais dados).
     Migra dados relacionados para o tenant mantido.
@@ -719,6 +725,11 @@ async def clean_duplicate_tenants():
                             bu.tenant_id = keep_tenant.id
                             print(f"      ✅ BU {bu.name} migrada para tenant mantido")
                     
+                    # Recalcular rollup dos lançamentos migrados
+                    from app.services.lancamento_rollup_service import LancamentoRollupService
+                    LancamentoRollupService.rebuild(db, tenant.id)
+                    LancamentoRollupService.rebuild(db, keep_tenant.id)
+                    
                     # Deletar tenant (agora que todos os dados foram migrados)
                     db.delete(tenant)
                     deleted_count += 1
@@ -729,6 +740,9 @@ async def clean_duplicate_tenants():
                     details.append(detail)
         
         db.commit()
+        # Usuários podem ter sido movidos de tenant/BU (update em massa)
+        from app.services.user_cache import AuthenticatedUserCache
+        AuthenticatedUserCache.invalidate()
         
         return JSONResponse(content={
             "success": True,
@@ -750,7 +764,7 @@ async def clean_duplicate_tenants():
         db.close()
 
 @router.post("/migrate-qa-user-to-llm", summary="Migra usuário QA para tenant LLM Lavanderia (APENAS STAGING)", status_code=200)
-async def migrate_qa_user_to_llm():
+def migrate_qa_user_to_llm():
     """
     Migra o usuário qa@finaflow.test do tenant "FinaFlow Default" para "LLM Lavanderia".
     ATENÇÃO: Endpoint temporário sem autenticação - remover após uso
@@ -796,6 +810,8 @@ async def migrate_qa_user_to_llm():
         qa_user.business_unit_id = llm_bu.id
         
         db.commit()
+        from app.services.user_cache import AuthenticatedUserCache
+        AuthenticatedUserCache.invalidate(qa_user.id)
         
         return JSONResponse(content={
             "success": True,
@@ -819,7 +835,7 @@ async def migrate_qa_user_to_llm():
         db.close()
 
 @router.post("/remove-empty-tenants", summary="Remove Tenants vazios (sem dados importantes) (APENAS STAGING)", status_code=200)
-async def remove_empty_tenants():
+def remove_empty_tenants():
     """
     Remove Tenants que não têm dados importantes (lançamentos, usuários ativos, etc.).
     ATENÇÃO: Endpoint temporário sem autenticação - remover após uso
@@ -906,7 +922,7 @@ async def remove_empty_tenants():
         db.close()
 
 @router.post("/test-seed-direct", summary="Testa seed diretamente com logging detalhado (APENAS STAGING)", status_code=200)
-async def test_seed_direct():
+def test_seed_direct():
     """
     Testa o seed diretamente para diagnosticar problemas de importação.
     Retorna logs detalhados de cada etapa.
@@ -3,7 +3,12 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 import os
-from typing import Generator
+from typing import Any, Callable, Generator, TypeVar
+
+from anyio import to_thread
+from starlette.concurrency import run_in_threadpool
+
+T = TypeVar("T")
 
 # Configuração do banco de dados - APENAS PostgreSQL
 # Suporta tanto Unix Socket (Cloud Run) quanto TCP (desenvolvimento local)
@@ -24,12 +29,21 @@ if "/cloudsql/" in DATABASE_URL:
 else:
     print(f"🔗 Conectando ao banco via TCP: {DATABASE_URL.split('@')[1].split('/')[0] if '@' in DATABASE_URL else 'PostgreSQL'}")
 
+# Tamanho do pool de conexões (configurável por ambiente)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+
+# Rotas síncronas (def) rodam no threadpool do AnyIO. Limitamos o número de
+# threads ao número máximo de conexões do pool: mais threads que conexões só
+# gerariam espera em QueuePool (e timeouts) em vez de fila no servidor.
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
 # Configuração para PostgreSQL
 engine = create_engine(
     DATABASE_URL,
     poolclass=QueuePool,
-    pool_size=20,
-    max_overflow=30,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
     pool_pre_ping=True,
     pool_recycle=3600,
     echo=False
@@ -62,6 +76,25 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+def configure_db_threadpool(size: int = DB_THREADPOOL_SIZE) -> None:
+    """
+    Define o limite do threadpool usado pelas rotas síncronas e por
+    run_in_db_threadpool. Deve ser chamado com o event loop em execução
+    (ex.: no lifespan da aplicação).
+    """
+    to_thread.current_default_thread_limiter().total_tokens = size
+
+
+async def run_in_db_threadpool(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa código síncrono de banco (Session do SQLAlchemy) fora do event loop.
+
+    Usar em rotas ``async def`` que precisam de ``await`` (ex.: leitura do corpo
+    da requisição) e também acessam o banco. Compartilha o mesmo limite do
+    threadpool das rotas ``def``.
+    """
+    return await run_in_threadpool(func, *args, **kwargs)
+
 def create_tables():
     """
     Cria todas as tabelas no banco de dados PostgreSQL.
@@ -6,7 +6,7 @@ import time
 import os
 from contextlib import asynccontextmanager
 
-from app.database import create_tables
+from app.database import DB_THREADPOOL_SIZE, configure_db_threadpool, create_tables
 from app.api import financial, include_routers as include_api_routers
 from app.routes import permissions
 from app.models.auth import Base
@@ -15,6 +15,10 @@ from app.models.financial import Base as FinancialBase
 from app.models.validation_status import DashboardValidationStatus  # noqa: F401
 from app.models.liquidation_accounts import LiquidationAccount, LiquidationAccountBalance  # noqa: F401
 from app.models.lancamento_diario import LancamentoDiario  # noqa: F401
+from app.models.lancamento_rollup import LancamentoDiarioRollup  # noqa: F401
+from app.models.onboarding_job import OnboardingJob  # noqa: F401
+from app.models.reference_counter import ReferenceCounter  # noqa: F401
+from app.services.workbook_process_pool import WorkbookProcessPool
 
 # Configurações de segurança
 default_allowed_hosts = "localhost,127.0.0.1,testserver,finaflow.vercel.app"
@@ -47,6 +51,8 @@ async def lifespan(app: FastAPI):
     """Lifecycle da aplicação."""
     # Startup
     print("🚀 Iniciando FinaFlow Backend...")
+    configure_db_threadpool()
+    print(f"🧵 Threadpool de banco limitado a {DB_THREADPOOL_SIZE} threads")
     try:
         create_tables()
         print("✅ Tabelas criadas/verificadas com sucesso")
@@ -58,6 +64,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("🛑 Encerrando FinaFlow Backend...")
+    WorkbookProcessPool.shutdown()
 
 # Criar aplicação FastAPI
 app = FastAPI(
@@ -1,13 +1,125 @@
 from datetime import datetime
+from typing import Optional, Tuple
 from uuid import uuid4
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, UniqueConstraint, SmallInteger, Index, event
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+# ============================================================================
+# CLASSIFICAÇÃO DE GRUPOS (calculada ao gravar o grupo, não a cada consulta)
+# ============================================================================
+
+# Ordem dos grupos conforme aparece na planilha (não alfabética)
+GROUP_ORDER = [
+    "Receita",
+    "Receita Operacional",
+    "Receita Financeira",
+    "Deduções",
+    "Custos",
+    "Custos com Serviços Prestados",
+    "Custos com Mão de Obra",
+    "Despesas Operacionais",
+    "Despesas Financeiras",
+    "Despesas com Pessoal",
+    "Despesas Administrativas",
+    "Despesas Comerciais",
+    "Investimentos",
+    "Movimentações Não Operacionais",
+]
+# Grupo fora da lista: vai para o final
+GROUP_ORDER_UNLISTED = len(GROUP_ORDER) + 1000
+
+# Grupos excluídos das visões operacionais (receita/despesa/custo)
+NON_OPERATIONAL_GROUP_KEYWORDS = (
+    "dedução",
+    "deducao",
+    "deduções",
+    "deducoes",
+    "movimentações não operacionais",
+    "movimentacoes nao operacionais",
+    "movimentações nao operacionais",
+    "movimentacoes não operacionais",
+)
+
+_RECEITA_GROUP_KEYWORDS = ("receita", "venda", "renda", "faturamento", "vendas")
+_CUSTO_GROUP_KEYWORDS = ("custo", "custos")
+_DESPESA_GROUP_KEYWORDS = ("despesa", "gasto", "operacional", "administrativa")
+
+
+def group_sort_ordinal(name: str) -> int:
+    """Posição do grupo na ordem da planilha (correspondência exata ou parcial)"""
+    group_lower = (name or "").lower()
+    for idx, ordered_name in enumerate(GROUP_ORDER):
+        ordered_lower = ordered_name.lower()
+        if ordered_lower in group_lower or group_lower in ordered_lower:
+            return idx
+    return GROUP_ORDER_UNLISTED
+
+
+def classify_group_name(name: str) -> Tuple[bool, int, Optional[str]]:
+    """
+    Atributos do grupo derivados do nome: (operacional?, ordem, classe de tipo).
+
+    A classe de tipo (RECEITA, CUSTO, DESPESA) é a indicada pelo próprio nome
+    do grupo; ``None`` quando o nome não indica (a conta/subgrupo decide).
+    Grupos não operacionais (Deduções, Movimentações Não Operacionais) não
+    têm classe.
+    """
+    group_lower = (name or "").lower().strip()
+    if any(keyword in group_lower for keyword in NON_OPERATIONAL_GROUP_KEYWORDS):
+        return False, group_sort_ordinal(name), None
+    if any(keyword in group_lower for keyword in _RECEITA_GROUP_KEYWORDS):
+        type_class = "RECEITA"
+    elif any(keyword in group_lower for keyword in _CUSTO_GROUP_KEYWORDS):
+        type_class = "CUSTO"
+    elif any(keyword in group_lower for keyword in _DESPESA_GROUP_KEYWORDS):
+        type_class = "DESPESA"
+    else:
+        type_class = None
+    return True, group_sort_ordinal(name), type_class
+
+
+# Subgrupos de custo dentro de grupos sem classe de custo/receita
+_CUSTO_SUBGROUP_KEYWORDS = (
+    "custo", "custos", "mercadoria", "produto",
+    "mão de obra", "mao de obra", "serviços prestados", "servicos prestados",
+)
+
+
+def account_transaction_type(is_operational: bool, group_type_class: Optional[str], subgroup_name: Optional[str]) -> str:
+    """
+    Tipo de transação (RECEITA, CUSTO, DESPESA) dos lançamentos de uma conta,
+    a partir da classificação gravada no grupo e do nome do subgrupo.
+
+    Grupos não operacionais ficam como DESPESA (são excluídos das visões
+    operacionais pelo grupo); sem indicação, o padrão é DESPESA.
+    """
+    if not is_operational:
+        return "DESPESA"
+    if group_type_class in ("RECEITA", "CUSTO"):
+        return group_type_class
+    subgroup_lower = (subgroup_name or "").lower()
+    if any(keyword in subgroup_lower for keyword in _CUSTO_SUBGROUP_KEYWORDS):
+        return "CUSTO"
+    return "DESPESA"
+
+
+def resolve_transaction_type(group_name: Optional[str], subgroup_name: Optional[str] = None) -> str:
+    """Mesma regra de ``account_transaction_type`` a partir dos nomes (grupo ainda não gravado)"""
+    if not group_name:
+        return "DESPESA"
+    is_operational, _, type_class = classify_group_name(group_name)
+    return account_transaction_type(is_operational, type_class, subgroup_name)
+
+
 class ChartAccountGroup(Base):
     """Grupo do Plano de Contas (1º nível)"""
     __tablename__ = "chart_account_groups"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Filtro operacional das agregações (junção por id + booleano)
+        Index('idx_chart_account_groups_tenant_operational', 'tenant_id', 'is_operational'),
+        {'extend_existing': True},
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     tenant_id = Column(String(36), ForeignKey("tenants.id"), nullable=True)  # Null = global/compartilhado
@@ -15,6 +127,10 @@ class ChartAccountGroup(Base):
     name = Column(String(100), nullable=False)
     description = Column(Text)
     is_active = Column(Boolean, default=True)
+    # Derivados do nome ao gravar (ver classify_group_name)
+    is_operational = Column(Boolean, nullable=False, default=True, server_default="true")
+    sort_ordinal = Column(SmallInteger, nullable=False, default=GROUP_ORDER_UNLISTED, server_default=str(GROUP_ORDER_UNLISTED))
+    type_class = Column(String(20), nullable=True)  # RECEITA, CUSTO, DESPESA ou nulo
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -26,6 +142,12 @@ class ChartAccountGroup(Base):
     #     UniqueConstraint('code', 'tenant_id', name='uq_group_code_tenant'),
     # )
 
+@event.listens_for(ChartAccountGroup, "before_insert")
+@event.listens_for(ChartAccountGroup, "before_update")
+def _classify_group(mapper, connection, group: ChartAccountGroup) -> None:
+    group.is_operational, group.sort_ordinal, group.type_class = classify_group_name(group.name)
+
+
 class ChartAccountSubgroup(Base):
     """Subgrupo do Plano de Contas (2º nível)"""
     __tablename__ = "chart_account_subgroups"
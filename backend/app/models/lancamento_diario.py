@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, Numeric, UniqueConstraint, Enum
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, Numeric, UniqueConstraint, Enum, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -75,6 +75,17 @@ class LancamentoDiario(Base):
             'import_ref',
             name='uq_lancamento_import_ref',
         ),
+        # Caminho quente: tenant/BU/ativos por intervalo de data (cobre as somas);
+        # o id no fim atende também a paginação por chave (data, id)
+        Index(
+            'idx_lancamentos_diarios_tenant_bu_active_data',
+            'tenant_id',
+            'business_unit_id',
+            'is_active',
+            'data_movimentacao',
+            'id',
+            postgresql_include=['valor', 'transaction_type', 'grupo_id', 'subgrupo_id', 'conta_id', 'status'],
+        ),
         {'extend_existing': True},
     )
 
@@ -114,6 +125,26 @@ class LancamentoDiarioUpdate(BaseModel):
     subgrupo_id: Optional[str] = None
     grupo_id: Optional[str] = None
 
+class LancamentoDiarioBatchItem(LancamentoDiarioCreate):
+    """Item de criação em lote; ``import_ref`` torna o reenvio idempotente"""
+    import_ref: Optional[str] = None
+
+class LancamentoDiarioBatchCreate(BaseModel):
+    """Criação em lote de lançamento diários"""
+    items: List[LancamentoDiarioBatchItem]
+
+class LancamentoDiarioBatchUpdateItem(LancamentoDiarioUpdate):
+    """Item de atualização em lote"""
+    id: str
+
+class LancamentoDiarioBatchUpdate(BaseModel):
+    """Atualização em lote de lançamento diários"""
+    items: List[LancamentoDiarioBatchUpdateItem]
+
+class LancamentoDiarioBatchDelete(BaseModel):
+    """Exclusão (soft delete) em lote de lançamento diários"""
+    ids: List[str]
+
 class LancamentoDiarioResponse(BaseModel):
     """Resposta de lançamento diário"""
     id: str
@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, Numeric, UniqueConstraint, Enum
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, Numeric, UniqueConstraint, Enum, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -71,6 +71,19 @@ class LancamentoPrevisto(Base):
             'import_ref',
             name='uq_lancamento_previsto_import_ref',
         ),
+        # Caminho quente: tenant/BU/ativos por intervalo de data (cobre as somas);
+        # o id no fim atende também a paginação por chave (data, id). status
+        # fica no INCLUDE: após o intervalo de data ele só filtrava, e como
+        # chave quebraria a ordem (data, id)
+        Index(
+            'idx_lancamentos_previstos_tenant_bu_active_data',
+            'tenant_id',
+            'business_unit_id',
+            'is_active',
+            'data_prevista',
+            'id',
+            postgresql_include=['valor', 'transaction_type', 'grupo_id', 'subgrupo_id', 'conta_id', 'status'],
+        ),
         {'extend_existing': True},
     )
 
@@ -108,6 +121,26 @@ class LancamentoPrevistoUpdate(BaseModel):
     subgrupo_id: Optional[str] = None
     grupo_id: Optional[str] = None
 
+class LancamentoPrevistoBatchItem(LancamentoPrevistoCreate):
+    """Item de criação em lote; ``import_ref`` torna o reenvio idempotente"""
+    import_ref: Optional[str] = None
+
+class LancamentoPrevistoBatchCreate(BaseModel):
+    """Criação em lote de lançamento previstos"""
+    items: List[LancamentoPrevistoBatchItem]
+
+class LancamentoPrevistoBatchUpdateItem(LancamentoPrevistoUpdate):
+    """Item de atualização em lote"""
+    id: str
+
+class LancamentoPrevistoBatchUpdate(BaseModel):
+    """Atualização em lote de lançamento previstos"""
+    items: List[LancamentoPrevistoBatchUpdateItem]
+
+class LancamentoPrevistoBatchDelete(BaseModel):
+    """Exclusão (soft delete) em lote de lançamento previstos"""
+    ids: List[str]
+
 class LancamentoPrevistoResponse(BaseModel):
     """Resposta de lançamento previsto"""
     id: str
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Date, DateTime, Index, Integer, Numeric, String
+
+from app.database import Base
+
+
+class LancamentoDiarioRollup(Base):
+    """
+    Totais pré-agregados dos lançamentos diários ativos.
+
+    Uma linha por (tenant, BU, grupo, subgrupo, conta, tipo, dia). Mantida
+    incrementalmente pelo LancamentoRollupService nas escritas unitárias e
+    reconstruída em lote após importações.
+    """
+    __tablename__ = "lancamentos_diarios_rollup"
+    __table_args__ = (
+        Index(
+            "idx_lancamentos_rollup_tenant_bu_dia",
+            "tenant_id",
+            "business_unit_id",
+            "dia",
+        ),
+        {"extend_existing": True},
+    )
+
+    tenant_id = Column(String(36), primary_key=True)
+    business_unit_id = Column(String(36), primary_key=True)
+    grupo_id = Column(String(36), primary_key=True)
+    subgrupo_id = Column(String(36), primary_key=True)
+    conta_id = Column(String(36), primary_key=True)
+    # "" representa lançamentos sem tipo (NULL não pode compor a chave)
+    transaction_type = Column(String(20), primary_key=True, default="")
+    dia = Column(Date, primary_key=True)
+
+    valor_total = Column(Numeric(18, 2), nullable=False, default=0)
+    quantidade = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,76 @@
+"""
+Modelo de jobs de onboarding (importação de planilha em etapas).
+
+Substitui o dicionário em memória do processo web: o estado fica no banco,
+visível por qualquer instância, e o job é executado por um worker que o
+reivindica com SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+from datetime import datetime
+from enum import Enum
+from uuid import uuid4
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from app.database import Base
+
+
+class OnboardingJobStatus(str, Enum):
+    """Estados do job (os intermediários são as etapas da importação)"""
+    QUEUED = "queued"
+    VALIDATING = "validating"
+    IMPORTING_PLAN = "importing_plan"
+    IMPORTING_TRANSACTIONS = "importing_transactions"
+    RECONCILING = "reconciling"
+    COMPLETED = "completed"
+    ERROR = "error"
+
+
+FINISHED_JOB_STATUSES = (OnboardingJobStatus.COMPLETED.value, OnboardingJobStatus.ERROR.value)
+
+
+class OnboardingJob(Base):
+    """
+    Uma execução de onboarding (run_id) para um tenant/BU.
+
+    ``checkpoints`` guarda as etapas já concluídas (JSON) para que um job
+    interrompido seja retomado a partir delas; dentro de cada etapa os lotes
+    já gravados são pulados pelo import_ref.
+    """
+    __tablename__ = "onboarding_jobs"
+    __table_args__ = (
+        # Worker: próximos jobs pendentes por ordem de chegada
+        Index("idx_onboarding_jobs_status_created", "status", "created_at"),
+        # /status: último job do tenant/BU
+        Index("idx_onboarding_jobs_tenant_bu_created", "tenant_id", "business_unit_id", "created_at"),
+        {"extend_existing": True},
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))  # run_id
+    tenant_id = Column(String(36), ForeignKey("tenants.id"), nullable=False)
+    business_unit_id = Column(String(36), ForeignKey("business_units.id"), nullable=False)
+
+    # Parâmetros da importação
+    spreadsheet_url = Column(Text, nullable=False)
+    reset_data = Column(Boolean, nullable=False, default=False)
+    user_id = Column(String(36), nullable=True)
+    corrections = Column(Text, nullable=True)  # JSON
+
+    # Progresso
+    status = Column(String(32), nullable=False, default=OnboardingJobStatus.QUEUED.value)
+    current_step = Column(String(120), nullable=True)
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    message = Column(Text, nullable=True)
+    errors = Column(Text, nullable=True)  # JSON (lista)
+    stats = Column(Text, nullable=True)  # JSON (contadores)
+    checkpoints = Column(Text, nullable=True)  # JSON (etapas concluídas)
+    live_progress = Column(Text, nullable=True)  # JSON (último evento de progresso da etapa)
+
+    # Execução pelo worker
+    attempts = Column(Integer, nullable=False, default=0)
+    locked_by = Column(String(120), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Date, DateTime, Integer, String
+
+from app.database import Base
+
+
+class ReferenceCounter(Base):
+    """
+    Contador de referências por (tenant, BU, prefixo, dia).
+
+    ``last_value`` é o último número já entregue; o ReferenceAllocator o
+    incrementa com um único INSERT ... ON CONFLICT DO UPDATE ... RETURNING,
+    reservando um ou vários números de uma vez.
+    """
+    __tablename__ = "reference_counters"
+    __table_args__ = {"extend_existing": True}
+
+    tenant_id = Column(String(36), primary_key=True)
+    business_unit_id = Column(String(36), primary_key=True)
+    prefix = Column(String(10), primary_key=True)
+    dia = Column(Date, primary_key=True)
+
+    last_value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -104,7 +104,7 @@ def _serialize_granular_permissions(user_id: str, business_unit_id: str, access:
 # ============================================================================
 
 @router.get("/tenants/{user_id}", response_model=List[UserTenantAccessResponse])
-async def get_user_tenant_permissions(
+def get_user_tenant_permissions(
     user_id: str,
     current_user: User = Depends(get_current_user),
     access_control: AccessControl = Depends(get_access_control),
@@ -143,7 +143,7 @@ async def get_user_tenant_permissions(
     return result
 
 @router.post("/tenants", response_model=UserTenantAccessResponse)
-async def create_user_tenant_permission(
+def create_user_tenant_permission(
     permission_data: UserTenantAccessCreate,
     current_user: User = Depends(get_current_user),
     access_control: AccessControl = Depends(get_access_control),
@@ -214,7 +214,7 @@ async def create_user_tenant_permission(
     )
 
 @router.put("/tenants/{permission_id}", response_model=UserTenantAccessResponse)
-async def update_user_tenant_permission(
+def update_user_tenant_permission(
     permission_id: str,
     permission_data: UserTenantAccessUpdate,
     current_user: User = Depends(get_current_user),
@@ -270,7 +270,7 @@ async def update_user_tenant_permission(
     )
 
 @router.delete("/tenants/{permission_id}")
-async def delete_user_tenant_permission(
+def delete_user_tenant_permission(
     permission_id: str,
     current_user: User = Depends(get_current_user),
     access_control: AccessControl = Depends(get_access_control),
@@ -303,7 +303,7 @@ async def delete_user_tenant_permission(
 # ============================================================================
 
 @router.get("/business-units/{user_id}", response_model=List[UserBusinessUnitAccessResponse])
-async def get_user_business_unit_permissions(
+def get_user_business_unit_permissions(
     user_id: str,
     current_user: User = Depends(get_current_user),
     access_control: AccessControl = Depends(get_access_control),
@@ -345,7 +345,7 @@ async def get_user_business_unit_permissions(
     return result
 
 @router.post("/business-units", response_model=UserBusinessUnitAccessResponse)
-async def create_user_business_unit_permission(
+def create_user_business_unit_permission(
     permission_data: UserBusinessUnitAccessCreate,
     current_user: User = Depends(get_current_user),
     access_control: AccessControl = Depends(get_access_control),
@@ -420,7 +420,7 @@ async def create_user_business_unit_permission(
     )
 
 @router.put("/business-units/{permission_id}", response_model=UserBusinessUnitAccessResponse)
-async def update_user_business_unit_permission(
+def update_user_business_unit_permission(
     permission_id: str,
     permission_data: UserBusinessUnitAccessUpdate,
     current_user: User = Depends(get_current_user),
@@ -478,7 +478,7 @@ async def update_user_business_unit_permission(
     )
 
 @router.delete("/business-units/{permission_id}")
-async def delete_user_business_unit_permission(
+def delete_user_business_unit_permission(
     permission_id: str,
     current_user: User = Depends(get_current_user),
     access_control: AccessControl = Depends(get_access_control),
@@ -511,7 +511,7 @@ async def delete_user_business_unit_permission(
 # ============================================================================
 
 @router.get("/available")
-async def list_available_permissions(
+def list_available_permissions(
     current_user: User = Depends(get_current_user),
 ):
     """Lista permissões disponíveis para as telas de administração."""
@@ -519,7 +519,7 @@ async def list_available_permissions(
 
 
 @router.get("/users/{user_id}/business-units/{business_unit_id}")
-async def get_user_business_unit_granular_permissions(
+def get_user_business_unit_granular_permissions(
     user_id: str,
     business_unit_id: str,
     current_user: User = Depends(get_current_user),
@@ -554,7 +554,7 @@ async def get_user_business_unit_granular_permissions(
 
 
 @router.put("/users/{user_id}/business-units/{business_unit_id}")
-async def update_user_business_unit_granular_permissions(
+def update_user_business_unit_granular_permissions(
     user_id: str,
     business_unit_id: str,
     payload: dict,
@@ -625,7 +625,7 @@ async def update_user_business_unit_granular_permissions(
     return _serialize_granular_permissions(user_id, business_unit_id, access)
 
 @router.get("/my-access")
-async def get_my_access(
+def get_my_access(
     current_user: User = Depends(get_current_user),
     access_control: AccessControl = Depends(get_access_control)
 ):
@@ -0,0 +1,158 @@
+"""
+Camada de Agregação SQL
+
+Consultas SUM(valor) ... GROUP BY (mês/dia, tipo, nível do plano de contas)
+sobre lancamentos_diarios e lancamentos_previstos. Devolvem tuplas compactas
+em vez de entidades ORM, para que os endpoints de dashboard não precisem
+hidratar todos os lançamentos do período.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.orm import Session
+
+from app.models.chart_of_accounts import ChartAccountGroup
+from app.models.lancamento_diario import LancamentoDiario
+from app.models.lancamento_diario import TransactionStatus as DiarioStatus
+from app.models.lancamento_previsto import LancamentoPrevisto
+from app.models.lancamento_previsto import TransactionStatus as PrevistoStatus
+
+
+def _date_column(model):
+    if model is LancamentoPrevisto:
+        return LancamentoPrevisto.data_prevista
+    return LancamentoDiario.data_movimentacao
+
+
+def _type_value(tx_type: Any) -> Optional[str]:
+    if tx_type is None:
+        return None
+    if hasattr(tx_type, "value"):
+        return tx_type.value
+    return str(tx_type)
+
+
+def _to_decimal(value: Any) -> Decimal:
+    if value is None:
+        return Decimal("0")
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def month_of(column):
+    """Mês (1-12) da coluna de data, portável entre PostgreSQL e SQLite"""
+    return cast(func.extract("month", column), Integer)
+
+
+class AggregationQueryService:
+    """Agregações SQL de lançamentos diários e previstos"""
+
+    @staticmethod
+    def _base_query(
+        db: Session,
+        model,
+        columns: List[Any],
+        tenant_id: str,
+        business_unit_id: Optional[str],
+        start_dt: datetime,
+        end_dt: datetime,
+        exclude_cancelled: bool = False,
+        operational_only: bool = False,
+    ):
+        date_col = _date_column(model)
+        query = db.query(*columns).filter(
+            model.tenant_id == tenant_id,
+            model.is_active.is_(True),
+            date_col >= start_dt,
+            date_col <= end_dt,
+        )
+        if business_unit_id:
+            query = query.filter(model.business_unit_id == business_unit_id)
+        if exclude_cancelled:
+            cancelado = PrevistoStatus.CANCELADO if model is LancamentoPrevisto else DiarioStatus.CANCELADO
+            query = query.filter(model.status != cancelado)
+        if operational_only:
+            query = query.join(ChartAccountGroup, model.grupo_id == ChartAccountGroup.id).filter(
+                ChartAccountGroup.is_operational.is_(True)
+            )
+        return query
+
+    @staticmethod
+    def totals_by_month_and_type(
+        db: Session,
+        model,
+        tenant_id: str,
+        business_unit_id: Optional[str],
+        start_dt: datetime,
+        end_dt: datetime,
+        operational_only: bool = False,
+    ) -> List[Tuple[int, str, Decimal, int]]:
+        """
+        Retorna (mês, tipo, total, quantidade) dos lançamentos com tipo definido.
+        Com operational_only, exclui Deduções e Movimentações Não Operacionais.
+        """
+        month = month_of(_date_column(model))
+        query = AggregationQueryService._base_query(
+            db,
+            model,
+            [month, model.transaction_type, func.sum(model.valor), func.count(model.id)],
+            tenant_id,
+            business_unit_id,
+            start_dt,
+            end_dt,
+            operational_only=operational_only,
+        )
+        rows = (
+            query.filter(model.transaction_type.isnot(None))
+            .group_by(month, model.transaction_type)
+            .all()
+        )
+        return [
+            (int(row[0]), _type_value(row[1]), _to_decimal(row[2]), int(row[3] or 0))
+            for row in rows
+        ]
+
+    @staticmethod
+    def totals_by_hierarchy_and_month(
+        db: Session,
+        model,
+        tenant_id: str,
+        business_unit_id: Optional[str],
+        start_dt: datetime,
+        end_dt: datetime,
+        exclude_cancelled: bool = True,
+    ) -> List[Tuple[Optional[str], Optional[str], Optional[str], int, Decimal]]:
+        """
+        Retorna (grupo_id, subgrupo_id, conta_id, mês, total) para montar
+        matrizes previsto x realizado sem carregar os lançamentos.
+        """
+        month = month_of(_date_column(model))
+        query = AggregationQueryService._base_query(
+            db,
+            model,
+            [model.grupo_id, model.subgrupo_id, model.conta_id, month, func.sum(model.valor)],
+            tenant_id,
+            business_unit_id,
+            start_dt,
+            end_dt,
+            exclude_cancelled=exclude_cancelled,
+        )
+        rows = (
+            query.filter(model.valor.isnot(None))
+            .group_by(model.grupo_id, model.subgrupo_id, model.conta_id, month)
+            .all()
+        )
+        return [
+            (
+                str(row[0]) if row[0] else None,
+                str(row[1]) if row[1] else None,
+                str(row[2]) if row[2] else None,
+                int(row[3]),
+                _to_decimal(row[4]),
+            )
+            for row in rows
+        ]
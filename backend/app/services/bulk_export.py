@@ -0,0 +1,108 @@
+"""
+Exportação em streaming (NDJSON / CSV) para listagens grandes
+
+Nas listagens em massa (até 10000 lançamentos), montar todos os objetos ORM
+com seus relacionamentos e um único corpo JSON faz a memória crescer com o
+tamanho do resultado. No modo streaming:
+
+- apenas as colunas necessárias são projetadas (``select`` de colunas, sem ORM);
+- as linhas são lidas em lotes com ``yield_per`` (cursor no servidor no PostgreSQL);
+- cada lote é serializado e enviado antes de buscar o próximo.
+
+O modo é escolhido por ``?format=ndjson|csv`` ou pelo cabeçalho
+``Accept: application/x-ndjson``. As linhas são registros planos (uma chave
+por coluna projetada).
+"""
+
+import csv
+import enum
+import io
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from app.database import SessionLocal
+
+# Linhas buscadas (e enviadas) por lote
+BULK_EXPORT_BATCH_SIZE = int(os.getenv("BULK_EXPORT_BATCH_SIZE", "1000"))
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+EXPORT_FORMAT_PATTERN = "^(json|ndjson|csv)$"
+
+
+def _plain(value: Any) -> Any:
+    """Valor serializável: datas em ISO, Decimal em float, enums pelo valor"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+class BulkExportService:
+    """Serialização incremental de ``select`` de colunas em NDJSON/CSV"""
+
+    @staticmethod
+    def requested_format(accept: Optional[str], format: Optional[str]) -> Optional[str]:
+        """``ndjson``/``csv`` quando o cliente pediu streaming; ``None`` para o JSON de sempre"""
+        if format:
+            return None if format == "json" else format
+        if accept and NDJSON_MEDIA_TYPE in accept.lower():
+            return "ndjson"
+        return None
+
+    @staticmethod
+    def iter_rows(statement: Select, export_format: str, batch_size: Optional[int] = None) -> Iterator[str]:
+        """
+        Executa ``statement`` em sessão própria (a da requisição não vive
+        durante o stream) e devolve um bloco de texto por lote de linhas.
+        """
+        size = batch_size or BULK_EXPORT_BATCH_SIZE
+        db = SessionLocal()
+        try:
+            result = db.execute(statement.execution_options(yield_per=size))
+            columns = list(result.keys())
+
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+                for batch in result.partitions():
+                    writer.writerows([_plain(value) for value in row] for row in batch)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    # Resultado vazio: só o cabeçalho
+                    yield buffer.getvalue()
+                return
+
+            for batch in result.partitions():
+                yield "".join(
+                    json.dumps(
+                        {column: _plain(value) for column, value in zip(columns, row)},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                    for row in batch
+                )
+        finally:
+            db.close()
+
+    @staticmethod
+    def response(statement: Select, export_format: str, filename: str) -> StreamingResponse:
+        if export_format == "csv":
+            return StreamingResponse(
+                BulkExportService.iter_rows(statement, "csv"),
+                media_type=f"{CSV_MEDIA_TYPE}; charset=utf-8",
+                headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'},
+            )
+        return StreamingResponse(BulkExportService.iter_rows(statement, "ndjson"), media_type=NDJSON_MEDIA_TYPE)
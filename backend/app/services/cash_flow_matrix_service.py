@@ -0,0 +1,746 @@
+"""
+Motor da Matriz Previsto x Realizado
+
+Calcula, em uma única passada, a matriz grupo/subgrupo/conta x mês do fluxo
+de caixa (previsto, realizado, AH e AV) para (tenant, BU, ano). A matriz é
+reaproveitada pelo endpoint de fluxo de caixa e pelos indicadores
+operacionais: fica memorizada na sessão da requisição e, entre requisições,
+no cache de processo.
+
+Invalidação: cada escrita nas fontes da matriz (lançamentos diários e
+previstos, configurações e valores do fluxo, plano de contas) eleva a versão
+do tenant afetado (ou de todos, para registros globais e escritas em massa)
+no flush e de novo ao fim da transação. A consulta ao cache compara versões em
+memória, sem ler o banco. Como as versões são por processo, o TTL limita a
+defasagem entre workers/instâncias.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.cash_flow_forecast_values import CashFlowForecastValue
+from app.models.cash_flow_settings import CashFlowYearSettings
+from app.models.chart_of_accounts import (
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario
+from app.models.lancamento_previsto import LancamentoPrevisto
+from app.services.aggregation_query_service import AggregationQueryService
+from app.services.chart_hierarchy_cache import (
+    AccountNode,
+    ChartHierarchyCache,
+    GroupNode,
+    SubgroupNode,
+)
+from app.services.forecast_sheet import MONTH_LABELS
+
+
+CASH_FLOW_MATRIX_CACHE_TTL_SECONDS = float(os.getenv("CASH_FLOW_MATRIX_CACHE_TTL_SECONDS", "60"))
+
+# Matrizes mantidas entre requisições (LRU por tenant/BU/ano): (versão, expira em, matriz)
+_MATRIX_CACHE_MAX_ENTRIES = 128
+_MATRIX_CACHE: "OrderedDict[Tuple[str, Optional[str], int], Tuple[int, float, CashFlowMatrix]]" = OrderedDict()
+_MATRIX_CACHE_LOCK = threading.Lock()
+_SESSION_INFO_KEY = "cash_flow_matrix"
+
+_SOURCE_MODELS = (
+    LancamentoDiario,
+    LancamentoPrevisto,
+    CashFlowYearSettings,
+    CashFlowForecastValue,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+    ChartAccount,
+)
+_SOURCE_TABLES = frozenset(model.__table__.name for model in _SOURCE_MODELS)
+_DIRTY_INFO_KEY = "cash_flow_matrix_dirty"
+# Marca de "todos os tenants" (registros globais ou escrita em massa)
+_ALL = "*"
+
+# Versão (contador de escritas) da última escrita de cada tenant
+_TENANT_CHANGED_AT: "OrderedDict[str, int]" = OrderedDict()
+_VERSION = 0
+_GLOBAL_CHANGED_AT = 0
+# Maior versão descartada de _TENANT_CHANGED_AT (piso para tenants sem registro)
+_PRUNED_VERSION = 0
+
+
+def decimal_to_float(value: Optional[Decimal]) -> float:
+    if value is None:
+        return 0.0
+    if isinstance(value, Decimal):
+        return float(value.quantize(Decimal("0.01")))
+    return float(Decimal(str(value)).quantize(Decimal("0.01")))
+
+
+def to_cent(value: float) -> float:
+    return float(Decimal(str(value)).quantize(Decimal("0.01")))
+
+
+def load_plan_structure(
+    db: Session, tenant_id: str
+) -> tuple[
+    List[GroupNode],
+    List[SubgroupNode],
+    List[AccountNode],
+    Dict[str, List[SubgroupNode]],
+    Dict[str, List[AccountNode]],
+]:
+    """Plano do tenant (ou global) em ordem de criação, do cache de hierarquia"""
+    tree = ChartHierarchyCache.plan(db, tenant_id)
+    return (
+        list(tree.groups),
+        list(tree.subgroups),
+        list(tree.accounts),
+        {group_id: list(items) for group_id, items in tree.subgroups_by_group.items()},
+        {subgroup_id: list(items) for subgroup_id, items in tree.accounts_by_subgroup.items()},
+    )
+
+
+def empty_months() -> Dict[str, Dict[str, float]]:
+    return {
+        label: {"previsto": 0.0, "realizado": 0.0, "ah": 0.0, "av": 0.0}
+        for label in MONTH_LABELS
+    }
+
+
+def load_cash_flow_settings(
+    db: Session,
+    tenant_id: str,
+    business_unit_id: Optional[str],
+    year: int,
+) -> Tuple[Optional[List[str]], float]:
+    settings_query = (
+        db.query(CashFlowYearSettings)
+        .filter(
+            CashFlowYearSettings.tenant_id == tenant_id,
+            CashFlowYearSettings.year == year,
+        )
+    )
+    if business_unit_id:
+        settings_query = settings_query.filter(
+            CashFlowYearSettings.business_unit_id == business_unit_id
+        )
+    settings = settings_query.first()
+    if not settings:
+        # fallback: usar a ordem mais recente disponível para manter o espelhamento da planilha
+        fallback_query = (
+            db.query(CashFlowYearSettings)
+            .filter(CashFlowYearSettings.tenant_id == tenant_id)
+            .order_by(CashFlowYearSettings.year.desc())
+        )
+        if business_unit_id:
+            fallback_query = fallback_query.filter(
+                CashFlowYearSettings.business_unit_id == business_unit_id
+            )
+        settings = fallback_query.first()
+        if not settings:
+            return None, 0.0
+        line_order = None
+        if settings.line_order:
+            try:
+                line_order = json.loads(settings.line_order)
+            except Exception:
+                line_order = None
+        # saldo do ano anterior não deve ser reutilizado quando o ano solicitado não tem settings
+        return line_order, 0.0
+
+    line_order = None
+    if settings.line_order:
+        try:
+            line_order = json.loads(settings.line_order)
+        except Exception:
+            line_order = None
+
+    saldo_ano_anterior = decimal_to_float(settings.saldo_ano_anterior)
+    return line_order, saldo_ano_anterior
+
+
+def load_forecast_values(
+    db: Session,
+    tenant_id: str,
+    business_unit_id: Optional[str],
+    year: int,
+) -> Dict[str, Dict[str, float]]:
+    query = (
+        db.query(CashFlowForecastValue)
+        .filter(
+            CashFlowForecastValue.tenant_id == tenant_id,
+            CashFlowForecastValue.year == year,
+        )
+    )
+    if business_unit_id:
+        query = query.filter(CashFlowForecastValue.business_unit_id == business_unit_id)
+
+    values: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for row in query.all():
+        label_key = (row.label or "").strip().lower()
+        if not label_key:
+            continue
+        if row.month and 1 <= row.month <= 12:
+            month_label = MONTH_LABELS[row.month - 1]
+            values[label_key][month_label] = decimal_to_float(row.value)
+
+    return values
+
+
+@dataclass(frozen=True)
+class MatrixRow:
+    """Linha tipada da matriz (valores mensais já arredondados em centavos)"""
+
+    categoria: str
+    nivel: int
+    tipo: str
+    previsto: Tuple[Decimal, ...]
+    realizado: Tuple[Decimal, ...]
+
+    def total_previsto(self, months: int = 12) -> Decimal:
+        return sum(self.previsto[:months], Decimal("0"))
+
+    def total_realizado(self, months: int = 12) -> Decimal:
+        return sum(self.realizado[:months], Decimal("0"))
+
+
+class CashFlowMatrix:
+    """Matriz previsto x realizado imutável de um (tenant, BU, ano)"""
+
+    def __init__(self, year: int, rows: List[Dict[str, Any]]):
+        self.year = year
+        self._rows = rows
+        self._by_label: Dict[str, MatrixRow] = {}
+        for row in rows:
+            key = str(row.get("categoria", "")).strip().lower()
+            if key in self._by_label:
+                # Mantém a primeira ocorrência, como as buscas por rótulo anteriores
+                continue
+            self._by_label[key] = MatrixRow(
+                categoria=row["categoria"],
+                nivel=row["nivel"],
+                tipo=row["tipo"],
+                previsto=tuple(Decimal(str(row["meses"][m]["previsto"])) for m in MONTH_LABELS),
+                realizado=tuple(Decimal(str(row["meses"][m]["realizado"])) for m in MONTH_LABELS),
+            )
+
+    def row(self, label: str, row_type: Optional[str] = None) -> Optional[MatrixRow]:
+        """Busca uma linha pelo rótulo (sem diferenciar maiúsculas/minúsculas)"""
+        found = self._by_label.get(label.strip().lower())
+        if found is None or (row_type and found.tipo != row_type):
+            return None
+        return found
+
+    def as_rows(self) -> List[Dict[str, Any]]:
+        """Cópia das linhas no formato do endpoint /cash-flow/previsto-realizado"""
+        return copy.deepcopy(self._rows)
+
+
+class CashFlowMatrixService:
+    """Construção e cache da matriz previsto x realizado"""
+
+    @staticmethod
+    def get_matrix(
+        db: Session,
+        tenant_id: str,
+        business_unit_id: Optional[str],
+        year: int,
+    ) -> CashFlowMatrix:
+        """
+        Retorna a matriz do (tenant, BU, ano). Reutiliza a instância já
+        calculada na mesma sessão e, entre requisições, a do cache de processo
+        enquanto a versão das fontes do tenant não mudar (e o TTL não vencer).
+        """
+        key = (str(tenant_id), str(business_unit_id) if business_unit_id else None, int(year))
+        session_cache = db.info.setdefault(_SESSION_INFO_KEY, {})
+        if key in session_cache:
+            return session_cache[key]
+
+        now = time.monotonic()
+        with _MATRIX_CACHE_LOCK:
+            version = CashFlowMatrixService._version(key[0])
+            cached = _MATRIX_CACHE.get(key)
+            if cached and cached[0] == version and cached[1] > now:
+                _MATRIX_CACHE.move_to_end(key)
+                session_cache[key] = cached[2]
+                return cached[2]
+
+        # Guardada com a versão lida antes da construção: uma escrita durante
+        # a construção já torna a entrada obsoleta
+        matrix = CashFlowMatrixService.build_matrix(db, *key)
+        if CASH_FLOW_MATRIX_CACHE_TTL_SECONDS > 0:
+            with _MATRIX_CACHE_LOCK:
+                _MATRIX_CACHE[key] = (version, now + CASH_FLOW_MATRIX_CACHE_TTL_SECONDS, matrix)
+                _MATRIX_CACHE.move_to_end(key)
+                while len(_MATRIX_CACHE) > _MATRIX_CACHE_MAX_ENTRIES:
+                    _MATRIX_CACHE.popitem(last=False)
+        session_cache[key] = matrix
+        return matrix
+
+    @staticmethod
+    def invalidate(db: Optional[Session] = None) -> None:
+        """Descarta as matrizes memorizadas (sessão informada e cache de processo)"""
+        if db is not None:
+            db.info.pop(_SESSION_INFO_KEY, None)
+        with _MATRIX_CACHE_LOCK:
+            _MATRIX_CACHE.clear()
+
+    @staticmethod
+    def _version(tenant_id: str) -> int:
+        return max(_TENANT_CHANGED_AT.get(tenant_id, _PRUNED_VERSION), _GLOBAL_CHANGED_AT)
+
+    @staticmethod
+    def mark_changed(tenant_id: Optional[str] = None) -> None:
+        """
+        Eleva a versão das fontes do tenant informado; sem tenant (registros
+        globais ou escrita em massa), de todos.
+        """
+        global _VERSION, _GLOBAL_CHANGED_AT, _PRUNED_VERSION
+        with _MATRIX_CACHE_LOCK:
+            _VERSION += 1
+            if tenant_id is None or tenant_id == _ALL:
+                _GLOBAL_CHANGED_AT = _VERSION
+                return
+            tenant_id = str(tenant_id)
+            _TENANT_CHANGED_AT[tenant_id] = _VERSION
+            _TENANT_CHANGED_AT.move_to_end(tenant_id)
+            while len(_TENANT_CHANGED_AT) > _MATRIX_CACHE_MAX_ENTRIES:
+                _, version = _TENANT_CHANGED_AT.popitem(last=False)
+                _PRUNED_VERSION = max(_PRUNED_VERSION, version)
+
+    @staticmethod
+    def build_matrix(
+        db: Session,
+        tenant_id: str,
+        business_unit_id: Optional[str],
+        target_year: int,
+    ) -> CashFlowMatrix:
+        """
+        Compara valores previstos (lançamentos previstos) e realizados (lançamentos diários)
+        agrupando por plano de contas (grupo → subgrupo → conta) por mês.
+        """
+        line_order, saldo_ano_anterior = load_cash_flow_settings(
+            db=db,
+            tenant_id=tenant_id,
+            business_unit_id=business_unit_id,
+            year=target_year,
+        )
+        forecast_values = load_forecast_values(
+            db=db,
+            tenant_id=tenant_id,
+            business_unit_id=business_unit_id,
+            year=target_year,
+        )
+
+        groups, subgroups, accounts, subgroup_by_group, account_by_subgroup = load_plan_structure(db, tenant_id)
+        group_map = {g.name.strip().lower(): str(g.id) for g in groups}
+        subgroup_map = {sg.name.strip().lower(): str(sg.id) for sg in subgroups}
+        account_map = {acc.name.strip().lower(): str(acc.id) for acc in accounts}
+
+        subtotal_labels = {
+            "receita líquida",
+            "lucro bruto",
+            "lucro antes dos investimentos",
+            "desembolso total",
+            "lucro operacional",
+            "lucro líquido de caixa mensal",
+            "lucro líquido acumulado (reservas)",
+            "saldo do ano anterior",
+        }
+
+        rows: List[Dict[str, Any]] = []
+        row_by_label: Dict[str, Dict[str, Any]] = {}
+        row_meta: List[Dict[str, Any]] = []
+        current_group_id: Optional[str] = None
+
+        def _make_row(name: str, level: int, row_type: str) -> Dict[str, Any]:
+            return {
+                "categoria": name,
+                "nivel": level,
+                "tipo": row_type,
+                "meses": empty_months(),
+            }
+
+        def _append_row(label: str, level: int, row_type: str, group_id=None, subgroup_id=None, account_id=None) -> None:
+            row = _make_row(label, level, row_type)
+            rows.append(row)
+            row_by_label[label.strip().lower()] = row
+            row_meta.append(
+                {
+                    "row": row,
+                    "type": row_type,
+                    "group_id": group_id,
+                    "subgroup_id": subgroup_id,
+                    "account_id": account_id,
+                    "label_key": label.strip().lower(),
+                }
+            )
+
+        # Montar ordem de linhas (preferir ordem salva no onboarding)
+        order_labels: List[str] = []
+        if line_order:
+            order_labels = [str(label) for label in line_order if str(label).strip()]
+        else:
+            for group in groups:
+                order_labels.append(group.name)
+                for subgroup in subgroup_by_group.get(str(group.id), []):
+                    order_labels.append(subgroup.name)
+                    for account in account_by_subgroup.get(str(subgroup.id), []):
+                        order_labels.append(account.name)
+            for subtotal in [
+                "Receita Líquida",
+                "Lucro Bruto",
+                "Lucro antes dos investimentos",
+                "Desembolso Total",
+                "LUCRO OPERACIONAL",
+                "Lucro Líquido de caixa mensal",
+                "Lucro líquido acumulado (Reservas)",
+                "Saldo do ano anterior",
+            ]:
+                if subtotal.strip().lower() not in {l.strip().lower() for l in order_labels}:
+                    order_labels.append(subtotal)
+
+        used_labels: set[str] = set()
+        for label in order_labels:
+            label = str(label).strip()
+            if not label:
+                continue
+            label_key = label.lower()
+
+            group_id = group_map.get(label_key)
+            subgroup_id = subgroup_map.get(label_key)
+            account_id = account_map.get(label_key)
+
+            if group_id:
+                row_type = "grupo"
+                level = 0
+                current_group_id = group_id
+            elif subgroup_id:
+                row_type = "subgrupo"
+                level = 1
+            elif account_id:
+                row_type = "conta"
+                level = 2
+            elif label_key in subtotal_labels:
+                row_type = "subtotal"
+                level = 0
+            else:
+                row_type = "subgrupo" if current_group_id else "subtotal"
+                level = 1 if current_group_id else 0
+
+            _append_row(label, level, row_type, group_id, subgroup_id, account_id)
+            used_labels.add(label_key)
+
+        # Adicionar itens do plano de contas ausentes na ordem
+        # Quando a ordem vem da planilha (line_order), não incluir itens fora dela
+        # para manter espelhamento exato da estrutura do cliente.
+        if not line_order:
+            for group in groups:
+                key = group.name.strip().lower()
+                if key not in used_labels:
+                    _append_row(group.name, 0, "grupo", group_id=str(group.id))
+                    used_labels.add(key)
+                for subgroup in subgroup_by_group.get(str(group.id), []):
+                    sub_key = subgroup.name.strip().lower()
+                    if sub_key not in used_labels:
+                        _append_row(subgroup.name, 1, "subgrupo", subgroup_id=str(subgroup.id))
+                        used_labels.add(sub_key)
+                    for account in account_by_subgroup.get(str(subgroup.id), []):
+                        acc_key = account.name.strip().lower()
+                        if acc_key not in used_labels:
+                            _append_row(account.name, 2, "conta", account_id=str(account.id))
+                            used_labels.add(acc_key)
+
+        start_dt = datetime(target_year, 1, 1)
+        end_dt = datetime(target_year, 12, 31, 23, 59, 59)
+
+        def _init_months_decimal() -> Dict[str, Decimal]:
+            return {label: Decimal("0") for label in MONTH_LABELS}
+
+        def _totals_by_level(model):
+            group_totals: Dict[str, Dict[str, Decimal]] = defaultdict(_init_months_decimal)
+            subgroup_totals: Dict[str, Dict[str, Decimal]] = defaultdict(_init_months_decimal)
+            account_totals: Dict[str, Dict[str, Decimal]] = defaultdict(_init_months_decimal)
+            for grupo_id, subgrupo_id, conta_id, month, amount in AggregationQueryService.totals_by_hierarchy_and_month(
+                db,
+                model,
+                tenant_id,
+                business_unit_id,
+                start_dt,
+                end_dt,
+                exclude_cancelled=True,
+            ):
+                month_label = MONTH_LABELS[month - 1]
+                if conta_id:
+                    account_totals[conta_id][month_label] += amount
+                if subgrupo_id:
+                    subgroup_totals[subgrupo_id][month_label] += amount
+                if grupo_id:
+                    group_totals[grupo_id][month_label] += amount
+            return group_totals, subgroup_totals, account_totals
+
+        # Previstos e realizados agregados no banco (grupo/subgrupo/conta x mês)
+        previsto_group_totals, previsto_subgroup_totals, previsto_account_totals = _totals_by_level(LancamentoPrevisto)
+        realized_group_totals, realized_subgroup_totals, realized_account_totals = _totals_by_level(LancamentoDiario)
+
+        for meta in row_meta:
+            row = meta["row"]
+            if meta["type"] == "grupo" and meta["group_id"]:
+                totals_prev = previsto_group_totals.get(meta["group_id"], _init_months_decimal())
+                totals_real = realized_group_totals.get(meta["group_id"], _init_months_decimal())
+            elif meta["type"] == "subgrupo" and meta["subgroup_id"]:
+                totals_prev = previsto_subgroup_totals.get(meta["subgroup_id"], _init_months_decimal())
+                totals_real = realized_subgroup_totals.get(meta["subgroup_id"], _init_months_decimal())
+            elif meta["type"] == "conta" and meta["account_id"]:
+                totals_prev = previsto_account_totals.get(meta["account_id"], _init_months_decimal())
+                totals_real = realized_account_totals.get(meta["account_id"], _init_months_decimal())
+            else:
+                continue
+            for label in MONTH_LABELS:
+                row["meses"][label]["previsto"] = float(totals_prev[label])
+                row["meses"][label]["realizado"] = float(totals_real[label])
+
+        def _get_row_by_name(name: str, row_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+            key = name.strip().lower()
+            row = row_by_label.get(key)
+            if row_type and row and row.get("tipo") != row_type:
+                return None
+            return row
+
+        def _sum_groups_by_predicate(group_totals, predicate) -> Dict[str, Decimal]:
+            totals = {label: Decimal("0") for label in MONTH_LABELS}
+            for group in groups:
+                if not predicate(group.name):
+                    continue
+                data = group_totals.get(str(group.id), _init_months_decimal())
+                for label in MONTH_LABELS:
+                    totals[label] += data[label]
+            return totals
+
+        def _sum_group_by_name(group_totals, name: str) -> Dict[str, Decimal]:
+            group = next((g for g in groups if g.name.strip().lower() == name.strip().lower()), None)
+            if not group:
+                return {label: Decimal("0") for label in MONTH_LABELS}
+            return group_totals.get(str(group.id), _init_months_decimal())
+
+        def _sum_subgroup_by_name(subgroup_totals, name: str) -> Dict[str, Decimal]:
+            subgroup = next((sg for sg in subgroups if sg.name.strip().lower() == name.strip().lower()), None)
+            if not subgroup:
+                return {label: Decimal("0") for label in MONTH_LABELS}
+            return subgroup_totals.get(str(subgroup.id), _init_months_decimal())
+
+        receita_totais_prev = _sum_groups_by_predicate(
+            previsto_group_totals,
+            lambda name: "receita" in name.lower() and "dedu" not in name.lower(),
+        )
+        deducoes_totais_prev = _sum_groups_by_predicate(previsto_group_totals, lambda name: "dedu" in name.lower())
+        custos_totais_prev = _sum_groups_by_predicate(previsto_group_totals, lambda name: "custo" in name.lower())
+        despesas_operacionais_totais_prev = _sum_group_by_name(previsto_group_totals, "Despesas Operacionais")
+        investimentos_totais_prev = _sum_groups_by_predicate(previsto_group_totals, lambda name: "investimento" in name.lower())
+
+        entradas_nao_op_prev = _sum_subgroup_by_name(previsto_subgroup_totals, "Entradas não Operacionais")
+        saidas_nao_op_prev = _sum_subgroup_by_name(previsto_subgroup_totals, "Saídas não Operacionais")
+
+        receita_totais_real = _sum_groups_by_predicate(
+            realized_group_totals,
+            lambda name: "receita" in name.lower() and "dedu" not in name.lower(),
+        )
+        deducoes_totais_real = _sum_groups_by_predicate(realized_group_totals, lambda name: "dedu" in name.lower())
+        custos_totais_real = _sum_groups_by_predicate(realized_group_totals, lambda name: "custo" in name.lower())
+        despesas_operacionais_totais_real = _sum_group_by_name(realized_group_totals, "Despesas Operacionais")
+        investimentos_totais_real = _sum_groups_by_predicate(realized_group_totals, lambda name: "investimento" in name.lower())
+
+        entradas_nao_op_real = _sum_subgroup_by_name(realized_subgroup_totals, "Entradas não Operacionais")
+        saidas_nao_op_real = _sum_subgroup_by_name(realized_subgroup_totals, "Saídas não Operacionais")
+
+        mov_group_row = _get_row_by_name("Movimentações Não Operacionais", "grupo")
+        if mov_group_row:
+            for label in MONTH_LABELS:
+                mov_group_row["meses"][label]["previsto"] = float(
+                    entradas_nao_op_prev[label] - saidas_nao_op_prev[label]
+                )
+                mov_group_row["meses"][label]["realizado"] = float(
+                    entradas_nao_op_real[label] - saidas_nao_op_real[label]
+                )
+
+        receita_liquida_prev = {label: Decimal("0") for label in MONTH_LABELS}
+        lucro_bruto_prev = {label: Decimal("0") for label in MONTH_LABELS}
+        lucro_antes_invest_prev = {label: Decimal("0") for label in MONTH_LABELS}
+        desembolso_total_prev = {label: Decimal("0") for label in MONTH_LABELS}
+        lucro_operacional_prev = {label: Decimal("0") for label in MONTH_LABELS}
+        lucro_liquido_prev = {label: Decimal("0") for label in MONTH_LABELS}
+
+        receita_liquida_real = {label: Decimal("0") for label in MONTH_LABELS}
+        lucro_bruto_real = {label: Decimal("0") for label in MONTH_LABELS}
+        lucro_antes_invest_real = {label: Decimal("0") for label in MONTH_LABELS}
+        desembolso_total_real = {label: Decimal("0") for label in MONTH_LABELS}
+        lucro_operacional_real = {label: Decimal("0") for label in MONTH_LABELS}
+        lucro_liquido_real = {label: Decimal("0") for label in MONTH_LABELS}
+
+        for label in MONTH_LABELS:
+            receita_total_prev = receita_totais_prev[label]
+            ded_prev = deducoes_totais_prev[label]
+            custo_prev = custos_totais_prev[label]
+            desp_prev = despesas_operacionais_totais_prev[label]
+            inv_prev = investimentos_totais_prev[label]
+
+            receita_liquida_prev[label] = receita_total_prev - ded_prev
+            lucro_bruto_prev[label] = receita_liquida_prev[label] - custo_prev
+            lucro_antes_invest_prev[label] = lucro_bruto_prev[label] - desp_prev
+            desembolso_total_prev[label] = ded_prev + custo_prev + desp_prev + inv_prev
+            lucro_operacional_prev[label] = receita_total_prev - desembolso_total_prev[label]
+
+            mov_prev = entradas_nao_op_prev[label] - saidas_nao_op_prev[label]
+            lucro_liquido_prev[label] = lucro_operacional_prev[label] + mov_prev
+
+            receita_total_real = receita_totais_real[label]
+            ded_real = deducoes_totais_real[label]
+            custo_real = custos_totais_real[label]
+            desp_real = despesas_operacionais_totais_real[label]
+            inv_real = investimentos_totais_real[label]
+
+            receita_liquida_real[label] = receita_total_real - ded_real
+            lucro_bruto_real[label] = receita_liquida_real[label] - custo_real
+            lucro_antes_invest_real[label] = lucro_bruto_real[label] - desp_real
+            desembolso_total_real[label] = ded_real + custo_real + desp_real + inv_real
+            lucro_operacional_real[label] = receita_total_real - desembolso_total_real[label]
+
+            mov_real = entradas_nao_op_real[label] - saidas_nao_op_real[label]
+            lucro_liquido_real[label] = lucro_operacional_real[label] + mov_real
+
+        def _apply_values(label: str, previsto_values: Dict[str, Decimal], realizado_values: Dict[str, Decimal]) -> None:
+            row = _get_row_by_name(label)
+            if not row:
+                return
+            for month in MONTH_LABELS:
+                row["meses"][month]["previsto"] = float(previsto_values[month])
+                row["meses"][month]["realizado"] = float(realizado_values[month])
+
+        _apply_values("Receita Líquida", receita_liquida_prev, receita_liquida_real)
+        _apply_values("Lucro Bruto", lucro_bruto_prev, lucro_bruto_real)
+        _apply_values("Lucro antes dos investimentos", lucro_antes_invest_prev, lucro_antes_invest_real)
+        _apply_values("Desembolso Total", desembolso_total_prev, desembolso_total_real)
+        _apply_values("LUCRO OPERACIONAL", lucro_operacional_prev, lucro_operacional_real)
+        _apply_values("Lucro Líquido de caixa mensal", lucro_liquido_prev, lucro_liquido_real)
+
+        if forecast_values:
+            for row in rows:
+                label_key = str(row.get("categoria", "")).strip().lower()
+                if label_key not in forecast_values:
+                    continue
+                for month in MONTH_LABELS:
+                    row["meses"][month]["previsto"] = float(forecast_values[label_key].get(month, 0.0))
+
+        saldo_row = _get_row_by_name("Saldo do ano anterior")
+        if not saldo_row and saldo_ano_anterior:
+            _append_row("Saldo do ano anterior", 0, "subtotal")
+            saldo_row = _get_row_by_name("Saldo do ano anterior")
+
+        if saldo_row:
+            if (saldo_row.get("categoria") or "").strip().lower() in forecast_values:
+                for month in MONTH_LABELS:
+                    saldo_row["meses"][month]["previsto"] = float(
+                        forecast_values[saldo_row["categoria"].strip().lower()].get(month, 0.0)
+                    )
+            else:
+                for month in MONTH_LABELS:
+                    saldo_row["meses"][month]["previsto"] = 0.0
+                    saldo_row["meses"][month]["realizado"] = 0.0
+                saldo_row["meses"][MONTH_LABELS[0]]["previsto"] = float(saldo_ano_anterior)
+                saldo_row["meses"][MONTH_LABELS[0]]["realizado"] = float(saldo_ano_anterior)
+
+        lucro_acumulado_prev = {label: Decimal("0") for label in MONTH_LABELS}
+        lucro_acumulado_real = {label: Decimal("0") for label in MONTH_LABELS}
+        acc_prev = Decimal(str(saldo_ano_anterior))
+        acc_real = Decimal(str(saldo_ano_anterior))
+        lucro_liquido_row = _get_row_by_name("Lucro Líquido de caixa mensal")
+        for label in MONTH_LABELS:
+            prev_value = lucro_liquido_prev[label]
+            if lucro_liquido_row:
+                prev_value = Decimal(str(lucro_liquido_row["meses"][label]["previsto"]))
+            acc_prev += prev_value
+            acc_real += Decimal(str(lucro_liquido_real[label]))
+            lucro_acumulado_prev[label] = acc_prev
+            lucro_acumulado_real[label] = acc_real
+
+        _apply_values("Lucro líquido acumulado (Reservas)", lucro_acumulado_prev, lucro_acumulado_real)
+
+        total_realizado_por_mes: Dict[str, float] = {
+            label: sum(
+                row["meses"][label]["realizado"]
+                for row in rows
+                if row.get("nivel") == 0 and row.get("tipo") == "grupo"
+            )
+            for label in MONTH_LABELS
+        }
+
+        for row in rows:
+            for month_label in MONTH_LABELS:
+                bucket = row["meses"][month_label]
+                previsto = bucket["previsto"]
+                realizado = bucket["realizado"]
+                if previsto > 0:
+                    bucket["ah"] = (realizado / previsto) * 100
+                elif realizado > 0:
+                    bucket["ah"] = 100.0
+                else:
+                    bucket["ah"] = 0.0
+
+                total_mes = total_realizado_por_mes.get(month_label, 0.0)
+                if total_mes > 0:
+                    bucket["av"] = (realizado / total_mes) * 100
+                else:
+                    bucket["av"] = 0.0
+
+                bucket["previsto"] = to_cent(bucket["previsto"])
+                bucket["realizado"] = to_cent(bucket["realizado"])
+                bucket["ah"] = to_cent(bucket["ah"])
+                bucket["av"] = to_cent(bucket["av"])
+
+        return CashFlowMatrix(target_year, rows)
+
+
+def _mark_dirty(session: Session, tenants: Set[str]) -> None:
+    if not tenants:
+        return
+    session.info.setdefault(_DIRTY_INFO_KEY, set()).update(tenants)
+    for tenant_id in tenants:
+        CashFlowMatrixService.mark_changed(tenant_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _matrix_sources_flushed(session: Session, flush_context) -> None:
+    tenants: Set[str] = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _SOURCE_MODELS):
+            tenant_id = getattr(instance, "tenant_id", None)
+            tenants.add(str(tenant_id) if tenant_id else _ALL)
+    _mark_dirty(session, tenants)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _matrix_sources_bulk_written(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in _SOURCE_TABLES:
+        _mark_dirty(orm_execute_state.session, {_ALL})
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _matrix_transaction_finished(session: Session) -> None:
+    # Nova versão ao fim da transação: matrizes montadas entre o flush e o
+    # commit (que ainda viam os dados antigos) deixam de valer
+    for tenant_id in session.info.pop(_DIRTY_INFO_KEY, set()):
+        CashFlowMatrixService.mark_changed(tenant_id)
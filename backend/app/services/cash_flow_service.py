@@ -15,50 +15,15 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
 from app.models.lancamento_diario import LancamentoDiario, TransactionType
-from app.models.chart_of_accounts import (
-    ChartAccountGroup,
-    ChartAccountSubgroup,
-    ChartAccount
+from app.services.lancamento_rollup_service import LancamentoRollupService
+from app.services.chart_hierarchy_cache import (
+    AccountNode,
+    ChartHierarchyCache,
+    GroupNode,
+    SubgroupNode,
 )
 
 
-# ============================================================================
-# ORDEM EXPLÍCITA BASEADA NA PLANILHA
-# ============================================================================
-
-# Ordem dos grupos conforme aparece na planilha (não alfabética)
-GROUP_ORDER = [
-    "Receita",
-    "Receita Operacional",
-    "Receita Financeira",
-    "Deduções",
-    "Custos",
-    "Custos com Serviços Prestados",
-    "Custos com Mão de Obra",
-    "Despesas Operacionais",
-    "Despesas Financeiras",
-    "Despesas com Pessoal",
-    "Despesas Administrativas",
-    "Despesas Comerciais",
-    "Investimentos",
-    "Movimentações Não Operacionais",
-]
-
-# Mapeamento de nomes de grupos para ordem (case-insensitive)
-GROUP_ORDER_MAP = {name.lower(): idx for idx, name in enumerate(GROUP_ORDER)}
-
-
-def _get_group_order_index(group_name: str) -> int:
-    """Retorna o índice de ordem do grupo (maior = mais abaixo na planilha)"""
-    group_lower = group_name.lower()
-    # Buscar correspondência exata ou parcial
-    for ordered_name, idx in GROUP_ORDER_MAP.items():
-        if ordered_name in group_lower or group_lower in ordered_name:
-            return idx
-    # Se não encontrar, colocar no final
-    return len(GROUP_ORDER) + 1000
-
-
 class CashFlowService:
     """Serviço para gerar fluxo de caixa mensal replicando a planilha"""
 
@@ -106,51 +71,28 @@ class CashFlowService:
             CashFlowService._load_complete_plan_structure(db, tenant_id)
         )
         
-        # 2. Buscar lançamentos do mês (com relacionamentos)
-        from sqlalchemy.orm import joinedload
-        
-        query = (
-            db.query(LancamentoDiario)
-            .options(
-                joinedload(LancamentoDiario.grupo),
-                joinedload(LancamentoDiario.subgrupo),
-                joinedload(LancamentoDiario.conta)
-            )
-            .filter(
-                LancamentoDiario.tenant_id == tenant_id,
-                LancamentoDiario.is_active.is_(True),
-                LancamentoDiario.data_movimentacao >= start_dt,
-                LancamentoDiario.data_movimentacao <= end_dt,
-            )
+        # 2. Buscar totais do mês por conta/dia no rollup diário
+        LancamentoRollupService.ensure_built(db, tenant_id, business_unit_id)
+        account_day_totals = LancamentoRollupService.totals_by_account_and_day(
+            db,
+            tenant_id,
+            business_unit_id,
+            start_dt.date(),
+            end_dt.date(),
         )
-        if business_unit_id:
-            query = query.filter(LancamentoDiario.business_unit_id == business_unit_id)
-        
-        transactions = query.all()
         
         # 3. Agregar valores por conta/subgrupo/grupo por dia
         # Estrutura: {grupo_id: {subgrupo_id: {conta_id: {day: valor}}}}
         values_by_hierarchy = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(Decimal))))
         
-        for tx in transactions:
-            if not tx.data_movimentacao or tx.valor is None:
-                continue
-            
-            day = tx.data_movimentacao.day
-            valor = tx.valor if isinstance(tx.valor, Decimal) else Decimal(str(tx.valor))
-            
-            grupo_id = str(tx.grupo_id) if tx.grupo_id else None
-            subgrupo_id = str(tx.subgrupo_id) if tx.subgrupo_id else None
-            conta_id = str(tx.conta_id) if tx.conta_id else None
-            
-            if grupo_id and subgrupo_id and conta_id:
-                values_by_hierarchy[grupo_id][subgrupo_id][conta_id][day] += valor
+        for grupo_id, subgrupo_id, conta_id, dia, valor in account_day_totals:
+            values_by_hierarchy[str(grupo_id)][str(subgrupo_id)][str(conta_id)][dia.day] += valor
         
         # 4. Construir estrutura hierárquica ordenada
         rows: List[Dict[str, any]] = []
         
-        # Ordenar grupos pela ordem da planilha
-        sorted_groups = sorted(groups, key=lambda g: _get_group_order_index(g.name))
+        # Ordenar grupos pela ordem da planilha (posição gravada no grupo)
+        sorted_groups = sorted(groups, key=lambda g: g.sort_ordinal)
         
         for group in sorted_groups:
             group_id = str(group.id)
@@ -396,51 +338,23 @@ class CashFlowService:
         db: Session,
         tenant_id: str
     ) -> Tuple[
-        List[ChartAccountGroup],
-        List[ChartAccountSubgroup],
-        List[ChartAccount],
-        Dict[str, List[ChartAccountSubgroup]],
-        Dict[str, List[ChartAccount]],
+        List[GroupNode],
+        List[SubgroupNode],
+        List[AccountNode],
+        Dict[str, List[SubgroupNode]],
+        Dict[str, List[AccountNode]],
     ]:
         """
         Carrega estrutura COMPLETA do plano de contas (incluindo contas sem lançamentos).
         """
-        def _load(model):
-            # Buscar itens do tenant primeiro
-            tenant_items = (
-                db.query(model)
-                .filter(
-                    model.tenant_id == tenant_id,
-                    model.is_active.is_(True),
-                )
-                .all()
-            )
-            if tenant_items:
-                return tenant_items
-            # Se não encontrar, buscar globais
-            return (
-                db.query(model)
-                .filter(
-                    model.tenant_id.is_(None),
-                    model.is_active.is_(True),
-                )
-                .all()
-            )
-        
-        groups = _load(ChartAccountGroup)
-        subgroups = _load(ChartAccountSubgroup)
-        accounts = _load(ChartAccount)
-        
-        # Organizar hierarquia
-        subgroup_by_group: Dict[str, List[ChartAccountSubgroup]] = defaultdict(list)
-        for sub in subgroups:
-            subgroup_by_group[str(sub.group_id)].append(sub)
-        
-        account_by_subgroup: Dict[str, List[ChartAccount]] = defaultdict(list)
-        for account in accounts:
-            account_by_subgroup[str(account.subgroup_id)].append(account)
-        
-        return groups, subgroups, accounts, subgroup_by_group, account_by_subgroup
+        tree = ChartHierarchyCache.plan(db, tenant_id)
+        return (
+            list(tree.groups),
+            list(tree.subgroups),
+            list(tree.accounts),
+            {group_id: list(items) for group_id, items in tree.subgroups_by_group.items()},
+            {subgroup_id: list(items) for subgroup_id, items in tree.accounts_by_subgroup.items()},
+        )
     
     @staticmethod
     def _create_row(
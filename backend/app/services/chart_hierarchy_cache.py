@@ -0,0 +1,344 @@
+"""
+Cache em processo da hierarquia do plano de contas (grupo → subgrupo → conta)
+
+O plano de contas é lido em quase toda tela (formulários de lançamento,
+fluxo de caixa, matriz previsto x realizado) e muda raramente. Em vez de
+cada consumidor repetir três consultas com joinedload e montar a árvore por
+conta própria, a árvore do tenant é carregada uma vez (três SELECTs só das
+colunas usadas), montada em O(n) e guardada como estrutura imutável com
+índices id → nó e pai → filhos.
+
+Invalidação: qualquer escrita em grupos, subgrupos ou contas (flush do ORM
+ou UPDATE/DELETE em massa via sessão) remove a entrada do tenant afetado (ou
+todas, para registros compartilhados e escritas em massa) e registra a
+geração da invalidação. Uma carga iniciada antes dela não é guardada. O
+registro por tenant tem o mesmo limite LRU do cache; o descarte eleva um piso
+que vale para os tenants sem registro, de modo que só cargas em andamento
+anteriores ao descarte deixam de ser guardadas. Como o cache é por processo,
+o TTL limita a defasagem entre workers/instâncias.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, fields
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import event, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.chart_of_accounts import (
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+    account_transaction_type,
+)
+
+CHART_HIERARCHY_CACHE_TTL_SECONDS = float(os.getenv("CHART_HIERARCHY_CACHE_TTL_SECONDS", "300"))
+CHART_HIERARCHY_CACHE_MAX_SIZE = int(os.getenv("CHART_HIERARCHY_CACHE_MAX_SIZE", "256"))
+# Recargas por conta desconhecida (visible_with): no máximo uma por tenant nesse intervalo
+CHART_HIERARCHY_MISS_RELOAD_SECONDS = float(os.getenv("CHART_HIERARCHY_MISS_RELOAD_SECONDS", "10"))
+
+_CHART_MODELS = (ChartAccountGroup, ChartAccountSubgroup, ChartAccount)
+_CHART_TABLES = frozenset(model.__table__.name for model in _CHART_MODELS)
+_SESSION_INFO_KEY = "chart_hierarchy_dirty"
+# Marca de "todos os tenants" (registros globais ou escrita em massa)
+_ALL = "*"
+
+_HIERARCHY_CACHE: "OrderedDict[str, Tuple[float, TenantChartPlan]]" = OrderedDict()
+# Geração (contador de invalidações) da última invalidação de cada tenant
+_TENANT_INVALIDATED_AT: "OrderedDict[str, int]" = OrderedDict()
+_GENERATION = 0
+_GLOBAL_INVALIDATED_AT = 0
+# Maior geração descartada de _TENANT_INVALIDATED_AT (piso para tenants sem registro)
+_PRUNED_GENERATION = 0
+# Instante da última recarga por conta desconhecida de cada tenant
+_MISS_RELOADED_AT: "OrderedDict[str, float]" = OrderedDict()
+_HIERARCHY_CACHE_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class GroupNode:
+    id: str
+    code: str
+    name: str
+    description: Optional[str]
+    tenant_id: Optional[str]
+    is_active: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    # Classificação gravada no grupo (ver classify_group_name)
+    is_operational: bool
+    sort_ordinal: int
+    type_class: Optional[str]
+
+
+@dataclass(frozen=True)
+class SubgroupNode:
+    id: str
+    code: str
+    name: str
+    description: Optional[str]
+    group_id: str
+    tenant_id: Optional[str]
+    is_active: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+@dataclass(frozen=True)
+class AccountNode:
+    id: str
+    code: str
+    name: str
+    description: Optional[str]
+    subgroup_id: str
+    account_type: str
+    tenant_id: Optional[str]
+    is_active: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+def _creation_order(node) -> Tuple[datetime, str]:
+    return (node.created_at or datetime.min, node.id)
+
+
+@dataclass(frozen=True)
+class ChartHierarchy:
+    """
+    Árvore imutável do plano de contas. Nós em ordem de criação
+    (created_at, id); filhos de cada pai na mesma ordem.
+    """
+
+    groups: Tuple[GroupNode, ...]
+    subgroups: Tuple[SubgroupNode, ...]
+    accounts: Tuple[AccountNode, ...]
+    group_by_id: Mapping[str, GroupNode]
+    subgroup_by_id: Mapping[str, SubgroupNode]
+    account_by_id: Mapping[str, AccountNode]
+    subgroups_by_group: Mapping[str, Tuple[SubgroupNode, ...]]
+    accounts_by_subgroup: Mapping[str, Tuple[AccountNode, ...]]
+    # conta → tipo de transação (RECEITA/CUSTO/DESPESA) dos seus lançamentos
+    account_types: Mapping[str, str]
+
+    @staticmethod
+    def build(
+        groups: Iterable[GroupNode],
+        subgroups: Iterable[SubgroupNode],
+        accounts: Iterable[AccountNode],
+    ) -> "ChartHierarchy":
+        groups = tuple(sorted(groups, key=_creation_order))
+        subgroups = tuple(sorted(subgroups, key=_creation_order))
+        accounts = tuple(sorted(accounts, key=_creation_order))
+
+        subgroups_by_group: Dict[str, List[SubgroupNode]] = defaultdict(list)
+        for subgroup in subgroups:
+            subgroups_by_group[subgroup.group_id].append(subgroup)
+        accounts_by_subgroup: Dict[str, List[AccountNode]] = defaultdict(list)
+        for account in accounts:
+            accounts_by_subgroup[account.subgroup_id].append(account)
+
+        group_by_id = {node.id: node for node in groups}
+        subgroup_by_id = {node.id: node for node in subgroups}
+        account_types: Dict[str, str] = {}
+        for account in accounts:
+            subgroup = subgroup_by_id.get(account.subgroup_id)
+            group = group_by_id.get(subgroup.group_id) if subgroup else None
+            if group:
+                account_types[account.id] = account_transaction_type(group.is_operational, group.type_class, subgroup.name)
+
+        return ChartHierarchy(
+            groups=groups,
+            subgroups=subgroups,
+            accounts=accounts,
+            group_by_id=MappingProxyType(group_by_id),
+            subgroup_by_id=MappingProxyType(subgroup_by_id),
+            account_by_id=MappingProxyType({node.id: node for node in accounts}),
+            subgroups_by_group=MappingProxyType({key: tuple(value) for key, value in subgroups_by_group.items()}),
+            accounts_by_subgroup=MappingProxyType({key: tuple(value) for key, value in accounts_by_subgroup.items()}),
+            account_types=MappingProxyType(account_types),
+        )
+
+    def group_of_account(self, account_id: str) -> Optional[GroupNode]:
+        account = self.account_by_id.get(str(account_id))
+        subgroup = self.subgroup_by_id.get(account.subgroup_id) if account else None
+        return self.group_by_id.get(subgroup.group_id) if subgroup else None
+
+
+@dataclass(frozen=True)
+class TenantChartPlan:
+    """
+    Visões do plano de um tenant:
+
+    - ``visible``: registros ativos do tenant e os globais (tenant_id nulo);
+    - ``plan``: por nível, os do tenant ou, se o tenant não tiver nenhum, os
+      globais (regra usada pelo fluxo de caixa e pela matriz).
+    """
+
+    visible: ChartHierarchy
+    plan: ChartHierarchy
+
+
+def _load_nodes(db: Session, model, node_type, tenant_id: str) -> List[Any]:
+    columns = [getattr(model, field.name) for field in fields(node_type)]
+    rows = db.execute(
+        select(*columns).where(
+            model.is_active.is_(True),
+            or_(model.tenant_id == tenant_id, model.tenant_id.is_(None)),
+        )
+    ).all()
+    nodes = []
+    for row in rows:
+        values = dict(row._mapping)
+        for key in ("id", "group_id", "subgroup_id", "tenant_id"):
+            if values.get(key) is not None:
+                values[key] = str(values[key])
+        nodes.append(node_type(**values))
+    return nodes
+
+
+def _tenant_or_global(nodes: List[Any], tenant_id: str) -> List[Any]:
+    own = [node for node in nodes if node.tenant_id == tenant_id]
+    return own or [node for node in nodes if node.tenant_id is None]
+
+
+def _build_plan(db: Session, tenant_id: str) -> TenantChartPlan:
+    groups = _load_nodes(db, ChartAccountGroup, GroupNode, tenant_id)
+    subgroups = _load_nodes(db, ChartAccountSubgroup, SubgroupNode, tenant_id)
+    accounts = _load_nodes(db, ChartAccount, AccountNode, tenant_id)
+    return TenantChartPlan(
+        visible=ChartHierarchy.build(groups, subgroups, accounts),
+        plan=ChartHierarchy.build(
+            _tenant_or_global(groups, tenant_id),
+            _tenant_or_global(subgroups, tenant_id),
+            _tenant_or_global(accounts, tenant_id),
+        ),
+    )
+
+
+class ChartHierarchyCache:
+    """Hierarquia do plano de contas por tenant, versionada e com TTL"""
+
+    @staticmethod
+    def _invalidated_at(tenant_id: str) -> int:
+        return max(_TENANT_INVALIDATED_AT.get(tenant_id, _PRUNED_GENERATION), _GLOBAL_INVALIDATED_AT)
+
+    @staticmethod
+    def get(db: Session, tenant_id: str) -> TenantChartPlan:
+        tenant_id = str(tenant_id)
+        now = time.monotonic()
+        with _HIERARCHY_CACHE_LOCK:
+            entry = _HIERARCHY_CACHE.get(tenant_id)
+            if entry and entry[0] > now:
+                _HIERARCHY_CACHE.move_to_end(tenant_id)
+                return entry[1]
+            started_at = _GENERATION
+
+        plan = _build_plan(db, tenant_id)
+        if CHART_HIERARCHY_CACHE_TTL_SECONDS <= 0 or CHART_HIERARCHY_CACHE_MAX_SIZE <= 0:
+            return plan
+        with _HIERARCHY_CACHE_LOCK:
+            # Escrita concorrente durante a carga: não guardar a árvore antiga
+            if ChartHierarchyCache._invalidated_at(tenant_id) <= started_at:
+                _HIERARCHY_CACHE[tenant_id] = (now + CHART_HIERARCHY_CACHE_TTL_SECONDS, plan)
+                _HIERARCHY_CACHE.move_to_end(tenant_id)
+                while len(_HIERARCHY_CACHE) > CHART_HIERARCHY_CACHE_MAX_SIZE:
+                    _HIERARCHY_CACHE.popitem(last=False)
+        return plan
+
+    @staticmethod
+    def visible(db: Session, tenant_id: str) -> ChartHierarchy:
+        return ChartHierarchyCache.get(db, tenant_id).visible
+
+    @staticmethod
+    def plan(db: Session, tenant_id: str) -> ChartHierarchy:
+        return ChartHierarchyCache.get(db, tenant_id).plan
+
+    @staticmethod
+    def visible_with(db: Session, tenant_id: str, account_ids: Iterable[str]) -> ChartHierarchy:
+        """
+        Hierarquia visível que contenha as contas informadas. Se alguma não
+        estiver na árvore em cache (ex.: criada por outro processo dentro do
+        TTL), recarrega o tenant uma vez antes de responder.
+
+        A recarga acontece no máximo uma vez por tenant a cada
+        CHART_HIERARCHY_MISS_RELOAD_SECONDS: um cliente que insiste em um id
+        inexistente recebe a árvore em cache (e a conta como não encontrada)
+        em vez de forçar três consultas por chamada.
+        """
+        hierarchy = ChartHierarchyCache.visible(db, tenant_id)
+        if all(str(account_id) in hierarchy.account_by_id for account_id in account_ids):
+            return hierarchy
+        tenant_id = str(tenant_id)
+        now = time.monotonic()
+        with _HIERARCHY_CACHE_LOCK:
+            last_reload = _MISS_RELOADED_AT.get(tenant_id)
+            if last_reload is not None and now - last_reload < CHART_HIERARCHY_MISS_RELOAD_SECONDS:
+                return hierarchy
+            _MISS_RELOADED_AT[tenant_id] = now
+            _MISS_RELOADED_AT.move_to_end(tenant_id)
+            while len(_MISS_RELOADED_AT) > max(CHART_HIERARCHY_CACHE_MAX_SIZE, 0):
+                _MISS_RELOADED_AT.popitem(last=False)
+        ChartHierarchyCache.invalidate(tenant_id)
+        return ChartHierarchyCache.visible(db, tenant_id)
+
+    @staticmethod
+    def invalidate(tenant_id: Optional[str] = None) -> None:
+        """
+        Invalida o tenant informado; sem tenant (registros globais ou escrita
+        em massa), todos.
+        """
+        global _GENERATION, _GLOBAL_INVALIDATED_AT, _PRUNED_GENERATION
+        with _HIERARCHY_CACHE_LOCK:
+            _GENERATION += 1
+            if tenant_id is None or tenant_id == _ALL:
+                _GLOBAL_INVALIDATED_AT = _GENERATION
+                _HIERARCHY_CACHE.clear()
+                return
+            tenant_id = str(tenant_id)
+            _TENANT_INVALIDATED_AT[tenant_id] = _GENERATION
+            _TENANT_INVALIDATED_AT.move_to_end(tenant_id)
+            while len(_TENANT_INVALIDATED_AT) > max(CHART_HIERARCHY_CACHE_MAX_SIZE, 0):
+                _, generation = _TENANT_INVALIDATED_AT.popitem(last=False)
+                _PRUNED_GENERATION = max(_PRUNED_GENERATION, generation)
+            _HIERARCHY_CACHE.pop(tenant_id, None)
+
+
+def _mark_dirty(session: Session, tenants: Set[str]) -> None:
+    if not tenants:
+        return
+    session.info.setdefault(_SESSION_INFO_KEY, set()).update(tenants)
+    for tenant_id in tenants:
+        ChartHierarchyCache.invalidate(tenant_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _chart_rows_flushed(session: Session, flush_context) -> None:
+    tenants: Set[str] = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _CHART_MODELS):
+            tenant_id = getattr(instance, "tenant_id", None)
+            tenants.add(str(tenant_id) if tenant_id else _ALL)
+    _mark_dirty(session, tenants)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _chart_rows_bulk_written(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in _CHART_TABLES:
+        _mark_dirty(orm_execute_state.session, {_ALL})
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _chart_transaction_finished(session: Session) -> None:
+    # Nova versão ao fim da transação: leituras feitas entre o flush e o
+    # commit (que ainda viam os dados antigos) deixam de valer
+    for tenant_id in session.info.pop(_SESSION_INFO_KEY, set()):
+        ChartHierarchyCache.invalidate(tenant_id)
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.auth import User, UserRole, UserStatus
 from app.services.security import SecurityService
+from app.services.user_cache import AuthenticatedUserCache
 
 # Configuração do bearer token
 security = HTTPBearer()
@@ -27,14 +28,18 @@ def get_current_user(
                 detail="Token inválido"
             )
         
-        # Buscar usuário no banco
-        user = db.query(User).filter(User.id == user_id).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Usuário não encontrado"
-            )
+        # Buscar usuário (cache curto em processo; banco em caso de miss)
+        user = AuthenticatedUserCache.get(db, user_id)
+        if user is None:
+            user = db.query(User).filter(User.id == user_id).first()
+            
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Usuário não encontrado"
+                )
+            # Snapshot antes de aplicar o contexto do token
+            AuthenticatedUserCache.put(user)
         
         # Aplicar contexto do token em memória (não persistir no DB aqui)
         # - business_unit_id: permite que o token de "select-business-unit" tenha efeito imediato
@@ -15,6 +15,8 @@ from sqlalchemy import func, and_, cast, Integer, not_
 
 from app.models.lancamento_diario import LancamentoDiario, TransactionType
 from app.models.lancamento_previsto import LancamentoPrevisto
+from app.services.aggregation_query_service import AggregationQueryService
+from app.services.lancamento_rollup_service import LancamentoRollupService
 
 
 class FinancialAggregationService:
@@ -56,64 +58,29 @@ class FinancialAggregationService:
         start_dt = datetime(year, 1, 1)
         end_dt = datetime(year, 12, 31, 23, 59, 59)
 
-        # Query para buscar lançamentos do ano
-        from app.models.chart_of_accounts import ChartAccountGroup
-        
-        query = (
-            db.query(LancamentoDiario)
-            .join(ChartAccountGroup, LancamentoDiario.grupo_id == ChartAccountGroup.id)
-            .filter(
-                LancamentoDiario.tenant_id == tenant_id,
-                LancamentoDiario.is_active.is_(True),
-                LancamentoDiario.data_movimentacao >= start_dt,
-                LancamentoDiario.data_movimentacao <= end_dt,
-            )
+        # Realizados vêm do rollup diário (já exclui Deduções e
+        # Movimentações Não Operacionais e ignora lançamentos sem tipo)
+        LancamentoRollupService.ensure_built(db, tenant_id, business_unit_id)
+        realized_totals = LancamentoRollupService.totals_by_day_and_type(
+            db,
+            tenant_id,
+            business_unit_id,
+            start_dt.date(),
+            end_dt.date(),
+            operational_only=True,
         )
-        if business_unit_id:
-            query = query.filter(LancamentoDiario.business_unit_id == business_unit_id)
-        
-        # APLICAR FILTRO DIRETAMENTE NA QUERY para excluir Deduções e Movimentações Não Operacionais
-        query = query.filter(
-            ~ChartAccountGroup.name.ilike('%dedução%'),
-            ~ChartAccountGroup.name.ilike('%deducao%'),
-            ~ChartAccountGroup.name.ilike('%deduções%'),
-            ~ChartAccountGroup.name.ilike('%deducoes%'),
-            ~ChartAccountGroup.name.ilike('%movimentações não operacionais%'),
-            ~ChartAccountGroup.name.ilike('%movimentacoes nao operacionais%'),
-            ~ChartAccountGroup.name.ilike('%movimentações nao operacionais%'),
-            ~ChartAccountGroup.name.ilike('%movimentacoes não operacionais%'),
-        )
-
-        # Buscar todos os lançamentos
-        transactions = query.all()
 
-        previstos: List[LancamentoPrevisto] = []
+        previsto_totals: List[Tuple[int, str, Decimal, int]] = []
         if include_previstos:
-            previstos_query = (
-                db.query(LancamentoPrevisto)
-                .join(ChartAccountGroup, LancamentoPrevisto.grupo_id == ChartAccountGroup.id)
-                .filter(
-                    LancamentoPrevisto.tenant_id == tenant_id,
-                    LancamentoPrevisto.is_active.is_(True),
-                    LancamentoPrevisto.data_prevista >= start_dt,
-                    LancamentoPrevisto.data_prevista <= end_dt,
-                )
+            previsto_totals = AggregationQueryService.totals_by_month_and_type(
+                db,
+                LancamentoPrevisto,
+                tenant_id,
+                business_unit_id,
+                start_dt,
+                end_dt,
+                operational_only=True,
             )
-            if business_unit_id:
-                previstos_query = previstos_query.filter(
-                    LancamentoPrevisto.business_unit_id == business_unit_id
-                )
-            previstos_query = previstos_query.filter(
-                ~ChartAccountGroup.name.ilike('%dedução%'),
-                ~ChartAccountGroup.name.ilike('%deducao%'),
-                ~ChartAccountGroup.name.ilike('%deduções%'),
-                ~ChartAccountGroup.name.ilike('%deducoes%'),
-                ~ChartAccountGroup.name.ilike('%movimentações não operacionais%'),
-                ~ChartAccountGroup.name.ilike('%movimentacoes nao operacionais%'),
-                ~ChartAccountGroup.name.ilike('%movimentações nao operacionais%'),
-                ~ChartAccountGroup.name.ilike('%movimentacoes não operacionais%'),
-            )
-            previstos = previstos_query.all()
 
         # Inicializar estrutura mensal (12 meses)
         monthly_data: Dict[int, Dict[str, Decimal]] = {
@@ -126,13 +93,6 @@ class FinancialAggregationService:
             for month in range(1, 13)
         }
 
-        def _normalize_type(tx_type: Optional[any]) -> Optional[str]:
-            if tx_type is None:
-                return None
-            if hasattr(tx_type, "value"):
-                return tx_type.value
-            return str(tx_type)
-
         def _apply_value(month: int, valor: Decimal, tx_type_value: Optional[str]) -> None:
             if tx_type_value == "RECEITA":
                 monthly_data[month]["revenue"] += valor
@@ -143,22 +103,11 @@ class FinancialAggregationService:
 
         # Agregar transações por mês
         # FILTRO JÁ APLICADO NA QUERY - não precisa verificar novamente
-        for tx in transactions:
-            tx_type_value = _normalize_type(tx.transaction_type)
-            if tx_type_value is None:
-                continue
-            month = tx.data_movimentacao.month
-            valor = tx.valor if tx.valor is not None else Decimal("0")
-            _apply_value(month, valor, tx_type_value)
+        for dia, tx_type_value, valor in realized_totals:
+            _apply_value(dia.month, valor, tx_type_value)
 
-        if include_previstos:
-            for tx in previstos:
-                tx_type_value = _normalize_type(tx.transaction_type)
-                if tx_type_value is None:
-                    continue
-                month = tx.data_prevista.month
-                valor = tx.valor if tx.valor is not None else Decimal("0")
-                _apply_value(month, valor, tx_type_value)
+        for month, tx_type_value, valor, _count in previsto_totals:
+            _apply_value(month, valor, tx_type_value)
 
         # ============================================================
         # CÁLCULO DO SALDO MENSAL
@@ -256,34 +205,15 @@ class FinancialAggregationService:
             )
         )
 
-        # Agregação SQL direta por tipo e mês
-        # Usar func.extract para compatibilidade (PostgreSQL/SQLite)
-        try:
-            # Tentar PostgreSQL (date_part)
-            sql_aggregation = (
-                db.query(
-                    cast(func.date_part("month", LancamentoDiario.data_movimentacao), Integer).label("month"),
-                    LancamentoDiario.transaction_type,
-                    func.sum(LancamentoDiario.valor).label("total"),
-                    func.count(LancamentoDiario.id).label("count"),
-                )
-                .filter(
-                    LancamentoDiario.tenant_id == tenant_id,
-                    LancamentoDiario.business_unit_id == business_unit_id,
-                    LancamentoDiario.is_active.is_(True),
-                    LancamentoDiario.data_movimentacao >= start_dt,
-                    LancamentoDiario.data_movimentacao <= end_dt,
-                    LancamentoDiario.transaction_type.isnot(None),
-                )
-                .group_by(
-                    cast(func.date_part("month", LancamentoDiario.data_movimentacao), Integer),
-                    LancamentoDiario.transaction_type,
-                )
-                .all()
-            )
-        except Exception:
-            # Fallback: usar agregação em memória apenas
-            sql_aggregation = []
+        # Agregação SQL direta por tipo e mês (mesma camada usada pelos endpoints)
+        sql_aggregation = AggregationQueryService.totals_by_month_and_type(
+            db,
+            LancamentoDiario,
+            tenant_id,
+            business_unit_id,
+            start_dt,
+            end_dt,
+        )
 
         # Estrutura para armazenar dados SQL
         sql_monthly: Dict[int, Dict[str, Dict[str, any]]] = {
@@ -295,11 +225,7 @@ class FinancialAggregationService:
             for month in range(1, 13)
         }
 
-        for row in sql_aggregation:
-            month = int(row.month)
-            tx_type = row.transaction_type.value if row.transaction_type else None
-            total = Decimal(str(row.total)) if row.total else Decimal("0")
-            count = row.count or 0
+        for month, tx_type, total, count in sql_aggregation:
 
             if tx_type == "RECEITA":
                 sql_monthly[month]["revenue"]["total"] = total
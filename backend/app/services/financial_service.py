@@ -10,6 +10,7 @@ from app.models.financial_transactions import (
     TransactionCategory
 )
 from app.models.chart_of_accounts import ChartAccount, ChartAccountSubgroup, ChartAccountGroup
+from app.services.reference_allocator import ReferenceAllocator
 
 class FinancialService:
     """Serviço para gerenciar transações financeiras"""
@@ -60,27 +61,8 @@ class FinancialService:
     @staticmethod
     def _generate_reference(db: Session, tenant_id: str, business_unit_id: str) -> str:
         """Gera uma referência única para a transação"""
-        # Formato: TX-YYYYMMDD-XXXX (onde XXXX é um número sequencial)
-        today = datetime.now().strftime("%Y%m%d")
-        
-        # Buscar última transação do dia
-        last_transaction = db.query(FinancialTransaction).filter(
-            FinancialTransaction.tenant_id == tenant_id,
-            FinancialTransaction.business_unit_id == business_unit_id,
-            func.date(FinancialTransaction.created_at) == func.date(func.now())
-        ).order_by(FinancialTransaction.created_at.desc()).first()
-        
-        if last_transaction and last_transaction.reference:
-            # Extrair número sequencial
-            try:
-                last_number = int(last_transaction.reference.split('-')[-1])
-                new_number = last_number + 1
-            except (ValueError, IndexError):
-                new_number = 1
-        else:
-            new_number = 1
-        
-        return f"TX-{today}-{new_number:04d}"
+        # Formato: TX-YYYYMMDD-XXXX (contador por tenant/BU/dia, ver ReferenceAllocator)
+        return ReferenceAllocator.allocate(db, tenant_id, business_unit_id)[0]
     
     @staticmethod
     def get_transactions(
@@ -0,0 +1,159 @@
+"""
+Extração vetorizada das abas "Fluxo de caixa-<ano>" / "Previsão Fluxo de caixa-<ano>"
+
+As abas têm uma linha de cabeçalho com os meses (JANEIRO...DEZEMBRO), cada
+mês ocupando duas colunas (Previsto, Realizado), e uma coluna de rótulos das
+linhas. Em vez de percorrer célula a célula com ``df.iloc`` e converter cada
+valor em Python, o cabeçalho é localizado uma vez, os blocos de colunas
+previstas/realizadas são recortados como arrays numpy e os valores em
+formato brasileiro ("R$ 1.500,00") são convertidos com operações de string
+do pandas sobre o bloco inteiro.
+
+O resultado (``ForecastRows``) guarda os rótulos e duas matrizes ``(linhas, 12)``.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+MONTH_LABELS = [
+    "JANEIRO",
+    "FEVEREIRO",
+    "MARÇO",
+    "ABRIL",
+    "MAIO",
+    "JUNHO",
+    "JULHO",
+    "AGOSTO",
+    "SETEMBRO",
+    "OUTUBRO",
+    "NOVEMBRO",
+    "DEZEMBRO",
+]
+
+_HEADER_SCAN_ROWS = 10
+_IGNORED_LABELS = ["previsão de fluxo de caixa", "ano do fluxo:"]
+# Tipos inferidos em que o acessor ``.str`` do pandas é aceito
+_TEXT_DTYPES = {"string", "empty", "bytes", "mixed", "mixed-integer"}
+
+
+@dataclass(frozen=True)
+class ForecastRows:
+    """Linhas da aba: rótulo e valores mensais (previsto/realizado) em matrizes ``(n, 12)``"""
+
+    labels: List[str]
+    previsto: np.ndarray
+    realizado: np.ndarray
+
+    def previsto_by_label(self) -> Dict[str, np.ndarray]:
+        """Rótulo → 12 valores previstos (rótulo repetido: vale a última linha)"""
+        return {label: self.previsto[idx] for idx, label in enumerate(self.labels)}
+
+    def first_nonzero(self, label: str) -> float:
+        """
+        Primeiro valor não nulo (previsto antes de realizado, mês a mês) da
+        última linha com o rótulo informado (comparação sem caixa); 0.0 se não houver.
+        """
+        value = 0.0
+        target = label.strip().lower()
+        for idx, row_label in enumerate(self.labels):
+            if row_label.lower() != target:
+                continue
+            # Intercala previsto/realizado: JAN prev, JAN real, FEV prev...
+            pairs = np.column_stack([self.previsto[idx], self.realizado[idx]]).ravel()
+            nonzero = np.flatnonzero(pairs)
+            value = float(pairs[nonzero[0]]) if nonzero.size else value
+        return value
+
+
+def _stripped_text(series: pd.Series) -> pd.Series:
+    """Textos sem espaços nas bordas; células que não são texto viram NaN"""
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in _TEXT_DTYPES:
+        return series.str.strip()
+    return pd.Series(np.nan, index=series.index, dtype=object)
+
+
+def parse_brl(values) -> np.ndarray:
+    """
+    Converte valores da planilha em float: números como estão, textos em
+    formato brasileiro ("R$ 1.500,00" → 1500.0); vazios, datas e textos
+    inválidos viram 0.0.
+    """
+    series = pd.Series(np.asarray(values, dtype=object).ravel(), dtype=object)
+    text = _stripped_text(series)
+    is_text = text.notna()
+
+    numbers = pd.to_numeric(series.mask(is_text), errors="coerce")
+    if is_text.any():
+        cleaned = (
+            text[is_text]
+            .str.replace("R$", "", regex=False)
+            .str.replace(" ", "", regex=False)
+            .str.replace(".", "", regex=False)
+            .str.replace(",", ".", regex=False)
+        )
+        numbers[is_text] = pd.to_numeric(cleaned, errors="coerce")
+    return numbers.fillna(0.0).to_numpy(dtype=float).reshape(np.shape(values))
+
+
+def find_month_header_row(df: pd.DataFrame) -> Optional[int]:
+    """Primeira linha (entre as 10 iniciais) que contém JANEIRO e FEVEREIRO"""
+    head = df.iloc[:_HEADER_SCAN_ROWS]
+    if head.empty:
+        return None
+    upper = np.char.upper(np.char.strip(head.to_numpy(dtype=str)))
+    matches = (upper == "JANEIRO").any(axis=1) & (upper == "FEVEREIRO").any(axis=1)
+    hits = np.flatnonzero(matches)
+    return int(hits[0]) if hits.size else None
+
+
+def detect_label_column(df: pd.DataFrame, start_row: int) -> int:
+    """Coluna com mais textos não vazios a partir de ``start_row`` (empate: a primeira)"""
+    block = df.iloc[start_row:]
+    if block.shape[1] == 0:
+        return 1
+    counts = [
+        int(_stripped_text(block.iloc[:, position]).fillna("").ne("").sum())
+        for position in range(block.shape[1])
+    ]
+    return int(df.columns[int(np.argmax(counts))])
+
+
+def extract_forecast_rows(df: pd.DataFrame, year: int) -> Optional[ForecastRows]:
+    """Linhas de dados da aba; ``None`` se o cabeçalho de meses não for encontrado"""
+    header_row_idx = find_month_header_row(df)
+    if header_row_idx is None:
+        return None
+
+    header = [str(value).strip().upper() for value in df.iloc[header_row_idx].tolist()]
+    month_columns: Dict[str, int] = {}
+    for position, value in enumerate(header):
+        if value in MONTH_LABELS:
+            month_columns[value] = position
+
+    data_start = header_row_idx + 2
+    label_col = detect_label_column(df, data_start)
+
+    raw_labels = df.iloc[data_start:, label_col]
+    text = raw_labels[raw_labels.notna()].astype(str).str.strip()
+    lower = text.str.lower()
+    is_year = text.str.isdigit() & (pd.to_numeric(text.where(text.str.isdigit()), errors="coerce") == year)
+    keep = text.ne("") & ~lower.isin(_IGNORED_LABELS) & ~is_year
+    text = text[keep]
+    positions = data_start + np.flatnonzero(raw_labels.notna().to_numpy())[keep.to_numpy()]
+
+    n_cols = df.shape[1]
+    previsto = np.zeros((len(positions), len(MONTH_LABELS)))
+    realizado = np.zeros((len(positions), len(MONTH_LABELS)))
+    months = [(m, month_columns[label]) for m, label in enumerate(MONTH_LABELS) if label in month_columns]
+    if months and len(positions):
+        block = df.to_numpy(dtype=object)[positions]
+        month_idx = [m for m, _ in months]
+        previsto[:, month_idx] = parse_brl(block[:, [col for _, col in months]])
+        realized = [(m, col + 1) for m, col in months if col + 1 < n_cols]
+        if realized:
+            realizado[:, [m for m, _ in realized]] = parse_brl(block[:, [col for _, col in realized]])
+
+    return ForecastRows(labels=text.tolist(), previsto=previsto, realizado=realizado)
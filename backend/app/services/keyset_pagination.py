@@ -0,0 +1,86 @@
+"""
+Paginação por chave (keyset/seek) para listagens de lançamentos
+
+Em vez de ``OFFSET (page-1)*per_page`` (que lê e descarta todas as linhas
+anteriores a cada página), a próxima página é buscada a partir da última
+linha entregue: ``(data, id) < (data_cursor, id_cursor)`` em ordem
+decrescente. O ``id`` desempata lançamentos com a mesma data, então nenhuma
+linha é pulada nem repetida entre páginas.
+
+O cursor devolvido ao cliente é opaco (JSON em base64 url-safe) e deve ser
+repassado como está.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginação malformado"""
+
+
+@dataclass(frozen=True)
+class KeysetCursor:
+    """Posição da última linha entregue: valor de ordenação e id"""
+
+    value: datetime
+    id: str
+
+
+def encode_cursor(value: datetime, row_id: Any) -> str:
+    payload = json.dumps({"v": value.isoformat(), "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> KeysetCursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return KeysetCursor(value=datetime.fromisoformat(data["v"]), id=str(data["id"]))
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursorError("Cursor inválido.") from exc
+
+
+def keyset_filter(sort_column, id_column, cursor: KeysetCursor):
+    """Linhas depois do cursor na ordem ``(sort_column, id_column)`` decrescente"""
+    return or_(
+        sort_column < cursor.value,
+        and_(sort_column == cursor.value, id_column < cursor.id),
+    )
+
+
+def fetch_page(
+    query: Query,
+    sort_column,
+    id_column,
+    limit: int,
+    cursor: Optional[KeysetCursor] = None,
+    offset: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Aplica a ordenação ``(sort_column, id_column)`` decrescente e busca uma
+    página de até ``limit`` linhas a partir do cursor (ou do ``offset``,
+    mantido para a paginação por número de página).
+
+    Retorna as linhas e o cursor da próxima página (``None`` na última).
+    Busca ``limit + 1`` linhas para saber se há próxima página sem ``COUNT``.
+    """
+    if cursor is not None:
+        query = query.filter(keyset_filter(sort_column, id_column, cursor))
+    query = query.order_by(sort_column.desc(), id_column.desc())
+    if offset:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
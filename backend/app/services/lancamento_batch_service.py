@@ -0,0 +1,365 @@
+"""
+Criação, atualização e exclusão em lote de lançamentos diários e previstos
+
+Uma chamada com milhares de itens paga autenticação, carga do plano de
+contas e transação uma única vez:
+
+- a hierarquia (conta → subgrupo → grupo e tipo) vem do cache por tenant e
+  cada item é validado em memória;
+- as inserções usam INSERT multi-linha (``LANCAMENTO_BATCH_INSERT_SIZE``
+  linhas por comando) e o rollup diário recebe um único upsert;
+- tudo é gravado em uma transação, com um resultado por item (na ordem do
+  envio): itens inválidos são reportados e não impedem os demais.
+
+Idempotência: itens com ``import_ref`` já gravado (no mesmo tenant/BU) ou
+repetido no próprio envio voltam como ``duplicate`` com o id existente; a
+restrição única de ``import_ref`` cobre envios concorrentes
+(ON CONFLICT DO NOTHING).
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Sequence, Set
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import lancamento_diario, lancamento_previsto
+from app.services.chart_hierarchy_cache import ChartHierarchyCache
+from app.services.lancamento_diario_service import LancamentoDiarioService
+from app.services.lancamento_rollup_service import LancamentoRollupService
+
+# Itens aceitos por chamada
+LANCAMENTO_BATCH_MAX_ITEMS = int(os.getenv("LANCAMENTO_BATCH_MAX_ITEMS", "5000"))
+# Linhas por INSERT multi-linha
+LANCAMENTO_BATCH_INSERT_SIZE = int(os.getenv("LANCAMENTO_BATCH_INSERT_SIZE", "500"))
+
+_IMPORT_REF_MAX_LENGTH = 128
+
+
+@dataclass(frozen=True)
+class BatchTarget:
+    """Diferenças entre lançamentos diários e previstos nas operações em lote"""
+
+    model: Any
+    type_enum: Any
+    status_enum: Any
+    date_fields: Sequence[str]  # o primeiro é obrigatório na criação
+    allow_shared: bool  # aceita contas do plano global
+    rollup: bool  # mantém lancamentos_diarios_rollup
+
+
+DIARIO_BATCH = BatchTarget(
+    model=lancamento_diario.LancamentoDiario,
+    type_enum=lancamento_diario.TransactionType,
+    status_enum=lancamento_diario.TransactionStatus,
+    date_fields=("data_movimentacao", "liquidacao"),
+    allow_shared=False,
+    rollup=True,
+)
+
+PREVISTO_BATCH = BatchTarget(
+    model=lancamento_previsto.LancamentoPrevisto,
+    type_enum=lancamento_previsto.TransactionType,
+    status_enum=lancamento_previsto.TransactionStatus,
+    date_fields=("data_prevista",),
+    allow_shared=True,
+    rollup=False,
+)
+
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _parse_dates(target: BatchTarget, item: Any) -> Dict[str, datetime]:
+    """Datas ISO informadas no item; ``ValueError`` com o campo inválido"""
+    parsed = {}
+    for field in target.date_fields:
+        value = getattr(item, field, None)
+        if not value:
+            continue
+        try:
+            parsed[field] = _parse_datetime(value)
+        except ValueError as exc:
+            raise ValueError(f"Data inválida em {field}: {value}") from exc
+    return parsed
+
+
+def _summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"success": True, "total": len(results), "counts": counts, "results": results}
+
+
+class LancamentoBatchService:
+    """Operações em lote sobre lançamentos (uma transação por chamada)"""
+
+    @staticmethod
+    def _check_size(count: int) -> None:
+        if count > LANCAMENTO_BATCH_MAX_ITEMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Lote com {count} itens excede o máximo de {LANCAMENTO_BATCH_MAX_ITEMS}.",
+            )
+
+    @staticmethod
+    def _insert_rows(db: Session, table, rows: List[Dict[str, Any]]) -> Set[str]:
+        """INSERT multi-linha ignorando conflitos de import_ref; retorna os ids gravados"""
+        inserted: Set[str] = set()
+        dialect = db.get_bind().dialect.name
+        for offset in range(0, len(rows), LANCAMENTO_BATCH_INSERT_SIZE):
+            chunk = rows[offset:offset + LANCAMENTO_BATCH_INSERT_SIZE]
+            if dialect in ("postgresql", "sqlite"):
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                stmt = insert(table).values(chunk).on_conflict_do_nothing().returning(table.c.id)
+                inserted.update(db.execute(stmt).scalars())
+            else:
+                db.execute(table.insert().values(chunk))
+                inserted.update(row["id"] for row in chunk)
+        return inserted
+
+    @staticmethod
+    def _ids_by_import_ref(db: Session, target: BatchTarget, tenant_id: str, business_unit_id: str, refs: Iterable[str]) -> Dict[str, str]:
+        refs = set(refs)
+        if not refs:
+            return {}
+        model = target.model
+        rows = db.query(model.import_ref, model.id).filter(
+            model.tenant_id == tenant_id,
+            model.business_unit_id == business_unit_id,
+            model.import_ref.in_(refs),
+        )
+        return {ref: str(row_id) for ref, row_id in rows}
+
+    @staticmethod
+    def create(
+        db: Session,
+        target: BatchTarget,
+        items: Sequence[Any],
+        tenant_id: str,
+        business_unit_id: str,
+        user_id: str,
+    ) -> Dict[str, Any]:
+        """
+        Cria os itens válidos em uma transação. Status por item: ``created``,
+        ``duplicate`` (import_ref já gravado) ou ``error`` (com ``message``).
+        """
+        LancamentoBatchService._check_size(len(items))
+        tenant_id, business_unit_id = str(tenant_id), str(business_unit_id)
+        model = target.model
+        hierarchy = ChartHierarchyCache.visible_with(db, tenant_id, {item.conta_id for item in items})
+        existing = LancamentoBatchService._ids_by_import_ref(
+            db, target, tenant_id, business_unit_id, (item.import_ref for item in items if item.import_ref)
+        )
+
+        now = datetime.utcnow()
+        results: List[Dict[str, Any]] = []
+        rows: List[Dict[str, Any]] = []
+        row_results: List[Dict[str, Any]] = []
+        ref_ids: Dict[str, str] = dict(existing)
+        for index, item in enumerate(items):
+            result: Dict[str, Any] = {"index": index, "import_ref": item.import_ref}
+            results.append(result)
+            ref = item.import_ref
+            if ref and ref in ref_ids:
+                result.update(status="duplicate")
+                continue
+            if ref and len(ref) > _IMPORT_REF_MAX_LENGTH:
+                result.update(status="error", message=f"import_ref excede {_IMPORT_REF_MAX_LENGTH} caracteres")
+                continue
+
+            is_valid, message = LancamentoDiarioService.check_plano_contas(
+                hierarchy, item.conta_id, item.subgrupo_id, item.grupo_id, tenant_id, target.allow_shared
+            )
+            if not is_valid:
+                result.update(status="error", message=message)
+                continue
+            try:
+                dates = _parse_dates(target, item)
+            except ValueError as e:
+                result.update(status="error", message=str(e))
+                continue
+            if target.date_fields[0] not in dates:
+                result.update(status="error", message=f"{target.date_fields[0]} é obrigatório")
+                continue
+
+            transaction_type = hierarchy.account_types.get(str(item.conta_id), "DESPESA")
+            row = {
+                "id": str(uuid4()),
+                **{field: dates.get(field) for field in target.date_fields},
+                "valor": item.valor,
+                "observacoes": item.observacoes,
+                "import_ref": ref,
+                "conta_id": item.conta_id,
+                "subgrupo_id": item.subgrupo_id,
+                "grupo_id": item.grupo_id,
+                "transaction_type": target.type_enum(transaction_type),
+                "status": target.status_enum.PENDENTE,
+                "tenant_id": tenant_id,
+                "business_unit_id": business_unit_id,
+                "created_by": user_id,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            rows.append(row)
+            row_results.append(result)
+            if ref:
+                ref_ids[ref] = row["id"]
+
+        inserted = LancamentoBatchService._insert_rows(db, model.__table__, rows)
+        # Perdeu a corrida para outro envio com o mesmo import_ref
+        lost_refs = [row["import_ref"] for row in rows if row["id"] not in inserted and row["import_ref"]]
+        ref_ids.update(LancamentoBatchService._ids_by_import_ref(db, target, tenant_id, business_unit_id, lost_refs))
+        for row, result in zip(rows, row_results):
+            if row["id"] in inserted:
+                result.update(status="created", id=row["id"])
+            else:
+                result.update(status="duplicate")
+        for result in results:
+            if result["status"] == "duplicate":
+                result["id"] = ref_ids.get(result["import_ref"])
+
+        if target.rollup:
+            LancamentoRollupService.apply_changes(
+                db,
+                [(None, LancamentoRollupService.snapshot(SimpleNamespace(**row))) for row in rows if row["id"] in inserted],
+            )
+        db.commit()
+        return _summary(results)
+
+    @staticmethod
+    def _load_active(db: Session, target: BatchTarget, ids: Iterable[str], tenant_id: str, business_unit_id: str) -> Dict[str, Any]:
+        model = target.model
+        objects = db.query(model).filter(
+            model.id.in_(set(ids)),
+            model.tenant_id == tenant_id,
+            model.business_unit_id == business_unit_id,
+            model.is_active.is_(True),
+        )
+        return {str(obj.id): obj for obj in objects}
+
+    @staticmethod
+    def update(
+        db: Session,
+        target: BatchTarget,
+        items: Sequence[Any],
+        tenant_id: str,
+        business_unit_id: str,
+    ) -> Dict[str, Any]:
+        """
+        Atualiza os itens encontrados com as mesmas regras da atualização
+        individual. Status por item: ``updated``, ``not_found`` ou ``error``.
+        """
+        LancamentoBatchService._check_size(len(items))
+        tenant_id, business_unit_id = str(tenant_id), str(business_unit_id)
+        objects = LancamentoBatchService._load_active(db, target, (item.id for item in items), tenant_id, business_unit_id)
+        hierarchy = ChartHierarchyCache.visible_with(
+            db,
+            tenant_id,
+            {item.conta_id or objects[item.id].conta_id for item in items if item.id in objects},
+        )
+
+        now = datetime.utcnow()
+        results: List[Dict[str, Any]] = []
+        rollup_changes = []
+        for index, item in enumerate(items):
+            result: Dict[str, Any] = {"index": index, "id": item.id}
+            results.append(result)
+            obj = objects.get(item.id)
+            if obj is None:
+                result.update(status="not_found")
+                continue
+
+            try:
+                dates = _parse_dates(target, item)
+            except ValueError as e:
+                result.update(status="error", message=str(e))
+                continue
+            plano_changed = any([item.conta_id, item.subgrupo_id, item.grupo_id])
+            conta_id = item.conta_id or obj.conta_id
+            subgrupo_id = item.subgrupo_id or obj.subgrupo_id
+            grupo_id = item.grupo_id or obj.grupo_id
+            if plano_changed:
+                is_valid, message = LancamentoDiarioService.check_plano_contas(
+                    hierarchy, conta_id, subgrupo_id, grupo_id, tenant_id, target.allow_shared
+                )
+                if not is_valid:
+                    result.update(status="error", message=message)
+                    continue
+
+            before = LancamentoRollupService.snapshot(obj) if target.rollup else None
+            for field, value in dates.items():
+                setattr(obj, field, value)
+            if item.valor is not None:
+                obj.valor = item.valor
+            if item.observacoes is not None:
+                obj.observacoes = item.observacoes
+            if item.status:
+                obj.status = item.status
+            if plano_changed:
+                obj.conta_id, obj.subgrupo_id, obj.grupo_id = conta_id, subgrupo_id, grupo_id
+                transaction_type = hierarchy.account_types.get(str(conta_id))
+                if transaction_type:
+                    obj.transaction_type = target.type_enum(transaction_type)
+            obj.updated_at = now
+            if target.rollup:
+                rollup_changes.append((before, LancamentoRollupService.snapshot(obj)))
+            result.update(status="updated")
+
+        db.flush()
+        if rollup_changes:
+            LancamentoRollupService.apply_changes(db, rollup_changes)
+        db.commit()
+        return _summary(results)
+
+    @staticmethod
+    def delete(
+        db: Session,
+        target: BatchTarget,
+        ids: Sequence[str],
+        tenant_id: str,
+        business_unit_id: str,
+    ) -> Dict[str, Any]:
+        """
+        Exclusão lógica (is_active = false) com um único UPDATE.
+        Status por item: ``deleted`` ou ``not_found``.
+        """
+        LancamentoBatchService._check_size(len(ids))
+        tenant_id, business_unit_id = str(tenant_id), str(business_unit_id)
+        model = target.model
+        objects = LancamentoBatchService._load_active(db, target, ids, tenant_id, business_unit_id)
+
+        results: List[Dict[str, Any]] = []
+        deleted: List[str] = []  # ordem do envio
+        seen: Set[str] = set()
+        for index, row_id in enumerate(ids):
+            if row_id in objects and row_id not in seen:
+                seen.add(row_id)
+                deleted.append(row_id)
+                results.append({"index": index, "id": row_id, "status": "deleted"})
+            else:
+                results.append({"index": index, "id": row_id, "status": "not_found"})
+
+        if deleted:
+            if target.rollup:
+                LancamentoRollupService.apply_changes(
+                    db, [(LancamentoRollupService.snapshot(objects[row_id]), None) for row_id in deleted]
+                )
+            db.execute(
+                update(model)
+                .where(model.id.in_(deleted))
+                .values(is_active=False, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        return _summary(results)
@@ -9,7 +9,6 @@ from sqlalchemy.orm import Session, joinedload
 #     LancamentoDiarioCreate,
 #     LancamentoDiarioUpdate
 # )
-from app.models.chart_of_accounts import ChartAccount, ChartAccountSubgroup, ChartAccountGroup
 from app.models.lancamento_diario import (
     LancamentoDiario,
     LancamentoDiarioCreate,
@@ -17,75 +16,68 @@ from app.models.lancamento_diario import (
     TransactionStatus,
     TransactionType,
 )
+from app.services.chart_hierarchy_cache import ChartHierarchy, ChartHierarchyCache
+from app.services.keyset_pagination import KeysetCursor, fetch_page
+from app.services.lancamento_rollup_service import LancamentoRollupService
+from app.services.transaction_type_resolver import TransactionTypeResolver
 
 class LancamentoDiarioService:
     """Serviço para gerenciar lançamentos diários"""
     
     @staticmethod
-    def determine_transaction_type(grupo_nome: str) -> TransactionType:
-        """Determina o tipo de transação baseado no nome do grupo"""
-        grupo_lower = grupo_nome.lower()
-        
-        if any(keyword in grupo_lower for keyword in ['receita', 'venda', 'renda']):
-            return TransactionType.RECEITA
-        elif any(keyword in grupo_lower for keyword in ['despesa', 'custo', 'gasto']):
-            return TransactionType.DESPESA
-        elif any(keyword in grupo_lower for keyword in ['ativo', 'bem', 'imobilizado']):
-            return TransactionType.ATIVO
-        elif any(keyword in grupo_lower for keyword in ['passivo', 'dívida', 'obrigação']):
-            return TransactionType.PASSIVO
-        elif any(keyword in grupo_lower for keyword in ['patrimônio', 'capital', 'lucro']):
-            return TransactionType.PATRIMONIO_LIQUIDO
-        else:
-            # Default baseado no valor
-            return TransactionType.DESPESA
-    
+    def check_plano_contas(
+        hierarchy: ChartHierarchy,
+        conta_id: str,
+        subgrupo_id: str,
+        grupo_id: str,
+        tenant_id: str,
+        allow_shared: bool = False,
+    ) -> Tuple[bool, str]:
+        """
+        Valida conta → subgrupo → grupo contra a hierarquia já carregada
+        (sem consultas). Com ``allow_shared``, aceita também registros globais.
+        """
+        tenant_id = str(tenant_id)
+
+        def _owned(node) -> bool:
+            return node is not None and (node.tenant_id == tenant_id or (allow_shared and node.tenant_id is None))
+
+        conta = hierarchy.account_by_id.get(str(conta_id))
+        if not _owned(conta):
+            return False, "Conta não encontrada"
+
+        subgrupo = hierarchy.subgroup_by_id.get(str(subgrupo_id))
+        if not _owned(subgrupo):
+            return False, "Subgrupo não encontrado"
+
+        grupo = hierarchy.group_by_id.get(str(grupo_id))
+        if not _owned(grupo):
+            return False, "Grupo não encontrado"
+
+        # Validar hierarquia
+        if conta.subgroup_id != subgrupo.id:
+            return False, "Conta não pertence ao subgrupo especificado"
+
+        if subgrupo.group_id != grupo.id:
+            return False, "Subgrupo não pertence ao grupo especificado"
+
+        return True, "OK"
+
     @staticmethod
     def validate_plano_contas_consistency(
         db: Session, 
         conta_id: str, 
         subgrupo_id: str, 
         grupo_id: str,
-        tenant_id: str
+        tenant_id: str,
+        allow_shared: bool = False,
     ) -> Tuple[bool, str]:
-        """Valida se conta, subgrupo e grupo estão consistentes"""
+        """Valida se conta, subgrupo e grupo estão consistentes (hierarquia do tenant em cache)"""
         try:
-            # Buscar conta
-            conta = db.query(ChartAccount).filter(
-                ChartAccount.id == conta_id,
-                ChartAccount.tenant_id == tenant_id
-            ).first()
-            
-            if not conta:
-                return False, "Conta não encontrada"
-            
-            # Buscar subgrupo
-            subgrupo = db.query(ChartAccountSubgroup).filter(
-                ChartAccountSubgroup.id == subgrupo_id,
-                ChartAccountSubgroup.tenant_id == tenant_id
-            ).first()
-            
-            if not subgrupo:
-                return False, "Subgrupo não encontrado"
-            
-            # Buscar grupo
-            grupo = db.query(ChartAccountGroup).filter(
-                ChartAccountGroup.id == grupo_id,
-                ChartAccountGroup.tenant_id == tenant_id
-            ).first()
-            
-            if not grupo:
-                return False, "Grupo não encontrado"
-            
-            # Validar hierarquia
-            if conta.subgroup_id != subgrupo_id:
-                return False, "Conta não pertence ao subgrupo especificado"
-            
-            if subgrupo.group_id != grupo_id:
-                return False, "Subgrupo não pertence ao grupo especificado"
-            
-            return True, "OK"
-            
+            hierarchy = ChartHierarchyCache.visible_with(db, tenant_id, [conta_id])
+            return LancamentoDiarioService.check_plano_contas(
+                hierarchy, conta_id, subgrupo_id, grupo_id, tenant_id, allow_shared
+            )
         except Exception as e:
             return False, f"Erro na validação: {str(e)}"
     
@@ -108,12 +100,10 @@ class LancamentoDiarioService:
             if not is_valid:
                 return {"success": False, "message": message}
             
-            # Buscar informações do grupo para determinar tipo de transação
-            grupo = db.query(ChartAccountGroup).filter(
-                ChartAccountGroup.id == lancamento_data.grupo_id
-            ).first()
-            
-            transaction_type = LancamentoDiarioService.determine_transaction_type(grupo.name)
+            # Tipo de transação resolvido pela conta (plano de contas em cache)
+            transaction_type = TransactionTypeResolver.resolve(
+                db, tenant_id, lancamento_data.conta_id, TransactionType, default=TransactionType.DESPESA
+            )
             
             # Converter datas
             data_movimentacao = datetime.fromisoformat(lancamento_data.data_movimentacao.replace('Z', '+00:00'))
@@ -139,6 +129,7 @@ class LancamentoDiarioService:
             
             db.add(lancamento)
             db.flush()
+            LancamentoRollupService.register(db, lancamento)
             
             return {
                 "success": True, 
@@ -163,9 +154,17 @@ class LancamentoDiarioService:
         status: Optional[str] = None,
         cost_center_id: Optional[str] = None,
         page: int = 1,
-        per_page: int = 50
+        per_page: int = 50,
+        cursor: Optional[KeysetCursor] = None,
+        include_total: bool = True,
     ) -> Dict:
-        """Busca lançamentos diários com filtros"""
+        """
+        Busca lançamentos diários com filtros, ordenados por (data_movimentacao, id) decrescente.
+
+        Com ``cursor`` a página é buscada por chave a partir do cursor (``page``
+        é ignorado); sem ele, por número de página. ``include_total=False``
+        dispensa o ``COUNT`` (total e total_pages voltam ``None``).
+        """
         try:
             from sqlalchemy.orm import joinedload
             from app.models.lancamento_diario import LancamentoDiario as LD
@@ -212,13 +211,14 @@ class LancamentoDiarioService:
             # if cost_center_id:
             #     query = query.filter(LD.cost_center_id == cost_center_id)
             
-            total = query.count()
-            offset = (page - 1) * per_page
-            lancamentos = (
-                query.order_by(LD.data_movimentacao.desc(), LD.created_at.desc())
-                .offset(offset)
-                .limit(per_page)
-                .all()
+            total = query.count() if include_total else None
+            lancamentos, next_cursor = fetch_page(
+                query,
+                LD.data_movimentacao,
+                LD.id,
+                per_page,
+                cursor=cursor,
+                offset=0 if cursor else (page - 1) * per_page,
             )
             
             # Converter para response
@@ -258,7 +258,8 @@ class LancamentoDiarioService:
                 "total": total,
                 "page": page,
                 "per_page": per_page,
-                "total_pages": (total + per_page - 1) // per_page
+                "total_pages": (total + per_page - 1) // per_page if total is not None else None,
+                "next_cursor": next_cursor,
             }
             
         except Exception as e:
@@ -268,23 +269,16 @@ class LancamentoDiarioService:
     def get_plano_contas_hierarchy(db: Session, tenant_id: str) -> Dict:
         """Busca hierarquia completa do plano de contas para o formulário"""
         try:
-            # Buscar grupos
-            grupos = db.query(ChartAccountGroup).filter(
-                ChartAccountGroup.tenant_id == tenant_id,
-                ChartAccountGroup.is_active == True
-            ).order_by(ChartAccountGroup.code).all()
-            
-            # Buscar subgrupos
-            subgrupos = db.query(ChartAccountSubgroup).filter(
-                ChartAccountSubgroup.tenant_id == tenant_id,
-                ChartAccountSubgroup.is_active == True
-            ).order_by(ChartAccountSubgroup.code).all()
-            
-            # Buscar contas
-            contas = db.query(ChartAccount).filter(
-                ChartAccount.tenant_id == tenant_id,
-                ChartAccount.is_active == True
-            ).order_by(ChartAccount.code).all()
+            # Apenas registros do próprio tenant, ordenados por código
+            tree = ChartHierarchyCache.visible(db, tenant_id)
+            tenant_id = str(tenant_id)
+
+            def _own(nodes):
+                return sorted((node for node in nodes if node.tenant_id == tenant_id), key=lambda node: node.code)
+
+            grupos = _own(tree.groups)
+            subgrupos = _own(tree.subgroups)
+            contas = _own(tree.accounts)
             
             return {
                 "success": True,
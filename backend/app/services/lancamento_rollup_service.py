@@ -0,0 +1,391 @@
+"""
+Serviço de Rollup de Lançamentos Diários
+
+Mantém a tabela lancamentos_diarios_rollup, com totais por
+(tenant, BU, grupo, subgrupo, conta, tipo, dia), e expõe as consultas
+agregadas usadas pelos serviços de dashboard. As leituras somam poucas
+linhas pré-agregadas em vez de hidratar todos os lançamentos do período.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import String, cast, func, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.chart_of_accounts import ChartAccountGroup
+from app.models.lancamento_diario import LancamentoDiario
+from app.models.lancamento_rollup import LancamentoDiarioRollup
+
+RollupKey = Tuple[str, str, str, str, str, str, date]
+RollupSnapshot = Tuple[RollupKey, Decimal]
+
+_KEY_COLUMNS = [
+    "tenant_id",
+    "business_unit_id",
+    "grupo_id",
+    "subgrupo_id",
+    "conta_id",
+    "transaction_type",
+    "dia",
+]
+
+
+def _type_value(tx_type: Any) -> str:
+    if tx_type is None:
+        return ""
+    if hasattr(tx_type, "value"):
+        return tx_type.value
+    return str(tx_type)
+
+
+def _to_decimal(value: Any) -> Decimal:
+    if value is None:
+        return Decimal("0")
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+class LancamentoRollupService:
+    """Manutenção e leitura do rollup diário de lançamentos"""
+
+    # ------------------------------------------------------------------
+    # Manutenção incremental
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def snapshot(lancamento: LancamentoDiario) -> Optional[RollupSnapshot]:
+        """
+        Retorna a contribuição atual do lançamento para o rollup
+        (None quando o lançamento não entra nas somas).
+        """
+        if not lancamento.is_active:
+            return None
+        if lancamento.data_movimentacao is None or lancamento.valor is None:
+            return None
+        if not (lancamento.grupo_id and lancamento.subgrupo_id and lancamento.conta_id):
+            return None
+        data_mov = lancamento.data_movimentacao
+        dia = data_mov.date() if isinstance(data_mov, datetime) else data_mov
+        key: RollupKey = (
+            str(lancamento.tenant_id),
+            str(lancamento.business_unit_id),
+            str(lancamento.grupo_id),
+            str(lancamento.subgrupo_id),
+            str(lancamento.conta_id),
+            _type_value(lancamento.transaction_type),
+            dia,
+        )
+        return key, _to_decimal(lancamento.valor)
+
+    @staticmethod
+    def register(db: Session, lancamento: LancamentoDiario) -> None:
+        """Soma um lançamento recém-criado (ou reativado) ao rollup"""
+        LancamentoRollupService.apply_change(db, None, LancamentoRollupService.snapshot(lancamento))
+
+    @staticmethod
+    def apply_change(
+        db: Session,
+        before: Optional[RollupSnapshot],
+        after: Optional[RollupSnapshot],
+    ) -> None:
+        """
+        Aplica a diferença entre dois estados de um lançamento.
+        before=None representa criação; after=None representa exclusão.
+        """
+        LancamentoRollupService.apply_changes(db, [(before, after)])
+
+    @staticmethod
+    def apply_changes(
+        db: Session,
+        changes: Iterable[Tuple[Optional[RollupSnapshot], Optional[RollupSnapshot]]],
+    ) -> None:
+        """
+        Aplica as diferenças de vários lançamentos de uma vez (operações em
+        lote): as deltas são somadas por chave e gravadas em um único upsert.
+        """
+        deltas: Dict[RollupKey, Tuple[Decimal, int]] = {}
+        for before, after in changes:
+            if before == after:
+                continue
+            if before is not None:
+                key, valor = before
+                total, qtd = deltas.get(key, (Decimal("0"), 0))
+                deltas[key] = (total - valor, qtd - 1)
+            if after is not None:
+                key, valor = after
+                total, qtd = deltas.get(key, (Decimal("0"), 0))
+                deltas[key] = (total + valor, qtd + 1)
+        LancamentoRollupService._apply_deltas(db, deltas.items())
+
+    @staticmethod
+    def _apply_deltas(
+        db: Session,
+        deltas: Iterable[Tuple[RollupKey, Tuple[Decimal, int]]],
+    ) -> None:
+        values = [
+            {
+                **dict(zip(_KEY_COLUMNS, key)),
+                "valor_total": total,
+                "quantidade": qtd,
+                "updated_at": datetime.utcnow(),
+            }
+            for key, (total, qtd) in deltas
+            if total or qtd
+        ]
+        if not values:
+            return
+
+        table = LancamentoDiarioRollup.__table__
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=_KEY_COLUMNS,
+                set_={
+                    "valor_total": table.c.valor_total + stmt.excluded.valor_total,
+                    "quantidade": table.c.quantidade + stmt.excluded.quantidade,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            db.execute(stmt)
+            return
+
+        # Fallback genérico (outros bancos): leitura + escrita via ORM
+        for item in values:
+            key = tuple(item[col] for col in _KEY_COLUMNS)
+            row = db.get(LancamentoDiarioRollup, key)
+            if row is None:
+                db.add(LancamentoDiarioRollup(**item))
+            else:
+                row.valor_total = _to_decimal(row.valor_total) + item["valor_total"]
+                row.quantidade = (row.quantidade or 0) + item["quantidade"]
+        db.flush()
+
+    # ------------------------------------------------------------------
+    # Reconstrução em lote (importadores, limpezas, backfill)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def rebuild(db: Session, tenant_id: str, business_unit_id: Optional[str] = None) -> None:
+        """
+        Recalcula o rollup do tenant (ou apenas da BU) a partir de
+        lancamentos_diarios com um único INSERT ... SELECT ... GROUP BY.
+        Não faz commit: participa da transação de quem chamou.
+        """
+        LD = LancamentoDiario
+        rollup = LancamentoDiarioRollup
+
+        delete_query = db.query(rollup).filter(rollup.tenant_id == str(tenant_id))
+        if business_unit_id:
+            delete_query = delete_query.filter(rollup.business_unit_id == str(business_unit_id))
+        delete_query.delete(synchronize_session=False)
+
+        dia = func.date(LD.data_movimentacao)
+        tipo = func.coalesce(cast(LD.transaction_type, String(20)), "")
+        source = (
+            select(
+                LD.tenant_id,
+                LD.business_unit_id,
+                LD.grupo_id,
+                LD.subgrupo_id,
+                LD.conta_id,
+                tipo,
+                dia,
+                func.sum(LD.valor),
+                func.count(LD.id),
+                literal(datetime.utcnow()),
+            )
+            .where(
+                LD.tenant_id == str(tenant_id),
+                LD.is_active.is_(True),
+                LD.valor.isnot(None),
+                LD.data_movimentacao.isnot(None),
+                LD.grupo_id.isnot(None),
+                LD.subgrupo_id.isnot(None),
+                LD.conta_id.isnot(None),
+            )
+            .group_by(
+                LD.tenant_id,
+                LD.business_unit_id,
+                LD.grupo_id,
+                LD.subgrupo_id,
+                LD.conta_id,
+                tipo,
+                dia,
+            )
+        )
+        if business_unit_id:
+            source = source.where(LD.business_unit_id == str(business_unit_id))
+
+        db.execute(
+            rollup.__table__.insert().from_select(
+                _KEY_COLUMNS + ["valor_total", "quantidade", "updated_at"],
+                source,
+            )
+        )
+        db.flush()
+
+    @staticmethod
+    def ensure_built(db: Session, tenant_id: str, business_unit_id: Optional[str] = None) -> None:
+        """
+        Garante que o escopo já foi materializado (primeiro acesso após a
+        criação da tabela ou de dados legados).
+
+        Com BU: duas sondagens de índice. Sem BU (visão do tenant): compara as
+        BUs distintas dos lançamentos com as do rollup e materializa apenas as
+        que faltam — uma BU já materializada não esconde as demais.
+
+        A materialização roda em uma sessão própria: a transação de quem chamou
+        (em geral uma leitura de dashboard) não é confirmada nem desfeita.
+        """
+        rollup = LancamentoDiarioRollup
+        LD = LancamentoDiario
+        source_filters = [
+            LD.tenant_id == str(tenant_id),
+            LD.is_active.is_(True),
+            LD.valor.isnot(None),
+            LD.data_movimentacao.isnot(None),
+            LD.grupo_id.isnot(None),
+            LD.subgrupo_id.isnot(None),
+            LD.conta_id.isnot(None),
+        ]
+
+        if business_unit_id:
+            rollup_query = db.query(rollup.tenant_id).filter(
+                rollup.tenant_id == str(tenant_id),
+                rollup.business_unit_id == str(business_unit_id),
+            )
+            if db.query(rollup_query.exists()).scalar():
+                return
+            source_query = db.query(LD.id).filter(
+                *source_filters, LD.business_unit_id == str(business_unit_id)
+            )
+            if not db.query(source_query.exists()).scalar():
+                return
+            missing = [str(business_unit_id)]
+        else:
+            source_bus = {
+                row[0] for row in db.query(LD.business_unit_id).filter(*source_filters).distinct()
+            }
+            if not source_bus:
+                return
+            built_bus = {
+                row[0]
+                for row in db.query(rollup.business_unit_id)
+                .filter(rollup.tenant_id == str(tenant_id))
+                .distinct()
+            }
+            missing = sorted(source_bus - built_bus)
+            if not missing:
+                return
+
+        rebuild_db = Session(bind=db.get_bind())
+        try:
+            for bu in missing:
+                try:
+                    LancamentoRollupService.rebuild(rebuild_db, tenant_id, bu)
+                    rebuild_db.commit()
+                except IntegrityError:
+                    # Outra requisição materializou a mesma BU em paralelo
+                    rebuild_db.rollback()
+        finally:
+            rebuild_db.close()
+
+    # ------------------------------------------------------------------
+    # Leituras agregadas
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _scoped_query(
+        db: Session,
+        columns: List[Any],
+        tenant_id: str,
+        business_unit_id: Optional[str],
+        start_date: date,
+        end_date: date,
+        operational_only: bool,
+    ):
+        rollup = LancamentoDiarioRollup
+        query = db.query(*columns).filter(
+            rollup.tenant_id == str(tenant_id),
+            rollup.dia >= start_date,
+            rollup.dia <= end_date,
+        )
+        if business_unit_id:
+            query = query.filter(rollup.business_unit_id == str(business_unit_id))
+        if operational_only:
+            query = query.join(ChartAccountGroup, rollup.grupo_id == ChartAccountGroup.id).filter(
+                ChartAccountGroup.is_operational.is_(True)
+            )
+        return query
+
+    @staticmethod
+    def totals_by_day_and_type(
+        db: Session,
+        tenant_id: str,
+        business_unit_id: Optional[str],
+        start_date: date,
+        end_date: date,
+        operational_only: bool = True,
+    ) -> List[Tuple[date, str, Decimal]]:
+        """
+        Totais por (dia, tipo) dos tipos RECEITA/DESPESA/CUSTO.
+        Com operational_only, exclui Deduções e Movimentações Não Operacionais.
+        """
+        rollup = LancamentoDiarioRollup
+        query = LancamentoRollupService._scoped_query(
+            db,
+            [rollup.dia, rollup.transaction_type, func.sum(rollup.valor_total)],
+            tenant_id,
+            business_unit_id,
+            start_date,
+            end_date,
+            operational_only,
+        )
+        rows = (
+            query.filter(rollup.transaction_type.in_(["RECEITA", "DESPESA", "CUSTO"]))
+            .group_by(rollup.dia, rollup.transaction_type)
+            .all()
+        )
+        return [(row[0], row[1], _to_decimal(row[2])) for row in rows]
+
+    @staticmethod
+    def totals_by_account_and_day(
+        db: Session,
+        tenant_id: str,
+        business_unit_id: Optional[str],
+        start_date: date,
+        end_date: date,
+    ) -> List[Tuple[str, str, str, date, Decimal]]:
+        """Totais por (grupo, subgrupo, conta, dia), todos os tipos"""
+        rollup = LancamentoDiarioRollup
+        query = LancamentoRollupService._scoped_query(
+            db,
+            [
+                rollup.grupo_id,
+                rollup.subgrupo_id,
+                rollup.conta_id,
+                rollup.dia,
+                func.sum(rollup.valor_total),
+            ],
+            tenant_id,
+            business_unit_id,
+            start_date,
+            end_date,
+            operational_only=False,
+        )
+        rows = query.group_by(
+            rollup.grupo_id,
+            rollup.subgrupo_id,
+            rollup.conta_id,
+            rollup.dia,
+        ).all()
+        return [(row[0], row[1], row[2], row[3], _to_decimal(row[4])) for row in rows]
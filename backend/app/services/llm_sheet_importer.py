@@ -12,6 +12,9 @@ from googleapiclient.discovery import build
 from sqlalchemy.orm import Session
 import re
 
+# Linhas por INSERT em lote na importação
+IMPORT_BATCH_SIZE = 1000
+
 class LLMSheetImporter:
     def __init__(self, credentials_path="google_credentials.json"):
         """Inicializar importador"""
@@ -145,12 +148,17 @@ class LLMSheetImporter:
             if col_conta is None:
                 return {"success": False, "error": "Coluna 'Conta' não encontrada"}
             
-            # Importar lançamentos diários
-            from app.models.lancamento_diario import LancamentoDiario, TransactionType, TransactionStatus
-            from app.models.chart_of_accounts import ChartAccount, ChartAccountSubgroup, ChartAccountGroup
+            from app.models.lancamento_diario import LancamentoDiario, TransactionStatus
+            
+            tenant_key = str(tenant_id)
+            business_unit_key = str(business_unit_id)
             
-            transactions_created = 0
+            # Fase 1: plano de contas em memória + resolução de todas as linhas
+            chart_index = self._load_chart_index(db, tenant_key)
+            if not chart_index["accounts"]:
+                return {"success": False, "error": "Plano de contas vazio para o tenant"}
             
+            candidates = []
             for idx, row in enumerate(rows, start=2):
                 if len(row) <= max(filter(lambda x: x is not None, [col_data, col_valor, col_conta or 0])):
                     print(f"[IMPORT] Ignorando linha diária {idx}: dados incompletos")
@@ -177,43 +185,17 @@ class LLMSheetImporter:
                     print(f"[IMPORT] Ignorando linha diária {idx}: conta não encontrada ({conta_name})")
                     continue
                 
-                # Buscar conta por nome
-                import uuid
-                tenant_uuid = uuid.UUID(tenant_id) if isinstance(tenant_id, str) else tenant_id
-                
-                # Buscar conta por nome exato primeiro
-                account = db.query(ChartAccount).filter(
-                    ChartAccount.name == conta_name,
-                    ChartAccount.tenant_id == str(tenant_uuid)
-                ).first()
-                
-                # Se não encontrou por nome exato, buscar por similaridade
-                if not account:
-                    account = db.query(ChartAccount).filter(
-                        ChartAccount.name.ilike(f"%{conta_name}%"),
-                        ChartAccount.tenant_id == str(tenant_uuid)
-                    ).first()
-                
-                if not account:
-                    # Tentar buscar por subgrupo
-                    if col_subgrupo is not None and col_subgrupo < len(row) and row[col_subgrupo]:
-                        subgrupo_name = row[col_subgrupo].strip()
-                        
-                        from app.models.chart_of_accounts import ChartAccountSubgroup
-                        subgroup = db.query(ChartAccountSubgroup).filter(
-                            ChartAccountSubgroup.name.ilike(f"%{subgrupo_name}%")
-                        ).first()
-                        
-                        if subgroup:
-                            account = db.query(ChartAccount).filter(
-                                ChartAccount.subgroup_id == subgroup.id
-                            ).first()
+                subgrupo_name = ""
+                if col_subgrupo is not None and col_subgrupo < len(row) and row[col_subgrupo]:
+                    subgrupo_name = row[col_subgrupo].strip()
                 
+                account = self._resolve_account(chart_index, conta_name, subgrupo_name)
                 if not account:
-                    # Fallback: usar primeira conta disponível
-                    account = db.query(ChartAccount).first()
+                    continue
                 
-                if not account:
+                grupo_id = chart_index["group_by_subgroup"].get(account["subgroup_id"])
+                if not grupo_id:
+                    print(f"[IMPORT] Ignorando linha diária {idx}: conta sem grupo ({account['name']})")
                     continue
                 
                 # Descrição/observação
@@ -224,55 +206,38 @@ class LLMSheetImporter:
                 if not descricao:
                     descricao = f"Lançamento - {conta_name}"
                 
-                # Criar lançamento diário
-                # from app.models.lancamento_diario import LancamentoDiario
-                
-                # Determinar tipo baseado apenas nos grupos específicos
-                transaction_type_enum = None  # Sem classificação por padrão
-                
-                if account.subgroup and account.subgroup.group:
-                    grupo_nome = account.subgroup.group.name.lower()
-                    
-                    # Classificação específica apenas para 3 grupos
-                    if 'receita' in grupo_nome:
-                        transaction_type_enum = TransactionType.RECEITA
-                    elif 'despesas operacionais' in grupo_nome:
-                        transaction_type_enum = TransactionType.DESPESA
-                    elif 'custos' in grupo_nome:
-                        transaction_type_enum = TransactionType.CUSTO
-                    # Demais grupos ficam sem classificação (None)
-                
-                # Verificar se já existe (evitar duplicatas)
-                # Converter para string pois colunas são VARCHAR no banco
-                existing = db.query(LancamentoDiario).filter(
-                    LancamentoDiario.data_movimentacao == transaction_date,
-                    LancamentoDiario.conta_id == account.id,
-                    LancamentoDiario.valor == abs(amount),
-                    LancamentoDiario.tenant_id == str(tenant_uuid),
-                    LancamentoDiario.business_unit_id == str(business_unit_id)
-                ).first()
-                
-                if not existing:
-                    lancamento = LancamentoDiario(
-                        tenant_id=str(tenant_uuid),
-                        business_unit_id=str(business_unit_id),
-                        conta_id=account.id,
-                        subgrupo_id=account.subgroup_id,
-                        grupo_id=account.subgroup.group_id if account.subgroup else None,
-                        data_movimentacao=transaction_date,
-                        valor=abs(amount),
-                        observacoes=descricao or f"Importado - {account.name}",
-                        transaction_type=transaction_type_enum,
-                        status=TransactionStatus.PENDENTE,
-                        created_by=user_id
-                    )
-                    db.add(lancamento)
-                    transactions_created += 1
-                    
-                    # Commit a cada 100 transações para evitar timeout
-                    if transactions_created % 100 == 0:
-                        db.commit()
-                        print(f"[IMPORT] Progresso: {transactions_created} transações...")
+                candidates.append({
+                    "tenant_id": tenant_key,
+                    "business_unit_id": business_unit_key,
+                    "conta_id": account["id"],
+                    "subgrupo_id": account["subgroup_id"],
+                    "grupo_id": grupo_id,
+                    "data_movimentacao": datetime.combine(transaction_date, datetime.min.time()),
+                    "valor": abs(amount),
+                    "observacoes": descricao or f"Importado - {account['name']}",
+                    "transaction_type": self._account_transaction_type(chart_index, account),
+                    "status": TransactionStatus.PENDENTE,
+                    "created_by": user_id,
+                })
+            
+            # Fase 2: deduplicação (data, conta, valor) contra o banco em uma
+            # única consulta e entre as próprias linhas da planilha
+            seen_keys = self._existing_daily_keys(db, tenant_key, business_unit_key, candidates)
+            new_rows = []
+            for row in candidates:
+                key = self._daily_key(row["data_movimentacao"], row["conta_id"], row["valor"])
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                new_rows.append(row)
+            print(f"[IMPORT] {len(candidates)} linhas válidas, {len(candidates) - len(new_rows)} já existentes ou repetidas")
+            
+            # Fase 3: escrita em lote (INSERT multi-linha)
+            transactions_created = self._bulk_insert_ignore_duplicates(db, LancamentoDiario.__table__, new_rows)
+            
+            # Rollup diário reconstruído em lote junto com o commit final
+            from app.services.lancamento_rollup_service import LancamentoRollupService
+            LancamentoRollupService.rebuild(db, tenant_key, business_unit_key)
             
             # Commit final
             db.commit()
@@ -287,6 +252,126 @@ class LLMSheetImporter:
             traceback.print_exc()
             return {"success": False, "error": str(e)}
     
+    def _load_chart_index(self, db, tenant_id):
+        """
+        Índices por nome sobre o plano de contas do tenant (e compartilhado)
+        em cache: no máximo três consultas, independentemente do número de linhas.
+        """
+        from app.services.chart_hierarchy_cache import ChartHierarchyCache
+        
+        def _tenant_first(nodes):
+            # Registros do tenant antes dos compartilhados (tenant_id nulo), por código
+            return sorted(nodes, key=lambda node: (node.tenant_id is None, node.code))
+        
+        hierarchy = ChartHierarchyCache.visible(db, tenant_id)
+        accounts = [
+            {"id": node.id, "name": node.name, "subgroup_id": node.subgroup_id}
+            for node in _tenant_first(hierarchy.accounts)
+        ]
+        subgroups = _tenant_first(hierarchy.subgroups)
+        
+        by_name = {}
+        first_by_subgroup = {}
+        for account in accounts:
+            by_name.setdefault(account["name"], account)
+            first_by_subgroup.setdefault(account["subgroup_id"], account)
+        
+        return {
+            "accounts": accounts,
+            "by_name": by_name,
+            "first_by_subgroup": first_by_subgroup,
+            "subgroups": [(sg.id, (sg.name or "").lower()) for sg in subgroups],
+            "group_by_subgroup": {sg.id: sg.group_id for sg in subgroups},
+            "account_types": hierarchy.account_types,
+            "resolved": {},
+        }
+    
+    def _resolve_account(self, chart_index, conta_name, subgrupo_name=""):
+        """
+        Resolver conta pela mesma ordem da busca linha a linha:
+        nome exato -> nome contém -> primeira conta do subgrupo -> primeira conta.
+        """
+        cache_key = (conta_name, subgrupo_name)
+        if cache_key in chart_index["resolved"]:
+            return chart_index["resolved"][cache_key]
+        
+        account = chart_index["by_name"].get(conta_name)
+        
+        if not account:
+            needle = conta_name.lower()
+            account = next((a for a in chart_index["accounts"] if needle in (a["name"] or "").lower()), None)
+        
+        if not account and subgrupo_name:
+            needle = subgrupo_name.lower()
+            subgroup_id = next((sg_id for sg_id, name in chart_index["subgroups"] if needle in name), None)
+            if subgroup_id:
+                account = chart_index["first_by_subgroup"].get(subgroup_id)
+        
+        if not account:
+            # Fallback: usar primeira conta disponível
+            account = chart_index["accounts"][0] if chart_index["accounts"] else None
+        
+        chart_index["resolved"][cache_key] = account
+        return account
+    
+    def _account_transaction_type(self, chart_index, account):
+        """Tipo da conta pelo mapa conta → tipo do plano em cache (``None`` se a conta não tem grupo ativo)"""
+        from app.models.lancamento_diario import TransactionType
+        
+        value = chart_index["account_types"].get(account["id"])
+        return TransactionType(value) if value else None
+    
+    @staticmethod
+    def _daily_key(data_movimentacao, conta_id, valor):
+        return (data_movimentacao, str(conta_id), Decimal(str(valor)).quantize(Decimal("0.01")))
+    
+    def _existing_daily_keys(self, db, tenant_id, business_unit_id, candidates):
+        """Chaves (data, conta, valor) já gravadas, em uma única consulta por intervalo"""
+        from app.models.lancamento_diario import LancamentoDiario
+        
+        if not candidates:
+            return set()
+        dates = [row["data_movimentacao"] for row in candidates]
+        conta_ids = {row["conta_id"] for row in candidates}
+        existing = (
+            db.query(LancamentoDiario.data_movimentacao, LancamentoDiario.conta_id, LancamentoDiario.valor)
+            .filter(
+                LancamentoDiario.tenant_id == tenant_id,
+                LancamentoDiario.business_unit_id == business_unit_id,
+                LancamentoDiario.data_movimentacao >= min(dates),
+                LancamentoDiario.data_movimentacao <= max(dates),
+                LancamentoDiario.conta_id.in_(conta_ids),
+            )
+            .all()
+        )
+        return {self._daily_key(data, conta_id, valor) for data, conta_id, valor in existing}
+    
+    def _bulk_insert_ignore_duplicates(self, db, table, rows, batch_size=IMPORT_BATCH_SIZE):
+        """
+        INSERT multi-linha em lotes ignorando conflitos de chave única; retorna
+        as linhas inseridas, contadas pelo RETURNING (o rowcount de executemany
+        não é confiável no psycopg2). As linhas já devem vir deduplicadas.
+        """
+        if not rows:
+            return 0
+        
+        dialect = db.get_bind().dialect.name
+        inserted = 0
+        for offset in range(0, len(rows), batch_size):
+            batch = rows[offset:offset + batch_size]
+            if dialect in ("postgresql", "sqlite"):
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                stmt = insert(table).values(batch).on_conflict_do_nothing().returning(table.c.id)
+                inserted += len(db.execute(stmt).scalars().all())
+            else:
+                db.execute(table.insert().values(batch))
+                inserted += len(batch)
+            print(f"[IMPORT] Progresso: {min(offset + batch_size, len(rows))}/{len(rows)} transações...")
+        return inserted
+    
     def _import_forecast_transactions(self, spreadsheet_id, sheet_name, tenant_id, business_unit_id, db, user_id=None):
         """Importar lançamentos previstos (previsões)"""
         try:
@@ -339,11 +424,13 @@ class LLMSheetImporter:
             
             # Importar previsões
             from app.models.lancamento_previsto import LancamentoPrevisto, TransactionType, TransactionStatus
-            from app.models.chart_of_accounts import ChartAccount, ChartAccountSubgroup, ChartAccountGroup
+            from app.models.chart_of_accounts import ChartAccount, ChartAccountSubgroup, ChartAccountGroup, resolve_transaction_type
+            from app.services.transaction_type_resolver import TransactionTypeResolver
             
             forecasts_created = 0
             import uuid
             tenant_uuid = uuid.UUID(tenant_id) if isinstance(tenant_id, str) else tenant_id
+            account_types = TransactionTypeResolver.account_types(db, str(tenant_uuid))
             
             for idx, row in enumerate(rows, start=2):
                 if len(row) <= max(filter(lambda x: x is not None, [col_data, col_valor, col_conta or 0])):
@@ -391,18 +478,11 @@ class LLMSheetImporter:
                 if not descricao:
                     descricao = f"Previsão - {conta_name}"
                 
-                # Determinar tipo (mesma lógica dos lançamentos diários)
-                grupo_nome = account.subgroup.group.name.lower()
-                subgrupo_nome = account.subgroup.name.lower()
-                
-                if any(keyword in grupo_nome for keyword in ['receita', 'venda', 'renda', 'faturamento', 'vendas']):
-                    transaction_type_enum = TransactionType.RECEITA
-                elif any(keyword in grupo_nome for keyword in ['custo', 'custos']) or any(keyword in subgrupo_nome for keyword in ['custo', 'custos', 'mercadoria', 'produto']):
-                    transaction_type_enum = TransactionType.CUSTO
-                elif any(keyword in grupo_nome for keyword in ['despesa', 'gasto', 'operacional', 'administrativa']) or any(keyword in subgrupo_nome for keyword in ['despesa', 'gasto', 'marketing', 'administrativa']):
-                    transaction_type_enum = TransactionType.DESPESA
-                else:
-                    transaction_type_enum = TransactionType.DESPESA
+                # Tipo pela conta (mapa conta → tipo); conta inativa: mesma regra pelos nomes
+                transaction_type_enum = TransactionType(
+                    account_types.get(str(account.id))
+                    or resolve_transaction_type(account.subgroup.group.name, account.subgroup.name)
+                )
                 
                 # Verificar se já existe
                 existing = db.query(LancamentoPrevisto).filter(
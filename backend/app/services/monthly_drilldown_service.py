@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from app.models.lancamento_diario import LancamentoDiario, TransactionType
+from app.services.lancamento_rollup_service import LancamentoRollupService
 
 
 class MonthlyDrilldownService:
@@ -64,36 +65,18 @@ class MonthlyDrilldownService:
         last_day = monthrange(year, month)[1]
         end_dt = datetime(year, month, last_day, 23, 59, 59)
         
-        # Query para buscar lançamentos do mês
-        from app.models.chart_of_accounts import ChartAccountGroup
-        
-        query = (
-            db.query(LancamentoDiario)
-            .join(ChartAccountGroup, LancamentoDiario.grupo_id == ChartAccountGroup.id)
-            .filter(
-                LancamentoDiario.tenant_id == tenant_id,
-                LancamentoDiario.business_unit_id == business_unit_id,
-                LancamentoDiario.is_active.is_(True),
-                LancamentoDiario.data_movimentacao >= start_dt,
-                LancamentoDiario.data_movimentacao <= end_dt,
-            )
-        )
-        
-        # APLICAR FILTRO DIRETAMENTE NA QUERY para excluir Deduções e Movimentações Não Operacionais
-        query = query.filter(
-            ~ChartAccountGroup.name.ilike('%dedução%'),
-            ~ChartAccountGroup.name.ilike('%deducao%'),
-            ~ChartAccountGroup.name.ilike('%deduções%'),
-            ~ChartAccountGroup.name.ilike('%deducoes%'),
-            ~ChartAccountGroup.name.ilike('%movimentações não operacionais%'),
-            ~ChartAccountGroup.name.ilike('%movimentacoes nao operacionais%'),
-            ~ChartAccountGroup.name.ilike('%movimentações nao operacionais%'),
-            ~ChartAccountGroup.name.ilike('%movimentacoes não operacionais%'),
+        # Totais realizados do mês vindos do rollup diário (já exclui
+        # Deduções e Movimentações Não Operacionais e lançamentos sem tipo)
+        LancamentoRollupService.ensure_built(db, tenant_id, business_unit_id)
+        realized_totals = LancamentoRollupService.totals_by_day_and_type(
+            db,
+            tenant_id,
+            business_unit_id,
+            start_dt.date(),
+            end_dt.date(),
+            operational_only=True,
         )
         
-        # Buscar todos os lançamentos
-        transactions = query.all()
-        
         # Inicializar estrutura diária (todos os dias do mês)
         daily_data: Dict[int, Dict[str, Decimal]] = {
             day: {
@@ -107,19 +90,13 @@ class MonthlyDrilldownService:
         
         # Agregar transações por dia
         # FILTRO JÁ APLICADO NA QUERY - não precisa verificar novamente
-        for tx in transactions:
-            # Ignorar transações sem tipo
-            if tx.transaction_type is None:
-                continue
-            
-            day = tx.data_movimentacao.day
-            valor = tx.valor if tx.valor is not None else Decimal("0")
-            
-            if tx.transaction_type == TransactionType.RECEITA:
+        for dia, tx_type_value, valor in realized_totals:
+            day = dia.day
+            if tx_type_value == TransactionType.RECEITA.value:
                 daily_data[day]["revenue"] += valor
-            elif tx.transaction_type == TransactionType.DESPESA:
+            elif tx_type_value == TransactionType.DESPESA.value:
                 daily_data[day]["expense"] += valor
-            elif tx.transaction_type == TransactionType.CUSTO:
+            elif tx_type_value == TransactionType.CUSTO.value:
                 daily_data[day]["cost"] += valor
         
         # Calcular saldo diário (receita - despesa - custo)
@@ -243,18 +220,8 @@ class MonthlyDrilldownService:
             )
         )
         
-        # APLICAR FILTRO DIRETAMENTE NA QUERY para excluir Deduções e Movimentações Não Operacionais
-        # Isso é mais eficiente que filtrar depois
-        query = query.filter(
-            ~ChartAccountGroup.name.ilike('%dedução%'),
-            ~ChartAccountGroup.name.ilike('%deducao%'),
-            ~ChartAccountGroup.name.ilike('%deduções%'),
-            ~ChartAccountGroup.name.ilike('%deducoes%'),
-            ~ChartAccountGroup.name.ilike('%movimentações não operacionais%'),
-            ~ChartAccountGroup.name.ilike('%movimentacoes nao operacionais%'),
-            ~ChartAccountGroup.name.ilike('%movimentações nao operacionais%'),
-            ~ChartAccountGroup.name.ilike('%movimentacoes não operacionais%'),
-        )
+        # Excluir Deduções e Movimentações Não Operacionais (classificação gravada no grupo)
+        query = query.filter(ChartAccountGroup.is_operational.is_(True))
         
         # Aplicar filtros
         if transaction_type:
@@ -285,19 +252,6 @@ class MonthlyDrilldownService:
             if tx.transaction_type is None:
                 continue
             
-            # FILTRO JÁ APLICADO NA QUERY - não precisa verificar novamente
-            # Mas manter verificação como segurança adicional
-            grupo_nome = tx.grupo.name.lower() if tx.grupo else ""
-            
-            # Excluir Deduções (verificação adicional)
-            if "dedução" in grupo_nome or "deducao" in grupo_nome or "deduções" in grupo_nome or "deducoes" in grupo_nome:
-                continue  # Não contar como despesa
-            
-            # Excluir Movimentações Não Operacionais (verificação adicional)
-            if "movimentações não operacionais" in grupo_nome or "movimentacoes nao operacionais" in grupo_nome or \
-               "movimentações nao operacionais" in grupo_nome or "movimentacoes não operacionais" in grupo_nome:
-                continue  # Não contar como despesa operacional
-            
             valor = tx.valor if tx.valor is not None else Decimal("0")
             
             if tx.transaction_type == TransactionType.RECEITA:
@@ -0,0 +1,252 @@
+"""
+Fila persistente de jobs de onboarding
+
+O estado de cada importação (etapa, progresso, contadores e checkpoints) fica
+na tabela ``onboarding_jobs``, de modo que qualquer instância responde ao
+/status e um job interrompido pode ser retomado. Os jobs são executados por
+workers que os reivindicam com ``SELECT ... FOR UPDATE SKIP LOCKED``: vários
+workers podem consultar a fila ao mesmo tempo sem pegar o mesmo job.
+"""
+
+import json
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.onboarding_job import FINISHED_JOB_STATUSES, OnboardingJob, OnboardingJobStatus
+
+# Sem heartbeat por esse tempo, o job é considerado abandonado (worker caiu)
+ONBOARDING_JOB_STALE_SECONDS = int(os.getenv("ONBOARDING_JOB_STALE_SECONDS", "900"))
+ONBOARDING_JOB_MAX_ATTEMPTS = int(os.getenv("ONBOARDING_JOB_MAX_ATTEMPTS", "3"))
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _load_json(value: Optional[str], default: Any) -> Any:
+    if not value:
+        return default
+    try:
+        return json.loads(value)
+    except ValueError:
+        return default
+
+
+class OnboardingJobService:
+    """Criação, reivindicação e atualização dos jobs de onboarding"""
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        *,
+        tenant_id: str,
+        business_unit_id: str,
+        spreadsheet_url: str,
+        reset_data: bool,
+        user_id: Optional[str],
+        corrections: Optional[Dict[str, Any]] = None,
+        source_snapshot_id: Optional[str] = None,
+        message: Optional[str] = None,
+    ) -> OnboardingJob:
+        checkpoints = {"source_snapshot": source_snapshot_id} if source_snapshot_id else None
+        job = OnboardingJob(
+            tenant_id=str(tenant_id),
+            business_unit_id=str(business_unit_id),
+            spreadsheet_url=spreadsheet_url,
+            reset_data=bool(reset_data),
+            user_id=str(user_id) if user_id else None,
+            corrections=json.dumps(corrections, ensure_ascii=True) if corrections else None,
+            status=OnboardingJobStatus.QUEUED.value,
+            current_step="Aguardando processamento",
+            progress=0,
+            message=message,
+            checkpoints=json.dumps(checkpoints) if checkpoints else None,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def latest(db: Session, tenant_id: str, business_unit_id: str) -> Optional[OnboardingJob]:
+        return (
+            db.query(OnboardingJob)
+            .filter(
+                OnboardingJob.tenant_id == str(tenant_id),
+                OnboardingJob.business_unit_id == str(business_unit_id),
+            )
+            .order_by(OnboardingJob.created_at.desc())
+            .first()
+        )
+
+    @staticmethod
+    def latest_snapshot_id(db: Session, tenant_id: str, business_unit_id: str) -> Optional[str]:
+        """Snapshot da planilha usado pela importação mais recente do tenant/BU"""
+        jobs = (
+            db.query(OnboardingJob)
+            .filter(
+                OnboardingJob.tenant_id == str(tenant_id),
+                OnboardingJob.business_unit_id == str(business_unit_id),
+            )
+            .order_by(OnboardingJob.created_at.desc())
+            .limit(20)
+        )
+        for job in jobs:
+            snapshot_id = OnboardingJobService.checkpoints(job).get("snapshot")
+            if snapshot_id:
+                return snapshot_id
+        return None
+
+    @staticmethod
+    def claim_next(db: Session, worker_id: str) -> Optional[str]:
+        """
+        Reivindica o próximo job pendente (ou abandonado) e retorna seu run_id.
+
+        O lock de linha só dura a transação da reivindicação; depois disso o
+        dono do job é identificado por ``locked_by`` + ``heartbeat_at``.
+        """
+        while True:
+            now = datetime.utcnow()
+            stale_before = now - timedelta(seconds=ONBOARDING_JOB_STALE_SECONDS)
+            job = (
+                db.query(OnboardingJob)
+                .filter(
+                    OnboardingJob.status.notin_(FINISHED_JOB_STATUSES),
+                    or_(OnboardingJob.locked_by.is_(None), OnboardingJob.heartbeat_at < stale_before),
+                )
+                .order_by(OnboardingJob.created_at)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                db.commit()
+                return None
+
+            if job.attempts >= ONBOARDING_JOB_MAX_ATTEMPTS:
+                errors = _load_json(job.errors, [])
+                errors.append(f"Job abandonado após {job.attempts} tentativas")
+                job.errors = json.dumps(errors, ensure_ascii=True)
+                job.status = OnboardingJobStatus.ERROR.value
+                job.message = "Importação interrompida: número máximo de tentativas excedido"
+                job.locked_by = None
+                job.finished_at = now
+                db.commit()
+                continue
+
+            job.locked_by = worker_id
+            job.heartbeat_at = now
+            job.attempts += 1
+            job.started_at = job.started_at or now
+            run_id = job.id
+            db.commit()
+            return run_id
+
+    @staticmethod
+    def update(
+        run_id: str,
+        *,
+        status: Optional[str] = None,
+        current_step: Optional[str] = None,
+        progress: Optional[int] = None,
+        message: Optional[str] = None,
+        stats: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+        live_progress: Optional[Dict[str, Any]] = None,
+        finished: bool = False,
+    ) -> None:
+        """
+        Atualiza o job em uma sessão própria (commit imediato), independente da
+        transação da importação. Cada atualização também renova o heartbeat.
+        """
+        db = SessionLocal()
+        try:
+            job = db.get(OnboardingJob, run_id)
+            if job is None:
+                return
+            now = datetime.utcnow()
+            if status is not None:
+                job.status = status
+            if current_step is not None:
+                job.current_step = current_step
+            if progress is not None:
+                job.progress = progress
+            if message is not None:
+                job.message = message
+            if stats is not None:
+                job.stats = json.dumps(stats, ensure_ascii=True, default=str)
+            if error:
+                errors = _load_json(job.errors, [])
+                errors.append(error)
+                job.errors = json.dumps(errors, ensure_ascii=True)
+            if checkpoint:
+                checkpoints = _load_json(job.checkpoints, {})
+                checkpoints.update(checkpoint)
+                job.checkpoints = json.dumps(checkpoints, ensure_ascii=True, default=str)
+            if live_progress is not None:
+                job.live_progress = json.dumps(live_progress, ensure_ascii=True, default=str)
+            job.heartbeat_at = now
+            if finished:
+                job.finished_at = now
+                job.locked_by = None
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def checkpoints(job: OnboardingJob) -> Dict[str, Any]:
+        return _load_json(job.checkpoints, {})
+
+    @staticmethod
+    def corrections(job: OnboardingJob) -> Optional[Dict[str, Any]]:
+        return _load_json(job.corrections, None)
+
+    @staticmethod
+    def to_status(job: OnboardingJob) -> Dict[str, Any]:
+        """Formato do antigo OnboardingStatus em memória"""
+        def _iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+
+        return {
+            "tenant_id": job.tenant_id,
+            "business_unit_id": job.business_unit_id,
+            "status": job.status,
+            "current_step": job.current_step,
+            "progress": job.progress or 0,
+            "message": job.message,
+            "errors": _load_json(job.errors, []),
+            "stats": _load_json(job.stats, None),
+            "live": _load_json(job.live_progress, None),
+            "run_id": job.id,
+            "started_at": _iso(job.started_at or job.created_at),
+            "finished_at": _iso(job.finished_at),
+            "last_updated_at": _iso(job.updated_at),
+        }
+
+    @staticmethod
+    def run_pending(
+        runner: Callable[[str], None],
+        worker_id: Optional[str] = None,
+        max_jobs: Optional[int] = None,
+    ) -> int:
+        """Executa jobs pendentes até esvaziar a fila (ou ``max_jobs``)"""
+        worker_id = worker_id or default_worker_id()
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            db = SessionLocal()
+            try:
+                run_id = OnboardingJobService.claim_next(db, worker_id)
+            finally:
+                db.close()
+            if run_id is None:
+                break
+            print(f"🚀 [ONBOARDING WORKER] {worker_id} executando job {run_id}")
+            runner(run_id)
+            processed += 1
+        return processed
@@ -0,0 +1,146 @@
+"""
+Progresso em tempo real das importações de onboarding
+
+As funções de seed publicam eventos (aba, linhas lidas/gravadas) diretamente
+no ``ImportProgressReporter`` do job, sem thread de polling. O reporter calcula
+taxa e ETA, entrega o evento aos streams SSE abertos nesta instância e persiste
+o último evento no job (com throttling) para que as demais instâncias também o
+enxerguem ao consultar o banco.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from app.services.onboarding_job_service import OnboardingJobService
+
+# Intervalo mínimo entre gravações do progresso no banco (por job)
+ONBOARDING_PROGRESS_PERSIST_SECONDS = float(os.getenv("ONBOARDING_PROGRESS_PERSIST_SECONDS", "1.0"))
+# Eventos pendentes por assinante; um cliente lento perde os mais antigos
+ONBOARDING_PROGRESS_QUEUE_SIZE = 100
+_LATEST_MAX_RUNS = 256
+
+_Subscriber = Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[Dict[str, Any]]"]
+
+_SUBSCRIBERS: Dict[str, List[_Subscriber]] = {}
+_LATEST: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_BROKER_LOCK = threading.Lock()
+
+
+def _offer(queue: "asyncio.Queue[Dict[str, Any]]", event: Dict[str, Any]) -> None:
+    """Executado no event loop do assinante"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class OnboardingProgressBroker:
+    """Pub/sub em memória por run_id (threads do worker -> event loop do SSE)"""
+
+    @staticmethod
+    def subscribe(run_id: str) -> "asyncio.Queue[Dict[str, Any]]":
+        """Deve ser chamado dentro do event loop que vai consumir a fila"""
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=ONBOARDING_PROGRESS_QUEUE_SIZE)
+        loop = asyncio.get_running_loop()
+        with _BROKER_LOCK:
+            _SUBSCRIBERS.setdefault(run_id, []).append((loop, queue))
+            latest = _LATEST.get(run_id)
+        if latest is not None:
+            queue.put_nowait(latest)
+        return queue
+
+    @staticmethod
+    def unsubscribe(run_id: str, queue: "asyncio.Queue[Dict[str, Any]]") -> None:
+        with _BROKER_LOCK:
+            subscribers = [sub for sub in _SUBSCRIBERS.get(run_id, []) if sub[1] is not queue]
+            if subscribers:
+                _SUBSCRIBERS[run_id] = subscribers
+            else:
+                _SUBSCRIBERS.pop(run_id, None)
+
+    @staticmethod
+    def publish(run_id: str, event: Dict[str, Any]) -> None:
+        with _BROKER_LOCK:
+            _LATEST[run_id] = event
+            _LATEST.move_to_end(run_id)
+            while len(_LATEST) > _LATEST_MAX_RUNS:
+                _LATEST.popitem(last=False)
+            subscribers = list(_SUBSCRIBERS.get(run_id, []))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # Event loop encerrado: o assinante já foi embora
+                OnboardingProgressBroker.unsubscribe(run_id, queue)
+
+
+class ImportProgressReporter:
+    """
+    Callback de progresso passado às funções de seed.
+
+    ``progress_range`` define a faixa do progresso geral do job (0-100)
+    ocupada pela etapa atual; a porcentagem dentro da etapa vem de
+    ``rows_done / rows_total``.
+    """
+
+    def __init__(self, run_id: str, progress_range: Tuple[int, int] = (60, 90)):
+        self.run_id = run_id
+        self.progress_range = progress_range
+        self._started_at: Dict[str, float] = {}
+        self._last_persist = 0.0
+
+    def __call__(
+        self,
+        sheet: str,
+        *,
+        rows_parsed: int = 0,
+        rows_total: int = 0,
+        rows_done: int = 0,
+        rows_inserted: int = 0,
+        final: bool = False,
+    ) -> Dict[str, Any]:
+        now = time.monotonic()
+        elapsed = now - self._started_at.setdefault(sheet, now)
+        rate = rows_done / elapsed if rows_done and elapsed > 0 else 0.0
+        eta = (rows_total - rows_done) / rate if rate > 0 else None
+
+        start, end = self.progress_range
+        fraction = min(rows_done / rows_total, 1.0) if rows_total else (1.0 if final else 0.0)
+        event = {
+            "run_id": self.run_id,
+            "sheet": sheet,
+            "rows_parsed": int(rows_parsed),
+            "rows_total": int(rows_total),
+            "rows_done": int(rows_done),
+            "rows_inserted": int(rows_inserted),
+            "rate": round(rate, 1),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "elapsed_seconds": round(elapsed, 1),
+            "progress": int(start + (end - start) * fraction),
+            "at": datetime.utcnow().isoformat(),
+        }
+        OnboardingProgressBroker.publish(self.run_id, event)
+
+        if final or now - self._last_persist >= ONBOARDING_PROGRESS_PERSIST_SECONDS:
+            self._last_persist = now
+            OnboardingJobService.update(
+                self.run_id,
+                progress=event["progress"],
+                message=f"Importando {sheet}... {rows_done}/{rows_total} linhas ({event['rate']:.0f} linhas/s)",
+                live_progress=event,
+            )
+        return event
+
+    def heartbeat(self) -> None:
+        """
+        Renova o heartbeat do job em trechos sem eventos de linha (upserts de
+        configurações etc.), com o mesmo throttling das gravações de progresso
+        """
+        now = time.monotonic()
+        if now - self._last_persist >= ONBOARDING_PROGRESS_PERSIST_SECONDS:
+            self._last_persist = now
+            OnboardingJobService.update(self.run_id)
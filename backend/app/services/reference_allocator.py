@@ -0,0 +1,100 @@
+"""
+Alocação de referências sequenciais por (tenant, BU, dia)
+
+Referências no formato ``PREFIXO-YYYYMMDD-NNNN`` saem de um contador por
+(tenant, BU, prefixo, dia) em ``reference_counters``, em vez de ler a última
+transação do dia (consulta sem índice utilizável e sujeita a corrida entre
+criações simultâneas).
+
+Reservar ``count`` números custa um único comando:
+
+    INSERT ... VALUES (..., :count)
+    ON CONFLICT (chave) DO UPDATE SET last_value = last_value + :count
+    RETURNING last_value
+
+O bloqueio da linha do contador dura até o fim da transação de quem chamou:
+criações concorrentes no mesmo dia serializam nessa linha e nunca recebem o
+mesmo número; se a transação for desfeita, o incremento também é.
+"""
+
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.reference_counter import ReferenceCounter
+
+DEFAULT_REFERENCE_PREFIX = "TX"
+
+
+def format_reference(prefix: str, day: date, number: int) -> str:
+    return f"{prefix}-{day:%Y%m%d}-{number:04d}"
+
+
+class ReferenceAllocator:
+    """Reserva de números de referência (um ou um intervalo por chamada)"""
+
+    @staticmethod
+    def reserve(
+        db: Session,
+        tenant_id: str,
+        business_unit_id: str,
+        count: int = 1,
+        day: Optional[date] = None,
+        prefix: str = DEFAULT_REFERENCE_PREFIX,
+    ) -> range:
+        """
+        Reserva ``count`` números consecutivos do contador e devolve o
+        intervalo. Não faz commit: participa da transação de quem chamou.
+        """
+        if count < 1:
+            raise ValueError("count deve ser maior que zero")
+        day = day or datetime.now().date()
+        key = {
+            "tenant_id": str(tenant_id),
+            "business_unit_id": str(business_unit_id),
+            "prefix": prefix,
+            "dia": day,
+        }
+        table = ReferenceCounter.__table__
+        dialect = db.get_bind().dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table).values(**key, last_value=count, updated_at=datetime.utcnow())
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(key),
+                set_={
+                    "last_value": table.c.last_value + stmt.excluded.last_value,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            ).returning(table.c.last_value)
+            last_value = db.execute(stmt).scalar_one()
+        else:
+            # Fallback genérico (outros bancos): leitura com bloqueio + escrita via ORM
+            counter = db.get(ReferenceCounter, tuple(key.values()), with_for_update=True)
+            if counter is None:
+                counter = ReferenceCounter(**key, last_value=0)
+                db.add(counter)
+            counter.last_value += count
+            db.flush()
+            last_value = counter.last_value
+
+        return range(last_value - count + 1, last_value + 1)
+
+    @staticmethod
+    def allocate(
+        db: Session,
+        tenant_id: str,
+        business_unit_id: str,
+        count: int = 1,
+        day: Optional[date] = None,
+        prefix: str = DEFAULT_REFERENCE_PREFIX,
+    ) -> List[str]:
+        """Reserva ``count`` referências formatadas (``PREFIXO-YYYYMMDD-NNNN``)"""
+        day = day or datetime.now().date()
+        numbers = ReferenceAllocator.reserve(db, tenant_id, business_unit_id, count, day, prefix)
+        return [format_reference(prefix, day, number) for number in numbers]
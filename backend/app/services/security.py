@@ -10,6 +10,7 @@ from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from app.models.auth import User, UserSession, AuditLog, UserStatus, UserRole
 from app.database import get_db
+from app.services.user_cache import AuthenticatedUserCache
 
 # Configurações de segurança
 JWT_SECRET = os.getenv("JWT_SECRET", "finaflow-super-secret-jwt-key-2024")
@@ -148,6 +149,8 @@ class SecurityService:
             user.status = UserStatus.SUSPENDED
         
         db.commit()
+        if user.status == UserStatus.SUSPENDED:
+            AuthenticatedUserCache.invalidate(user.id)
         
         # Log da tentativa falhada
         SecurityService._log_failed_login(db, user.username, ip_address, user_agent, f"Tentativa {user.failed_login_attempts}")
@@ -272,6 +275,7 @@ class SecurityService:
                 user.locked_until = None
                 user.status = UserStatus.ACTIVE
                 db.commit()
+                AuthenticatedUserCache.invalidate(user.id)
             return
 
         # Se usuário informou senha padrão conhecida, ressincroniza hash
@@ -281,3 +285,4 @@ class SecurityService:
             user.locked_until = None
             user.status = UserStatus.ACTIVE
             db.commit()
+            AuthenticatedUserCache.invalidate(user.id)
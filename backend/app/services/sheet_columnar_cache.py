@@ -0,0 +1,252 @@
+"""
+Cache colunar (Arrow IPC) das abas de planilhas
+
+Ler xlsx com openpyxl é a etapa mais lenta do onboarding e do fluxo previsto
+do dashboard. Cada aba (por versão da planilha e ``header``) é convertida uma
+única vez para um arquivo Arrow IPC em ``SHEET_COLUMNAR_CACHE_DIR``; leituras
+seguintes abrem o arquivo via memory map (milissegundos, páginas compartilhadas
+entre processos pelo cache do SO) em vez de reprocessar o xlsx.
+
+A conversão preserva o DataFrame do pandas: colunas ``object`` com tipos
+mistos (texto + data + número, comum nas planilhas dos clientes) são gravadas
+com o tipo de cada célula e reconstruídas como os mesmos objetos Python.
+
+``pyarrow`` é opcional: sem ele (ou com ``SHEET_COLUMNAR_CACHE=0``) as abas são
+lidas diretamente do xlsx, como antes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import date, datetime, time as dt_time
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow é opcional
+    pa = None
+
+_DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "sheet_cache"
+SHEET_COLUMNAR_CACHE_DIR = os.getenv("SHEET_COLUMNAR_CACHE_DIR", str(_DEFAULT_CACHE_DIR))
+SHEET_COLUMNAR_CACHE_ENABLED = os.getenv("SHEET_COLUMNAR_CACHE", "1") == "1"
+
+_METADATA_KEY = b"finaflow.sheet"
+_FORMAT_VERSION = 1
+
+
+# ----------------------------------------------------------------------
+# Codificação de valores de colunas object (tipo + texto)
+# ----------------------------------------------------------------------
+
+def _encode_value(value: Any) -> Tuple[str, Optional[str]]:
+    if value is None:
+        return "n", None
+    if isinstance(value, (bool, np.bool_)):
+        return "b", "1" if value else "0"
+    if isinstance(value, (int, np.integer)):
+        return "i", str(int(value))
+    if isinstance(value, (float, np.floating)):
+        return "f", repr(float(value))
+    if isinstance(value, str):
+        return "s", value
+    if isinstance(value, pd.Timestamp):
+        return "T", value.isoformat()
+    if isinstance(value, datetime):
+        return "d", value.isoformat()
+    if isinstance(value, date):
+        return "D", value.isoformat()
+    if isinstance(value, dt_time):
+        return "t", value.isoformat()
+    raise TypeError(f"tipo não suportado no cache colunar: {type(value).__name__}")
+
+
+def _decode_value(tag: str, text: Optional[str]) -> Any:
+    if tag == "s":
+        return text
+    if tag == "f":
+        return float(text)
+    if tag == "i":
+        return int(text)
+    if tag == "d":
+        return datetime.fromisoformat(text)
+    if tag == "T":
+        return pd.Timestamp(text)
+    if tag == "D":
+        return date.fromisoformat(text)
+    if tag == "t":
+        return dt_time.fromisoformat(text)
+    if tag == "b":
+        return text == "1"
+    return None
+
+
+def _decode_column(texts: pd.Series, tags: pd.Series) -> pd.Series:
+    """
+    Reconstrói uma coluna ``tagged`` com uma conversão vetorizada por tipo
+    (máscara do tipo + pd.to_numeric/pd.to_datetime na fatia), sem decodificar
+    célula a célula.
+    """
+    values = np.full(len(texts), None, dtype=object)
+    for tag in tags.unique():
+        mask = (tags == tag).to_numpy()
+        chunk = texts[mask]
+        if tag == "s":
+            decoded = chunk.to_numpy(dtype=object)
+        elif tag == "f":
+            # astype aceita "nan"/"inf" gravados por repr(); to_numeric não
+            decoded = chunk.astype("float64").to_numpy(dtype=object)
+        elif tag == "i":
+            decoded = pd.to_numeric(chunk).to_numpy(dtype=object)
+        elif tag == "d":
+            parsed = pd.to_datetime(chunk, format="ISO8601")
+            decoded = parsed.to_numpy(dtype="datetime64[us]").astype(object)
+        elif tag == "T":
+            decoded = pd.to_datetime(chunk, format="ISO8601").to_numpy(dtype=object)
+        elif tag == "D":
+            parsed = pd.to_datetime(chunk, format="ISO8601")
+            decoded = parsed.to_numpy(dtype="datetime64[D]").astype(object)
+        elif tag == "t":
+            parsed = pd.to_datetime("1970-01-01T" + chunk, format="ISO8601")
+            decoded = parsed.dt.time.to_numpy(dtype=object)
+        elif tag == "b":
+            decoded = (chunk == "1").to_numpy(dtype=object)
+        else:
+            continue
+        values[mask] = decoded
+    return pd.Series(values, dtype=object)
+
+
+def _frame_to_table(df: pd.DataFrame) -> "pa.Table":
+    arrays: List["pa.Array"] = []
+    names: List[str] = []
+    kinds: List[str] = []
+    for position in range(df.shape[1]):
+        series = df.iloc[:, position]
+        field = f"c{position}"
+        if series.dtype != object:
+            arrays.append(pa.array(series))
+            names.append(field)
+            kinds.append("native")
+            continue
+        try:
+            native = pa.array(series, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            native = None
+        if native is not None and (pa.types.is_string(native.type) or pa.types.is_null(native.type)):
+            # Texto puro: vazios (NaN) voltam como NaN na leitura
+            arrays.append(native.cast(pa.string()))
+            names.append(field)
+            kinds.append("text")
+            continue
+        encoded = [_encode_value(value) for value in series.tolist()]
+        arrays.append(pa.array([text for _, text in encoded], type=pa.string()))
+        arrays.append(pa.array([tag for tag, _ in encoded], type=pa.string()))
+        names.extend([field, f"{field}__tag"])
+        kinds.append("tagged")
+
+    metadata = {
+        "version": _FORMAT_VERSION,
+        "rows": int(len(df)),
+        "columns": [list(_encode_value(name)) for name in df.columns],
+        "kinds": kinds,
+    }
+    schema = pa.schema(
+        [pa.field(name, array.type) for name, array in zip(names, arrays)],
+        metadata={_METADATA_KEY: json.dumps(metadata, ensure_ascii=True).encode("utf-8")},
+    )
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _table_to_frame(table: "pa.Table") -> pd.DataFrame:
+    metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+    columns = []
+    for position, kind in enumerate(metadata["kinds"]):
+        field = f"c{position}"
+        if kind == "tagged":
+            values = _decode_column(
+                table.column(field).to_pandas(),
+                table.column(f"{field}__tag").to_pandas(),
+            )
+        else:
+            values = table.column(field).to_pandas()
+            if kind == "text":
+                values = values.astype(object).where(values.notna(), np.nan)
+        columns.append(values.reset_index(drop=True))
+
+    frame = pd.concat(columns, axis=1, ignore_index=True) if columns else pd.DataFrame(index=range(metadata["rows"]))
+    frame.columns = pd.Index([_decode_value(tag, text) for tag, text in metadata["columns"]])
+    return frame
+
+
+class SheetColumnarCache:
+    """Arquivos Arrow IPC por (versão da planilha, aba, header)"""
+
+    @staticmethod
+    def available() -> bool:
+        return pa is not None and SHEET_COLUMNAR_CACHE_ENABLED
+
+    @staticmethod
+    def _path(workbook_id: str, sheet_name: str, header: Optional[int]) -> Path:
+        key = hashlib.sha1(json.dumps([sheet_name, header], ensure_ascii=True).encode("utf-8")).hexdigest()
+        return Path(SHEET_COLUMNAR_CACHE_DIR) / workbook_id / f"{key}.arrow"
+
+    @staticmethod
+    def load(
+        workbook_id: str,
+        sheet_name: str,
+        header: Optional[int],
+        build: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """
+        Retorna a aba a partir do arquivo Arrow; na primeira vez chama
+        ``build`` (leitura do xlsx) e grava o resultado.
+        """
+        if not SheetColumnarCache.available():
+            return build()
+
+        path = SheetColumnarCache._path(workbook_id, sheet_name, header)
+        if path.exists():
+            try:
+                with pa.memory_map(str(path), "r") as source:
+                    return _table_to_frame(pa.ipc.open_file(source).read_all())
+            except (OSError, ValueError, KeyError, pa.ArrowException) as exc:
+                print(f"⚠️ [SheetColumnarCache] Arquivo inválido {path.name}: {exc}")
+                path.unlink(missing_ok=True)
+
+        frame = build()
+        try:
+            table = _frame_to_table(frame)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Escrita atômica (outro processo pode estar lendo)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with pa.OSFile(str(tmp_path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError, pa.ArrowException) as exc:
+            print(f"⚠️ [SheetColumnarCache] Aba '{sheet_name}' não convertida: {exc}")
+        return frame
+
+    @staticmethod
+    def discard(workbook_id: str) -> None:
+        shutil.rmtree(Path(SHEET_COLUMNAR_CACHE_DIR) / workbook_id, ignore_errors=True)
+
+    @staticmethod
+    def purge(max_age_seconds: float, now: Optional[float] = None) -> int:
+        """Remove versões de planilha sem uso (mtime do diretório) há mais de ``max_age_seconds``"""
+        directory = Path(SHEET_COLUMNAR_CACHE_DIR)
+        if not directory.exists():
+            return 0
+        cutoff = (time.time() if now is None else now) - max_age_seconds
+        removed = 0
+        for workbook_dir in directory.iterdir():
+            if workbook_dir.is_dir() and workbook_dir.stat().st_mtime < cutoff:
+                shutil.rmtree(workbook_dir, ignore_errors=True)
+                removed += 1
+        return removed
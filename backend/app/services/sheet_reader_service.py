@@ -0,0 +1,156 @@
+"""
+Leitura em lote da planilha de fluxo de caixa diário (Google Sheets)
+
+Os extratos de caixa, investimentos e contas bancárias leem o bloco de saldos
+(linhas 174-184) de cada aba mensal ``FC-diário-<Mês><Ano>``. Antes era uma
+chamada ``values().get`` por mês e por rótulo; aqui todas as abas são lidas
+em um único ``values().batchGet`` e o resultado fica em cache por planilha,
+servindo qualquer rótulo a partir do mesmo snapshot.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Bloco de saldos diários: coluna B = rótulo, C..AF = dias 1..30/31
+DAILY_BALANCE_FIRST_ROW = 174
+DAILY_BALANCE_RANGE = f"B{DAILY_BALANCE_FIRST_ROW}:AF184"
+
+SHEET_READER_CACHE_TTL_SECONDS = int(os.getenv("SHEET_READER_CACHE_TTL_SECONDS", "300"))
+SHEET_READER_CACHE_MAX_SIZE = int(os.getenv("SHEET_READER_CACHE_MAX_SIZE", "32"))
+
+SheetRows = List[List[str]]
+DailyGrid = Dict[str, SheetRows]
+
+_GridKey = Tuple[str, Tuple[str, ...]]
+
+_GRID_CACHE: "OrderedDict[_GridKey, Tuple[float, DailyGrid]]" = OrderedDict()
+_GRID_CACHE_LOCK = threading.Lock()
+_GRID_LOCKS: Dict[_GridKey, threading.Lock] = {}
+_GRID_LOCKS_GUARD = threading.Lock()
+
+
+def daily_sheet_range(month_suffix: str) -> str:
+    return f"'FC-diário-{month_suffix}'!{DAILY_BALANCE_RANGE}"
+
+
+class SheetReaderService:
+    """Snapshot em cache das abas FC-diário-* de uma planilha"""
+
+    @staticmethod
+    def _lock_for(key: _GridKey) -> threading.Lock:
+        with _GRID_LOCKS_GUARD:
+            return _GRID_LOCKS.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def _cached(key: _GridKey) -> Optional[DailyGrid]:
+        with _GRID_CACHE_LOCK:
+            entry = _GRID_CACHE.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= SHEET_READER_CACHE_TTL_SECONDS:
+                del _GRID_CACHE[key]
+                return None
+            _GRID_CACHE.move_to_end(key)
+            return entry[1]
+
+    @staticmethod
+    def _store(key: _GridKey, grid: DailyGrid) -> None:
+        if SHEET_READER_CACHE_MAX_SIZE <= 0:
+            return
+        with _GRID_CACHE_LOCK:
+            _GRID_CACHE[key] = (time.time(), grid)
+            _GRID_CACHE.move_to_end(key)
+            while len(_GRID_CACHE) > SHEET_READER_CACHE_MAX_SIZE:
+                evicted, _ = _GRID_CACHE.popitem(last=False)
+                with _GRID_LOCKS_GUARD:
+                    _GRID_LOCKS.pop(evicted, None)
+
+    @staticmethod
+    def _fetch(service, spreadsheet_id: str, month_suffixes: Sequence[str]) -> DailyGrid:
+        ranges = [daily_sheet_range(suffix) for suffix in month_suffixes]
+        try:
+            result = (
+                service.spreadsheets()
+                .values()
+                .batchGet(spreadsheetId=spreadsheet_id, ranges=ranges)
+                .execute()
+            )
+            value_ranges = result.get("valueRanges", [])
+            return {
+                suffix: (value_ranges[index].get("values", []) if index < len(value_ranges) else [])
+                for index, suffix in enumerate(month_suffixes)
+            }
+        except Exception as exc:
+            # batchGet falha inteiro se alguma aba não existir: lê aba a aba,
+            # ignorando as ausentes (mesmo comportamento da leitura por mês)
+            print(f"⚠️ [SheetReader] batchGet falhou ({exc}); lendo abas individualmente")
+
+        grid: DailyGrid = {}
+        for suffix, range_label in zip(month_suffixes, ranges):
+            try:
+                result = (
+                    service.spreadsheets()
+                    .values()
+                    .get(spreadsheetId=spreadsheet_id, range=range_label)
+                    .execute()
+                )
+            except Exception:
+                continue
+            grid[suffix] = result.get("values", [])
+        return grid
+
+    @staticmethod
+    def get_daily_grid(
+        service_factory: Callable[[], Optional[object]],
+        spreadsheet_id: str,
+        month_suffixes: Sequence[str],
+    ) -> Optional[DailyGrid]:
+        """
+        Retorna ``{sufixo_do_mês: linhas}`` do bloco de saldos de cada aba.
+
+        ``service_factory`` só é chamado quando o snapshot não está em cache
+        (evita autenticar a cada requisição). Retorna None se não houver
+        serviço disponível (ex.: falha de credenciais).
+        """
+        key = (spreadsheet_id, tuple(month_suffixes))
+        cached = SheetReaderService._cached(key)
+        if cached is not None:
+            return cached
+
+        # Um único download por planilha mesmo com requisições concorrentes
+        with SheetReaderService._lock_for(key):
+            cached = SheetReaderService._cached(key)
+            if cached is not None:
+                return cached
+
+            service = service_factory()
+            if service is None:
+                return None
+
+            grid = SheetReaderService._fetch(service, spreadsheet_id, month_suffixes)
+            if grid:
+                # Falha total (rede/credencial) não fica em cache
+                SheetReaderService._store(key, grid)
+            return grid
+
+    @staticmethod
+    def find_row(
+        rows: SheetRows,
+        normalized_label: str,
+        normalize: Callable[[str], str],
+    ) -> Optional[List[str]]:
+        """Primeira linha cujo rótulo (coluna B) normalizado coincide"""
+        for row in rows:
+            if row and normalize(row[0]) == normalized_label:
+                return row
+        return None
+
+    @staticmethod
+    def invalidate(spreadsheet_id: Optional[str] = None) -> None:
+        with _GRID_CACHE_LOCK:
+            for key in list(_GRID_CACHE.keys()):
+                if spreadsheet_id is None or key[0] == spreadsheet_id:
+                    _GRID_CACHE.pop(key, None)
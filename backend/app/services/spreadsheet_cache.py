@@ -0,0 +1,268 @@
+"""
+Cache de planilhas (Google Sheets exportadas em xlsx)
+
+Substitui o dicionário de bytes com TTL fixo do dashboard por um cache em
+duas camadas:
+
+- memória: LRU limitado por número de planilhas, guardando os bytes e as abas
+  já convertidas em DataFrame (cada aba é lida uma única vez por versão, e a
+  conversão fica salva em Arrow pelo ``SheetColumnarCache``);
+- disco (opcional, ``SPREADSHEET_CACHE_DIR``): bytes + validadores HTTP,
+  compartilhados entre processos/reinícios e também limitados em tamanho.
+
+A chave é a URL normalizada; a versão é dada por ETag/Last-Modified (ou,
+sem validadores, pelo hash do conteúdo). Após o TTL a planilha é revalidada
+com GET condicional (If-None-Match / If-Modified-Since): um 304 reaproveita
+bytes e DataFrames já processados. O download usa ``SpreadsheetDownloader``
+(streaming, com limite de tamanho).
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from app.services.sheet_columnar_cache import SheetColumnarCache
+from app.services.spreadsheet_downloader import SpreadsheetDownloader
+
+SPREADSHEET_CACHE_TTL_SECONDS = int(os.getenv("SPREADSHEET_CACHE_TTL_SECONDS", "300"))
+SPREADSHEET_CACHE_MAX_ENTRIES = int(os.getenv("SPREADSHEET_CACHE_MAX_ENTRIES", "16"))
+SPREADSHEET_CACHE_DIR = os.getenv("SPREADSHEET_CACHE_DIR")
+SPREADSHEET_CACHE_DISK_MAX_BYTES = int(os.getenv("SPREADSHEET_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+def normalize_spreadsheet_url(spreadsheet_url: str) -> str:
+    """Converte links do Google Sheets na URL de exportação xlsx"""
+    spreadsheet_url = spreadsheet_url.strip()
+    if "docs.google.com/spreadsheets" not in spreadsheet_url:
+        return spreadsheet_url
+    match = re.search(r"/spreadsheets/d/([a-zA-Z0-9_-]+)", spreadsheet_url)
+    if match:
+        sheet_id = match.group(1)
+        return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=xlsx"
+    base_url = spreadsheet_url.split("?")[0].split("#")[0]
+    if base_url.endswith("/edit"):
+        base_url = base_url[:-5]
+    return f"{base_url}/export?format=xlsx"
+
+
+class CachedWorkbook:
+    """Uma versão de planilha: bytes, validadores HTTP e abas já lidas"""
+
+    def __init__(
+        self,
+        url: str,
+        content: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ):
+        self.url = url
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = hashlib.sha256(content).hexdigest()
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self._excel: Optional[pd.ExcelFile] = None
+        self._frames: Dict[Tuple[str, Optional[int]], pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """Identificador da versão: ETag, Last-Modified ou hash do conteúdo"""
+        return self.etag or self.last_modified or self.content_hash
+
+    def _excel_file(self) -> pd.ExcelFile:
+        if self._excel is None:
+            self._excel = pd.ExcelFile(io.BytesIO(self.content))
+        return self._excel
+
+    @property
+    def sheet_names(self) -> List[str]:
+        with self._lock:
+            return list(self._excel_file().sheet_names)
+
+    def frame(self, sheet_name: str, header: Optional[int] = 0) -> pd.DataFrame:
+        """
+        Retorna a aba como DataFrame (cópia), lendo o xlsx apenas na primeira vez.
+        """
+        key = (sheet_name, header)
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is None:
+                cached = SheetColumnarCache.load(
+                    self.content_hash,
+                    sheet_name,
+                    header,
+                    lambda: pd.read_excel(self._excel_file(), sheet_name=sheet_name, header=header),
+                )
+                self._frames[key] = cached
+        return cached.copy()
+
+
+_MEMORY_CACHE: "OrderedDict[str, CachedWorkbook]" = OrderedDict()
+_MEMORY_LOCK = threading.Lock()
+
+
+class SpreadsheetCache:
+    """Cache LRU (memória + disco opcional) de planilhas baixadas por URL"""
+
+    # ------------------------------------------------------------------
+    # Camada de disco
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _disk_paths(url: str) -> Optional[Tuple[Path, Path]]:
+        if not SPREADSHEET_CACHE_DIR:
+            return None
+        directory = Path(SPREADSHEET_CACHE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return directory / f"{digest}.xlsx", directory / f"{digest}.json"
+
+    @staticmethod
+    def _load_from_disk(url: str) -> Optional[CachedWorkbook]:
+        paths = SpreadsheetCache._disk_paths(url)
+        if not paths or not paths[0].exists() or not paths[1].exists():
+            return None
+        try:
+            meta = json.loads(paths[1].read_text())
+            content = paths[0].read_bytes()
+            if hashlib.sha256(content).hexdigest() != meta.get("content_hash"):
+                return None
+            os.utime(paths[0])  # LRU do disco por mtime
+            return CachedWorkbook(
+                url,
+                content,
+                etag=meta.get("etag"),
+                last_modified=meta.get("last_modified"),
+                fetched_at=meta.get("fetched_at"),
+            )
+        except (OSError, ValueError) as exc:
+            print(f"⚠️ [SpreadsheetCache] Falha ao ler cache em disco: {exc}")
+            return None
+
+    @staticmethod
+    def _save_to_disk(workbook: CachedWorkbook, content_changed: bool = True) -> None:
+        paths = SpreadsheetCache._disk_paths(workbook.url)
+        if not paths:
+            return
+        data_path, meta_path = paths
+        meta = {
+            "url": workbook.url,
+            "etag": workbook.etag,
+            "last_modified": workbook.last_modified,
+            "content_hash": workbook.content_hash,
+            "fetched_at": workbook.fetched_at,
+        }
+        try:
+            # Escrita atômica (outro processo pode estar lendo)
+            if content_changed or not data_path.exists():
+                tmp_data = data_path.with_suffix(".xlsx.tmp")
+                tmp_data.write_bytes(workbook.content)
+                os.replace(tmp_data, data_path)
+            tmp_meta = meta_path.with_suffix(".json.tmp")
+            tmp_meta.write_text(json.dumps(meta))
+            os.replace(tmp_meta, meta_path)
+            SpreadsheetCache._evict_disk(Path(SPREADSHEET_CACHE_DIR))
+        except OSError as exc:
+            print(f"⚠️ [SpreadsheetCache] Falha ao gravar cache em disco: {exc}")
+
+    @staticmethod
+    def _evict_disk(directory: Path) -> None:
+        files = sorted(directory.glob("*.xlsx"), key=lambda path: path.stat().st_mtime)
+        total = sum(path.stat().st_size for path in files)
+        while files and total > SPREADSHEET_CACHE_DISK_MAX_BYTES:
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+            oldest.with_suffix(".json").unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # Camada de memória
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _remember(workbook: CachedWorkbook) -> None:
+        with _MEMORY_LOCK:
+            _MEMORY_CACHE[workbook.url] = workbook
+            _MEMORY_CACHE.move_to_end(workbook.url)
+            while len(_MEMORY_CACHE) > SPREADSHEET_CACHE_MAX_ENTRIES:
+                _MEMORY_CACHE.popitem(last=False)
+
+    @staticmethod
+    def invalidate(spreadsheet_url: Optional[str] = None) -> None:
+        """Remove uma planilha (ou todas) da memória; o disco é revalidado por HTTP"""
+        with _MEMORY_LOCK:
+            if spreadsheet_url is None:
+                _MEMORY_CACHE.clear()
+            else:
+                _MEMORY_CACHE.pop(normalize_spreadsheet_url(spreadsheet_url), None)
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_workbook(spreadsheet_url: str, max_age: Optional[int] = None) -> CachedWorkbook:
+        """
+        Retorna a planilha, baixando/revalidando apenas quando necessário.
+
+        - dentro do TTL: memória (ou disco) sem requisição;
+        - após o TTL: GET condicional; 304 reaproveita a versão em cache;
+        - 200 com o mesmo conteúdo também reaproveita as abas já lidas.
+        """
+        url = normalize_spreadsheet_url(spreadsheet_url)
+        ttl = SPREADSHEET_CACHE_TTL_SECONDS if max_age is None else max_age
+
+        with _MEMORY_LOCK:
+            cached = _MEMORY_CACHE.get(url)
+            if cached is not None:
+                _MEMORY_CACHE.move_to_end(url)
+
+        if cached is None:
+            cached = SpreadsheetCache._load_from_disk(url)
+            if cached is not None:
+                SpreadsheetCache._remember(cached)
+
+        if cached is not None and time.time() - cached.fetched_at < ttl:
+            return cached
+
+        with tempfile.TemporaryDirectory(prefix="finaflow-sheet-") as tmp_dir:
+            result = SpreadsheetDownloader.download_sync(
+                url,
+                Path(tmp_dir) / "workbook.xlsx",
+                etag=cached.etag if cached is not None else None,
+                last_modified=cached.last_modified if cached is not None else None,
+            )
+            content = result.path.read_bytes() if not result.not_modified else b""
+
+        if result.not_modified and cached is not None:
+            cached.fetched_at = time.time()
+            SpreadsheetCache._save_to_disk(cached, content_changed=False)
+            return cached
+
+        etag = result.etag
+        last_modified = result.last_modified
+
+        if cached is not None and result.sha256 == cached.content_hash:
+            # Mesmo conteúdo sem validadores: mantém as abas já processadas
+            cached.etag = etag or cached.etag
+            cached.last_modified = last_modified or cached.last_modified
+            cached.fetched_at = time.time()
+            SpreadsheetCache._save_to_disk(cached, content_changed=False)
+            return cached
+
+        workbook = CachedWorkbook(url, content, etag=etag, last_modified=last_modified)
+        SpreadsheetCache._remember(workbook)
+        SpreadsheetCache._save_to_disk(workbook)
+        return workbook
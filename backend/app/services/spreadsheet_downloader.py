@@ -0,0 +1,173 @@
+"""
+Download de planilhas em streaming (httpx assíncrono)
+
+O conteúdo é gravado em disco em blocos à medida que chega, com hash sha256
+calculado no caminho, em vez de manter a resposta inteira em memória. A
+escrita e o hash de cada bloco rodam em thread (``asyncio.to_thread``) para
+não bloquear o event loop das rotas assíncronas. O
+tamanho máximo (``SPREADSHEET_DOWNLOAD_MAX_BYTES``) é verificado pelo
+Content-Length e também durante o streaming, e o download é interrompido ao
+ultrapassá-lo. Validadores (ETag/Last-Modified) permitem GET condicional: um
+304 não transfere conteúdo.
+
+Rotas ``async def`` usam ``SpreadsheetDownloader.download`` diretamente; código
+síncrono (worker do onboarding, cache do dashboard) usa ``download_sync``.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import httpx
+
+SPREADSHEET_DOWNLOAD_TIMEOUT = int(os.getenv("SPREADSHEET_DOWNLOAD_TIMEOUT", "30"))
+SPREADSHEET_DOWNLOAD_MAX_BYTES = int(os.getenv("SPREADSHEET_DOWNLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+SPREADSHEET_DOWNLOAD_CHUNK_BYTES = 256 * 1024
+
+# (bytes recebidos, total pelo Content-Length ou None)
+DownloadProgress = Callable[[int, Optional[int]], None]
+
+
+class SpreadsheetDownloadError(Exception):
+    """Falha de rede ou resposta HTTP de erro ao baixar a planilha"""
+
+
+class SpreadsheetTooLargeError(SpreadsheetDownloadError):
+    """Planilha maior que ``SPREADSHEET_DOWNLOAD_MAX_BYTES``"""
+
+
+class DownloadResult:
+    """Resultado de um download: arquivo gravado ou 304 (``not_modified``)"""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        path: Optional[Path] = None,
+        size: int = 0,
+        sha256: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+def _write_chunk(sink, digest, chunk: bytes) -> None:
+    sink.write(chunk)
+    digest.update(chunk)
+
+
+def _create_client() -> httpx.AsyncClient:
+    # Exportação do Google Sheets responde com redirect para o arquivo
+    return httpx.AsyncClient(timeout=SPREADSHEET_DOWNLOAD_TIMEOUT, follow_redirects=True)
+
+
+class SpreadsheetDownloader:
+    """Download assíncrono em streaming com limite de tamanho"""
+
+    @staticmethod
+    async def download(
+        url: str,
+        destination: Path,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        progress: Optional[DownloadProgress] = None,
+    ) -> DownloadResult:
+        """
+        Baixa ``url`` para ``destination`` (gravação atômica via arquivo
+        temporário no mesmo diretório).
+
+        Com ``etag``/``last_modified`` envia GET condicional; em 304 nada é
+        gravado e o resultado tem ``not_modified`` verdadeiro.
+        """
+        limit = SPREADSHEET_DOWNLOAD_MAX_BYTES if max_bytes is None else max_bytes
+        headers: Dict[str, str] = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        destination = Path(destination)
+        await asyncio.to_thread(destination.parent.mkdir, parents=True, exist_ok=True)
+        tmp_path = destination.with_name(f"{destination.name}.{os.getpid()}.{threading.get_ident()}.part")
+
+        try:
+            async with _create_client() as client:
+                async with client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 304:
+                        return DownloadResult(url, 304, etag=etag, last_modified=last_modified)
+                    response.raise_for_status()
+
+                    declared = response.headers.get("Content-Length")
+                    total = int(declared) if declared and declared.isdigit() else None
+                    if total is not None and total > limit:
+                        raise SpreadsheetTooLargeError(
+                            f"Planilha com {total} bytes excede o limite de {limit} bytes"
+                        )
+
+                    digest = hashlib.sha256()
+                    received = 0
+                    sink = await asyncio.to_thread(open, tmp_path, "wb")
+                    try:
+                        async for chunk in response.aiter_bytes(SPREADSHEET_DOWNLOAD_CHUNK_BYTES):
+                            received += len(chunk)
+                            if received > limit:
+                                raise SpreadsheetTooLargeError(
+                                    f"Planilha excede o limite de {limit} bytes"
+                                )
+                            await asyncio.to_thread(_write_chunk, sink, digest, chunk)
+                            if progress is not None:
+                                progress(received, total)
+                    finally:
+                        await asyncio.to_thread(sink.close)
+
+                    await asyncio.to_thread(os.replace, tmp_path, destination)
+                    return DownloadResult(
+                        url,
+                        response.status_code,
+                        path=destination,
+                        size=received,
+                        sha256=digest.hexdigest(),
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                    )
+        except httpx.HTTPStatusError as exc:
+            raise SpreadsheetDownloadError(f"HTTP {exc.response.status_code} ao baixar planilha") from exc
+        except httpx.HTTPError as exc:
+            raise SpreadsheetDownloadError(f"Falha ao baixar planilha: {exc}") from exc
+        finally:
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+
+    @staticmethod
+    def download_sync(url: str, destination: Path, **kwargs) -> DownloadResult:
+        """``download`` para código síncrono (threads sem event loop)"""
+        return asyncio.run(SpreadsheetDownloader.download(url, destination, **kwargs))
+
+
+def throttled_progress(callback: DownloadProgress, interval: float = 1.0) -> DownloadProgress:
+    """Repassa o progresso no máximo uma vez por ``interval`` segundos (e ao completar)"""
+    last = [0.0]
+
+    def _report(received: int, total: Optional[int]) -> None:
+        now = time.monotonic()
+        if now - last[0] >= interval or (total is not None and received >= total):
+            last[0] = now
+            callback(received, total)
+
+    return _report
@@ -0,0 +1,373 @@
+"""
+Snapshots de planilhas do onboarding (armazenamento endereçado por conteúdo)
+
+Cada download é gravado (em streaming, via ``SpreadsheetDownloader``) uma
+única vez em ``SPREADSHEET_SNAPSHOT_DIR`` como ``<sha256>.xlsx`` +
+``<sha256>.json`` (URL, fetched_at, abas, origem, validadores HTTP). O id do
+snapshot é o hash: validação, importação e conciliação usam o mesmo arquivo,
+e planilhas corrigidas viram um novo snapshot derivado do original.
+
+As leituras (abas em DataFrame e resultados derivados, como os totais da
+conciliação) ficam em um LRU em memória por arquivo; abaixo dele, cada aba é
+convertida uma única vez para Arrow (``SheetColumnarCache``) e as demais
+leituras, em qualquer processo, abrem o arquivo colunar. Snapshots mais antigos que a retenção (ou
+além do limite de arquivos) são removidos a cada gravação.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
+
+from app.services.sheet_columnar_cache import SheetColumnarCache
+from app.services.spreadsheet_cache import normalize_spreadsheet_url
+from app.services.spreadsheet_downloader import DownloadProgress, DownloadResult, SpreadsheetDownloader
+
+_DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parents[2] / "data" / "snapshots"
+SPREADSHEET_SNAPSHOT_DIR = os.getenv("SPREADSHEET_SNAPSHOT_DIR", str(_DEFAULT_SNAPSHOT_DIR))
+SPREADSHEET_SNAPSHOT_RETENTION_DAYS = int(os.getenv("SPREADSHEET_SNAPSHOT_RETENTION_DAYS", "30"))
+SPREADSHEET_SNAPSHOT_MAX_FILES = int(os.getenv("SPREADSHEET_SNAPSHOT_MAX_FILES", "200"))
+# Importação logo após a validação reaproveita o download dentro desta janela
+SPREADSHEET_SNAPSHOT_REUSE_SECONDS = int(os.getenv("SPREADSHEET_SNAPSHOT_REUSE_SECONDS", "600"))
+SPREADSHEET_PARSE_CACHE_SIZE = int(os.getenv("SPREADSHEET_PARSE_CACHE_SIZE", "32"))
+
+_SNAPSHOT_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_ParseKey = Tuple[str, int, int, Any]
+_PARSE_CACHE: "OrderedDict[_ParseKey, Any]" = OrderedDict()
+_PARSE_LOCK = threading.Lock()
+
+
+class SpreadsheetSnapshot:
+    """Um arquivo xlsx imutável identificado pelo hash do conteúdo"""
+
+    def __init__(
+        self,
+        snapshot_id: str,
+        path: Path,
+        url: Optional[str],
+        fetched_at: float,
+        size: int,
+        sheets: List[str],
+        parent_id: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        self.id = snapshot_id
+        self.path = path
+        self.url = url
+        self.fetched_at = fetched_at
+        self.size = size
+        self.sheets = sheets
+        self.parent_id = parent_id
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "url": self.url,
+            "fetched_at": self.fetched_at,
+            "size": self.size,
+            "sheets": self.sheets,
+            "parent_id": self.parent_id,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        }
+
+
+class SpreadsheetSnapshotStore:
+    """Armazenamento de snapshots + cache de leitura por arquivo"""
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _directory() -> Path:
+        directory = Path(SPREADSHEET_SNAPSHOT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    @staticmethod
+    def _from_meta(directory: Path, meta: Dict[str, Any]) -> SpreadsheetSnapshot:
+        return SpreadsheetSnapshot(
+            meta["id"],
+            directory / f"{meta['id']}.xlsx",
+            meta.get("url"),
+            float(meta.get("fetched_at") or 0),
+            int(meta.get("size") or 0),
+            list(meta.get("sheets") or []),
+            meta.get("parent_id"),
+            meta.get("etag"),
+            meta.get("last_modified"),
+        )
+
+    @staticmethod
+    def get(snapshot_id: Optional[str]) -> Optional[SpreadsheetSnapshot]:
+        if not snapshot_id or not _SNAPSHOT_ID_RE.match(snapshot_id):
+            return None
+        directory = SpreadsheetSnapshotStore._directory()
+        meta_path = directory / f"{snapshot_id}.json"
+        if not meta_path.exists() or not (directory / f"{snapshot_id}.xlsx").exists():
+            return None
+        try:
+            return SpreadsheetSnapshotStore._from_meta(directory, json.loads(meta_path.read_text()))
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"⚠️ [SnapshotStore] Metadados inválidos para {snapshot_id}: {exc}")
+            return None
+
+    @staticmethod
+    def _all() -> List[SpreadsheetSnapshot]:
+        directory = SpreadsheetSnapshotStore._directory()
+        snapshots = []
+        for meta_path in directory.glob("*.json"):
+            try:
+                snapshots.append(SpreadsheetSnapshotStore._from_meta(directory, json.loads(meta_path.read_text())))
+            except (OSError, ValueError, KeyError):
+                continue
+        return sorted(snapshots, key=lambda snapshot: snapshot.fetched_at)
+
+    @staticmethod
+    def latest_for_url(url: str) -> Optional[SpreadsheetSnapshot]:
+        """Último download (não derivado) da URL"""
+        url = normalize_spreadsheet_url(url)
+        matches = [s for s in SpreadsheetSnapshotStore._all() if s.url == url and s.parent_id is None]
+        return matches[-1] if matches else None
+
+    @staticmethod
+    def _register(
+        snapshot_id: str,
+        data_path: Path,
+        url: Optional[str],
+        parent_id: Optional[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> SpreadsheetSnapshot:
+        snapshot = SpreadsheetSnapshot(
+            snapshot_id,
+            data_path,
+            normalize_spreadsheet_url(url) if url else None,
+            time.time(),
+            data_path.stat().st_size,
+            SpreadsheetSnapshotStore.sheet_names(data_path),
+            parent_id,
+            etag,
+            last_modified,
+        )
+        tmp_meta = data_path.parent / f"{snapshot_id}.{os.getpid()}.json.tmp"
+        tmp_meta.write_text(json.dumps(snapshot.metadata(), ensure_ascii=True))
+        os.replace(tmp_meta, data_path.parent / f"{snapshot_id}.json")
+
+        SpreadsheetSnapshotStore.purge(keep=(snapshot_id, parent_id))
+        return snapshot
+
+    @staticmethod
+    def put(content: bytes, url: Optional[str] = None, parent_id: Optional[str] = None) -> SpreadsheetSnapshot:
+        """Grava o conteúdo (se ainda não existir) e retorna o snapshot"""
+        snapshot_id = hashlib.sha256(content).hexdigest()
+        directory = SpreadsheetSnapshotStore._directory()
+        data_path = directory / f"{snapshot_id}.xlsx"
+
+        # Escrita atômica (outro processo pode estar lendo)
+        if not data_path.exists():
+            tmp_data = directory / f"{snapshot_id}.{os.getpid()}.xlsx.tmp"
+            tmp_data.write_bytes(content)
+            os.replace(tmp_data, data_path)
+
+        return SpreadsheetSnapshotStore._register(snapshot_id, data_path, url, parent_id)
+
+    @staticmethod
+    def _reusable(url: str, max_age: Optional[int]) -> Tuple[Optional[SpreadsheetSnapshot], bool]:
+        """Último snapshot da URL e se ainda está dentro de ``max_age``"""
+        previous = SpreadsheetSnapshotStore.latest_for_url(url)
+        fresh = (
+            previous is not None
+            and max_age is not None
+            and time.time() - previous.fetched_at < max_age
+        )
+        return previous, fresh
+
+    @staticmethod
+    def _download_path() -> Path:
+        return SpreadsheetSnapshotStore._directory() / f"{uuid.uuid4().hex}.download"
+
+    @staticmethod
+    def _ingest(
+        result: DownloadResult,
+        url: str,
+        previous: Optional[SpreadsheetSnapshot],
+    ) -> SpreadsheetSnapshot:
+        """Registra o arquivo baixado (ou renova o snapshot anterior em 304)"""
+        if result.not_modified and previous is not None:
+            return SpreadsheetSnapshotStore._register(
+                previous.id, previous.path, url, None, previous.etag, previous.last_modified
+            )
+
+        data_path = result.path.parent / f"{result.sha256}.xlsx"
+        if data_path.exists():
+            result.path.unlink(missing_ok=True)
+        else:
+            os.replace(result.path, data_path)
+        return SpreadsheetSnapshotStore._register(
+            result.sha256, data_path, url, None, result.etag, result.last_modified
+        )
+
+    @staticmethod
+    def fetch(
+        spreadsheet_url: str,
+        max_age: Optional[int] = None,
+        progress: Optional[DownloadProgress] = None,
+    ) -> SpreadsheetSnapshot:
+        """
+        Baixa a planilha e grava o snapshot.
+
+        Com ``max_age`` um download da mesma URL feito há menos de
+        ``max_age`` segundos é reaproveitado sem nova requisição; fora da
+        janela, o último snapshot é revalidado com GET condicional.
+        """
+        url = normalize_spreadsheet_url(spreadsheet_url)
+        previous, fresh = SpreadsheetSnapshotStore._reusable(url, max_age)
+        if fresh:
+            return previous
+
+        result = SpreadsheetDownloader.download_sync(
+            url,
+            SpreadsheetSnapshotStore._download_path(),
+            etag=previous.etag if previous else None,
+            last_modified=previous.last_modified if previous else None,
+            progress=progress,
+        )
+        return SpreadsheetSnapshotStore._ingest(result, url, previous)
+
+    @staticmethod
+    async def fetch_async(
+        spreadsheet_url: str,
+        max_age: Optional[int] = None,
+        progress: Optional[DownloadProgress] = None,
+    ) -> SpreadsheetSnapshot:
+        """``fetch`` para rotas ``async def``: o download não bloqueia o event loop"""
+        url = normalize_spreadsheet_url(spreadsheet_url)
+        previous, fresh = await run_in_threadpool(SpreadsheetSnapshotStore._reusable, url, max_age)
+        if fresh:
+            return previous
+
+        result = await SpreadsheetDownloader.download(
+            url,
+            SpreadsheetSnapshotStore._download_path(),
+            etag=previous.etag if previous else None,
+            last_modified=previous.last_modified if previous else None,
+            progress=progress,
+        )
+        # Leitura das abas (openpyxl) e metadados fora do event loop
+        return await run_in_threadpool(SpreadsheetSnapshotStore._ingest, result, url, previous)
+
+    @staticmethod
+    def derive(
+        snapshot: SpreadsheetSnapshot,
+        transform: Callable[[Path], Any],
+    ) -> Tuple[SpreadsheetSnapshot, Any]:
+        """
+        Aplica ``transform`` (que edita o xlsx no lugar) sobre uma cópia do
+        snapshot e grava o resultado como novo snapshot derivado.
+        """
+        directory = SpreadsheetSnapshotStore._directory()
+        work_path = directory / f"{snapshot.id}.{os.getpid()}.{threading.get_ident()}.work.xlsx"
+        shutil.copyfile(snapshot.path, work_path)
+        try:
+            result = transform(work_path)
+            derived = SpreadsheetSnapshotStore.put(work_path.read_bytes(), snapshot.url, parent_id=snapshot.id)
+        finally:
+            work_path.unlink(missing_ok=True)
+        return derived, result
+
+    @staticmethod
+    def purge(keep: Tuple[Optional[str], ...] = (), now: Optional[float] = None) -> int:
+        """Remove snapshots além da retenção (idade e quantidade); retorna quantos saíram"""
+        now = time.time() if now is None else now
+        cutoff = now - SPREADSHEET_SNAPSHOT_RETENTION_DAYS * 86400
+        snapshots = SpreadsheetSnapshotStore._all()
+
+        removed = 0
+        for snapshot in snapshots:  # mais antigos primeiro
+            if snapshot.id in keep:
+                continue
+            over_limit = len(snapshots) - removed > SPREADSHEET_SNAPSHOT_MAX_FILES
+            if not over_limit and snapshot.fetched_at >= cutoff:
+                continue
+            snapshot.path.unlink(missing_ok=True)
+            snapshot.path.with_suffix(".json").unlink(missing_ok=True)
+            SheetColumnarCache.discard(snapshot.id)
+            removed += 1
+        # Abas convertidas de planilhas que não passam pelo store (dashboard)
+        SheetColumnarCache.purge(SPREADSHEET_SNAPSHOT_RETENTION_DAYS * 86400, now=now)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Leitura (cache em memória por arquivo)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def memoize(path: Path, key: Any, loader: Callable[[Path], Any]) -> Any:
+        """
+        Resultado de ``loader(path)`` em cache, invalidado quando o arquivo
+        muda (mtime/tamanho). O valor é compartilhado: não altere no lugar.
+        """
+        path = Path(path)
+        stat = path.stat()
+        cache_key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size, key)
+        with _PARSE_LOCK:
+            if cache_key in _PARSE_CACHE:
+                _PARSE_CACHE.move_to_end(cache_key)
+                return _PARSE_CACHE[cache_key]
+
+        value = loader(path)
+        with _PARSE_LOCK:
+            _PARSE_CACHE[cache_key] = value
+            _PARSE_CACHE.move_to_end(cache_key)
+            while len(_PARSE_CACHE) > SPREADSHEET_PARSE_CACHE_SIZE:
+                _PARSE_CACHE.popitem(last=False)
+        return value
+
+    @staticmethod
+    def sheet_names(path: Path) -> List[str]:
+        def _load(file_path: Path) -> List[str]:
+            with pd.ExcelFile(file_path, engine="openpyxl") as excel:
+                return list(excel.sheet_names)
+
+        return list(SpreadsheetSnapshotStore.memoize(path, ("sheet_names",), _load))
+
+    @staticmethod
+    def content_id(path: Path) -> str:
+        """sha256 do arquivo (o próprio nome, para snapshots do store)"""
+        path = Path(path)
+        if _SNAPSHOT_ID_RE.match(path.stem):
+            return path.stem
+        return SpreadsheetSnapshotStore.memoize(
+            path, ("sha256",), lambda file_path: hashlib.sha256(file_path.read_bytes()).hexdigest()
+        )
+
+    @staticmethod
+    def read_sheet(path: Path, sheet_name: str, header: Optional[int] = 0) -> pd.DataFrame:
+        """Aba como DataFrame (cópia), lida do xlsx apenas na primeira vez"""
+
+        def _load(file_path: Path) -> pd.DataFrame:
+            return SheetColumnarCache.load(
+                SpreadsheetSnapshotStore.content_id(file_path),
+                sheet_name,
+                header,
+                lambda: pd.read_excel(file_path, sheet_name=sheet_name, header=header, engine="openpyxl"),
+            )
+
+        frame = SpreadsheetSnapshotStore.memoize(path, ("sheet", sheet_name, header), _load)
+        return frame.copy()
@@ -0,0 +1,77 @@
+"""
+Resolução conta → tipo de transação
+
+O tipo (RECEITA, CUSTO, DESPESA) de um lançamento depende só da conta: da
+classificação gravada no grupo e do subgrupo da conta. O mapa conta → tipo
+é montado junto com a hierarquia do plano de contas em cache
+(``ChartHierarchy.account_types``), de modo que criação, atualização e
+importadores resolvem o tipo com uma consulta a dicionário, sem reler o
+grupo nem comparar nomes a cada linha.
+
+``backfill`` corrige os lançamentos já gravados do tenant com um único
+UPDATE por tabela.
+"""
+
+from typing import Dict, Mapping, Type
+
+from sqlalchemy import case, literal, update
+from sqlalchemy.orm import Session
+
+from app.models.lancamento_diario import LancamentoDiario
+from app.models.lancamento_previsto import LancamentoPrevisto
+from app.services.chart_hierarchy_cache import ChartHierarchyCache
+from app.services.lancamento_rollup_service import LancamentoRollupService
+
+
+class TransactionTypeResolver:
+    """Tipo de transação por conta, a partir do plano de contas em cache"""
+
+    @staticmethod
+    def account_types(db: Session, tenant_id: str) -> Mapping[str, str]:
+        """Mapa conta → tipo das contas ativas visíveis ao tenant (próprias e globais)"""
+        return ChartHierarchyCache.visible(db, tenant_id).account_types
+
+    @staticmethod
+    def resolve(db: Session, tenant_id: str, conta_id: str, enum_type: Type, default=None):
+        """Tipo da conta no enum do modelo (``enum_type``); ``default`` se a conta não está no plano"""
+        value = TransactionTypeResolver.account_types(db, tenant_id).get(str(conta_id))
+        return enum_type(value) if value else default
+
+    @staticmethod
+    def backfill(db: Session, tenant_id: str) -> Dict[str, int]:
+        """
+        Regrava o tipo dos lançamentos diários e previstos do tenant conforme
+        o mapa conta → tipo (um UPDATE ... SET transaction_type = CASE conta_id
+        por tabela, só nas linhas divergentes) e reconstrói o rollup se algum
+        lançamento diário mudou. Não faz commit.
+        """
+        tenant_id = str(tenant_id)
+        account_types = TransactionTypeResolver.account_types(db, tenant_id)
+        updated = {LancamentoDiario.__tablename__: 0, LancamentoPrevisto.__tablename__: 0}
+        if not account_types:
+            return updated
+
+        for model in (LancamentoDiario, LancamentoPrevisto):
+            column_type = model.transaction_type.type
+            resolved = case(
+                {
+                    conta_id: literal(column_type.enum_class(value), column_type)
+                    for conta_id, value in account_types.items()
+                },
+                value=model.conta_id,
+            )
+            result = db.execute(
+                update(model)
+                .where(
+                    model.tenant_id == tenant_id,
+                    model.conta_id.in_(list(account_types)),
+                    model.transaction_type.is_distinct_from(resolved),
+                )
+                .values(transaction_type=resolved)
+                .execution_options(synchronize_session=False)
+            )
+            updated[model.__tablename__] = result.rowcount or 0
+
+        if updated[LancamentoDiario.__tablename__]:
+            LancamentoRollupService.rebuild(db, tenant_id)
+        return updated
@@ -0,0 +1,115 @@
+"""
+Cache em processo do usuário autenticado.
+
+``get_current_user`` roda em toda requisição autenticada. Em vez de consultar
+``users`` a cada chamada, guardamos por alguns segundos um snapshot das colunas
+do usuário (identidade, role, status) e o reanexamos à sessão da requisição sem
+SELECT.
+
+Chave: ``(user_id, versão)``. ``invalidate`` (mudança de status, role,
+senha...) dá ao usuário uma nova versão, o que torna inalcançáveis as entradas
+antigas. As versões vêm de um contador global e nunca se repetem; o mapa de
+versões tem o mesmo limite LRU do cache, e descartar a versão de um usuário só
+faz a chave voltar a ``(user_id, 0)``, removida do cache na primeira
+invalidação. Como o cache é por processo, o TTL curto limita a defasagem entre
+workers/instâncias.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from app.models.auth import User
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_SIZE = int(os.getenv("AUTH_USER_CACHE_MAX_SIZE", "1024"))
+
+_CacheKey = Tuple[str, int]
+
+_USER_CACHE: "OrderedDict[_CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_USER_VERSIONS: "OrderedDict[str, int]" = OrderedDict()
+_USER_VERSION_COUNTER = itertools.count(1)
+_USER_CACHE_LOCK = threading.Lock()
+
+
+class AuthenticatedUserCache:
+    """Cache TTL + LRU do usuário autenticado (snapshot das colunas de ``users``)"""
+
+    @staticmethod
+    def _key(user_id: str) -> _CacheKey:
+        return (str(user_id), _USER_VERSIONS.get(str(user_id), 0))
+
+    @staticmethod
+    def snapshot(user: User) -> Dict[str, Any]:
+        """Valores das colunas do usuário como estão no banco"""
+        return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+    @staticmethod
+    def get(db: Session, user_id: str) -> Optional[User]:
+        """
+        Retorna o usuário do cache já anexado à sessão (sem SELECT), ou None.
+        """
+        now = time.monotonic()
+        with _USER_CACHE_LOCK:
+            key = AuthenticatedUserCache._key(user_id)
+            entry = _USER_CACHE.get(key)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= now:
+                del _USER_CACHE[key]
+                return None
+            _USER_CACHE.move_to_end(key)
+
+        # Usuário já carregado nesta sessão: reutilizar a instância
+        existing = db.identity_map.get(identity_key(User, str(user_id)))
+        if existing is not None:
+            return existing
+
+        user = User(**values)
+        # Marca como "carregado do banco": sem INSERT no flush, apenas UPDATE
+        # de atributos alterados, e relacionamentos com lazy load normal.
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    @staticmethod
+    def put(user: User) -> None:
+        """Guarda o snapshot do usuário (chamar antes de aplicar contexto do token)"""
+        if USER_CACHE_TTL_SECONDS <= 0 or USER_CACHE_MAX_SIZE <= 0:
+            return
+        values = AuthenticatedUserCache.snapshot(user)
+        with _USER_CACHE_LOCK:
+            key = AuthenticatedUserCache._key(user.id)
+            _USER_CACHE[key] = (time.monotonic() + USER_CACHE_TTL_SECONDS, values)
+            _USER_CACHE.move_to_end(key)
+            while len(_USER_CACHE) > USER_CACHE_MAX_SIZE:
+                _USER_CACHE.popitem(last=False)
+
+    @staticmethod
+    def invalidate(user_id: Optional[str] = None) -> None:
+        """
+        Invalida o usuário informado (incrementando sua versão) ou todo o cache.
+
+        Chamar após o commit de mudanças em status, role, senha ou vínculo
+        (tenant/BU) do usuário.
+        """
+        with _USER_CACHE_LOCK:
+            if user_id is None:
+                _USER_CACHE.clear()
+                _USER_VERSIONS.clear()
+                return
+            user_id = str(user_id)
+            _USER_CACHE.pop(AuthenticatedUserCache._key(user_id), None)
+            _USER_VERSIONS[user_id] = next(_USER_VERSION_COUNTER)
+            _USER_VERSIONS.move_to_end(user_id)
+            while len(_USER_VERSIONS) > max(USER_CACHE_MAX_SIZE, 0):
+                stale_id, stale_version = _USER_VERSIONS.popitem(last=False)
+                _USER_CACHE.pop((stale_id, stale_version), None)
@@ -0,0 +1,166 @@
+"""
+Pool de processos para leitura e validação de planilhas
+
+Leitura de xlsx (openpyxl) e as verificações linha a linha com pandas são
+CPU-bound e, nas threads da API, disputam o GIL com as demais requisições.
+Este módulo mantém um ``ProcessPoolExecutor`` limitado
+(``WORKBOOK_POOL_WORKERS`` processos, no máximo ``WORKBOOK_POOL_MAX_PENDING``
+tarefas em andamento; acima disso ``WorkbookPoolBusyError``).
+
+As tarefas recebem caminhos de arquivo (não DataFrames) e devem ser funções
+de módulo (serializáveis). Abas lidas no processo filho ficam gravadas no
+cache colunar, de modo que o processo da API as reabre em Arrow depois.
+
+Cada submissão pode ser registrada como job (``register_job``): a rota
+aguarda o resultado com timeout ou devolve o ``job_id`` para consulta
+posterior. Os jobs vivem na memória desta instância.
+
+``WORKBOOK_POOL_WORKERS=0`` executa as tarefas em threads do próprio processo
+(desenvolvimento e testes).
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+WORKBOOK_POOL_WORKERS = int(os.getenv("WORKBOOK_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+WORKBOOK_POOL_MAX_PENDING = int(os.getenv("WORKBOOK_POOL_MAX_PENDING", "16"))
+WORKBOOK_POOL_TIMEOUT_SECONDS = float(os.getenv("WORKBOOK_POOL_TIMEOUT_SECONDS", "120"))
+_JOB_HISTORY = 256
+
+_EXECUTOR: Optional[Executor] = None
+_EXECUTOR_LOCK = threading.Lock()
+_PENDING = threading.BoundedSemaphore(WORKBOOK_POOL_MAX_PENDING)
+
+_JOBS: "OrderedDict[str, Future]" = OrderedDict()
+_JOBS_LOCK = threading.Lock()
+
+Call = Tuple[Callable[..., Any], Sequence[Any]]
+
+
+class WorkbookPoolBusyError(Exception):
+    """Pool sem vagas: mais de ``WORKBOOK_POOL_MAX_PENDING`` tarefas em andamento"""
+
+
+class WorkbookProcessPool:
+    """Submissão de tarefas ao pool e registro de jobs"""
+
+    @staticmethod
+    def _executor() -> Executor:
+        global _EXECUTOR
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                if WORKBOOK_POOL_WORKERS <= 0:
+                    _EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="workbook")
+                else:
+                    # spawn: o processo da API tem threads (fork herdaria locks em uso)
+                    _EXECUTOR = ProcessPoolExecutor(
+                        max_workers=WORKBOOK_POOL_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+            return _EXECUTOR
+
+    @staticmethod
+    def shutdown() -> None:
+        global _EXECUTOR
+        with _EXECUTOR_LOCK:
+            executor, _EXECUTOR = _EXECUTOR, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def submit(func: Callable[..., Any], *args: Any) -> Future:
+        if not _PENDING.acquire(blocking=False):
+            raise WorkbookPoolBusyError("Processamento de planilhas sobrecarregado; tente novamente em instantes")
+        try:
+            try:
+                future = WorkbookProcessPool._executor().submit(func, *args)
+            except BrokenProcessPool:
+                # Processo filho morreu (ex.: falta de memória): recria o pool
+                print("⚠️ [WorkbookPool] Pool quebrado; recriando")
+                WorkbookProcessPool.shutdown()
+                future = WorkbookProcessPool._executor().submit(func, *args)
+        except BaseException:
+            _PENDING.release()
+            raise
+        future.add_done_callback(lambda _: _PENDING.release())
+        return future
+
+    @staticmethod
+    def map_reduce(calls: List[Call], reduce: Callable[[List[Any]], Any]) -> Future:
+        """
+        Executa ``calls`` em paralelo e resolve um único Future com
+        ``reduce(resultados)`` (na ordem de ``calls``) ou com a primeira exceção.
+        """
+        combined: Future = Future()
+        futures: List[Future] = []
+        try:
+            for func, args in calls:
+                futures.append(WorkbookProcessPool.submit(func, *args))
+        except WorkbookPoolBusyError:
+            for future in futures:
+                future.cancel()
+            raise
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def _on_done(_: Future) -> None:
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            errors = [f.exception() for f in futures if f.exception() is not None]
+            if errors:
+                combined.set_exception(errors[0])
+                return
+            try:
+                combined.set_result(reduce([f.result() for f in futures]))
+            except Exception as exc:
+                combined.set_exception(exc)
+
+        for future in futures:
+            future.add_done_callback(_on_done)
+        return combined
+
+    @staticmethod
+    async def wait(future: Future, timeout: Optional[float] = None) -> Any:
+        """
+        Aguarda o resultado sem bloquear o event loop. Em timeout levanta
+        ``asyncio.TimeoutError`` e a tarefa continua (consultável pelo job).
+        """
+        timeout = WORKBOOK_POOL_TIMEOUT_SECONDS if timeout is None else timeout
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def register_job(future: Future) -> str:
+        job_id = str(uuid.uuid4())
+        with _JOBS_LOCK:
+            _JOBS[job_id] = future
+            while len(_JOBS) > _JOB_HISTORY:
+                _JOBS.popitem(last=False)
+        return job_id
+
+    @staticmethod
+    def job_status(job_id: str) -> Optional[Dict[str, Any]]:
+        with _JOBS_LOCK:
+            future = _JOBS.get(job_id)
+        if future is None:
+            return None
+        if not future.done():
+            return {"job_id": job_id, "status": "running"}
+        if future.cancelled():
+            return {"job_id": job_id, "status": "error", "error": "cancelado"}
+        error = future.exception()
+        if error is not None:
+            return {"job_id": job_id, "status": "error", "error": str(error)}
+        return {"job_id": job_id, "status": "completed", "result": future.result()}
@@ -0,0 +1,443 @@
+"""
+Validação da planilha de onboarding
+
+Verificações de estrutura e consistência executadas no pool de processos
+(``WorkbookProcessPool``). Cada aba é validada por uma tarefa independente
+(Lançamento Diário, Lançamentos Previstos, consistência mensal com o Fluxo de
+caixa e aba de Previsão), que roda em paralelo e devolve a lista de
+inconsistências; ``WorkbookValidationService.submit`` junta tudo no relatório
+retornado por ``/validate-spreadsheet``.
+"""
+
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from app.services.forecast_sheet import MONTH_LABELS
+from app.services.spreadsheet_snapshot_store import SpreadsheetSnapshot, SpreadsheetSnapshotStore
+from app.services.workbook_process_pool import WorkbookProcessPool
+
+REQUIRED_SHEETS = ["Plano de contas", "Lançamento Diário", "Lançamentos Previstos"]
+
+Issue = Dict[str, Any]
+
+
+def _issue(
+    severity: str,
+    code: str,
+    message: str,
+    sheet: Optional[str] = None,
+    row: Optional[int] = None,
+    data: Optional[dict] = None,
+) -> Issue:
+    return {
+        "id": f"{code}:{sheet or 'sheet'}:{row or 'na'}",
+        "severity": severity,
+        "code": code,
+        "message": message,
+        "sheet": sheet,
+        "row": row,
+        "data": data or {},
+    }
+
+
+def _find_col(cols, includes):
+    for col in cols:
+        c = str(col).lower().strip()
+        if all(x in c for x in includes):
+            return col
+    return None
+
+
+def _norm(value: Any) -> str:
+    text = str(value or "")
+    normalized = unicodedata.normalize("NFKD", text)
+    normalized = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return normalized.strip().lower()
+
+
+# ----------------------------------------------------------------------
+# Tarefas (executadas no pool; recebem apenas caminhos e nomes de abas)
+# ----------------------------------------------------------------------
+
+def validate_diario_rows(path: str, diario_sheet: str) -> List[Issue]:
+    diarios_df = SpreadsheetSnapshotStore.read_sheet(Path(path), diario_sheet)
+    diarios_cols = list(diarios_df.columns)
+    di_data_col = _find_col(diarios_cols, ["data", "moviment"])
+    di_grupo_col = _find_col(diarios_cols, ["grupo"])
+    di_subgrupo_col = _find_col(diarios_cols, ["subgrupo"])
+    di_valor_col = _find_col(diarios_cols, ["valor"])
+
+    if not di_data_col or not di_valor_col or not di_grupo_col or not di_subgrupo_col:
+        return [
+            _issue(
+                "error",
+                "DIARIO_COLUMNS_MISSING",
+                "Colunas obrigatórias não encontradas em Lançamento Diário (data, grupo, subgrupo, valor).",
+                sheet=diario_sheet,
+            )
+        ]
+
+    issues: List[Issue] = []
+    for idx, row in diarios_df.iterrows():
+        row_num = idx + 2
+        data_val = row.get(di_data_col)
+        valor_val = row.get(di_valor_col)
+        grupo_val = row.get(di_grupo_col)
+        subgrupo_val = row.get(di_subgrupo_col)
+
+        if pd.isna(data_val):
+            issues.append(_issue("error", "DIARIO_DATA_MISSING", "Data movimentação ausente.", diario_sheet, row_num))
+            continue
+        if pd.isna(valor_val):
+            issues.append(_issue("error", "DIARIO_VALOR_MISSING", "Valor ausente.", diario_sheet, row_num))
+            continue
+        if pd.isna(grupo_val) or pd.isna(subgrupo_val):
+            issues.append(_issue("error", "DIARIO_GRUPO_SUBGRUPO_MISSING", "Grupo/Subgrupo ausentes.", diario_sheet, row_num))
+            continue
+    return issues
+
+
+def validate_previstos(path: str, previstos_sheet: str, plano_sheet: str) -> List[Issue]:
+    plano_df = SpreadsheetSnapshotStore.read_sheet(Path(path), plano_sheet)
+    previstos_df = SpreadsheetSnapshotStore.read_sheet(Path(path), previstos_sheet)
+
+    plano_conta_col = _find_col(list(plano_df.columns), ["conta"])
+    plano_contas = set()
+    if plano_conta_col:
+        plano_contas = {
+            str(v).strip().lower()
+            for v in plano_df[plano_conta_col].dropna().tolist()
+            if str(v).strip()
+        }
+
+    prev_cols = list(previstos_df.columns)
+    prev_data_col = _find_col(prev_cols, ["data"]) or _find_col(prev_cols, ["mês"]) or _find_col(prev_cols, ["mes"])
+    prev_conta_col = _find_col(prev_cols, ["conta"])
+    prev_grupo_col = _find_col(prev_cols, ["grupo"])
+    prev_subgrupo_col = _find_col(prev_cols, ["subgrupo"])
+    prev_valor_col = _find_col(prev_cols, ["valor"])
+
+    # Heurística para coluna de data: priorizar coluna com dia ≠ 1
+    date_candidates = []
+    for col in prev_cols:
+        try:
+            series = pd.to_datetime(previstos_df[col], errors="coerce")
+        except Exception:
+            continue
+        valid_ratio = series.notna().mean()
+        if valid_ratio >= 0.6:
+            day_not_one_ratio = (series.dt.day != 1).mean()
+            date_candidates.append((day_not_one_ratio, col))
+    if date_candidates:
+        date_candidates.sort(reverse=True, key=lambda x: x[0])
+        best_ratio, best_col = date_candidates[0]
+        if best_ratio >= 0.1:
+            prev_data_col = best_col
+
+    if not prev_data_col or not prev_conta_col or not prev_valor_col:
+        return [
+            _issue(
+                "error",
+                "PREVISTO_COLUMNS_MISSING",
+                "Colunas obrigatórias não encontradas em Lançamentos Previstos (data, conta, valor).",
+                sheet=previstos_sheet,
+            )
+        ]
+
+    issues: List[Issue] = []
+    for idx, row in previstos_df.iterrows():
+        row_num = idx + 2
+        data_val = row.get(prev_data_col)
+        valor_val = row.get(prev_valor_col)
+        conta_val = row.get(prev_conta_col)
+        grupo_val = row.get(prev_grupo_col) if prev_grupo_col else None
+        subgrupo_val = row.get(prev_subgrupo_col) if prev_subgrupo_col else None
+
+        if pd.isna(data_val):
+            issues.append(_issue("error", "PREVISTO_DATA_MISSING", "Data prevista ausente.", previstos_sheet, row_num))
+            continue
+        if pd.isna(valor_val):
+            issues.append(_issue("error", "PREVISTO_VALOR_MISSING", "Valor ausente.", previstos_sheet, row_num))
+            continue
+        if pd.isna(conta_val) or str(conta_val).strip() == "":
+            issues.append(_issue("error", "PREVISTO_CONTA_MISSING", "Conta ausente.", previstos_sheet, row_num))
+            continue
+        if prev_grupo_col and prev_subgrupo_col and (pd.isna(grupo_val) or pd.isna(subgrupo_val)):
+            issues.append(_issue("error", "PREVISTO_GRUPO_SUBGRUPO_MISSING", "Grupo/Subgrupo ausentes.", previstos_sheet, row_num))
+            continue
+        if plano_contas and str(conta_val).strip().lower() not in plano_contas:
+            issues.append(
+                _issue(
+                    "error",
+                    "PREVISTO_CONTA_FORA_PLANO",
+                    f"Conta '{conta_val}' não encontrada no Plano de Contas.",
+                    previstos_sheet,
+                    row_num,
+                )
+            )
+    return issues
+
+
+def validate_monthly_consistency(path: str, diario_sheet: str, fluxo_sheet: str) -> List[Issue]:
+    """Totais mensais do Lançamento Diário x linhas "Realizado" do Fluxo de caixa"""
+    fluxo_df = SpreadsheetSnapshotStore.read_sheet(Path(path), fluxo_sheet, header=None)
+    diarios_df = SpreadsheetSnapshotStore.read_sheet(Path(path), diario_sheet)
+    diarios_cols = list(diarios_df.columns)
+    di_data_col = _find_col(diarios_cols, ["data", "moviment"])
+    di_grupo_col = _find_col(diarios_cols, ["grupo"])
+    di_subgrupo_col = _find_col(diarios_cols, ["subgrupo"])
+    di_valor_col = _find_col(diarios_cols, ["valor"])
+
+    # Encontrar linha de meses e linha de labels (Previsto/Realizado)
+    months_row = None
+    labels_row = None
+    for idx in range(min(10, len(fluxo_df))):
+        row = fluxo_df.iloc[idx]
+        if any(isinstance(val, str) and val.strip().upper() in MONTH_LABELS for val in row.values):
+            months_row = row
+            if idx + 1 < len(fluxo_df):
+                labels_row = fluxo_df.iloc[idx + 1]
+            break
+    if months_row is None:
+        months_row = fluxo_df.iloc[2]
+    if labels_row is None:
+        labels_row = fluxo_df.iloc[3] if len(fluxo_df) > 3 else fluxo_df.iloc[2]
+    month_cols = {}
+    for idx, val in months_row.items():
+        if isinstance(val, str) and val.strip():
+            month = val.strip().upper()
+            if str(labels_row.get(idx, "")) == "Previsto":
+                month_cols[month] = (idx, idx + 1)
+
+    label_col = 1
+    for col in fluxo_df.columns:
+        col_series = fluxo_df[col].astype(str).str.strip().str.lower()
+        if (col_series == "receita").any():
+            label_col = col
+            break
+
+    label_row_index = {}
+    label_series = fluxo_df[label_col].astype(str).map(_norm)
+    for idx, val in label_series.items():
+        if val:
+            label_row_index[val] = idx
+
+    def get_row_value(label: str, month: str, kind: str) -> float:
+        row = fluxo_df[fluxo_df[label_col].astype(str).str.strip().str.lower() == label.strip().lower()]
+        if row.empty:
+            return 0.0
+        row = row.iloc[0]
+        col_prev, col_real = month_cols.get(month, (None, None))
+        val = row[col_real] if kind == "realizado" else row[col_prev]
+        if pd.isna(val):
+            return 0.0
+        return float(val)
+
+    issues: List[Issue] = []
+    if not (di_data_col and di_grupo_col and di_valor_col):
+        return issues
+
+    # Agregar diários por grupo
+    diarios_df["_data"] = pd.to_datetime(diarios_df[di_data_col], errors="coerce")
+    diarios_df["_mes"] = diarios_df["_data"].dt.month
+    diarios_df["_grupo"] = diarios_df[di_grupo_col].astype(str).map(_norm)
+    diarios_df["_valor"] = pd.to_numeric(diarios_df[di_valor_col], errors="coerce").fillna(0.0)
+
+    group_month_totals = defaultdict(lambda: defaultdict(float))
+    subgroup_month_totals = defaultdict(lambda: defaultdict(float))
+    diario_groups = set()
+    for _, row in diarios_df.iterrows():
+        if pd.isna(row.get("_data")):
+            continue
+        month = row["_mes"]
+        group = row["_grupo"]
+        if group:
+            diario_groups.add(group)
+        group_month_totals[group][month] += float(row["_valor"])
+        subgrupo_val = ""
+        if di_subgrupo_col:
+            subgrupo_val = _norm(row.get(di_subgrupo_col))
+        if group == _norm("movimentações não operacionais") and subgrupo_val:
+            subgroup_month_totals[subgrupo_val][month] += float(row["_valor"])
+
+    labels_to_check = [
+        "Receita",
+        "Deduções",
+        "Custos",
+        "Despesas Operacionais",
+        "Investimentos",
+        "Movimentações Não Operacionais",
+        "Entradas não Operacionais",
+        "Saídas não Operacionais",
+    ]
+    month_label_map = {i + 1: m for i, m in enumerate(MONTH_LABELS)}
+
+    child_labels_map = {
+        _norm("entradas não operacionais"): [
+            "Empréstimos/Financiamentos obtidos",
+            "Aporte dos sócios",
+            "Venda de equipamentos usados",
+            "Outros entradas não operacionais",
+        ],
+        _norm("saídas não operacionais"): [
+            "Giro Pronampe",
+            "Juros Bancários e por Atraso",
+            "Pagamento de Empréstimos",
+            "Retirada de Lucros",
+            "Juros de Antecipação de Recebíveis",
+            "Outras saídas não operacionais",
+        ],
+    }
+
+    def add_divergences(label: str, label_key: str, totals: Dict[int, float]) -> None:
+        for month_num, month_name in month_label_map.items():
+            sheet_real = get_row_value(label, month_name, "realizado")
+            diario_real = totals.get(month_num, 0.0)
+            diff = round(diario_real - sheet_real, 2)
+            if abs(diff) > 0.0:
+                row_idx = label_row_index.get(label_key)
+                row_ref = (row_idx + 1) if row_idx is not None else None
+                issues.append(
+                    _issue(
+                        "error",
+                        "MENSAL_DIARIO_DIVERGENCE",
+                        f"'{label}' {month_name}: planilha={sheet_real:.2f} vs diário={diario_real:.2f} (dif={diff:.2f})",
+                        sheet=fluxo_sheet,
+                        row=row_ref,
+                        data={"label": label, "month": month_name},
+                    )
+                )
+
+    for label in labels_to_check:
+        label_key = _norm(label)
+        if label_key in {"entradas não operacionais", "saídas não operacionais"}:
+            # Se existirem linhas filhas, comparar com elas e ignorar o totalizador
+            child_labels = child_labels_map.get(label_key, [])
+            has_child_rows = False
+            for child in child_labels:
+                child_key = _norm(child)
+                if child_key in label_row_index:
+                    has_child_rows = True
+                    add_divergences(child, child_key, subgroup_month_totals.get(child_key, {}))
+            if has_child_rows:
+                continue
+            # Se a linha da planilha não possui valores preenchidos, não comparar
+            total_sheet = 0.0
+            for month_name in month_label_map.values():
+                total_sheet += abs(get_row_value(label, month_name, "realizado"))
+            if total_sheet == 0.0:
+                continue
+            # Comparar pelo subgrupo quando grupo for Movimentações Não Operacionais
+            add_divergences(label, label_key, subgroup_month_totals.get(label_key, {}))
+            continue
+
+        if label_key not in diario_groups:
+            # Não comparar linhas totalizadoras que não existem no diário
+            continue
+        add_divergences(label, label_key, group_month_totals[label_key])
+    return issues
+
+
+def validate_forecast_sheet(path: str, previsao_sheet: str) -> List[Issue]:
+    previsao_df = SpreadsheetSnapshotStore.read_sheet(Path(path), previsao_sheet, header=None)
+    for idx in range(min(10, len(previsao_df))):
+        row = previsao_df.iloc[idx]
+        if any(isinstance(val, str) and val.strip().upper() in MONTH_LABELS for val in row.values):
+            return []
+    return [
+        _issue(
+            "error",
+            "FORECAST_SHEET_INVALID",
+            "Não foi possível identificar os meses na aba de Previsão Fluxo de caixa-2025.",
+            sheet=previsao_sheet,
+        )
+    ]
+
+
+# ----------------------------------------------------------------------
+# Orquestração
+# ----------------------------------------------------------------------
+
+class WorkbookValidationService:
+    """Monta e submete a validação de um snapshot ao pool de processos"""
+
+    @staticmethod
+    def find_required_sheets(available_sheets: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        """Abas obrigatórias encontradas (com variações de nome) e as faltantes"""
+        found_sheets = {}
+        for req_sheet in REQUIRED_SHEETS:
+            for avail_sheet in available_sheets:
+                if req_sheet.lower() in avail_sheet.lower() or avail_sheet.lower() in req_sheet.lower():
+                    found_sheets[req_sheet] = avail_sheet
+                    break
+        missing_sheets = [s for s in REQUIRED_SHEETS if s not in found_sheets]
+        return found_sheets, missing_sheets
+
+    @staticmethod
+    def find_cash_flow_sheets(available_sheets: List[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Abas "Fluxo de caixa-2025" (realizado) e "Previsão Fluxo de caixa-2025", se existirem"""
+        fluxo_sheet = None
+        previsao_sheet = None
+        for sheet in available_sheets:
+            sheet_lower = sheet.lower()
+            if "fluxo de caixa" in sheet_lower and "2025" in sheet_lower and "previs" not in sheet_lower:
+                fluxo_sheet = sheet
+                break
+        if not fluxo_sheet:
+            for sheet in available_sheets:
+                sheet_lower = sheet.lower()
+                if "fluxo de caixa" in sheet_lower and "2025" in sheet_lower:
+                    fluxo_sheet = sheet
+                    break
+        for sheet in available_sheets:
+            sheet_lower = sheet.lower()
+            if "fluxo de caixa" in sheet_lower and "2025" in sheet_lower and "previs" in sheet_lower:
+                previsao_sheet = sheet
+                break
+        return fluxo_sheet, previsao_sheet
+
+    @staticmethod
+    def submit(snapshot: SpreadsheetSnapshot, found_sheets: Dict[str, str]) -> Future:
+        """
+        Valida as abas em paralelo no pool; o Future resolve com o relatório
+        (``valid``, ``summary``, ``issues``...). Levanta
+        ``WorkbookPoolBusyError`` se o pool estiver cheio.
+        """
+        path = str(snapshot.path)
+        diario_sheet = found_sheets["Lançamento Diário"]
+        fluxo_sheet, previsao_sheet = WorkbookValidationService.find_cash_flow_sheets(snapshot.sheets)
+
+        calls = [
+            (validate_diario_rows, (path, diario_sheet)),
+            (validate_previstos, (path, found_sheets["Lançamentos Previstos"], found_sheets["Plano de contas"])),
+        ]
+        if fluxo_sheet:
+            calls.append((validate_monthly_consistency, (path, diario_sheet, fluxo_sheet)))
+        if previsao_sheet:
+            calls.append((validate_forecast_sheet, (path, previsao_sheet)))
+
+        def _report(issue_lists: List[List[Issue]]) -> Dict[str, Any]:
+            issues = [issue for issue_list in issue_lists for issue in issue_list]
+            summary = {
+                "missing_sheets": [],
+                "errors": sum(1 for issue in issues if issue["severity"] == "error"),
+                "warnings": sum(1 for issue in issues if issue["severity"] == "warning"),
+                "available_sheets": snapshot.sheets,
+                "found_sheets": found_sheets,
+            }
+            return {
+                "valid": summary["errors"] == 0,
+                "message": "Planilha validada com relatório de inconsistências",
+                "snapshot_id": snapshot.id,
+                "available_sheets": snapshot.sheets,
+                "found_sheets": found_sheets,
+                "summary": summary,
+                "issues": issues,
+            }
+
+        return WorkbookProcessPool.map_reduce(calls, _report)
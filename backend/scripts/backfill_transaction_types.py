@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Backfill do tipo de transação dos lançamentos pelo mapa conta → tipo
+
+Regrava ``transaction_type`` dos lançamentos diários e previstos do tenant
+conforme a classificação atual do plano de contas (um UPDATE por tabela) e
+reconstrói o rollup diário quando algum lançamento diário mudou.
+
+USO:
+    python -m scripts.backfill_transaction_types --tenant-id <uuid>
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Adicionar backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import SessionLocal  # noqa: E402
+from app.services.transaction_type_resolver import TransactionTypeResolver  # noqa: E402
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Corrige o tipo de transação dos lançamentos de um tenant")
+    parser.add_argument("--tenant-id", required=True, help="Tenant a corrigir")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        updated = TransactionTypeResolver.backfill(db, args.tenant_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    for table, count in updated.items():
+        print(f"✅ [BACKFILL] {table}: {count} lançamento(s) corrigido(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Benchmark: índices compostos (e particionamento anual) de lançamentos
+
+Gera uma massa sintética (padrão: 1.000.000 lançamentos diários e 1.000.000
+previstos) em um schema isolado do PostgreSQL e mede as consultas quentes do
+dashboard em três cenários:
+
+    1. "antes"        - apenas os índices de coluna única originais
+    2. "depois"       - + índices compostos de migrations/add_lancamentos_composite_indexes.sql
+    3. "particionado" - (opcional, --with-partitioning) tabelas particionadas por ano
+
+Para cada consulta imprime o plano (EXPLAIN ANALYZE, BUFFERS) e a latência
+mediana/p95.
+
+USO:
+    DATABASE_URL=postgresql://... python -m scripts.benchmark_lancamentos_indexes
+    python -m scripts.benchmark_lancamentos_indexes --rows 200000 --runs 20 --with-partitioning
+
+O schema de benchmark é removido ao final (use --keep para inspecioná-lo).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Adicionar backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+SCHEMA = "bench_lancamentos"
+TENANTS = 20
+BUS_PER_TENANT = 3
+YEARS = (2022, 2023, 2024, 2025)
+TARGET_TENANT = "tenant-0007"
+TARGET_BU = "tenant-0007-bu-1"
+TARGET_YEAR = 2025
+
+# ============================================================================
+# MASSA SINTÉTICA
+# ============================================================================
+
+TABLES_SQL = """
+CREATE TABLE {schema}.lancamentos_diarios (
+    id VARCHAR(36) PRIMARY KEY,
+    data_movimentacao TIMESTAMP NOT NULL,
+    valor NUMERIC(15, 2) NOT NULL,
+    conta_id VARCHAR(36) NOT NULL,
+    subgrupo_id VARCHAR(36) NOT NULL,
+    grupo_id VARCHAR(36) NOT NULL,
+    transaction_type VARCHAR(20),
+    status VARCHAR(20),
+    tenant_id VARCHAR(36) NOT NULL,
+    business_unit_id VARCHAR(36) NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE
+);
+CREATE TABLE {schema}.lancamentos_previstos (
+    id VARCHAR(36) PRIMARY KEY,
+    data_prevista TIMESTAMP NOT NULL,
+    valor NUMERIC(15, 2) NOT NULL,
+    conta_id VARCHAR(36) NOT NULL,
+    subgrupo_id VARCHAR(36) NOT NULL,
+    grupo_id VARCHAR(36) NOT NULL,
+    transaction_type VARCHAR(20) NOT NULL,
+    status VARCHAR(20),
+    tenant_id VARCHAR(36) NOT NULL,
+    business_unit_id VARCHAR(36) NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE
+);
+"""
+
+POPULATE_SQL = """
+INSERT INTO {schema}.{table} (
+    id, {date_column}, valor, conta_id, subgrupo_id, grupo_id,
+    transaction_type, status, tenant_id, business_unit_id, is_active
+)
+SELECT
+    md5(i::text || '{table}'),
+    make_date({first_year}, 1, 1)
+        + ((i * 7919) % ({years} * 365)) * INTERVAL '1 day'
+        + ((i % 86400) * INTERVAL '1 second'),
+    round((((i * 31) % 100000) / 100.0 + 1)::numeric, 2),
+    'conta-' || (i % 120),
+    'subgrupo-' || (i % 30),
+    'grupo-' || (i % 8),
+    (ARRAY['RECEITA', 'DESPESA', 'CUSTO', 'ATIVO'])[1 + (i % 4)],
+    (ARRAY[{statuses}])[1 + (i % 3)],
+    'tenant-' || lpad(((i / 7) % {tenants})::text, 4, '0'),
+    'tenant-' || lpad(((i / 7) % {tenants})::text, 4, '0') || '-bu-' || (i % {bus}),
+    (i % 33) <> 0
+FROM generate_series(1, {rows}) AS i;
+"""
+
+BASELINE_INDEXES_SQL = """
+CREATE INDEX ON {schema}.lancamentos_diarios (tenant_id, business_unit_id);
+CREATE INDEX ON {schema}.lancamentos_diarios (data_movimentacao);
+CREATE INDEX ON {schema}.lancamentos_diarios (is_active);
+CREATE INDEX ON {schema}.lancamentos_previstos (tenant_id, business_unit_id);
+CREATE INDEX ON {schema}.lancamentos_previstos (data_prevista);
+"""
+
+COMPOSITE_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS idx_bench_diarios_tenant_bu_active_data
+    ON {schema}.lancamentos_diarios (tenant_id, business_unit_id, is_active, data_movimentacao, id)
+    INCLUDE (valor, transaction_type, grupo_id, subgrupo_id, conta_id, status);
+CREATE INDEX IF NOT EXISTS idx_bench_previstos_tenant_bu_active_data
+    ON {schema}.lancamentos_previstos (tenant_id, business_unit_id, is_active, data_prevista, id)
+    INCLUDE (valor, transaction_type, grupo_id, subgrupo_id, conta_id, status);
+"""
+
+# ============================================================================
+# CONSULTAS QUENTES (mesmo formato das rotas de dashboard)
+# ============================================================================
+
+QUERIES: Dict[str, str] = {
+    "resumo anual (realizado por mês/tipo)": """
+        SELECT EXTRACT(MONTH FROM data_movimentacao) AS mes, transaction_type, SUM(valor)
+        FROM {schema}.lancamentos_diarios
+        WHERE tenant_id = :tenant AND business_unit_id = :bu AND is_active
+          AND data_movimentacao >= :start AND data_movimentacao <= :end
+        GROUP BY 1, 2
+    """,
+    "matriz previsto x realizado (conta/mês)": """
+        SELECT grupo_id, subgrupo_id, conta_id, EXTRACT(MONTH FROM data_movimentacao), SUM(valor)
+        FROM {schema}.lancamentos_diarios
+        WHERE tenant_id = :tenant AND business_unit_id = :bu AND is_active
+          AND data_movimentacao >= :start AND data_movimentacao <= :end
+          AND status <> 'CANCELADO'
+        GROUP BY 1, 2, 3, 4
+    """,
+    "listagem do mês (página de 100)": """
+        SELECT id, data_movimentacao, valor, conta_id, transaction_type
+        FROM {schema}.lancamentos_diarios
+        WHERE tenant_id = :tenant AND business_unit_id = :bu AND is_active
+          AND data_movimentacao >= :month_start AND data_movimentacao < :month_end
+        ORDER BY data_movimentacao DESC
+        LIMIT 100
+    """,
+    "previstos pendentes do ano": """
+        SELECT EXTRACT(MONTH FROM data_prevista), transaction_type, SUM(valor)
+        FROM {schema}.lancamentos_previstos
+        WHERE tenant_id = :tenant AND business_unit_id = :bu AND is_active
+          AND data_prevista >= :start AND data_prevista <= :end
+          AND status <> 'CANCELADO'
+        GROUP BY 1, 2
+    """,
+}
+
+PARAMS = {
+    "tenant": TARGET_TENANT,
+    "bu": TARGET_BU,
+    "start": f"{TARGET_YEAR}-01-01",
+    "end": f"{TARGET_YEAR}-12-31 23:59:59",
+    "month_start": f"{TARGET_YEAR}-06-01",
+    "month_end": f"{TARGET_YEAR}-07-01",
+}
+
+
+def _run_script(engine: Engine, sql: str) -> None:
+    with engine.begin() as conn:
+        for statement in sql.split(";"):
+            if statement.strip():
+                conn.execute(text(statement))
+
+
+def _vacuum_analyze(engine: Engine) -> None:
+    # VACUUM atualiza o visibility map (necessário para index-only scans)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.lancamentos_diarios"))
+        conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.lancamentos_previstos"))
+
+
+def create_dataset(engine: Engine, rows: int) -> None:
+    print(f"🧪 Gerando {rows:,} lançamentos diários e {rows:,} previstos em '{SCHEMA}'...")
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    _run_script(engine, TABLES_SQL.format(schema=SCHEMA))
+
+    common = {
+        "schema": SCHEMA,
+        "rows": rows,
+        "first_year": YEARS[0],
+        "years": len(YEARS),
+        "tenants": TENANTS,
+        "bus": BUS_PER_TENANT,
+    }
+    _run_script(
+        engine,
+        POPULATE_SQL.format(
+            table="lancamentos_diarios",
+            date_column="data_movimentacao",
+            statuses="'pendente', 'liquidado', 'cancelado'",
+            **common,
+        ),
+    )
+    _run_script(
+        engine,
+        POPULATE_SQL.format(
+            table="lancamentos_previstos",
+            date_column="data_prevista",
+            statuses="'pendente', 'confirmado', 'cancelado'",
+            **common,
+        ),
+    )
+    _run_script(engine, BASELINE_INDEXES_SQL.format(schema=SCHEMA))
+    _vacuum_analyze(engine)
+    print(f"✅ Massa criada em {time.perf_counter() - started:.1f}s")
+
+
+def partition_dataset(engine: Engine) -> None:
+    """Recria as tabelas do benchmark particionadas por ano (mesmos índices compostos)"""
+    print("🧱 Convertendo tabelas do benchmark para particionamento anual...")
+    for table, date_column in (
+        ("lancamentos_diarios", "data_movimentacao"),
+        ("lancamentos_previstos", "data_prevista"),
+    ):
+        statements = [
+            f"ALTER TABLE {SCHEMA}.{table} RENAME TO {table}_flat",
+            f"CREATE TABLE {SCHEMA}.{table} (LIKE {SCHEMA}.{table}_flat INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({date_column})",
+        ]
+        for year in YEARS:
+            statements.append(
+                f"CREATE TABLE {SCHEMA}.{table}_{year} PARTITION OF {SCHEMA}.{table} "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+        statements.append(f"CREATE TABLE {SCHEMA}.{table}_default PARTITION OF {SCHEMA}.{table} DEFAULT")
+        statements.append(f"INSERT INTO {SCHEMA}.{table} SELECT * FROM {SCHEMA}.{table}_flat")
+        statements.append(f"DROP TABLE {SCHEMA}.{table}_flat")
+        _run_script(engine, ";".join(statements))
+    _run_script(engine, COMPOSITE_INDEXES_SQL.format(schema=SCHEMA))
+    _vacuum_analyze(engine)
+
+
+# ============================================================================
+# MEDIÇÃO
+# ============================================================================
+
+def measure(engine: Engine, label: str, runs: int, show_plans: bool) -> Dict[str, Tuple[float, float]]:
+    print("\n" + "=" * 80)
+    print(f"📊 Cenário: {label}")
+    print("=" * 80)
+    results: Dict[str, Tuple[float, float]] = {}
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            statement = text(sql.format(schema=SCHEMA))
+            # Aquecimento (cache do buffer pool)
+            conn.execute(statement, PARAMS).fetchall()
+
+            timings: List[float] = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                conn.execute(statement, PARAMS).fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+
+            median = statistics.median(timings)
+            p95 = sorted(timings)[max(0, int(round(0.95 * len(timings))) - 1)]
+            results[name] = (median, p95)
+            print(f"\n▶ {name}: mediana {median:.2f} ms | p95 {p95:.2f} ms")
+
+            if show_plans:
+                plan = conn.execute(
+                    text("EXPLAIN (ANALYZE, BUFFERS) " + sql.format(schema=SCHEMA)),
+                    PARAMS,
+                ).fetchall()
+                for (line,) in plan:
+                    print(f"    {line}")
+    return results
+
+
+def print_summary(scenarios: List[Tuple[str, Dict[str, Tuple[float, float]]]]) -> None:
+    print("\n" + "=" * 80)
+    print("📋 RESUMO (mediana / p95 em ms)")
+    print("=" * 80)
+    header = f"{'consulta':<42}" + "".join(f"{label:>20}" for label, _ in scenarios)
+    print(header)
+    for name in QUERIES:
+        line = f"{name:<42}"
+        for _, results in scenarios:
+            median, p95 = results[name]
+            line += f"{f'{median:.1f} / {p95:.1f}':>20}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark dos índices compostos de lançamentos (PostgreSQL)"
+    )
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("DATABASE_URL"),
+        help="URL do PostgreSQL (default: $DATABASE_URL)",
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Linhas por tabela (default: 1.000.000)")
+    parser.add_argument("--runs", type=int, default=30, help="Execuções por consulta (default: 30)")
+    parser.add_argument("--with-partitioning", action="store_true", help="Medir também tabelas particionadas por ano")
+    parser.add_argument("--no-plans", action="store_true", help="Não imprimir os planos de execução")
+    parser.add_argument("--keep", action="store_true", help="Manter o schema de benchmark ao final")
+    args = parser.parse_args()
+
+    if not args.database_url or not args.database_url.startswith("postgresql"):
+        print("❌ Informe um PostgreSQL via --database-url ou DATABASE_URL")
+        sys.exit(1)
+
+    engine = create_engine(args.database_url, pool_pre_ping=True)
+    show_plans = not args.no_plans
+    scenarios: List[Tuple[str, Dict[str, Tuple[float, float]]]] = []
+
+    try:
+        create_dataset(engine, args.rows)
+        scenarios.append(("antes", measure(engine, "antes (índices simples)", args.runs, show_plans)))
+
+        print("\n🔧 Criando índices compostos...")
+        _run_script(engine, COMPOSITE_INDEXES_SQL.format(schema=SCHEMA))
+        _vacuum_analyze(engine)
+        scenarios.append(("depois", measure(engine, "depois (índices compostos)", args.runs, show_plans)))
+
+        if args.with_partitioning:
+            partition_dataset(engine)
+            scenarios.append(("particionado", measure(engine, "particionado por ano", args.runs, show_plans)))
+
+        print_summary(scenarios)
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Teste de carga: tráfego misto concorrente contra uma instância da API
+
+Dispara, durante um intervalo fixo, requisições concorrentes que misturam
+consultas pesadas (dashboards anuais) com rotas leves (listagem paginada,
+permissões, perfil e login). Reporta p50/p95/p99 por rota e no total.
+
+O objetivo é evidenciar bloqueio do event loop: com rotas ``async def``
+executando SQL síncrono, a latência das rotas leves cresce junto com as
+pesadas; com as rotas no threadpool, o p99 das leves permanece baixo.
+
+USO:
+    python -m scripts.load_test_concurrency --base-url http://localhost:8000 \\
+        --username admin --password senha --concurrency 50 --duration 60
+
+    # Comparar antes/depois: rodar o mesmo comando contra cada versão
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+# (nome, método, caminho, peso)
+TRAFFIC_MIX: List[Tuple[str, str, str, int]] = [
+    ("forecast-vs-realized", "GET", "/api/v1/dashboard/operational/forecast-vs-realized?year={year}&months=12", 2),
+    ("annual-summary", "GET", "/api/v1/financial/annual-summary?year={year}", 2),
+    ("previsto-realizado", "GET", "/api/v1/cash-flow/previsto-realizado?year={year}", 1),
+    ("lancamentos (página)", "GET", "/api/v1/lancamentos-diarios?page=1&limit=50", 5),
+    ("permissions/my-access", "GET", "/api/v1/permissions/my-access", 4),
+    ("auth/me", "GET", "/api/v1/auth/me", 5),
+    ("auth/login", "POST", "/api/v1/auth/login", 1),
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def authenticate(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"username": username, "password": password},
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    token: str,
+    credentials: Dict[str, str],
+    year: int,
+    deadline: float,
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int],
+) -> None:
+    weights = [item[3] for item in TRAFFIC_MIX]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    while time.perf_counter() < deadline:
+        name, method, path, _ = random.choices(TRAFFIC_MIX, weights=weights, k=1)[0]
+        url = path.format(year=year)
+        started = time.perf_counter()
+        try:
+            if method == "POST":
+                response = await client.post(url, json=credentials)
+            else:
+                response = await client.get(url, headers=headers)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code >= 400:
+                errors[name] += 1
+            latencies[name].append(elapsed)
+        except httpx.HTTPError:
+            errors[name] += 1
+
+
+def print_report(latencies: Dict[str, List[float]], errors: Dict[str, int], duration: float) -> None:
+    print("\n" + "=" * 96)
+    print("📊 RESULTADO (latência em ms)")
+    print("=" * 96)
+    print(f"{'rota':<26}{'req':>8}{'erros':>8}{'p50':>12}{'p95':>12}{'p99':>12}{'máx':>12}")
+
+    all_values: List[float] = []
+    for name, _, _, _ in TRAFFIC_MIX:
+        values = latencies.get(name, [])
+        all_values.extend(values)
+        if not values and not errors.get(name):
+            continue
+        print(
+            f"{name:<26}{len(values):>8}{errors.get(name, 0):>8}"
+            f"{percentile(values, 50):>12.1f}{percentile(values, 95):>12.1f}"
+            f"{percentile(values, 99):>12.1f}{(max(values) if values else 0):>12.1f}"
+        )
+
+    total_errors = sum(errors.values())
+    print("-" * 96)
+    print(
+        f"{'TOTAL':<26}{len(all_values):>8}{total_errors:>8}"
+        f"{percentile(all_values, 50):>12.1f}{percentile(all_values, 95):>12.1f}"
+        f"{percentile(all_values, 99):>12.1f}{(max(all_values) if all_values else 0):>12.1f}"
+    )
+    if all_values:
+        print(f"\n⚡ Throughput: {len(all_values) / duration:.1f} req/s | média {statistics.mean(all_values):.1f} ms")
+
+
+async def run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+    credentials = {"username": args.username, "password": args.password}
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        print(f"🔐 Autenticando {args.username} em {args.base_url}...")
+        token = await authenticate(client, args.username, args.password)
+
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        deadline = time.perf_counter() + args.duration
+
+        print(f"🚀 {args.concurrency} clientes concorrentes por {args.duration}s...")
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                worker(client, token, credentials, args.year, deadline, latencies, errors)
+                for _ in range(args.concurrency)
+            )
+        )
+        print_report(latencies, errors, time.perf_counter() - started)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga com tráfego misto concorrente")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="URL base da API")
+    parser.add_argument("--username", required=True, help="Usuário para autenticação")
+    parser.add_argument("--password", required=True, help="Senha do usuário")
+    parser.add_argument("--concurrency", type=int, default=50, help="Clientes concorrentes (default: 50)")
+    parser.add_argument("--duration", type=int, default=60, help="Duração em segundos (default: 60)")
+    parser.add_argument("--year", type=int, default=datetime.now().year, help="Ano consultado nos dashboards")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout por requisição em segundos")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(run(args))
+    except httpx.HTTPStatusError as exc:
+        print(f"❌ Falha na autenticação: {exc.response.status_code} {exc.response.text}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
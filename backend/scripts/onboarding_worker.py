@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Worker de onboarding: consome a fila ``onboarding_jobs``
+
+Vários workers (em instâncias diferentes) podem rodar ao mesmo tempo: cada
+job é reivindicado com SELECT ... FOR UPDATE SKIP LOCKED e retomado a partir
+dos checkpoints se o worker anterior cair (heartbeat expirado).
+
+USO:
+    python -m scripts.onboarding_worker
+    python -m scripts.onboarding_worker --once
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Adicionar backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.api.onboarding import execute_import  # noqa: E402
+from app.services.onboarding_job_service import OnboardingJobService, default_worker_id  # noqa: E402
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Worker da fila de onboarding")
+    parser.add_argument("--worker-id", default=default_worker_id(), help="Identificador do worker (default: host:pid)")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Intervalo entre consultas à fila em segundos")
+    parser.add_argument("--once", action="store_true", help="Processa os jobs pendentes e encerra")
+    args = parser.parse_args(argv)
+
+    print(f"👷 [ONBOARDING WORKER] {args.worker_id} aguardando jobs...")
+    while True:
+        try:
+            processed = OnboardingJobService.run_pending(execute_import, worker_id=args.worker_id)
+        except Exception as e:
+            print(f"❌ [ONBOARDING WORKER] Erro ao consumir fila: {e}")
+            processed = 0
+        if args.once:
+            print(f"✅ [ONBOARDING WORKER] {processed} job(s) processado(s)")
+            return
+        if not processed:
+            time.sleep(args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -37,7 +37,7 @@ from pathlib import Path
 from uuid import uuid4
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, Optional, Tuple, List
+from typing import Any, Callable, Dict, Optional, Tuple, List
 import re
 
 # Adicionar backend ao path
@@ -45,6 +45,7 @@ backend_path = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_path))
 
 try:
+    import numpy as np
     import pandas as pd
 except ImportError:
     print("❌ Erro: pandas não está instalado. Execute: pip install pandas openpyxl")
@@ -85,6 +86,10 @@ from app.models.lancamento_diario import (
 from app.models.lancamento_previsto import (
     LancamentoPrevisto
 )
+from app.models.lancamento_rollup import LancamentoDiarioRollup
+from app.services.lancamento_rollup_service import LancamentoRollupService
+from app.services.forecast_sheet import MONTH_LABELS, extract_forecast_rows
+from app.services.spreadsheet_snapshot_store import SpreadsheetSnapshotStore
 
 # Modelos de contas de liquidação
 from app.models.liquidation_accounts import (
@@ -96,6 +101,15 @@ from app.models.liquidation_accounts import (
 # CONFIGURAÇÕES
 # ============================================================================
 
+# Linhas por INSERT multi-linha nos seeds de lançamentos
+BULK_INSERT_BATCH_SIZE = int(os.getenv("SEED_BULK_INSERT_BATCH_SIZE", "500"))
+
+# Combinações grupo/subgrupo/conta entre eventos de progresso do plano de contas
+PLANO_CONTAS_PROGRESS_EVERY = 200
+
+# Callback de progresso: progress(aba, rows_parsed=, rows_total=, rows_done=, rows_inserted=, final=)
+ProgressCallback = Callable[..., Any]
+
 # Caminho padrão do arquivo Excel
 DEFAULT_EXCEL_FILE = backend_path / "data" / "fluxo_caixa_2025.xlsx"
 
@@ -105,20 +119,6 @@ LANCAMENTOS_DIARIOS_SHEETS = ["Lançamento Diário", "Lançamento Diario", "Lanc
 LANCAMENTOS_PREVISTOS_SHEETS = ["Lançamentos Previstos", "Lancamentos Previstos", "Previsões", "Previsoes"]
 FLUXO_CAIXA_SHEETS_REGEX = re.compile(r"(?:Fluxo de caixa|Previsão Fluxo de caixa)-(\d{4})", re.IGNORECASE)
 
-MONTH_LABELS = [
-    "JANEIRO",
-    "FEVEREIRO",
-    "MARÇO",
-    "ABRIL",
-    "MAIO",
-    "JUNHO",
-    "JULHO",
-    "AGOSTO",
-    "SETEMBRO",
-    "OUTUBRO",
-    "NOVEMBRO",
-    "DEZEMBRO",
-]
 
 # ============================================================================
 # UTILITÁRIOS
@@ -180,11 +180,32 @@ def _is_numeric_label(value: str) -> bool:
     return re.fullmatch(r"[-\d\.,]+", stripped) is not None
 
 
+def preload_plano_contas(
+    db: Session,
+    tenant: Tenant,
+) -> Tuple[Dict[str, ChartAccountGroup], Dict[Tuple[str, str], ChartAccountSubgroup], Dict[Tuple[str, str], ChartAccount]]:
+    """
+    Carrega o plano de contas do tenant em três consultas, indexado pelas
+    mesmas chaves das buscas de get_or_create_* (nome com trim/lower).
+    """
+    grupos: Dict[str, ChartAccountGroup] = {}
+    for grupo in db.query(ChartAccountGroup).filter(ChartAccountGroup.tenant_id == tenant.id):
+        grupos.setdefault(_normalize_name(grupo.name).lower(), grupo)
+    subgrupos: Dict[Tuple[str, str], ChartAccountSubgroup] = {}
+    for subgrupo in db.query(ChartAccountSubgroup).filter(ChartAccountSubgroup.tenant_id == tenant.id):
+        subgrupos.setdefault((subgrupo.group_id, _normalize_name(subgrupo.name).lower()), subgrupo)
+    contas: Dict[Tuple[str, str], ChartAccount] = {}
+    for conta in db.query(ChartAccount).filter(ChartAccount.tenant_id == tenant.id):
+        contas.setdefault((conta.subgroup_id, _normalize_name(conta.name).lower()), conta)
+    return grupos, subgrupos, contas
+
+
 def get_or_create_group(
     db: Session,
     tenant: Tenant,
     grupos_map: Dict[str, ChartAccountGroup],
     grupo_nome: str,
+    existing: Optional[Dict[Any, Any]] = None,
 ) -> ChartAccountGroup:
     grupo_nome = _normalize_name(grupo_nome)
     if not grupo_nome:
@@ -193,10 +214,13 @@ def get_or_create_group(
     grupo = grupos_map.get(grupo_key)
     if grupo:
         return grupo
-    grupo = db.query(ChartAccountGroup).filter(
-        func.trim(func.lower(ChartAccountGroup.name)) == grupo_key,
-        ChartAccountGroup.tenant_id == tenant.id,
-    ).first()
+    if existing is not None:
+        grupo = existing.get(grupo_key)
+    else:
+        grupo = db.query(ChartAccountGroup).filter(
+            func.trim(func.lower(ChartAccountGroup.name)) == grupo_key,
+            ChartAccountGroup.tenant_id == tenant.id,
+        ).first()
     if not grupo:
         grupo = ChartAccountGroup(
             id=str(uuid4()),
@@ -223,6 +247,7 @@ def get_or_create_subgroup(
     subgrupos_map: Dict[str, ChartAccountSubgroup],
     grupo: ChartAccountGroup,
     subgrupo_nome: str,
+    existing: Optional[Dict[Any, Any]] = None,
 ) -> ChartAccountSubgroup:
     subgrupo_nome = _normalize_name(subgrupo_nome)
     if not subgrupo_nome:
@@ -231,11 +256,14 @@ def get_or_create_subgroup(
     subgrupo = subgrupos_map.get(subgrupo_key)
     if subgrupo:
         return subgrupo
-    subgrupo = db.query(ChartAccountSubgroup).filter(
-        func.trim(func.lower(ChartAccountSubgroup.name)) == subgrupo_nome.lower(),
-        ChartAccountSubgroup.group_id == grupo.id,
-        ChartAccountSubgroup.tenant_id == tenant.id,
-    ).first()
+    if existing is not None:
+        subgrupo = existing.get((grupo.id, subgrupo_nome.lower()))
+    else:
+        subgrupo = db.query(ChartAccountSubgroup).filter(
+            func.trim(func.lower(ChartAccountSubgroup.name)) == subgrupo_nome.lower(),
+            ChartAccountSubgroup.group_id == grupo.id,
+            ChartAccountSubgroup.tenant_id == tenant.id,
+        ).first()
     if not subgrupo:
         subgrupo = ChartAccountSubgroup(
             id=str(uuid4()),
@@ -264,6 +292,7 @@ def get_or_create_account(
     subgrupo: ChartAccountSubgroup,
     conta_nome: str,
     grupo_nome: str,
+    existing: Optional[Dict[Any, Any]] = None,
 ) -> ChartAccount:
     conta_nome = _normalize_name(conta_nome)
     if not conta_nome:
@@ -272,11 +301,14 @@ def get_or_create_account(
     conta = contas_map.get(conta_key)
     if conta:
         return conta
-    conta = db.query(ChartAccount).filter(
-        func.trim(func.lower(ChartAccount.name)) == conta_nome.lower(),
-        ChartAccount.subgroup_id == subgrupo.id,
-        ChartAccount.tenant_id == tenant.id,
-    ).first()
+    if existing is not None:
+        conta = existing.get((subgrupo.id, conta_nome.lower()))
+    else:
+        conta = db.query(ChartAccount).filter(
+            func.trim(func.lower(ChartAccount.name)) == conta_nome.lower(),
+            ChartAccount.subgroup_id == subgrupo.id,
+            ChartAccount.tenant_id == tenant.id,
+        ).first()
     if not conta:
         conta = ChartAccount(
             id=str(uuid4()),
@@ -352,6 +384,18 @@ def parse_currency(value) -> Decimal:
         logger.log(f"Erro ao converter valor: {value}", "WARNING")
         return Decimal("0")
 
+# Formatos esperados (com e sem hora), na ordem de tentativa
+DATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",  # 2025-09-01 00:00:00
+    "%Y-%m-%d",           # 2025-09-01
+    "%d/%m/%Y %H:%M:%S",  # 01/09/2025 00:00:00
+    "%d/%m/%Y",           # 01/09/2025
+    "%d-%m-%Y %H:%M:%S",  # 01-09-2025 00:00:00
+    "%d-%m-%Y",           # 01-09-2025
+    "%d/%m/%y",           # 01/09/25
+    "%d-%m-%y",           # 01-09-25
+]
+
 def parse_date(date_value) -> Optional[datetime]:
     """Converte valor para datetime"""
     if pd.isna(date_value) or date_value == "" or date_value is None:
@@ -374,19 +418,7 @@ def parse_date(date_value) -> Optional[datetime]:
         parts = value_str.split('.')
         value_str = parts[0]
     
-    # Formatos esperados (com e sem hora)
-    formats = [
-        "%Y-%m-%d %H:%M:%S",  # 2025-09-01 00:00:00
-        "%Y-%m-%d",           # 2025-09-01
-        "%d/%m/%Y %H:%M:%S",  # 01/09/2025 00:00:00
-        "%d/%m/%Y",           # 01/09/2025
-        "%d-%m-%Y %H:%M:%S",  # 01-09-2025 00:00:00
-        "%d-%m-%Y",           # 01-09-2025
-        "%d/%m/%y",           # 01/09/25
-        "%d-%m-%y",           # 01-09-25
-    ]
-    
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
             return datetime.strptime(value_str, fmt)
         except:
@@ -395,6 +427,109 @@ def parse_date(date_value) -> Optional[datetime]:
     logger.log(f"Erro ao converter data: {date_value}", "WARNING")
     return None
 
+# ============================================================================
+# PARSE VETORIZADO (COLUNAS INTEIRAS)
+# ============================================================================
+
+def text_column(df: pd.DataFrame, column: Optional[str]) -> pd.Series:
+    """Coluna como texto, equivalente a str(valor) linha a linha ("" para nulos)"""
+    if column is None:
+        return pd.Series("", index=df.index, dtype=object)
+    values = df[column]
+    return values.astype(object).where(values.notna(), "").astype(str)
+
+
+def blank_numeric_labels(values: pd.Series) -> pd.Series:
+    """Versão vetorizada de _is_numeric_label: rótulos só numéricos viram vazio"""
+    stripped = values.str.strip()
+    numeric = stripped.str.contains(r"\d", regex=True) & stripped.str.fullmatch(r"[-\d\.,]+")
+    return values.mask(numeric.fillna(False).astype(bool), "")
+
+
+def parse_currency_series(values: pd.Series) -> pd.Series:
+    """Versão vetorizada de parse_currency (mesmas regras de separadores)"""
+    text = values.str.strip()
+    text = (
+        text.str.replace("R$", "", regex=False)
+        .str.replace("$", "", regex=False)
+        .str.replace(" ", "", regex=False)
+    )
+    has_dot = text.str.contains(".", regex=False)
+    has_comma = text.str.contains(",", regex=False)
+    cleaned = text.mask(has_dot & has_comma, text.str.replace(".", "", regex=False))
+    cleaned = cleaned.str.replace(",", ".", regex=False)
+
+    numeric = pd.to_numeric(cleaned, errors="coerce")
+    invalid = numeric.isna() & (cleaned != "")
+    for value in values[invalid]:
+        logger.log(f"Erro ao converter valor: {value}", "WARNING")
+    return cleaned.where(numeric.notna(), "0").map(Decimal)
+
+
+def parse_date_series(values: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de parse_date: cada formato é aplicado de uma vez às
+    linhas ainda não convertidas. Retorna NaT onde a data é inválida.
+    """
+    text = values.str.strip()
+    # Remover microsegundos ("2025-09-01 00:00:00.000000")
+    with_fraction = text.str.contains(".", regex=False) & text.str.contains(" ", regex=False)
+    text = text.mask(with_fraction, text.str.split(".", n=1).str[0])
+
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        pending = parsed.isna() & (text != "")
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(text[pending], format=fmt, errors="coerce")
+
+    for value in values[parsed.isna() & (text != "")]:
+        logger.log(f"Erro ao converter data: {value}", "WARNING")
+    return parsed
+
+
+def bulk_insert_ignore_conflicts(db: Session, table, records: List[Dict[str, Any]]) -> int:
+    """
+    INSERT multi-linha ignorando conflitos de import_ref (ON CONFLICT DO NOTHING).
+    Retorna o número de linhas efetivamente inseridas.
+    """
+    if not records:
+        return 0
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(records).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(records).on_conflict_do_nothing()
+    else:
+        stmt = table.insert().values(records)
+    result = db.execute(stmt)
+    if result.rowcount is None or result.rowcount < 0:
+        return len(records)
+    return result.rowcount
+
+
+def report_progress(progress: Optional[ProgressCallback], sheet_name: str, **fields: Any) -> None:
+    """Publica um evento de progresso; falhas do callback não interrompem o seed"""
+    if progress is None:
+        return
+    try:
+        progress(sheet_name, **fields)
+    except Exception as e:
+        logger.log(f"Erro ao publicar progresso: {str(e)}", "WARNING")
+
+
+def _append_classification_log(entries: List[Dict[str, Any]]) -> None:
+    """Grava o log de classificação (COST_DEBUG=1) na ordem das linhas do Excel"""
+    if not entries:
+        return
+    log_file = backend_path / "artifacts" / "seed_classification_2025.jsonl"
+    log_file.parent.mkdir(exist_ok=True)
+    with open(log_file, "a", encoding="utf-8") as f:
+        for entry in sorted(entries, key=lambda e: e["excel_row"]):
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
 def generate_code(name: str, prefix: str = "") -> str:
     """Gera código único baseado no nome"""
     # Remover acentos e caracteres especiais
@@ -428,8 +563,7 @@ def determine_account_type(grupo_nome: str) -> str:
 def find_sheet_in_excel(excel_file: Path, sheet_names: List[str]) -> Optional[str]:
     """Encontra a primeira aba que existe no arquivo Excel"""
     try:
-        excel = pd.ExcelFile(excel_file)
-        available_sheets = excel.sheet_names
+        available_sheets = SpreadsheetSnapshotStore.sheet_names(excel_file)
         
         for sheet_name in sheet_names:
             if sheet_name in available_sheets:
@@ -444,9 +578,9 @@ def find_sheet_in_excel(excel_file: Path, sheet_names: List[str]) -> Optional[st
         return None
 
 def read_excel_sheet(excel_file: Path, sheet_name: str) -> pd.DataFrame:
-    """Lê uma aba específica do arquivo Excel"""
+    """Lê uma aba específica do arquivo Excel (cache por arquivo)"""
     try:
-        df = pd.read_excel(excel_file, sheet_name=sheet_name, engine='openpyxl')
+        df = SpreadsheetSnapshotStore.read_sheet(excel_file, sheet_name)
         logger.log(f"Dados lidos da aba '{sheet_name}': {len(df)} linhas", "INFO")
         return df
     except Exception as e:
@@ -457,49 +591,6 @@ def read_excel_sheet(excel_file: Path, sheet_name: str) -> pd.DataFrame:
 # FUNÇÕES DE LEITURA DO FLUXO DE CAIXA (SALDO INICIAL E ORDEM)
 # ============================================================================
 
-def _find_month_header_row(df: pd.DataFrame) -> Optional[int]:
-    max_scan = min(10, len(df))
-    for idx in range(max_scan):
-        row = df.iloc[idx].astype(str).str.strip().str.upper()
-        if "JANEIRO" in row.values and "FEVEREIRO" in row.values:
-            return idx
-    return None
-
-def _detect_label_column(df: pd.DataFrame, start_row: int) -> int:
-    best_col = 1
-    best_count = -1
-    for col in df.columns:
-        series = df.iloc[start_row:, col]
-        count = int(series.apply(lambda v: isinstance(v, str) and v.strip() != "").sum())
-        if count > best_count:
-            best_count = count
-            best_col = int(col)
-    return best_col
-
-def _parse_numeric(value) -> float:
-    if value is None:
-        return 0.0
-    try:
-        if isinstance(value, float) and pd.isna(value):
-            return 0.0
-    except Exception:
-        pass
-    if isinstance(value, (int, float, Decimal)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = (
-            value.replace("R$", "")
-            .replace(" ", "")
-            .replace(".", "")
-            .replace(",", ".")
-            .strip()
-        )
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
-    return 0.0
-
 def extract_cash_flow_settings(excel_file: Path) -> Dict[int, Dict[str, Any]]:
     """
     Extrai ordem das linhas e saldo do ano anterior a partir das abas de fluxo de caixa.
@@ -507,12 +598,12 @@ def extract_cash_flow_settings(excel_file: Path) -> Dict[int, Dict[str, Any]]:
     """
     settings: Dict[int, Dict[str, any]] = {}
     try:
-        excel = pd.ExcelFile(excel_file)
+        available_sheets = SpreadsheetSnapshotStore.sheet_names(excel_file)
     except Exception as e:
         logger.log(f"Erro ao abrir arquivo para extrair fluxo de caixa: {str(e)}", "ERROR")
         return settings
 
-    for sheet_name in excel.sheet_names:
+    for sheet_name in available_sheets:
         match = FLUXO_CAIXA_SHEETS_REGEX.search(sheet_name or "")
         if not match:
             continue
@@ -522,53 +613,18 @@ def extract_cash_flow_settings(excel_file: Path) -> Dict[int, Dict[str, Any]]:
             continue
 
         try:
-            df = pd.read_excel(excel, sheet_name=sheet_name, header=None, engine="openpyxl")
+            df = SpreadsheetSnapshotStore.read_sheet(excel_file, sheet_name, header=None)
         except Exception as e:
             logger.log(f"Erro ao ler aba '{sheet_name}': {str(e)}", "ERROR")
             continue
 
-        header_row_idx = _find_month_header_row(df)
-        if header_row_idx is None:
+        rows = extract_forecast_rows(df, year)
+        if rows is None:
             logger.log(f"Não foi possível localizar cabeçalhos de meses em '{sheet_name}'", "WARNING")
             continue
 
-        header_row = df.iloc[header_row_idx].astype(str).str.strip().str.upper()
-        month_columns = {month: idx for idx, month in enumerate(header_row) if month in MONTH_LABELS}
-        data_start = header_row_idx + 2
-        label_col = _detect_label_column(df, data_start)
-
-        labels: List[str] = []
-        saldo_ano_anterior = 0.0
-        ignore_labels = {"previsão de fluxo de caixa", "ano do fluxo:"}
-
-        for row_idx in range(data_start, len(df)):
-            raw_label = df.iloc[row_idx, label_col]
-            if raw_label is None or (isinstance(raw_label, float) and pd.isna(raw_label)):
-                continue
-            label = str(raw_label).strip()
-            if not label:
-                continue
-            lower_label = label.lower()
-            if lower_label in ignore_labels:
-                continue
-            if label.isdigit() and int(label) == year:
-                continue
-
-            labels.append(label)
-
-            if lower_label == "saldo do ano anterior":
-                for month in MONTH_LABELS:
-                    col_idx = month_columns.get(month)
-                    if col_idx is None:
-                        continue
-                    previsto_val = _parse_numeric(df.iloc[row_idx, col_idx])
-                    realizado_val = _parse_numeric(df.iloc[row_idx, col_idx + 1]) if col_idx + 1 < len(df.columns) else 0.0
-                    if previsto_val:
-                        saldo_ano_anterior = previsto_val
-                        break
-                    if realizado_val:
-                        saldo_ano_anterior = realizado_val
-                        break
+        labels = rows.labels
+        saldo_ano_anterior = rows.first_nonzero("saldo do ano anterior")
 
         settings[year] = {
             "line_order": labels,
@@ -582,19 +638,19 @@ def extract_cash_flow_settings(excel_file: Path) -> Dict[int, Dict[str, Any]]:
     return settings
 
 
-def extract_cash_flow_forecast_values(excel_file: Path) -> Dict[int, Dict[str, Dict[str, float]]]:
+def extract_cash_flow_forecast_values(excel_file: Path) -> Dict[int, Dict[str, np.ndarray]]:
     """
     Extrai valores previstos por linha/mês da aba de previsão do fluxo de caixa.
-    Retorna: {year: {label: {MONTH_LABEL: value}}}
+    Retorna: {year: {label: array com os 12 meses (JANEIRO..DEZEMBRO)}}
     """
-    results: Dict[int, Dict[str, Dict[str, float]]] = {}
+    results: Dict[int, Dict[str, np.ndarray]] = {}
     try:
-        excel = pd.ExcelFile(excel_file)
+        available_sheets = SpreadsheetSnapshotStore.sheet_names(excel_file)
     except Exception as e:
         logger.log(f"Erro ao abrir arquivo para extrair valores previstos: {str(e)}", "ERROR")
         return results
 
-    for sheet_name in excel.sheet_names:
+    for sheet_name in available_sheets:
         match = FLUXO_CAIXA_SHEETS_REGEX.search(sheet_name or "")
         if not match:
             continue
@@ -604,45 +660,17 @@ def extract_cash_flow_forecast_values(excel_file: Path) -> Dict[int, Dict[str, D
             continue
 
         try:
-            df = pd.read_excel(excel, sheet_name=sheet_name, header=None, engine="openpyxl")
+            df = SpreadsheetSnapshotStore.read_sheet(excel_file, sheet_name, header=None)
         except Exception as e:
             logger.log(f"Erro ao ler aba '{sheet_name}': {str(e)}", "ERROR")
             continue
 
-        header_row_idx = _find_month_header_row(df)
-        if header_row_idx is None:
+        rows = extract_forecast_rows(df, year)
+        if rows is None:
             logger.log(f"Não foi possível localizar cabeçalhos de meses em '{sheet_name}'", "WARNING")
             continue
 
-        header_row = df.iloc[header_row_idx].astype(str).str.strip().str.upper()
-        month_columns = {month: idx for idx, month in enumerate(header_row) if month in MONTH_LABELS}
-        data_start = header_row_idx + 2
-        label_col = _detect_label_column(df, data_start)
-
-        year_values: Dict[str, Dict[str, float]] = {}
-        ignore_labels = {"previsão de fluxo de caixa", "ano do fluxo:"}
-
-        for row_idx in range(data_start, len(df)):
-            raw_label = df.iloc[row_idx, label_col]
-            if raw_label is None or (isinstance(raw_label, float) and pd.isna(raw_label)):
-                continue
-            label = str(raw_label).strip()
-            if not label:
-                continue
-            lower_label = label.lower()
-            if lower_label in ignore_labels:
-                continue
-            if label.isdigit() and int(label) == year:
-                continue
-
-            months: Dict[str, float] = {}
-            for month in MONTH_LABELS:
-                col_idx = month_columns.get(month)
-                value = df.iloc[row_idx, col_idx] if col_idx is not None else 0
-                months[month] = _parse_numeric(value)
-
-            year_values[label] = months
-
+        year_values = rows.previsto_by_label()
         if year_values:
             results[year] = year_values
             logger.log(
@@ -751,9 +779,15 @@ def get_or_create_user(db: Session, tenant: Tenant, business_unit: BusinessUnit,
 def seed_plano_contas(
     db: Session,
     tenant: Tenant,
-    excel_file: Path
+    excel_file: Path,
+    progress: Optional[ProgressCallback] = None,
 ) -> Tuple[Dict[str, ChartAccountGroup], Dict[str, ChartAccountSubgroup], Dict[str, ChartAccount]]:
-    """Seed do plano de contas a partir do Excel"""
+    """
+    Seed do plano de contas a partir do Excel
+
+    ``progress`` recebe eventos a cada PLANO_CONTAS_PROGRESS_EVERY combinações
+    resolvidas (o que também mantém vivo o heartbeat do job de onboarding).
+    """
     logger.log("Iniciando seed do Plano de Contas...", "STEP")
     
     grupos_map: Dict[str, ChartAccountGroup] = {}
@@ -797,51 +831,68 @@ def seed_plano_contas(
             logger.stats['erros'].append("Colunas necessárias não encontradas")
             return grupos_map, subgrupos_map, contas_map
         
-        last_grupo_nome = ""
-        last_subgrupo_nome = ""
-        for row_num, row in df.iterrows():
+        # Colunas inteiras de uma vez (sem df.iterrows)
+        conta_col = text_column(df, column_map['conta']).str.strip()
+        subgrupo_col = text_column(df, column_map['subgrupo']).str.strip()
+        grupo_col = text_column(df, column_map['grupo']).str.strip()
+        escolha_col = text_column(df, column_map.get('escolha')).str.strip()
+
+        numeric_rows = (
+            (blank_numeric_labels(grupo_col) != grupo_col)
+            | (blank_numeric_labels(subgrupo_col) != subgrupo_col)
+            | (blank_numeric_labels(conta_col) != conta_col)
+        )
+        escolha_ok = escolha_col.str.lower().isin(['usar', 'use', 'sim', 'yes', ''])
+        eligible = ~numeric_rows & escolha_ok
+
+        # Grupo/subgrupo vazios herdam o último valor usado (forward fill),
+        # considerando apenas as linhas que chegariam a ser gravadas
+        grupo_col = grupo_col[eligible].replace("", pd.NA).ffill().fillna("")
+        with_group = grupo_col != ""
+        grupo_col = grupo_col[with_group]
+        subgrupo_col = subgrupo_col[grupo_col.index].replace("", pd.NA).ffill().fillna("")
+        rows = pd.DataFrame({
+            "grupo": grupo_col,
+            "subgrupo": subgrupo_col,
+            "conta": conta_col[grupo_col.index],
+        })
+
+        # Plano já existente em três consultas; cada combinação única é
+        # resolvida uma única vez, na ordem da planilha
+        existing_grupos, existing_subgrupos, existing_contas = preload_plano_contas(db, tenant)
+        combos = rows.drop_duplicates()
+        report_progress(progress, sheet_name, rows_parsed=len(df), rows_total=len(combos))
+        for done, (row_num, grupo_nome, subgrupo_nome, conta_nome) in enumerate(combos.itertuples(name=None), start=1):
+            if done % PLANO_CONTAS_PROGRESS_EVERY == 0:
+                report_progress(
+                    progress, sheet_name,
+                    rows_parsed=len(df), rows_total=len(combos), rows_done=done, rows_inserted=len(contas_map),
+                )
             try:
-                # Parse dos campos
-                conta_nome = str(row[column_map['conta']]).strip() if pd.notna(row[column_map['conta']]) else ""
-                subgrupo_nome = str(row[column_map['subgrupo']]).strip() if pd.notna(row[column_map['subgrupo']]) else ""
-                grupo_nome = str(row[column_map['grupo']]).strip() if pd.notna(row[column_map['grupo']]) else ""
-                escolha = ""
-                if 'escolha' in column_map:
-                    escolha = str(row[column_map['escolha']]).strip() if pd.notna(row[column_map['escolha']]) else ""
-
-                if _is_numeric_label(grupo_nome) or _is_numeric_label(subgrupo_nome) or _is_numeric_label(conta_nome):
-                    continue
-
-                if not grupo_nome:
-                    grupo_nome = last_grupo_nome
-                if not subgrupo_nome:
-                    subgrupo_nome = last_subgrupo_nome
-
-                if not grupo_nome:
-                    continue
-
-                if escolha and escolha.lower() not in ['usar', 'use', 'sim', 'yes', '']:
-                    continue
-
-                grupo = get_or_create_group(db, tenant, grupos_map, grupo_nome)
+                grupo = get_or_create_group(db, tenant, grupos_map, grupo_nome, existing_grupos)
 
+                subgrupo = None
                 if subgrupo_nome:
-                    subgrupo = get_or_create_subgroup(db, tenant, subgrupos_map, grupo, subgrupo_nome)
-                    last_subgrupo_nome = subgrupo_nome
-                else:
-                    subgrupo = None
-
-                last_grupo_nome = grupo_nome
+                    subgrupo = get_or_create_subgroup(
+                        db, tenant, subgrupos_map, grupo, subgrupo_nome, existing_subgrupos
+                    )
 
                 if conta_nome and subgrupo:
-                    get_or_create_account(db, tenant, contas_map, subgrupo, conta_nome, grupo_nome)
-                
+                    get_or_create_account(
+                        db, tenant, contas_map, subgrupo, conta_nome, grupo_nome, existing_contas
+                    )
+
             except Exception as e:
                 error_msg = f"Erro na linha {row_num + 2}: {str(e)}"
                 logger.log(error_msg, "ERROR")
                 logger.stats['erros'].append(error_msg)
                 continue
         
+        report_progress(
+            progress, sheet_name,
+            rows_parsed=len(df), rows_total=len(combos), rows_done=len(combos), rows_inserted=len(contas_map),
+            final=True,
+        )
         logger.log("Seed do Plano de Contas concluído!", "SUCCESS")
         
     except Exception as e:
@@ -861,10 +912,13 @@ def seed_lancamentos_previstos(
     grupos_map: Dict[str, ChartAccountGroup],
     subgrupos_map: Dict[str, ChartAccountSubgroup],
     contas_map: Dict[str, ChartAccount],
-    excel_file: Path
+    excel_file: Path,
+    progress: Optional[ProgressCallback] = None,
 ):
     """
     Seed de lançamentos previstos a partir do Excel
+
+    ``progress`` recebe eventos após a leitura da aba e a cada lote gravado.
     
     REGRAS DE EXCLUSÃO DE LINHA (linhas ignoradas):
     - data_prevista (mês) vazia ou inválida (parse_date retorna None)
@@ -934,148 +988,166 @@ def seed_lancamentos_previstos(
             logger.stats['erros'].append("Colunas necessárias não encontradas em Lançamentos Previstos")
             return
         
-        for row_num, row in df.iterrows():
+        # Parse vetorizado das colunas
+        mes_col = text_column(df, column_map['data_prevista'])
+        valor_col = text_column(df, column_map['valor'])
+        conta_col = blank_numeric_labels(text_column(df, column_map['conta']).str.strip())
+        subgrupo_col = blank_numeric_labels(text_column(df, column_map.get('subgrupo')).str.strip())
+        grupo_col = blank_numeric_labels(text_column(df, column_map.get('grupo')).str.strip())
+
+        # Pular linhas vazias e datas inválidas
+        filled = (mes_col != "") & (valor_col != "")
+        datas = parse_date_series(mes_col[filled])
+        valid_index = datas.index[datas.notna()]
+        logger.stats['linhas_ignoradas'] += int(len(df) - len(valid_index))
+
+        rows = pd.DataFrame({
+            "excel_row": valid_index + 2,
+            "data_prevista": datas[valid_index],
+            "valor": parse_currency_series(valor_col[valid_index]),
+            "grupo": grupo_col[valid_index],
+            "subgrupo": subgrupo_col[valid_index],
+            "conta": conta_col[valid_index],
+        })
+
+        # Resolução do plano de contas por combinação única (grupo, subgrupo, conta)
+        contas_by_name: Dict[str, ChartAccount] = {}
+        for c in contas_map.values():
+            contas_by_name.setdefault(c.name.lower(), c)
+
+        def _resolve(grupo_nome: str, subgrupo_nome: str, conta_nome: str) -> Dict[str, Any]:
+            conta = contas_by_name.get(conta_nome.lower()) if conta_nome else None
+
+            # Fallback: tentar casar conta por aproximação quando grupo/subgrupo vierem vazios
+            if conta is None and conta_nome and not subgrupo_nome and not grupo_nome:
+                conta_lower = conta_nome.lower()
+                for c in contas_map.values():
+                    c_lower = c.name.lower()
+                    if conta_lower in c_lower or c_lower in conta_lower:
+                        conta = c
+                        break
+
+            if conta and not subgrupo_nome:
+                subgrupo = db.get(ChartAccountSubgroup, conta.subgroup_id)
+                if subgrupo:
+                    subgrupo_nome = subgrupo.name
+                    grupo_nome = subgrupo.group.name if subgrupo.group else ""
+
+            grupo = get_or_create_group(db, tenant, grupos_map, grupo_nome) if grupo_nome else None
+            subgrupo = None
+            if subgrupo_nome and grupo:
+                subgrupo = get_or_create_subgroup(db, tenant, subgrupos_map, grupo, subgrupo_nome)
+
+            # Usar subgrupo e grupo da conta se não encontrou
+            if not subgrupo and conta:
+                subgrupo = db.get(ChartAccountSubgroup, conta.subgroup_id)
+            if not grupo and subgrupo:
+                grupo = db.get(ChartAccountGroup, subgrupo.group_id)
+            # Se ainda não tem grupo/subgrupo, usar fallback para "Despesas Administrativas"
+            if not subgrupo and not grupo:
+                fallback_subgrupo = None
+                for key, sg in subgrupos_map.items():
+                    if key.strip().lower() == "despesas administrativas":
+                        fallback_subgrupo = sg
+                        break
+                if fallback_subgrupo:
+                    subgrupo = fallback_subgrupo
+                    grupo = db.get(ChartAccountGroup, subgrupo.group_id)
+            if not grupo or not subgrupo:
+                raise ValueError(f"Grupo/Subgrupo não encontrado para conta '{conta_nome}'")
+
+            if not conta_nome:
+                raise ValueError("Conta vazia")
+            conta = get_or_create_account(db, tenant, contas_map, subgrupo, conta_nome, grupo.name)
+            contas_by_name.setdefault(conta.name.lower(), conta)
+            return {
+                "conta_id": conta.id,
+                "subgrupo_id": subgrupo.id,
+                "grupo_id": grupo.id,
+                "transaction_type": determine_transaction_type(grupo.name, subgrupo.name),
+            }
+
+        resolved: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        failed: Dict[Tuple[str, str, str], str] = {}
+        for key in rows[["grupo", "subgrupo", "conta"]].drop_duplicates().itertuples(index=False, name=None):
             try:
-                # Parse dos campos
-                mes_str = str(row[column_map['data_prevista']]) if pd.notna(row[column_map['data_prevista']]) else ""
-                conta_nome = str(row[column_map['conta']]).strip() if pd.notna(row[column_map['conta']]) else ""
-                subgrupo_nome = ""
-                grupo_nome = ""
-                if 'subgrupo' in column_map:
-                    subgrupo_nome = str(row[column_map['subgrupo']]).strip() if pd.notna(row[column_map['subgrupo']]) else ""
-                if 'grupo' in column_map:
-                    grupo_nome = str(row[column_map['grupo']]).strip() if pd.notna(row[column_map['grupo']]) else ""
-                valor_str = str(row[column_map['valor']]) if pd.notna(row[column_map['valor']]) else ""
-
-                if _is_numeric_label(grupo_nome):
-                    grupo_nome = ""
-                if _is_numeric_label(subgrupo_nome):
-                    subgrupo_nome = ""
-                if _is_numeric_label(conta_nome):
-                    conta_nome = ""
-                
-                # Pular linhas vazias
-                if not mes_str or not valor_str:
-                    logger.stats['linhas_ignoradas'] += 1
-                    continue
-                
-                # Parse de data e valor
-                data_prevista = parse_date(mes_str)
-                if not data_prevista:
-                    logger.stats['linhas_ignoradas'] += 1
-                    continue
-                
-                valor = parse_currency(valor_str)
-                
-                conta = None
-                if conta_nome:
-                    for _, c in contas_map.items():
-                        if c.name.lower() == conta_nome.lower():
-                            conta = c
-                            break
-
-                # Fallback: tentar casar conta por aproximação quando grupo/subgrupo vierem vazios
-                if conta is None and conta_nome and not subgrupo_nome and not grupo_nome:
-                    conta_lower = conta_nome.lower()
-                    for _, c in contas_map.items():
-                        c_lower = c.name.lower()
-                        if conta_lower in c_lower or c_lower in conta_lower:
-                            conta = c
-                            break
-
-                if conta and not subgrupo_nome:
-                    subgrupo = db.query(ChartAccountSubgroup).filter(
-                        ChartAccountSubgroup.id == conta.subgroup_id
-                    ).first()
-                    if subgrupo:
-                        subgrupo_nome = subgrupo.name
-                        grupo_nome = subgrupo.group.name if subgrupo.group else ""
-                
-                # Buscar grupo e subgrupo se não foram encontrados
-                grupo = None
-                subgrupo = None
-                
-                if grupo_nome:
-                    grupo = get_or_create_group(db, tenant, grupos_map, grupo_nome)
-                else:
-                    grupo = None
-                if subgrupo_nome and grupo:
-                    subgrupo = get_or_create_subgroup(db, tenant, subgrupos_map, grupo, subgrupo_nome)
-                
-                # Usar subgrupo e grupo da conta se não encontrou
-                if not subgrupo and conta:
-                    subgrupo = db.query(ChartAccountSubgroup).filter(
-                        ChartAccountSubgroup.id == conta.subgroup_id
-                    ).first()
-                if not grupo and subgrupo:
-                    grupo = db.query(ChartAccountGroup).filter(
-                        ChartAccountGroup.id == subgrupo.group_id
-                    ).first()
-                # Se ainda não tem grupo/subgrupo, usar fallback para "Despesas Administrativas"
-                if not subgrupo and not grupo:
-                    fallback_subgrupo = None
-                    for key, sg in subgrupos_map.items():
-                        if key.strip().lower() == "despesas administrativas":
-                            fallback_subgrupo = sg
-                            break
-                    if fallback_subgrupo:
-                        subgrupo = fallback_subgrupo
-                        grupo = db.query(ChartAccountGroup).filter(
-                            ChartAccountGroup.id == subgrupo.group_id
-                        ).first()
-                if not grupo or not subgrupo:
-                    raise ValueError(
-                        f"Grupo/Subgrupo não encontrado para conta '{conta_nome}' (linha {row_num + 2})"
-                    )
+                resolved[key] = _resolve(*key)
+            except Exception as e:
+                failed[key] = str(e)
 
-                if conta_nome:
-                    conta = get_or_create_account(db, tenant, contas_map, subgrupo, conta_nome, grupo.name)
-                else:
-                    raise ValueError(f"Conta vazia na linha {row_num + 2}")
-                
-                # Verificar se já existe (idempotência)
-                import_ref = f"previsto:{row_num + 2}"
-                existing = db.query(LancamentoPrevisto).filter(
-                    LancamentoPrevisto.import_ref == import_ref,
-                    LancamentoPrevisto.tenant_id == tenant.id,
-                    LancamentoPrevisto.business_unit_id == business_unit.id,
-                ).first()
-                if existing:
-                    logger.stats['lancamentos_previstos_existentes'] += 1
-                    continue
-                
-                # Criar previsão
-                previsao = LancamentoPrevisto(
-                    id=str(uuid4()),
-                    data_prevista=data_prevista,
-                    valor=valor,
-                    observacoes=f"Previsão de {conta_nome}",
-                    import_ref=import_ref,
-                    conta_id=conta.id,
-                    subgrupo_id=subgrupo.id,
-                    grupo_id=grupo.id,
-                    transaction_type=determine_transaction_type(grupo_nome, subgrupo_nome),
-                    status=TransactionStatus.PENDENTE,
-                    tenant_id=tenant.id,
-                    business_unit_id=business_unit.id,
-                    created_by=user.id,
-                    is_active=True
-                )
-                
-                db.add(previsao)
-                logger.stats['lancamentos_previstos_criados'] += 1
-                
-                # Commit em batch a cada 50 registros para melhor performance
-                if logger.stats['lancamentos_previstos_criados'] % 50 == 0:
-                    db.commit()
-                    logger.log(f"Lançamentos previstos criados: {logger.stats['lancamentos_previstos_criados']}", "INFO")
-            
+        combo_keys = pd.Series(list(zip(rows["grupo"], rows["subgrupo"], rows["conta"])), index=rows.index)
+        failed_rows = combo_keys.isin(list(failed))
+        for excel_row, key in zip(rows.loc[failed_rows, "excel_row"], combo_keys[failed_rows]):
+            error_msg = f"Erro na linha {excel_row}: {failed[key]}"
+            logger.log(error_msg, "ERROR")
+            logger.stats['erros'].append(error_msg)
+        logger.stats['linhas_ignoradas'] += int(failed_rows.sum())
+        rows = rows[~failed_rows]
+        combo_keys = combo_keys[~failed_rows]
+
+        # Idempotência: anti-join contra os import_ref já gravados (uma consulta)
+        rows = rows.assign(import_ref="previsto:" + rows["excel_row"].astype(str))
+        existing_refs = {
+            ref for (ref,) in db.query(LancamentoPrevisto.import_ref).filter(
+                LancamentoPrevisto.tenant_id == tenant.id,
+                LancamentoPrevisto.business_unit_id == business_unit.id,
+                LancamentoPrevisto.import_ref.like("previsto:%"),
+            )
+        }
+        existing_rows = rows["import_ref"].isin(existing_refs)
+        logger.stats['lancamentos_previstos_existentes'] += int(existing_rows.sum())
+        rows = rows[~existing_rows]
+        combo_keys = combo_keys[~existing_rows]
+
+        records = [
+            {
+                "id": str(uuid4()),
+                "data_prevista": data_prevista.to_pydatetime(),
+                "valor": valor,
+                "observacoes": f"Previsão de {conta_nome}",
+                "import_ref": import_ref,
+                **resolved[key],
+                "status": TransactionStatus.PENDENTE,
+                "tenant_id": tenant.id,
+                "business_unit_id": business_unit.id,
+                "created_by": user.id,
+                "is_active": True,
+            }
+            for data_prevista, valor, conta_nome, import_ref, key in zip(
+                rows["data_prevista"], rows["valor"], rows["conta"], rows["import_ref"], combo_keys
+            )
+        ]
+
+        rows_parsed = len(valid_index)
+        inserted_total = 0
+        report_progress(progress, sheet_name, rows_parsed=rows_parsed, rows_total=len(records))
+
+        # INSERT em lote; conflitos de import_ref (execução concorrente) contam como existentes
+        for offset in range(0, len(records), BULK_INSERT_BATCH_SIZE):
+            batch = records[offset:offset + BULK_INSERT_BATCH_SIZE]
+            try:
+                inserted = bulk_insert_ignore_conflicts(db, LancamentoPrevisto.__table__, batch)
+                db.commit()
             except Exception as e:
-                error_msg = f"Erro na linha {row_num + 2}: {str(e)}"
-                logger.log(error_msg, "ERROR")
-                logger.stats['erros'].append(error_msg)
-                logger.stats['linhas_ignoradas'] += 1
+                db.rollback()
+                logger.log(f"Erro ao commitar lote: {str(e)}", "ERROR")
+                logger.stats['linhas_ignoradas'] += len(batch)
                 continue
+            inserted_total += inserted
+            logger.stats['lancamentos_previstos_criados'] += inserted
+            logger.stats['lancamentos_previstos_existentes'] += len(batch) - inserted
+            logger.log(f"Lançamentos previstos criados: {logger.stats['lancamentos_previstos_criados']}", "INFO")
+            report_progress(
+                progress, sheet_name,
+                rows_parsed=rows_parsed, rows_total=len(records),
+                rows_done=offset + len(batch), rows_inserted=inserted_total,
+            )
+
+        report_progress(
+            progress, sheet_name,
+            rows_parsed=rows_parsed, rows_total=len(records),
+            rows_done=len(records), rows_inserted=inserted_total, final=True,
+        )
         
         logger.log("Seed de Lançamentos Previstos concluído!", "SUCCESS")
         
@@ -1182,10 +1254,13 @@ def seed_lancamentos_diarios(
     grupos_map: Dict[str, ChartAccountGroup],
     subgrupos_map: Dict[str, ChartAccountSubgroup],
     contas_map: Dict[str, ChartAccount],
-    excel_file: Path
+    excel_file: Path,
+    progress: Optional[ProgressCallback] = None,
 ):
     """
     Seed de lançamentos diários a partir do Excel
+
+    ``progress`` recebe eventos após a leitura da aba e a cada lote gravado.
     
     REGRAS DE EXCLUSÃO DE LINHA (linhas ignoradas):
     - data_movimentacao vazia ou inválida (parse_date retorna None)
@@ -1272,304 +1347,294 @@ def seed_lancamentos_diarios(
             key = acc.name.strip().lower()
             accounts_by_name.setdefault(key, []).append(acc)
 
-        # Processar em lotes para melhor performance
-        BATCH_SIZE = 50  # Reduzir tamanho do lote para commits mais frequentes
-        lancamentos_batch = []
+        cost_debug = os.getenv("COST_DEBUG") == "1"
+        debug_entries: List[Dict[str, Any]] = []
         total_rows = len(df)
-        logger.log(f"Processando {total_rows} linhas de lançamentos diários...", "INFO")
-        logger.log(f"Progresso será mostrado a cada {BATCH_SIZE} lançamentos criados", "INFO")
-        
-        processed_count = 0
-        last_log_time = time.time()
         start_time = time.time()
-        for row_num, row in df.iterrows():
-            processed_count += 1
-            # Mostrar progresso a cada 50 linhas processadas OU a cada 10 segundos
-            current_time = time.time()
-            if processed_count % 50 == 0 or (current_time - last_log_time) >= 10:
-                created_count = logger.stats['lancamentos_diarios_criados']
-                skipped_count = logger.stats['linhas_ignoradas']
-                elapsed = current_time - start_time
-                rate = processed_count / elapsed if elapsed > 0 else 0
-                remaining = (total_rows - processed_count) / rate if rate > 0 else 0
-                progress_pct = (processed_count / total_rows) * 100 if total_rows > 0 else 0
-                logger.log(f"📊 Progresso: {processed_count}/{total_rows} ({progress_pct:.1f}%) | {created_count} criados | {skipped_count} ignorados | Velocidade: {rate:.1f} linhas/s | Tempo restante: {remaining/60:.1f} min", "INFO")
-                last_log_time = current_time
-            try:
-                # Parse dos campos
-                data_mov_str = str(row[column_map['data_movimentacao']]) if pd.notna(row[column_map['data_movimentacao']]) else ""
-                subgrupo_nome = ""
-                grupo_nome = ""
-                conta_nome = ""  # CORREÇÃO: Buscar conta específica da planilha
-                if 'subgrupo' in column_map:
-                    subgrupo_nome = str(row[column_map['subgrupo']]).strip() if pd.notna(row[column_map['subgrupo']]) else ""
-                if 'grupo' in column_map:
-                    grupo_nome = str(row[column_map['grupo']]).strip() if pd.notna(row[column_map['grupo']]) else ""
-                if 'conta' in column_map:
-                    conta_nome = str(row[column_map['conta']]).strip() if pd.notna(row[column_map['conta']]) else ""
-                valor_str = str(row[column_map['valor']]) if pd.notna(row[column_map['valor']]) else ""
-                observacoes = ""
-                if 'observacoes' in column_map:
-                    observacoes = str(row[column_map['observacoes']]).strip() if pd.notna(row[column_map['observacoes']]) else ""
-                
-                # CORREÇÃO CRÍTICA: Remover espaços extras no final (problema comum em Excel)
-                grupo_nome = grupo_nome.rstrip()
-                subgrupo_nome = subgrupo_nome.rstrip()
-                conta_nome = conta_nome.rstrip()
-
-                if _is_numeric_label(grupo_nome):
-                    grupo_nome = ""
-                if _is_numeric_label(subgrupo_nome):
-                    subgrupo_nome = ""
-                if _is_numeric_label(conta_nome):
-                    conta_nome = ""
-                
-                # Ler coluna de liquidação (código da conta: scb, cef, cx, etc.)
-                liquidacao_codigo = None
-                if 'liquidacao' in column_map:
-                    liquidacao_val = row[column_map['liquidacao']] if pd.notna(row[column_map['liquidacao']]) else None
-                    if liquidacao_val is not None:
-                        liquidacao_codigo = str(liquidacao_val).strip().lower()
-                        if not liquidacao_codigo or liquidacao_codigo == 'nan':
-                            liquidacao_codigo = None
-                
-                # Pular linhas vazias
-                if not data_mov_str or not valor_str:
-                    if os.getenv("COST_DEBUG") == "1":
-                        log_entry = {
-                            "excel_row": row_num + 2,
-                            "group": grupo_nome,
-                            "subgroup": subgrupo_nome,
-                            "description": "",
-                            "month": None,
-                            "year": None,
-                            "value": 0,
-                            "tipo_resultante": None,
-                            "motivo": "dados_vazios",
-                            "action": "SKIPPED",
-                            "skip_reason": "data_mov ou valor vazio"
-                        }
-                        log_file = backend_path / "artifacts" / "seed_classification_2025.jsonl"
-                        log_file.parent.mkdir(exist_ok=True)
-                        with open(log_file, "a", encoding="utf-8") as f:
-                            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-                    logger.stats['linhas_ignoradas'] += 1
-                    continue
-                
-                # Parse de data e valor
-                data_movimentacao = parse_date(data_mov_str)
-                if not data_movimentacao:
-                    if os.getenv("COST_DEBUG") == "1":
-                        log_entry = {
-                            "excel_row": row_num + 2,
-                            "group": grupo_nome,
-                            "subgroup": subgrupo_nome,
-                            "description": "",
-                            "month": None,
-                            "year": None,
-                            "value": float(parse_currency(valor_str)),
-                            "tipo_resultante": None,
-                            "motivo": "data_invalida",
-                            "action": "SKIPPED",
-                            "skip_reason": "data não parseada"
-                        }
-                        log_file = backend_path / "artifacts" / "seed_classification_2025.jsonl"
-                        log_file.parent.mkdir(exist_ok=True)
-                        with open(log_file, "a", encoding="utf-8") as f:
-                            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-                    logger.stats['linhas_ignoradas'] += 1
-                    continue
-                
-                valor = parse_currency(valor_str)
-                
-                # Buscar grupo e subgrupo
-                grupo = None
-                subgrupo = None
-                conta = None
-                
-                if grupo_nome:
-                    grupo = get_or_create_group(db, tenant, grupos_map, grupo_nome)
-                
-                if subgrupo_nome and grupo:
-                    subgrupo = get_or_create_subgroup(db, tenant, subgrupos_map, grupo, subgrupo_nome)
-
-                # Fallback: se grupo não veio na planilha, tentar inferir pelo subgrupo/conta
-                if not grupo:
-                    if subgrupo_nome:
-                        candidates = subgroups_by_name.get(subgrupo_nome.lower().strip(), [])
-                        if len(candidates) == 1:
-                            subgrupo = candidates[0]
+        logger.log(f"Processando {total_rows} linhas de lançamentos diários...", "INFO")
+        logger.log(f"Progresso será mostrado a cada lote de {BULK_INSERT_BATCH_SIZE} lançamentos", "INFO")
+
+        # 1. Parse vetorizado das colunas
+        data_mov_col = text_column(df, column_map['data_movimentacao'])
+        valor_col = text_column(df, column_map['valor'])
+        # CORREÇÃO CRÍTICA: Remover espaços extras no final (problema comum em Excel)
+        grupo_col = blank_numeric_labels(text_column(df, column_map.get('grupo')).str.strip())
+        subgrupo_col = blank_numeric_labels(text_column(df, column_map.get('subgrupo')).str.strip())
+        # CORREÇÃO: Buscar conta específica da planilha
+        conta_col = blank_numeric_labels(text_column(df, column_map.get('conta')).str.strip())
+        observacoes_col = text_column(df, column_map.get('observacoes')).str.strip()
+        # Coluna de liquidação (código da conta: scb, cef, cx, etc.)
+        liquidacao_col = text_column(df, column_map.get('liquidacao')).str.strip().str.lower()
+        liquidacao_col = liquidacao_col.mask(liquidacao_col == "nan", "")
+
+        # Pular linhas vazias
+        empty = (data_mov_col == "") | (valor_col == "")
+        datas = parse_date_series(data_mov_col[~empty])
+        invalid_date_index = datas.index[datas.isna()]
+        valid_index = datas.index[datas.notna()]
+        logger.stats['linhas_ignoradas'] += int(empty.sum()) + len(invalid_date_index)
+
+        if cost_debug:
+            for row_num in df.index[empty]:
+                debug_entries.append({
+                    "excel_row": row_num + 2,
+                    "group": grupo_col[row_num],
+                    "subgroup": subgrupo_col[row_num],
+                    "description": "",
+                    "month": None,
+                    "year": None,
+                    "value": 0,
+                    "tipo_resultante": None,
+                    "motivo": "dados_vazios",
+                    "action": "SKIPPED",
+                    "skip_reason": "data_mov ou valor vazio"
+                })
+            invalid_values = parse_currency_series(valor_col[invalid_date_index])
+            for row_num in invalid_date_index:
+                debug_entries.append({
+                    "excel_row": row_num + 2,
+                    "group": grupo_col[row_num],
+                    "subgroup": subgrupo_col[row_num],
+                    "description": "",
+                    "month": None,
+                    "year": None,
+                    "value": float(invalid_values[row_num]),
+                    "tipo_resultante": None,
+                    "motivo": "data_invalida",
+                    "action": "SKIPPED",
+                    "skip_reason": "data não parseada"
+                })
+
+        rows = pd.DataFrame({
+            "excel_row": valid_index + 2,
+            "data_movimentacao": datas[valid_index],
+            "valor": parse_currency_series(valor_col[valid_index]),
+            "grupo": grupo_col[valid_index],
+            "subgrupo": subgrupo_col[valid_index],
+            "conta": conta_col[valid_index],
+            "observacoes": observacoes_col[valid_index],
+            "liquidacao": liquidacao_col[valid_index],
+        })
+
+        # 2. Plano de contas: cada combinação (grupo, subgrupo, conta) é resolvida
+        # uma vez contra os mapas pré-carregados e depois juntada às linhas
+        def _resolve(grupo_nome: str, subgrupo_nome: str, conta_nome: str) -> Dict[str, Any]:
+            grupo = None
+            subgrupo = None
+            conta = None
+
+            if grupo_nome:
+                grupo = get_or_create_group(db, tenant, grupos_map, grupo_nome)
+
+            if subgrupo_nome and grupo:
+                subgrupo = get_or_create_subgroup(db, tenant, subgrupos_map, grupo, subgrupo_nome)
+
+            # Fallback: se grupo não veio na planilha, tentar inferir pelo subgrupo/conta
+            if not grupo:
+                if subgrupo_nome:
+                    candidates = subgroups_by_name.get(subgrupo_nome.lower().strip(), [])
+                    if len(candidates) == 1:
+                        subgrupo = candidates[0]
+                        grupo = group_by_id.get(subgrupo.group_id)
+                if not grupo and conta_nome:
+                    acc_candidates = accounts_by_name.get(conta_nome.lower().strip(), [])
+                    if len(acc_candidates) == 1:
+                        conta = acc_candidates[0]
+                        subgrupo = subgroup_by_id.get(conta.subgroup_id)
+                        if subgrupo:
                             grupo = group_by_id.get(subgrupo.group_id)
-                    if not grupo and conta_nome:
-                        acc_candidates = accounts_by_name.get(conta_nome.lower().strip(), [])
-                        if len(acc_candidates) == 1:
-                            conta = acc_candidates[0]
-                            subgrupo = subgroup_by_id.get(conta.subgroup_id)
-                            if subgrupo:
-                                grupo = group_by_id.get(subgrupo.group_id)
-
-                if grupo and not grupo_nome:
-                    grupo_nome = grupo.name
-                if subgrupo and not subgrupo_nome:
-                    subgrupo_nome = subgrupo.name
-                
-                if not grupo or not subgrupo:
-                    raise ValueError(
-                        f"Grupo/Subgrupo não encontrado na linha {row_num + 2}. Grupo='{grupo_nome}', Subgrupo='{subgrupo_nome}'"
-                    )
-                
-                if conta is None and conta_nome:
-                    conta = get_or_create_account(db, tenant, contas_map, subgrupo, conta_nome, grupo.name)
-                if conta is None and not conta_nome and subgrupo:
-                    conta = next(
-                        (c for c in contas_map.values() if getattr(c, "subgroup_id", None) == subgrupo.id),
-                        None
-                    )
-                    if conta is None:
-                        conta = get_or_create_account(db, tenant, contas_map, subgrupo, subgrupo.name, grupo.name)
-                if not conta:
-                    raise ValueError(f"Conta não encontrada na linha {row_num + 2}")
-                
-                # Verificar se já existe (idempotência)
-                # Usar referência de importação por linha para permitir duplicidades legítimas
-                import_ref = f"diario:{row_num + 2}"
-
-                existing = db.query(LancamentoDiario).filter(
-                    LancamentoDiario.import_ref == import_ref,
-                    LancamentoDiario.tenant_id == tenant.id,
-                    LancamentoDiario.business_unit_id == business_unit.id
-                ).first()
-                
-                if existing:
-                    if os.getenv("COST_DEBUG") == "1" and data_movimentacao.year == 2025:
-                        log_entry = {
-                            "excel_row": row_num + 2,
-                            "group": grupo_nome,
-                            "subgroup": subgrupo_nome,
-                            "description": observacoes or f"Lançamento de {subgrupo_nome}",
-                            "month": data_movimentacao.month,
-                            "year": data_movimentacao.year,
-                            "value": float(valor),
-                            "tipo_resultante": existing.transaction_type.value if existing.transaction_type else None,
-                            "motivo": "ja_existe",
-                            "action": "SKIPPED",
-                            "skip_reason": "lançamento já existe (idempotência)"
-                        }
-                        log_file = backend_path / "artifacts" / "seed_classification_2025.jsonl"
-                        log_file.parent.mkdir(exist_ok=True)
-                        with open(log_file, "a", encoding="utf-8") as f:
-                            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-                    logger.stats['lancamentos_diarios_existentes'] += 1
-                    continue
-                
-                # Determinar tipo de transação
-                transaction_type = determine_transaction_type(grupo_nome, subgrupo_nome)
-                
-                # Criar ou obter conta de liquidação se houver código
-                liquidation_account_id = None
-                if liquidacao_codigo:
-                    liquidation_account = get_or_create_liquidation_account(
-                        db, tenant, business_unit, liquidacao_codigo
-                    )
-                    if liquidation_account:
-                        liquidation_account_id = liquidation_account.id
-                
-                # Logging de classificação (se COST_DEBUG=1)
-                if os.getenv("COST_DEBUG") == "1" and data_movimentacao.year == 2025:
-                    log_entry = {
-                        "excel_row": row_num + 2,
-                        "group": grupo_nome,
-                        "subgroup": subgrupo_nome,
-                        "description": observacoes or f"Lançamento de {subgrupo_nome}",
-                        "month": data_movimentacao.month,
-                        "year": data_movimentacao.year,
-                        "value": float(valor),
-                        "tipo_resultante": transaction_type.value,
-                        "motivo": _get_classification_reason(grupo_nome, subgrupo_nome, transaction_type),
-                        "action": "INSERTED"
-                    }
-                    
-                    log_file = backend_path / "artifacts" / "seed_classification_2025.jsonl"
-                    log_file.parent.mkdir(exist_ok=True)
-                    with open(log_file, "a", encoding="utf-8") as f:
-                        f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-                
-                # Criar lançamento (adicionar ao lote)
-                # CORREÇÃO: Se não há observações, usar número da linha do Excel para diferenciar
-                # Isso permite múltiplos lançamentos legítimos sem observações
-                if observacoes and observacoes.strip():
-                    obs_final = observacoes
-                else:
-                    # Usar número da linha como identificador único para permitir múltiplos lançamentos
-                    obs_final = f"Lançamento linha {row_num + 2}"
-                
-                lancamento = LancamentoDiario(
-                    id=str(uuid4()),
-                    data_movimentacao=data_movimentacao,
-                    valor=valor,
-                    liquidacao=None,  # Campo DateTime - manter None por enquanto
-                    liquidation_account_id=liquidation_account_id,  # Conta de liquidação (scb, cef, cx, etc.)
-                    observacoes=obs_final,
-                    import_ref=import_ref,
-                    conta_id=conta.id,
-                    subgrupo_id=subgrupo.id,
-                    grupo_id=grupo.id,
-                    transaction_type=transaction_type,
-                    status=TransactionStatus.LIQUIDADO,
-                    tenant_id=tenant.id,
-                    business_unit_id=business_unit.id,
-                    created_by=user.id,
-                    is_active=True
+
+            if grupo and not grupo_nome:
+                grupo_nome = grupo.name
+            if subgrupo and not subgrupo_nome:
+                subgrupo_nome = subgrupo.name
+
+            if not grupo or not subgrupo:
+                raise ValueError(
+                    f"Grupo/Subgrupo não encontrado. Grupo='{grupo_nome}', Subgrupo='{subgrupo_nome}'"
                 )
-                
-                lancamentos_batch.append(lancamento)
-                logger.stats['lancamentos_diarios_criados'] += 1
-                
-                # Commit em lotes
-                if len(lancamentos_batch) >= BATCH_SIZE:
-                    try:
-                        logger.log(f"💾 Committing lote de {len(lancamentos_batch)} lançamentos...", "INFO")
-                        db.add_all(lancamentos_batch)
-                        db.commit()
-                        logger.log(f"✅ Lote commitado: {logger.stats['lancamentos_diarios_criados']} lançamentos criados (linha {row_num + 2}/{total_rows})", "INFO")
-                        lancamentos_batch = []
-                    except Exception as e:
-                        db.rollback()
-                        logger.log(f"Erro ao commitar lote: {str(e)}", "ERROR")
-                        # Tentar commit individual para o lote
-                        for lanc in lancamentos_batch:
-                            try:
-                                db.add(lanc)
-                                db.commit()
-                            except:
-                                db.rollback()
-                                logger.stats['linhas_ignoradas'] += 1
-                        lancamentos_batch = []
-            
+
+            if conta is None and conta_nome:
+                conta = get_or_create_account(db, tenant, contas_map, subgrupo, conta_nome, grupo.name)
+            if conta is None and not conta_nome and subgrupo:
+                conta = next(
+                    (c for c in contas_map.values() if getattr(c, "subgroup_id", None) == subgrupo.id),
+                    None
+                )
+                if conta is None:
+                    conta = get_or_create_account(db, tenant, contas_map, subgrupo, subgrupo.name, grupo.name)
+            if not conta:
+                raise ValueError("Conta não encontrada")
+
+            return {
+                "conta_id": conta.id,
+                "subgrupo_id": subgrupo.id,
+                "grupo_id": grupo.id,
+                "grupo_nome": grupo_nome,
+                "subgrupo_nome": subgrupo_nome,
+                "transaction_type": determine_transaction_type(grupo.name, subgrupo.name),
+            }
+
+        combo_columns = ["grupo", "subgrupo", "conta"]
+        resolved_rows = []
+        failed: Dict[Tuple[str, str, str], str] = {}
+        for key in rows[combo_columns].drop_duplicates().itertuples(index=False, name=None):
+            try:
+                resolved_rows.append({**dict(zip(combo_columns, key)), **_resolve(*key)})
             except Exception as e:
-                error_msg = f"Erro na linha {row_num + 2}: {str(e)}"
+                failed[key] = str(e)
+
+        if failed:
+            combo_keys = pd.Series(list(zip(rows["grupo"], rows["subgrupo"], rows["conta"])), index=rows.index)
+            failed_rows = combo_keys.isin(list(failed))
+            for excel_row, key in zip(rows.loc[failed_rows, "excel_row"], combo_keys[failed_rows]):
+                error_msg = f"Erro na linha {excel_row}: {failed[key]}"
                 logger.log(error_msg, "ERROR")
                 logger.stats['erros'].append(error_msg)
-                logger.stats['linhas_ignoradas'] += 1
-                continue
-        
-        # Commit do lote final
-        if lancamentos_batch:
+            logger.stats['linhas_ignoradas'] += int(failed_rows.sum())
+
+        resolved_columns = combo_columns + [
+            "conta_id", "subgrupo_id", "grupo_id", "grupo_nome", "subgrupo_nome", "transaction_type"
+        ]
+        rows = rows.merge(pd.DataFrame(resolved_rows, columns=resolved_columns), on=combo_columns, how="inner")
+        rows = rows.sort_values("excel_row", kind="stable").reset_index(drop=True)
+
+        # 3. Idempotência: anti-join contra os import_ref já gravados (uma consulta)
+        # Referência de importação por linha para permitir duplicidades legítimas
+        rows["import_ref"] = "diario:" + rows["excel_row"].astype(str)
+        existing_refs = dict(
+            db.query(LancamentoDiario.import_ref, LancamentoDiario.transaction_type).filter(
+                LancamentoDiario.tenant_id == tenant.id,
+                LancamentoDiario.business_unit_id == business_unit.id,
+                LancamentoDiario.import_ref.like("diario:%"),
+            )
+        )
+        existing_rows = rows["import_ref"].isin(list(existing_refs))
+        logger.stats['lancamentos_diarios_existentes'] += int(existing_rows.sum())
+
+        if cost_debug:
+            for row in rows[existing_rows & (rows["data_movimentacao"].dt.year == 2025)].itertuples():
+                existing_type = existing_refs[row.import_ref]
+                debug_entries.append({
+                    "excel_row": row.excel_row,
+                    "group": row.grupo_nome,
+                    "subgroup": row.subgrupo_nome,
+                    "description": row.observacoes or f"Lançamento de {row.subgrupo_nome}",
+                    "month": row.data_movimentacao.month,
+                    "year": row.data_movimentacao.year,
+                    "value": float(row.valor),
+                    "tipo_resultante": existing_type.value if existing_type else None,
+                    "motivo": "ja_existe",
+                    "action": "SKIPPED",
+                    "skip_reason": "lançamento já existe (idempotência)"
+                })
+        rows = rows[~existing_rows]
+
+        # 4. Contas de liquidação: uma consulta + criação apenas dos códigos novos
+        liquidation_by_code = dict(
+            db.query(LiquidationAccount.code, LiquidationAccount.id).filter(
+                LiquidationAccount.tenant_id == tenant.id
+            )
+        )
+        for codigo in rows.loc[rows["liquidacao"] != "", "liquidacao"].unique():
+            if codigo.upper() not in liquidation_by_code:
+                liquidation_account = get_or_create_liquidation_account(db, tenant, business_unit, codigo)
+                if liquidation_account:
+                    liquidation_by_code[liquidation_account.code] = liquidation_account.id
+
+        if cost_debug:
+            for row in rows[rows["data_movimentacao"].dt.year == 2025].itertuples():
+                debug_entries.append({
+                    "excel_row": row.excel_row,
+                    "group": row.grupo_nome,
+                    "subgroup": row.subgrupo_nome,
+                    "description": row.observacoes or f"Lançamento de {row.subgrupo_nome}",
+                    "month": row.data_movimentacao.month,
+                    "year": row.data_movimentacao.year,
+                    "value": float(row.valor),
+                    "tipo_resultante": row.transaction_type.value,
+                    "motivo": _get_classification_reason(row.grupo_nome, row.subgrupo_nome, row.transaction_type),
+                    "action": "INSERTED"
+                })
+            _append_classification_log(debug_entries)
+
+        # CORREÇÃO: Se não há observações, usar número da linha do Excel para diferenciar
+        # Isso permite múltiplos lançamentos legítimos sem observações
+        obs_final = rows["observacoes"].where(
+            rows["observacoes"] != "", "Lançamento linha " + rows["excel_row"].astype(str)
+        )
+        records = [
+            {
+                "id": str(uuid4()),
+                "data_movimentacao": data_movimentacao.to_pydatetime(),
+                "valor": valor,
+                "liquidacao": None,  # Campo DateTime - manter None por enquanto
+                "liquidation_account_id": liquidation_by_code.get(codigo.upper()) if codigo else None,
+                "observacoes": observacoes,
+                "import_ref": import_ref,
+                "conta_id": conta_id,
+                "subgrupo_id": subgrupo_id,
+                "grupo_id": grupo_id,
+                "transaction_type": transaction_type,
+                "status": TransactionStatus.LIQUIDADO,
+                "tenant_id": tenant.id,
+                "business_unit_id": business_unit.id,
+                "created_by": user.id,
+                "is_active": True,
+            }
+            for data_movimentacao, valor, codigo, observacoes, import_ref, conta_id, subgrupo_id, grupo_id, transaction_type in zip(
+                rows["data_movimentacao"], rows["valor"], rows["liquidacao"], obs_final, rows["import_ref"],
+                rows["conta_id"], rows["subgrupo_id"], rows["grupo_id"], rows["transaction_type"],
+            )
+        ]
+
+        rows_parsed = len(valid_index)
+        inserted_total = 0
+        report_progress(progress, sheet_name, rows_parsed=rows_parsed, rows_total=len(records))
+
+        # 5. INSERT multi-linha em lotes; conflitos de import_ref (execução
+        # concorrente) contam como existentes
+        for offset in range(0, len(records), BULK_INSERT_BATCH_SIZE):
+            batch = records[offset:offset + BULK_INSERT_BATCH_SIZE]
             try:
-                db.add_all(lancamentos_batch)
+                logger.log(f"💾 Committing lote de {len(batch)} lançamentos...", "INFO")
+                inserted = bulk_insert_ignore_conflicts(db, LancamentoDiario.__table__, batch)
                 db.commit()
-                logger.log(f"✅ Lote final commitado: {len(lancamentos_batch)} lançamentos", "INFO")
             except Exception as e:
                 db.rollback()
-                logger.log(f"Erro ao commitar lote final: {str(e)}", "ERROR")
-                # Tentar commit individual
-                for lanc in lancamentos_batch:
-                    try:
-                        db.add(lanc)
-                        db.commit()
-                    except:
-                        db.rollback()
-                        logger.stats['linhas_ignoradas'] += 1
+                logger.log(f"Erro ao commitar lote: {str(e)}", "ERROR")
+                logger.stats['linhas_ignoradas'] += len(batch)
+                continue
+            inserted_total += inserted
+            logger.stats['lancamentos_diarios_criados'] += inserted
+            logger.stats['lancamentos_diarios_existentes'] += len(batch) - inserted
+            logger.log(f"✅ Lote commitado: {logger.stats['lancamentos_diarios_criados']} lançamentos criados (linha {batch[-1]['import_ref'].split(':')[1]}/{total_rows})", "INFO")
+
+            processed_count = offset + len(batch)
+            elapsed = time.time() - start_time
+            rate = processed_count / elapsed if elapsed > 0 else 0
+            remaining = (len(records) - processed_count) / rate if rate > 0 else 0
+            progress_pct = (processed_count / len(records)) * 100
+            logger.log(f"📊 Progresso: {processed_count}/{len(records)} ({progress_pct:.1f}%) | {logger.stats['lancamentos_diarios_criados']} criados | {logger.stats['linhas_ignoradas']} ignorados | Velocidade: {rate:.1f} linhas/s | Tempo restante: {remaining/60:.1f} min", "INFO")
+            report_progress(
+                progress, sheet_name,
+                rows_parsed=rows_parsed, rows_total=len(records),
+                rows_done=processed_count, rows_inserted=inserted_total,
+            )
+        
+        # Rollup diário é reconstruído em lote após a importação
+        try:
+            LancamentoRollupService.rebuild(db, tenant.id, business_unit.id)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.log(f"Erro ao recalcular rollup de lançamentos diários: {str(e)}", "ERROR")
+
+        report_progress(
+            progress, sheet_name,
+            rows_parsed=rows_parsed, rows_total=len(records),
+            rows_done=len(records), rows_inserted=inserted_total, final=True,
+        )
         
         logger.log("Seed de Lançamentos Diários concluído!", "SUCCESS")
         
@@ -1682,6 +1747,7 @@ def main():
                     )
                 ).delete(synchronize_session=False)
                 
+                LancamentoRollupService.rebuild(db, tenant.id)
                 db.commit()
                 logger.log(f"✅ Removidos {deleted_diarios} lançamentos diários de 2025 e {deleted_prev} lançamentos previstos de 2025.", "SUCCESS")
                 
@@ -11,6 +11,7 @@ from decimal import Decimal
 from typing import Optional, List
 import pandas as pd
 
+from app.models.chart_of_accounts import resolve_transaction_type
 from app.models.lancamento_diario import TransactionType
 
 # Nomes das abas (tentar diferentes variações)
@@ -100,15 +101,14 @@ def determine_transaction_type(grupo_nome: str, subgrupo_nome: Optional[str] = N
     """
     Determina o tipo de transação baseado no grupo e subgrupo.
     
-    REGRA CRÍTICA: Grupos com "Custos" (singular ou plural) devem ser CUSTO.
-    Ordem de verificação:
-    1. EXCLUSÕES (Deduções, Movimentações Não Operacionais)
-    2. RECEITA (palavras-chave: receita, venda, renda, faturamento, vendas)
-    3. CUSTO (palavras-chave: custo, custos - no grupo OU subgrupo)
+    Mesma regra do mapa conta → tipo usado pela API e pelos importadores
+    (app.models.chart_of_accounts.resolve_transaction_type):
+    1. EXCLUSÕES (Deduções, Movimentações Não Operacionais) → DESPESA, filtradas pelo grupo
+    2. RECEITA (palavras-chave no grupo: receita, venda, renda, faturamento)
+    3. CUSTO (custo/custos no grupo OU palavras-chave de custo no subgrupo)
     4. DESPESA (padrão)
     """
-    if not grupo_nome:
-        return TransactionType.DESPESA
+    return TransactionType(resolve_transaction_type(grupo_nome, subgrupo_nome))
     
     grupo_lower = grupo_nome.lower().strip()
     subgrupo_lower = (subgrupo_nome or "").lower().strip()
@@ -0,0 +1,148 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario, TransactionType  # noqa: E402
+from app.models.lancamento_diario import TransactionStatus as DiarioStatus  # noqa: E402
+from app.models.lancamento_previsto import LancamentoPrevisto  # noqa: E402
+from app.models.lancamento_previsto import TransactionStatus as PrevistoStatus  # noqa: E402
+from app.models.lancamento_rollup import LancamentoDiarioRollup  # noqa: E402
+from app.services.aggregation_query_service import AggregationQueryService  # noqa: E402
+from app.services.financial_aggregation_service import FinancialAggregationService  # noqa: E402
+
+TENANT = "t1"
+BU = "bu1"
+YEAR_START = datetime(2025, 1, 1)
+YEAR_END = datetime(2025, 12, 31, 23, 59, 59)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoPrevisto.__table__,
+        LancamentoDiarioRollup.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+
+    session.add(ChartAccountGroup(id="g-rec", code="1", name="Receita", tenant_id=TENANT))
+    session.add(ChartAccountGroup(id="g-ded", code="2", name="Deduções", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg-rec", code="1.1", name="Vendas", group_id="g-rec", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg-ded", code="2.1", name="Impostos", group_id="g-ded", tenant_id=TENANT))
+    session.add(ChartAccount(id="c-rec", code="1.1.1", name="Produtos", subgroup_id="sg-rec", account_type="Analítica", tenant_id=TENANT))
+    session.add(ChartAccount(id="c-ded", code="2.1.1", name="Simples", subgroup_id="sg-ded", account_type="Analítica", tenant_id=TENANT))
+    session.commit()
+
+    yield session
+    session.close()
+
+
+def _common(conta):
+    suffix = conta.split("-")[1]
+    return {
+        "conta_id": conta,
+        "subgrupo_id": f"sg-{suffix}",
+        "grupo_id": f"g-{suffix}",
+        "tenant_id": TENANT,
+        "business_unit_id": BU,
+        "created_by": "u1",
+    }
+
+
+def test_previstos_summary_matches_row_by_row_sum(db):
+    previstos = [
+        ("c-rec", datetime(2025, 3, 2), "100.10", PrevistoStatus.PENDENTE),
+        ("c-rec", datetime(2025, 3, 28), "50.00", PrevistoStatus.CANCELADO),
+        ("c-ded", datetime(2025, 3, 10), "30.00", PrevistoStatus.PENDENTE),
+        ("c-rec", datetime(2025, 7, 1), "20.05", PrevistoStatus.CONFIRMADO),
+    ]
+    for conta, data, valor, status in previstos:
+        db.add(
+            LancamentoPrevisto(
+                data_prevista=data,
+                valor=Decimal(valor),
+                transaction_type=TransactionType.RECEITA,
+                status=status,
+                **_common(conta),
+            )
+        )
+    db.commit()
+
+    summary = FinancialAggregationService.aggregate_monthly_summary(
+        db, TENANT, BU, 2025, include_previstos=True
+    )
+
+    # Resumo anual não filtra status; Deduções ficam de fora
+    assert summary["monthly"][2]["revenue"] == pytest.approx(150.10)
+    assert summary["monthly"][6]["revenue"] == pytest.approx(20.05)
+
+    matrix = AggregationQueryService.totals_by_hierarchy_and_month(
+        db, LancamentoPrevisto, TENANT, BU, YEAR_START, YEAR_END
+    )
+    by_key = {(conta, month): total for _, _, conta, month, total in matrix}
+    assert by_key[("c-rec", 3)] == Decimal("100.10")
+    assert by_key[("c-ded", 3)] == Decimal("30.00")
+    assert by_key[("c-rec", 7)] == Decimal("20.05")
+
+
+def test_debug_summary_sql_matches_memory(db):
+    lancamentos = [
+        ("c-rec", datetime(2025, 1, 31, 23, 0), "10.00", TransactionType.RECEITA, DiarioStatus.PENDENTE),
+        ("c-rec", datetime(2025, 2, 1, 0, 30), "5.50", TransactionType.RECEITA, DiarioStatus.LIQUIDADO),
+        ("c-ded", datetime(2025, 2, 14), "2.25", TransactionType.DESPESA, DiarioStatus.CANCELADO),
+    ]
+    for conta, data, valor, tx_type, status in lancamentos:
+        db.add(
+            LancamentoDiario(
+                data_movimentacao=data,
+                valor=Decimal(valor),
+                transaction_type=tx_type,
+                status=status,
+                **_common(conta),
+            )
+        )
+    db.commit()
+
+    debug = FinancialAggregationService.get_debug_summary(db, TENANT, BU, 2025)
+
+    assert debug["annual_totals"]["sql"] == debug["annual_totals"]["memory"]
+    assert all(all(item["match"].values()) for item in debug["monthly_comparison"])
+    assert Decimal(debug["monthly_comparison"][1]["sql"]["revenue"]) == Decimal("5.50")
+
+    realized = AggregationQueryService.totals_by_hierarchy_and_month(
+        db, LancamentoDiario, TENANT, BU, YEAR_START, YEAR_END
+    )
+    # Cancelados ficam fora da matriz previsto x realizado
+    assert sorted((conta, month, total) for _, _, conta, month, total in realized) == [
+        ("c-rec", 1, Decimal("10.00")),
+        ("c-rec", 2, Decimal("5.50")),
+    ]
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+import app.services.bulk_export as bulk_export  # noqa: E402
+from app.api import dashboard, lancamentos_previstos  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario, TransactionType  # noqa: E402
+from app.models.lancamento_previsto import LancamentoPrevisto  # noqa: E402
+from app.models.lancamento_previsto import TransactionType as PrevistoType  # noqa: E402
+from app.services.bulk_export import BulkExportService  # noqa: E402
+from app.services.dependencies import get_current_active_user  # noqa: E402
+
+TENANT = "t1"
+BU = "bu1"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoPrevisto.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(bulk_export, "SessionLocal", session_factory)
+
+    session = session_factory()
+    session.add(ChartAccountGroup(id="g", code="1", name="Receita", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg", code="1.1", name="Vendas", group_id="g", tenant_id=TENANT))
+    session.add(ChartAccount(id="c", code="1.1.1", name="Produtos", subgroup_id="sg", account_type="Analítica", tenant_id=TENANT))
+    common = {"subgrupo_id": "sg", "grupo_id": "g", "tenant_id": TENANT, "business_unit_id": BU, "created_by": "u1"}
+    for idx in range(5):
+        day = datetime(2025, 1, idx + 1)
+        # Conta fora do plano: o outer join mantém a linha
+        conta = "c" if idx else "c-removida"
+        session.add(
+            LancamentoDiario(
+                id=f"d{idx}", data_movimentacao=day, valor=idx + 0.5, conta_id=conta,
+                transaction_type=TransactionType.RECEITA, **common
+            )
+        )
+        session.add(
+            LancamentoPrevisto(
+                id=f"p{idx}", data_prevista=day, valor=idx + 0.5, conta_id=conta,
+                transaction_type=PrevistoType.RECEITA, observacoes="Aluguel, sala 2" if idx == 4 else None, **common
+            )
+        )
+    session.commit()
+    session.close()
+
+    api = FastAPI()
+    api.include_router(dashboard.router)
+    api.include_router(lancamentos_previstos.router)
+    api.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(
+        id="u1", tenant_id=TENANT, business_unit_id=BU, role="user"
+    )
+    api.dependency_overrides[get_db] = lambda: session_factory()
+    yield TestClient(api)
+
+
+def test_previstos_stream_as_csv_with_same_values_as_json(client):
+    as_json = client.get("/api/v1/lancamentos-previstos", params={"limit": 3}).json()["previsoes"]
+    response = client.get("/api/v1/lancamentos-previstos", params={"limit": 3, "format": "csv"})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="lancamentos_previstos.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == [item["id"] for item in as_json] == ["p4", "p3", "p2"]
+    assert rows[0]["observacoes"] == "Aluguel, sala 2"
+    assert (rows[0]["conta_nome"], rows[0]["valor"], rows[0]["transaction_type"]) == ("Produtos", "4.5", "RECEITA")
+    assert rows[0]["data_prevista"] == as_json[0]["data_prevista"]
+
+    assert client.get("/api/v1/lancamentos-previstos", params={"format": "xml"}).status_code == 422
+
+
+def test_ndjson_is_written_one_batch_at_a_time(client):
+    response = client.get("/lancamentos-diarios", params={"limit": 10}, headers={"Accept": "application/x-ndjson"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == ["d4", "d3", "d2", "d1", "d0"]
+    assert lines[-1] == {
+        "id": "d0",
+        "data_movimentacao": "2025-01-01T00:00:00",
+        "valor": 0.5,
+        "observacoes": None,
+        "transaction_type": "RECEITA",
+        "conta_id": "c-removida",
+        "conta_nome": None,
+    }
+
+    statement = select(LancamentoDiario.id).order_by(LancamentoDiario.id)
+    chunks = list(BulkExportService.iter_rows(statement, "csv", batch_size=2))
+    # Cabeçalho junto do primeiro lote; um bloco por lote de 2 linhas
+    assert chunks == ["id\r\nd0\r\nd1\r\n", "d2\r\nd3\r\n", "d4\r\n"]
@@ -0,0 +1,139 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import Base  # noqa: E402
+from app.models.cash_flow_forecast_values import CashFlowForecastValue  # noqa: E402
+from app.models.cash_flow_settings import CashFlowYearSettings  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario, TransactionType  # noqa: E402
+from app.models.lancamento_previsto import LancamentoPrevisto  # noqa: E402
+from app.services.cash_flow_matrix_service import CashFlowMatrixService  # noqa: E402
+
+TENANT = "t1"
+BU = "bu1"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoPrevisto.__table__,
+        CashFlowYearSettings.__table__,
+        CashFlowForecastValue.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+
+    session.add(ChartAccountGroup(id="g-rec", code="1", name="Receita", tenant_id=TENANT))
+    session.add(ChartAccountGroup(id="g-cus", code="2", name="Custos", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg-rec", code="1.1", name="Vendas", group_id="g-rec", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg-cus", code="2.1", name="Insumos", group_id="g-cus", tenant_id=TENANT))
+    session.add(ChartAccount(id="c-rec", code="1.1.1", name="Produtos", subgroup_id="sg-rec", account_type="Analítica", tenant_id=TENANT))
+    session.add(ChartAccount(id="c-cus", code="2.1.1", name="Matéria-prima", subgroup_id="sg-cus", account_type="Analítica", tenant_id=TENANT))
+    session.add(CashFlowYearSettings(tenant_id=TENANT, business_unit_id=BU, year=2025, saldo_ano_anterior=Decimal("100.00")))
+    session.commit()
+
+    CashFlowMatrixService.invalidate()
+    yield session
+    session.close()
+    CashFlowMatrixService.invalidate()
+
+
+def _diario(conta, data, valor, tx_type):
+    suffix = conta.split("-")[1]
+    return LancamentoDiario(
+        data_movimentacao=data,
+        valor=Decimal(valor),
+        conta_id=conta,
+        subgrupo_id=f"sg-{suffix}",
+        grupo_id=f"g-{suffix}",
+        transaction_type=tx_type,
+        tenant_id=TENANT,
+        business_unit_id=BU,
+        created_by="u1",
+    )
+
+
+def test_matrix_rows_and_subtotals(db):
+    db.add(_diario("c-rec", datetime(2025, 1, 10), "500.00", TransactionType.RECEITA))
+    db.add(_diario("c-cus", datetime(2025, 1, 12), "120.00", TransactionType.CUSTO))
+    db.add(_diario("c-rec", datetime(2025, 2, 3), "80.00", TransactionType.RECEITA))
+    db.commit()
+
+    matrix = CashFlowMatrixService.get_matrix(db, TENANT, BU, 2025)
+
+    assert matrix.row("produtos", row_type="conta").realizado[:2] == (Decimal("500.00"), Decimal("80.00"))
+    assert matrix.row("Produtos", row_type="grupo") is None
+    assert matrix.row("Lucro Bruto").realizado[0] == Decimal("380.00")
+    reservas = matrix.row("Lucro líquido acumulado (Reservas)")
+    assert reservas.realizado[1] == Decimal("560.00")
+    assert matrix.row("Receita").total_realizado(1) == Decimal("500.00")
+
+
+def test_matrix_is_memoized_until_data_changes(db):
+    db.add(_diario("c-rec", datetime(2025, 3, 1), "10.00", TransactionType.RECEITA))
+    db.commit()
+
+    first = CashFlowMatrixService.get_matrix(db, TENANT, BU, 2025)
+    assert CashFlowMatrixService.get_matrix(db, TENANT, BU, 2025) is first
+
+    # Nova "requisição": cache de sessão vazio, fonte inalterada
+    db.info.clear()
+    assert CashFlowMatrixService.get_matrix(db, TENANT, BU, 2025) is first
+
+    rows = first.as_rows()
+    rows[0]["meses"]["JANEIRO"]["realizado"] = 999.0
+    assert first.as_rows()[0]["meses"]["JANEIRO"]["realizado"] != 999.0
+
+    db.add(_diario("c-rec", datetime(2025, 3, 2), "5.00", TransactionType.RECEITA))
+    db.commit()
+    db.info.clear()
+
+    refreshed = CashFlowMatrixService.get_matrix(db, TENANT, BU, 2025)
+    assert refreshed is not first
+    assert refreshed.row("Produtos").realizado[2] == Decimal("15.00")
+
+
+def test_cached_matrix_is_served_without_querying_sources(db):
+    db.add(_diario("c-rec", datetime(2025, 4, 1), "20.00", TransactionType.RECEITA))
+    db.commit()
+    first = CashFlowMatrixService.get_matrix(db, TENANT, BU, 2025)
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda c, cur, stmt, *a: statements.append(stmt))
+    db.info.clear()
+    assert CashFlowMatrixService.get_matrix(db, TENANT, BU, 2025) is first
+    assert statements == []
+
+    # Escrita em massa pela sessão também invalida
+    db.execute(update(LancamentoDiario).values(valor=Decimal("30.00")))
+    db.commit()
+    db.info.clear()
+    assert CashFlowMatrixService.get_matrix(db, TENANT, BU, 2025).row("Produtos").realizado[3] == Decimal("30.00")
@@ -0,0 +1,124 @@
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.api.chart_accounts import get_chart_accounts_hierarchy  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+import app.services.chart_hierarchy_cache as chart_cache  # noqa: E402
+from app.services.chart_hierarchy_cache import ChartHierarchyCache  # noqa: E402
+
+TENANT = "t1"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(
+        engine,
+        tables=[ChartAccountGroup.__table__, ChartAccountSubgroup.__table__, ChartAccount.__table__],
+    )
+    session = sessionmaker(bind=engine)()
+    session.add(ChartAccountGroup(id="g2", code="2", name="Despesas", tenant_id=TENANT, created_at=datetime(2025, 1, 1)))
+    session.add(ChartAccountGroup(id="g1", code="1", name="Receita", tenant_id=TENANT, created_at=datetime(2025, 1, 2)))
+    session.add(ChartAccountSubgroup(id="sg1", code="1.1", name="Vendas", group_id="g1", tenant_id=TENANT))
+    # Subgrupo cujo grupo está inativo: aparece como órfão
+    session.add(ChartAccountGroup(id="g-off", code="9", name="Antigo", tenant_id=TENANT, is_active=False))
+    session.add(ChartAccountSubgroup(id="sg-orfao", code="0.1", name="Solto", group_id="g-off", tenant_id=TENANT))
+    for account_id, code, name, day in [("c2", "1.1.2", "Serviços", 1), ("c1", "1.1.1", "Produtos", 2)]:
+        session.add(
+            ChartAccount(
+                id=account_id, code=code, name=name, subgroup_id="sg1", account_type="Receita",
+                tenant_id=TENANT, created_at=datetime(2025, 1, day),
+            )
+        )
+    # Plano global: usado apenas por tenants sem plano próprio
+    session.add(ChartAccountGroup(id="g-global", code="1", name="Receita Global", tenant_id=None))
+    session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session.info["statements"] = statements
+    yield session
+    session.close()
+
+
+def test_hierarchy_is_assembled_once_and_reloaded_after_writes(db):
+    user = SimpleNamespace(tenant_id=TENANT)
+    statements = db.info["statements"]
+
+    first = get_chart_accounts_hierarchy(current_user=user, db=db)
+    assert [group["id"] for group in first["groups"]] == ["g1", "g-global", "g2"]
+    assert [subgroup["id"] for subgroup in first["subgroups"]] == ["sg1", "sg-orfao"]
+    assert first["subgroups"][1]["group_name"] is None
+    assert [account["id"] for account in first["accounts"]] == ["c1", "c2"]
+    assert first["accounts"][0]["group_name"] == "Receita"
+    loaded = len(statements)
+    assert loaded == 3
+
+    assert get_chart_accounts_hierarchy(current_user=user, db=db) == first
+    assert len(statements) == loaded
+
+    # Escrita via ORM: nova versão do tenant, próxima leitura recarrega
+    db.add(ChartAccount(id="c0", code="1.1.0", name="Outros", subgroup_id="sg1", account_type="Receita", tenant_id=TENANT))
+    db.commit()
+    refreshed = get_chart_accounts_hierarchy(current_user=user, db=db)
+    assert [account["id"] for account in refreshed["accounts"]] == ["c0", "c1", "c2"]
+
+
+def test_plan_view_and_bulk_writes(db):
+    plan = ChartHierarchyCache.plan(db, TENANT)
+    assert [group.id for group in plan.groups] == ["g2", "g1"]
+    assert [account.id for account in plan.accounts_by_subgroup["sg1"]] == ["c2", "c1"]
+    assert plan.group_of_account("c1").name == "Receita"
+    # Tenant sem plano próprio usa o global
+    assert [group.id for group in ChartHierarchyCache.plan(db, "outro").groups] == ["g-global"]
+
+    # UPDATE em massa (sem flush de instâncias) também invalida
+    db.query(ChartAccountGroup).filter(ChartAccountGroup.id == "g2").update({ChartAccountGroup.is_active: False})
+    db.commit()
+    assert [group.id for group in ChartHierarchyCache.plan(db, TENANT).groups] == ["g1"]
+
+
+def test_invalidation_log_is_bounded_without_caching_stale_loads(db, monkeypatch):
+    monkeypatch.setattr(chart_cache, "CHART_HIERARCHY_CACHE_MAX_SIZE", 2)
+    build_plan = chart_cache._build_plan
+
+    def build_during_writes(session, tenant_id):
+        plan = build_plan(session, tenant_id)
+        # Escrita no tenant durante a carga, e o registro dela já descartado
+        for other in (tenant_id, "x1", "x2", "x3"):
+            ChartHierarchyCache.invalidate(other)
+        return plan
+
+    monkeypatch.setattr(chart_cache, "_build_plan", build_during_writes)
+    ChartHierarchyCache.invalidate(TENANT)
+    ChartHierarchyCache.get(db, TENANT)
+    assert len(chart_cache._TENANT_INVALIDATED_AT) == 2
+    assert TENANT not in chart_cache._HIERARCHY_CACHE
+
+    monkeypatch.setattr(chart_cache, "_build_plan", build_plan)
+    plan = ChartHierarchyCache.get(db, TENANT)
+    assert ChartHierarchyCache.get(db, TENANT) is plan
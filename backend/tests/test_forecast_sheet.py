@@ -0,0 +1,83 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.forecast_sheet import (  # noqa: E402
+    MONTH_LABELS,
+    detect_label_column,
+    extract_forecast_rows,
+    find_month_header_row,
+    parse_brl,
+)
+
+
+def _sheet() -> pd.DataFrame:
+    header = [None, None]
+    kinds = [None, None]
+    for month in MONTH_LABELS:
+        header += [f" {month.lower()} ", None]
+        kinds += ["Previsto", "Realizado"]
+    width = len(header)
+
+    def row(label, previsto, realizado=0):
+        values = [None, label]
+        for _ in MONTH_LABELS:
+            values += [previsto, realizado]
+        return values
+
+    return pd.DataFrame(
+        [
+            [None, "Previsão de Fluxo de Caixa"] + [None] * (width - 2),
+            [None, 2025] + [None] * (width - 2),
+            header,
+            kinds,
+            row("Receita", "R$ 1.500,00", 1200.5),
+            row("  ", 5),
+            row(None, 5),
+            row("2025", 5),
+            row("Ano do fluxo:", 5),
+            row("Custos", Decimal("10.25"), "abc"),
+            row("Aluguel", datetime(2025, 1, 1), np.nan),
+            row("Saldo do ano anterior", 0, 0)[:4] + ["", "350,10"] + [0] * (width - 6),
+        ],
+        dtype=object,
+    )
+
+
+def test_extracts_label_to_monthly_arrays():
+    df = _sheet()
+    assert find_month_header_row(df) == 2
+    assert detect_label_column(df, 4) == 1
+
+    rows = extract_forecast_rows(df, 2025)
+
+    assert rows.labels == ["Receita", "Custos", "Aluguel", "Saldo do ano anterior"]
+    assert rows.previsto.shape == rows.realizado.shape == (4, 12)
+    by_label = rows.previsto_by_label()
+    assert by_label["Receita"].tolist() == [1500.0] * 12
+    assert rows.realizado[0].tolist() == [1200.5] * 12
+    assert by_label["Custos"].tolist() == [10.25] * 12
+    assert rows.realizado[1].tolist() == [0.0] * 12
+    # Datas e vazios não são valores
+    assert by_label["Aluguel"].tolist() == [0.0] * 12
+    # Primeiro valor não nulo, mês a mês (previsto antes de realizado)
+    assert rows.first_nonzero("saldo do ano anterior") == 350.1
+    assert extract_forecast_rows(df.iloc[4:], 2025) is None
+
+
+def test_parse_brl_matches_spreadsheet_formats():
+    values = np.array(
+        [["R$ 1.234,56", " 10 ", 7, 2.5], [None, np.nan, "x", True], ["-3,5", "", Decimal("1.1"), pd.Timestamp("2025-01-01")]],
+        dtype=object,
+    )
+
+    assert parse_brl(values).tolist() == [[1234.56, 10.0, 7.0, 2.5], [0.0, 0.0, 0.0, 1.0], [-3.5, 0.0, 1.1, 0.0]]
+    # Coluna só com números (sem textos) também é aceita
+    assert parse_brl(np.array([1, 2.5], dtype=object)).tolist() == [1.0, 2.5]
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    GROUP_ORDER_UNLISTED,
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+    classify_group_name,
+)
+from app.services.chart_hierarchy_cache import ChartHierarchyCache  # noqa: E402
+
+TENANT = "t1"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(
+        engine,
+        tables=[ChartAccountGroup.__table__, ChartAccountSubgroup.__table__, ChartAccount.__table__],
+    )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_classify_group_name():
+    assert classify_group_name("Receita Operacional") == (True, 0, "RECEITA")
+    assert classify_group_name("DEDUÇÕES DA RECEITA") == (False, 0, None)
+    assert classify_group_name("Movimentações Não Operacionais") == (False, 13, None)
+    assert classify_group_name("Custos com Mão de Obra") == (True, 4, "CUSTO")
+    assert classify_group_name("Despesas Comerciais") == (True, 11, "DESPESA")
+    assert classify_group_name("Investimentos") == (True, 12, None)
+    assert classify_group_name("Outros") == (True, GROUP_ORDER_UNLISTED, None)
+
+
+def test_classification_is_stored_on_insert_and_rename(db):
+    db.add(ChartAccountGroup(id="g1", code="1", name="Deduções", tenant_id=TENANT))
+    db.add(ChartAccountGroup(id="g2", code="2", name="Despesas Administrativas", tenant_id=TENANT))
+    db.commit()
+
+    group = db.get(ChartAccountGroup, "g1")
+    assert (group.is_operational, group.sort_ordinal, group.type_class) == (False, 3, None)
+
+    group.name = "Custos Diretos"
+    db.commit()
+    stored = db.query(
+        ChartAccountGroup.is_operational, ChartAccountGroup.sort_ordinal, ChartAccountGroup.type_class
+    ).filter(ChartAccountGroup.id == "g1").one()
+    assert tuple(stored) == (True, 4, "CUSTO")
+
+    # A hierarquia em cache expõe a classificação sem recalcular pelo nome
+    nodes = {node.id: node for node in ChartHierarchyCache.plan(db, TENANT).groups}
+    assert (nodes["g2"].is_operational, nodes["g2"].sort_ordinal, nodes["g2"].type_class) == (True, 10, "DESPESA")
+    assert nodes["g1"].type_class == "CUSTO"
@@ -0,0 +1,137 @@
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.api.dashboard import list_transactions  # noqa: E402
+from app.api.lancamentos_previstos import list_lancamentos_previstos  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario, TransactionType  # noqa: E402
+from app.models.lancamento_previsto import LancamentoPrevisto  # noqa: E402
+from app.models.lancamento_previsto import TransactionType as PrevistoType  # noqa: E402
+from app.services.keyset_pagination import (  # noqa: E402
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+from app.services.lancamento_diario_service import LancamentoDiarioService  # noqa: E402
+
+TENANT = "t1"
+BU = "bu1"
+USER = SimpleNamespace(id="u1", tenant_id=TENANT, business_unit_id=BU, role="user")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoPrevisto.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+
+    session.add(ChartAccountGroup(id="g", code="1", name="Receita", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg", code="1.1", name="Vendas", group_id="g", tenant_id=TENANT))
+    session.add(ChartAccount(id="c", code="1.1.1", name="Produtos", subgroup_id="sg", account_type="Analítica", tenant_id=TENANT))
+    common = {"conta_id": "c", "subgrupo_id": "sg", "grupo_id": "g", "tenant_id": TENANT, "business_unit_id": BU, "created_by": "u1"}
+    # Vários lançamentos na mesma data: o cursor só por data pulava os empates
+    for idx in range(7):
+        day = datetime(2025, 3, 10) if idx < 5 else datetime(2025, 3, idx)
+        session.add(
+            LancamentoDiario(
+                id=f"d{idx}", data_movimentacao=day, valor=10 + idx, transaction_type=TransactionType.RECEITA, **common
+            )
+        )
+        session.add(
+            LancamentoPrevisto(
+                id=f"p{idx}", data_prevista=day, valor=10 + idx, transaction_type=PrevistoType.RECEITA, **common
+            )
+        )
+    session.commit()
+
+    yield session
+    session.close()
+
+
+def _walk(fetch):
+    ids, cursor = [], None
+    while True:
+        items, cursor = fetch(cursor)
+        ids += items
+        if cursor is None:
+            return ids
+
+
+def test_cursor_pages_cover_ties_without_gaps_or_duplicates(db):
+    expected = ["d4", "d3", "d2", "d1", "d0", "d6", "d5"]
+
+    def diarios(cursor):
+        result = LancamentoDiarioService.get_lancamentos(
+            db, TENANT, BU, per_page=2, cursor=decode_cursor(cursor) if cursor else None, include_total=False
+        )
+        assert result["total"] is None and result["total_pages"] is None
+        return [item["id"] for item in result["lancamentos"]], result["next_cursor"]
+
+    def transactions(cursor):
+        result = list_transactions(year=2025, limit=3, cursor=cursor, current_user=USER, db=db)
+        return [item["id"] for item in result["items"]], result["nextCursor"]
+
+    def previstos(cursor):
+        result = list_lancamentos_previstos(limit=2, cursor=cursor, format=None, accept=None, current_user=USER, db=db)
+        return [item["id"] for item in result["previsoes"]], result["next_cursor"]
+
+    assert _walk(diarios) == expected
+    assert _walk(transactions) == expected
+    assert _walk(previstos) == [f"p{value[1:]}" for value in expected]
+
+
+def test_page_numbers_still_work_and_report_total(db):
+    result = LancamentoDiarioService.get_lancamentos(db, TENANT, BU, page=2, per_page=3)
+
+    assert [item["id"] for item in result["lancamentos"]] == ["d1", "d0", "d6"]
+    assert (result["total"], result["total_pages"]) == (7, 3)
+    # O cursor da página numerada continua a partir da última linha entregue
+    follow = LancamentoDiarioService.get_lancamentos(
+        db, TENANT, BU, per_page=3, cursor=decode_cursor(result["next_cursor"])
+    )
+    assert [item["id"] for item in follow["lancamentos"]] == ["d5"]
+    assert follow["next_cursor"] is None
+
+
+def test_malformed_cursor_is_rejected(db):
+    cursor = encode_cursor(datetime(2025, 3, 10, 8, 30), "d3")
+    assert decode_cursor(cursor).id == "d3"
+
+    for value in ["not-a-cursor", encode_cursor(datetime(2025, 1, 1), "x")[:-3], "2025-03-10T00:00:00"]:
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(value)
+    with pytest.raises(HTTPException) as exc:
+        list_transactions(year=2025, limit=3, cursor="???", current_user=USER, db=db)
+    assert exc.value.status_code == 400
@@ -0,0 +1,159 @@
+import os
+import sys
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.api import lancamentos_diarios, lancamentos_previstos  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario, TransactionType  # noqa: E402
+from app.models.lancamento_previsto import LancamentoPrevisto  # noqa: E402
+from app.models.lancamento_rollup import LancamentoDiarioRollup  # noqa: E402
+from app.services.dependencies import get_current_active_user  # noqa: E402
+
+TENANT = "t1"
+BU = "bu1"
+
+
+@pytest.fixture
+def setup():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoPrevisto.__table__,
+        LancamentoDiarioRollup.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session_factory = sessionmaker(bind=engine)
+
+    session = session_factory()
+    session.add(ChartAccountGroup(id="g-rec", code="1", name="Receita", tenant_id=TENANT))
+    session.add(ChartAccountGroup(id="g-cus", code="2", name="Custos", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg-rec", code="1.1", name="Vendas", group_id="g-rec", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg-cus", code="2.1", name="Insumos", group_id="g-cus", tenant_id=TENANT))
+    session.add(ChartAccount(id="c-rec", code="1.1.1", name="Produtos", subgroup_id="sg-rec", account_type="Analítica", tenant_id=TENANT))
+    session.add(ChartAccount(id="c-cus", code="2.1.1", name="Matéria-prima", subgroup_id="sg-cus", account_type="Analítica", tenant_id=TENANT))
+    session.commit()
+    session.close()
+
+    api = FastAPI()
+    api.include_router(lancamentos_diarios.router)
+    api.include_router(lancamentos_previstos.router)
+    api.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(
+        id="u1", tenant_id=TENANT, business_unit_id=BU, role="user"
+    )
+    api.dependency_overrides[get_db] = lambda: session_factory()
+    yield TestClient(api), engine, session_factory
+
+
+def _item(day, valor, conta="c-rec", import_ref=None, **extra):
+    sub, group = {"c-rec": ("sg-rec", "g-rec"), "c-cus": ("sg-cus", "g-cus")}[conta]
+    return {
+        "data_movimentacao": f"2025-01-{day:02d}T00:00:00",
+        "valor": str(valor),
+        "conta_id": conta,
+        "subgrupo_id": sub,
+        "grupo_id": group,
+        "import_ref": import_ref,
+        **extra,
+    }
+
+
+def test_batch_create_uses_one_insert_and_is_idempotent(setup):
+    client, engine, session_factory = setup
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda c, cur, stmt, *a: statements.append(stmt))
+
+    items = [
+        _item(1, 100, import_ref="linha-1"),
+        _item(1, 50, import_ref="linha-2"),
+        _item(2, 30, conta="c-cus", import_ref="linha-3"),
+        _item(3, 10, subgrupo_id="sg-cus"),  # conta fora do subgrupo
+        _item(4, 70, import_ref="linha-1"),  # repetido no próprio envio
+    ]
+    body = client.post("/api/v1/lancamentos-diarios/batch", json={"items": items}).json()
+
+    assert [result["status"] for result in body["results"]] == ["created", "created", "created", "error", "duplicate"]
+    assert body["counts"] == {"created": 3, "error": 1, "duplicate": 1}
+    assert body["results"][3]["message"] == "Conta não pertence ao subgrupo especificado"
+    assert body["results"][4]["id"] == body["results"][0]["id"]
+    inserts = [s for s in statements if s.startswith("INSERT INTO lancamentos_diarios (")]
+    assert len(inserts) == 1
+
+    db = session_factory()
+    assert db.get(LancamentoDiario, body["results"][2]["id"]).transaction_type == TransactionType.CUSTO
+    totals = dict(db.query(LancamentoDiarioRollup.transaction_type, func.sum(LancamentoDiarioRollup.valor_total)).group_by(LancamentoDiarioRollup.transaction_type))
+    assert totals == {"RECEITA": Decimal("150"), "CUSTO": Decimal("30")}
+    db.close()
+
+    # Reenvio: nada gravado, ids originais devolvidos
+    again = client.post("/api/v1/lancamentos-diarios/batch", json={"items": items[:3]}).json()
+    assert again["counts"] == {"duplicate": 3}
+    assert [result["id"] for result in again["results"]] == [result["id"] for result in body["results"][:3]]
+
+    too_many = [_item(1, 1)] * 5001
+    assert client.post("/api/v1/lancamentos-diarios/batch", json={"items": too_many}).status_code == 400
+
+
+def test_batch_update_and_delete_keep_rollup_in_sync(setup):
+    client, _, session_factory = setup
+    created = client.post(
+        "/api/v1/lancamentos-diarios/batch", json={"items": [_item(1, 100), _item(2, 40), _item(3, 5)]}
+    ).json()
+    ids = [result["id"] for result in created["results"]]
+
+    updated = client.put(
+        "/api/v1/lancamentos-diarios/batch",
+        json={
+            "items": [
+                {"id": ids[0], "valor": "120"},
+                {"id": ids[1], "conta_id": "c-cus", "subgrupo_id": "sg-cus", "grupo_id": "g-cus"},
+                {"id": ids[2], "conta_id": "c-cus"},  # subgrupo/grupo antigos não batem
+                {"id": "inexistente", "valor": "1"},
+            ]
+        },
+    ).json()
+    assert [result["status"] for result in updated["results"]] == ["updated", "updated", "error", "not_found"]
+
+    deleted = client.post("/api/v1/lancamentos-diarios/batch/delete", json={"ids": [ids[2], ids[2], "inexistente"]}).json()
+    assert [result["status"] for result in deleted["results"]] == ["deleted", "not_found", "not_found"]
+
+    db = session_factory()
+    assert db.get(LancamentoDiario, ids[1]).transaction_type == TransactionType.CUSTO
+    assert db.get(LancamentoDiario, ids[2]).is_active is False
+    totals = dict(db.query(LancamentoDiarioRollup.transaction_type, func.sum(LancamentoDiarioRollup.valor_total)).group_by(LancamentoDiarioRollup.transaction_type))
+    assert totals == {"RECEITA": Decimal("120"), "CUSTO": Decimal("40")}
+    db.close()
+
+    # Previstos: mesmo contrato, sem rollup
+    previstos = client.post(
+        "/api/v1/lancamentos-previstos/batch",
+        json={"items": [{**_item(5, 10, import_ref="p-1"), "data_prevista": "2025-02-01T00:00:00"}]},
+    ).json()
+    assert previstos["counts"] == {"created": 1}
@@ -0,0 +1,201 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import (  # noqa: E402
+    LancamentoDiario,
+    TransactionStatus,
+    TransactionType,
+)
+from app.models.lancamento_rollup import LancamentoDiarioRollup  # noqa: E402
+from app.services.cash_flow_service import CashFlowService  # noqa: E402
+from app.services.financial_aggregation_service import FinancialAggregationService  # noqa: E402
+from app.services.lancamento_rollup_service import LancamentoRollupService  # noqa: E402
+from app.services.monthly_drilldown_service import MonthlyDrilldownService  # noqa: E402
+
+TENANT = "t1"
+BU = "bu1"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoDiarioRollup.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+
+    plan = [
+        ("g-rec", "Receita", "sg-rec", "Receitas de Vendas", "c-rec", "Vendas"),
+        ("g-desp", "Despesas Operacionais", "sg-desp", "Despesas Administrativas", "c-desp", "Aluguel"),
+        ("g-cust", "Custos", "sg-cust", "Custos Diretos", "c-cust", "Insumos"),
+        ("g-ded", "Deduções", "sg-ded", "Impostos", "c-ded", "Simples"),
+    ]
+    for group_id, group_name, sub_id, sub_name, acc_id, acc_name in plan:
+        session.add(ChartAccountGroup(id=group_id, code=group_id, name=group_name, tenant_id=TENANT))
+        session.add(ChartAccountSubgroup(id=sub_id, code=sub_id, name=sub_name, group_id=group_id, tenant_id=TENANT))
+        session.add(
+            ChartAccount(
+                id=acc_id,
+                code=acc_id,
+                name=acc_name,
+                subgroup_id=sub_id,
+                account_type="Analítica",
+                tenant_id=TENANT,
+            )
+        )
+    session.commit()
+
+    yield session
+    session.close()
+
+
+def _lancamento(conta, data, valor, tx_type, is_active=True):
+    grupo = "g-" + conta.split("-")[1]
+    return LancamentoDiario(
+        data_movimentacao=data,
+        valor=Decimal(valor),
+        conta_id=conta,
+        subgrupo_id="sg-" + conta.split("-")[1],
+        grupo_id=grupo,
+        transaction_type=tx_type,
+        status=TransactionStatus.PENDENTE,
+        tenant_id=TENANT,
+        business_unit_id=BU,
+        created_by="u1",
+        is_active=is_active,
+    )
+
+
+def _seed(db):
+    rows = [
+        _lancamento("c-rec", datetime(2025, 1, 5, 10), "1000.50", TransactionType.RECEITA),
+        _lancamento("c-rec", datetime(2025, 1, 5, 18), "200.25", TransactionType.RECEITA),
+        _lancamento("c-desp", datetime(2025, 1, 20), "300.00", TransactionType.DESPESA),
+        _lancamento("c-cust", datetime(2025, 2, 3), "150.10", TransactionType.CUSTO),
+        _lancamento("c-ded", datetime(2025, 1, 7), "99.99", TransactionType.DESPESA),
+        _lancamento("c-rec", datetime(2025, 1, 9), "555.00", TransactionType.RECEITA, is_active=False),
+        _lancamento("c-rec", datetime(2024, 12, 31), "777.00", TransactionType.RECEITA),
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def test_rollup_is_built_lazily_and_matches_source(db):
+    _seed(db)
+
+    summary = FinancialAggregationService.aggregate_monthly_summary(db, TENANT, BU, 2025)
+
+    january = summary["monthly"][0]
+    assert january["revenue"] == pytest.approx(1200.75)
+    assert january["expense"] == pytest.approx(300.00)
+    assert summary["monthly"][1]["cost"] == pytest.approx(150.10)
+    assert summary["totals"]["balance"] == pytest.approx(1200.75 - 300.00 - 150.10)
+    assert db.query(LancamentoDiarioRollup).count() > 0
+
+    daily = MonthlyDrilldownService.aggregate_daily_summary(db, TENANT, BU, 2025, 1)
+    day_five = daily["days"][4]
+    assert Decimal(day_five["revenue"]) == Decimal("1200.75")
+    assert Decimal(daily["metadata"]["month_total_expense"]) == Decimal("300.00")
+
+
+def test_cash_flow_reads_account_totals_from_rollup(db):
+    _seed(db)
+
+    cash_flow = CashFlowService.get_monthly_cash_flow(db, TENANT, BU, 2025, 1)
+    rows = {row["categoria"]: row for row in cash_flow["rows"]}
+
+    assert rows["Vendas"]["dias"][5] == pytest.approx(1200.75)
+    assert rows["Simples"]["total"] == pytest.approx(99.99)
+    assert rows["Despesas Operacionais"]["dias"][20] == pytest.approx(300.00)
+
+
+def test_incremental_changes_keep_rollup_in_sync(db):
+    rows = _seed(db)
+    db.refresh(rows[0])
+    LancamentoRollupService.ensure_built(db, TENANT, BU)
+    # Materialização em sessão própria: objetos do chamador não expiram
+    assert "valor" in rows[0].__dict__
+    assert db.query(LancamentoDiarioRollup).count() > 0
+
+    novo = _lancamento("c-rec", datetime(2025, 1, 5, 12), "10.00", TransactionType.RECEITA)
+    db.add(novo)
+    db.flush()
+    LancamentoRollupService.register(db, novo)
+
+    despesa = rows[2]
+    before = LancamentoRollupService.snapshot(despesa)
+    despesa.valor = Decimal("350.00")
+    despesa.data_movimentacao = datetime(2025, 1, 21)
+    LancamentoRollupService.apply_change(db, before, LancamentoRollupService.snapshot(despesa))
+
+    receita = rows[0]
+    before = LancamentoRollupService.snapshot(receita)
+    receita.is_active = False
+    LancamentoRollupService.apply_change(db, before, None)
+    db.commit()
+
+    incremental = {
+        (r.conta_id, r.transaction_type, r.dia): (r.valor_total, r.quantidade)
+        for r in db.query(LancamentoDiarioRollup).all()
+        if r.quantidade
+    }
+
+    LancamentoRollupService.rebuild(db, TENANT, BU)
+    db.commit()
+    rebuilt = {
+        (r.conta_id, r.transaction_type, r.dia): (r.valor_total, r.quantidade)
+        for r in db.query(LancamentoDiarioRollup).all()
+    }
+
+    assert incremental == rebuilt
+    daily = MonthlyDrilldownService.aggregate_daily_summary(db, TENANT, BU, 2025, 1)
+    assert Decimal(daily["days"][4]["revenue"]) == Decimal("210.25")
+    assert Decimal(daily["days"][20]["expense"]) == Decimal("350.00")
+
+
+def test_tenant_scope_builds_business_units_missing_from_rollup(db):
+    _seed(db)
+    LancamentoRollupService.ensure_built(db, TENANT, BU)
+
+    outra = _lancamento("c-rec", datetime(2025, 1, 5), "40.00", TransactionType.RECEITA)
+    outra.business_unit_id = "bu2"
+    db.add(outra)
+    db.commit()
+
+    LancamentoRollupService.ensure_built(db, TENANT)
+
+    built = {row[0] for row in db.query(LancamentoDiarioRollup.business_unit_id).distinct()}
+    assert built == {BU, "bu2"}
+    summary = FinancialAggregationService.aggregate_monthly_summary(db, TENANT, None, 2025)
+    assert summary["monthly"][0]["revenue"] == pytest.approx(1240.75)
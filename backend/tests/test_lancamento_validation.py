@@ -0,0 +1,101 @@
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario, LancamentoDiarioCreate  # noqa: E402
+from app.models.lancamento_rollup import LancamentoDiarioRollup  # noqa: E402
+import app.services.chart_hierarchy_cache as chart_cache  # noqa: E402
+from app.services.lancamento_diario_service import LancamentoDiarioService  # noqa: E402
+
+TENANT = "t1"
+BU = "bu1"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoDiarioRollup.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    session.add(ChartAccountGroup(id="g1", code="1", name="Receita", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg1", code="1.1", name="Vendas", group_id="g1", tenant_id=TENANT))
+    session.add(ChartAccountSubgroup(id="sg2", code="1.2", name="Serviços", group_id="g1", tenant_id=TENANT))
+    session.add(ChartAccount(id="c1", code="1.1.1", name="Produtos", subgroup_id="sg1", account_type="Receita", tenant_id=TENANT))
+    session.add(ChartAccount(id="c-outro", code="1.1.1", name="Produtos", subgroup_id="sg1", account_type="Receita", tenant_id="t2"))
+    session.add(ChartAccount(id="c-global", code="9.9.9", name="Global", subgroup_id="sg1", account_type="Receita", tenant_id=None))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _payload(conta_id="c1", subgrupo_id="sg1", grupo_id="g1"):
+    return LancamentoDiarioCreate(
+        data_movimentacao="2025-03-01T00:00:00", valor=Decimal("10"), conta_id=conta_id, subgrupo_id=subgrupo_id, grupo_id=grupo_id
+    )
+
+
+def test_create_with_warm_hierarchy_only_writes(db):
+    assert LancamentoDiarioService.validate_plano_contas_consistency(db, "c1", "sg1", "g1", TENANT) == (True, "OK")
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda c, cur, stmt, *a: statements.append(stmt))
+    result = LancamentoDiarioService.create_lancamento(db, _payload(), TENANT, BU, "u1")
+
+    assert result["success"] is True
+    # Validação e tipo vêm da hierarquia em cache: só o INSERT do lançamento (e o upsert do rollup)
+    assert [s.split("(")[0].strip() for s in statements] == ["INSERT INTO lancamentos_diarios", "INSERT INTO lancamentos_diarios_rollup"]
+
+
+def test_validation_rules_and_reload_for_unknown_accounts(db, monkeypatch):
+    check = LancamentoDiarioService.validate_plano_contas_consistency
+    assert check(db, "c1", "sg2", "g1", TENANT) == (False, "Conta não pertence ao subgrupo especificado")
+    assert check(db, "c-outro", "sg1", "g1", TENANT) == (False, "Conta não encontrada")
+    assert check(db, "c-global", "sg1", "g1", TENANT) == (False, "Conta não encontrada")
+    assert check(db, "c-global", "sg1", "g1", TENANT, allow_shared=True) == (True, "OK")
+
+    # Conta gravada fora desta sessão/processo (sem evento do ORM): a falta
+    # na árvore em cache força uma recarga antes de rejeitar, no máximo uma
+    # por tenant a cada CHART_HIERARCHY_MISS_RELOAD_SECONDS
+    db.connection().execute(
+        ChartAccount.__table__.insert().values(
+            id="c-nova", code="1.2.1", name="Consultoria", subgroup_id="sg2", account_type="Receita", tenant_id=TENANT, is_active=True
+        )
+    )
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda c, cur, stmt, *a: statements.append(stmt))
+    monkeypatch.setattr(chart_cache, "CHART_HIERARCHY_MISS_RELOAD_SECONDS", 3600)
+    assert check(db, "c-nova", "sg2", "g1", TENANT) == (False, "Conta não encontrada")
+    assert statements == []
+
+    monkeypatch.setattr(chart_cache, "CHART_HIERARCHY_MISS_RELOAD_SECONDS", 0)
+    assert check(db, "c-nova", "sg2", "g1", TENANT) == (True, "OK")
+    assert check(db, "c-inexistente", "sg1", "g1", TENANT) == (False, "Conta não encontrada")
@@ -0,0 +1,153 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario, TransactionType  # noqa: E402
+from app.models.lancamento_rollup import LancamentoDiarioRollup  # noqa: E402
+from app.services.llm_sheet_importer import LLMSheetImporter  # noqa: E402
+
+TENANT = "t1"
+BU = "bu1"
+HEADERS = ["", "Data Movimentação", "Conta", "Subgrupo", "Grupo", "Valor", "Código", "Observação"]
+
+
+class _FakeSheetsService:
+    """Imita service.spreadsheets().values().get(...).execute()"""
+
+    def __init__(self, values):
+        self._values = values
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId, range):
+        return self
+
+    def execute(self):
+        return {"values": self._values}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoDiarioRollup.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+
+    plan = [
+        ("g-rec", "Receita", "sg-rec", "Receitas de Vendas", "c-rec", "Vendas Balcão"),
+        ("g-desp", "Despesas Operacionais", "sg-desp", "Despesas Administrativas", "c-desp", "Aluguel"),
+    ]
+    for group_id, group_name, sub_id, sub_name, acc_id, acc_name in plan:
+        session.add(ChartAccountGroup(id=group_id, code=group_id, name=group_name, tenant_id=TENANT))
+        session.add(ChartAccountSubgroup(id=sub_id, code=sub_id, name=sub_name, group_id=group_id, tenant_id=TENANT))
+        session.add(
+            ChartAccount(
+                id=acc_id,
+                code=acc_id,
+                name=acc_name,
+                subgroup_id=sub_id,
+                account_type="Analítica",
+                tenant_id=TENANT,
+            )
+        )
+    session.commit()
+
+    yield session
+    session.close()
+
+
+def _import(db, rows):
+    importer = LLMSheetImporter()
+    importer.service = _FakeSheetsService([HEADERS] + rows)
+    return importer._import_daily_transactions("sheet-1", "Lançamento Diário", TENANT, BU, db, "u1")
+
+
+def test_bulk_import_resolves_accounts_in_memory_and_batches_writes(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda c, cur, stmt, *a: statements.append(stmt))
+
+    rows = []
+    for i in range(50):
+        rows += [
+            ["", "05/01/2025", "Aluguel", "Despesas Administrativas", "", f"1.5{i:02d},00", "", "Jan"],
+            ["", "06/01/2025", "vendas", "", "", f"2{i:02d},50", "", ""],
+            ["", "07/01/2025", "Desconhecida", "Receitas", "", f"1{i:02d},00", "", ""],
+            ["", "data?", "Aluguel", "", "", "10,00", "", ""],
+        ]
+
+    result = _import(db, rows)
+
+    assert result == {"success": True, "count": 150}
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT INTO LANCAMENTOS_DIARIOS (")]
+    assert len(inserts) == 1
+    # Plano de contas + deduplicação: número fixo de consultas, independente das linhas
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) <= 5
+
+    vendas = db.query(LancamentoDiario).filter(LancamentoDiario.conta_id == "c-rec").all()
+    assert len(vendas) == 100  # "vendas" por similaridade + "Receitas" pelo subgrupo
+    assert {v.transaction_type for v in vendas} == {TransactionType.RECEITA}
+    aluguel = db.query(LancamentoDiario).filter(LancamentoDiario.conta_id == "c-desp").first()
+    assert aluguel.valor == Decimal("1500.00")  # i = 0
+    assert aluguel.grupo_id == "g-desp"
+    assert aluguel.observacoes == "Jan"
+    assert db.query(LancamentoDiarioRollup).count() == 3
+
+
+def test_rows_already_in_database_are_skipped(db):
+    db.add(
+        LancamentoDiario(
+            tenant_id=TENANT,
+            business_unit_id=BU,
+            conta_id="c-desp",
+            subgrupo_id="sg-desp",
+            grupo_id="g-desp",
+            data_movimentacao=datetime(2025, 1, 5),
+            valor=Decimal("1500.00"),
+            created_by="u1",
+        )
+    )
+    db.commit()
+
+    rows = [
+        ["", "05/01/2025", "Aluguel", "", "", "-1.500,00", "", ""],
+        ["", "06/01/2025", "Aluguel", "", "", "1.500,00", "", ""],
+        ["", "06/01/2025", "Aluguel", "", "", "1.500,00", "", "repetida na planilha"],
+    ]
+
+    assert _import(db, rows) == {"success": True, "count": 1}
+    assert _import(db, rows) == {"success": True, "count": 0}
+    assert db.query(LancamentoDiario).count() == 2
@@ -0,0 +1,109 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+import app.services.onboarding_job_service as job_service  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models.onboarding_job import OnboardingJob  # noqa: E402
+from app.services.onboarding_job_service import OnboardingJobService  # noqa: E402
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine, tables=[OnboardingJob.__table__])
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(job_service, "SessionLocal", factory)
+    return factory
+
+
+def _enqueue(db, **overrides):
+    params = dict(
+        tenant_id="t1",
+        business_unit_id="bu1",
+        spreadsheet_url="https://example.com/plan.xlsx",
+        reset_data=True,
+        user_id="u1",
+        corrections={"Plano de contas": []},
+    )
+    params.update(overrides)
+    return OnboardingJobService.enqueue(db, **params)
+
+
+def test_job_lifecycle_is_visible_from_any_session(session_factory):
+    db = session_factory()
+    job = _enqueue(db)
+    run_id = job.id
+
+    seen = []
+
+    def runner(claimed_id):
+        other = session_factory()
+        claimed = other.get(OnboardingJob, claimed_id)
+        seen.append((claimed.locked_by, claimed.attempts, OnboardingJobService.corrections(claimed)))
+        other.close()
+        OnboardingJobService.update(claimed_id, status="importing_plan", progress=30, checkpoint={"excel_file": "/tmp/x.xlsx"})
+        OnboardingJobService.update(claimed_id, error="aviso", checkpoint={"previstos": 2})
+        OnboardingJobService.update(claimed_id, status="completed", progress=100, stats={"contas_importadas": 3}, finished=True)
+
+    assert OnboardingJobService.run_pending(runner, worker_id="w1") == 1
+    assert seen == [("w1", 1, {"Plano de contas": []})]
+
+    fresh = session_factory()
+    latest = OnboardingJobService.latest(fresh, "t1", "bu1")
+    assert latest.id == run_id
+    assert latest.locked_by is None
+    assert OnboardingJobService.checkpoints(latest) == {"excel_file": "/tmp/x.xlsx", "previstos": 2}
+    status = OnboardingJobService.to_status(latest)
+    assert status["status"] == "completed"
+    assert status["progress"] == 100
+    assert status["errors"] == ["aviso"]
+    assert status["stats"] == {"contas_importadas": 3}
+    assert status["run_id"] == run_id
+    assert status["finished_at"] is not None
+    # Fila vazia: nada a reivindicar
+    assert OnboardingJobService.claim_next(fresh, "w2") is None
+
+
+def test_stale_jobs_are_reclaimed_until_max_attempts(session_factory, monkeypatch):
+    monkeypatch.setattr(job_service, "ONBOARDING_JOB_MAX_ATTEMPTS", 2)
+    db = session_factory()
+    job = _enqueue(db)
+
+    assert OnboardingJobService.claim_next(db, "w1") == job.id
+    # Job em execução (heartbeat recente) não é reivindicado por outro worker
+    assert OnboardingJobService.claim_next(db, "w2") is None
+
+    # Worker caiu: heartbeat expirado -> outro worker retoma
+    job = db.get(OnboardingJob, job.id)
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=job_service.ONBOARDING_JOB_STALE_SECONDS + 1)
+    db.commit()
+    assert OnboardingJobService.claim_next(db, "w2") == job.id
+    db.refresh(job)
+    assert (job.locked_by, job.attempts) == ("w2", 2)
+
+    # Esgotou as tentativas: o job vai para erro em vez de ser executado de novo
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=job_service.ONBOARDING_JOB_STALE_SECONDS + 1)
+    db.commit()
+    assert OnboardingJobService.claim_next(db, "w3") is None
+    db.refresh(job)
+    assert job.status == "error"
+    assert job.locked_by is None
+    assert OnboardingJobService.to_status(job)["errors"] == ["Job abandonado após 2 tentativas"]
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+import app.api.onboarding as onboarding_api  # noqa: E402
+import app.services.onboarding_job_service as job_service  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models.onboarding_job import OnboardingJob  # noqa: E402
+from app.services.onboarding_job_service import OnboardingJobService  # noqa: E402
+import app.services.onboarding_progress as onboarding_progress  # noqa: E402
+from app.services.onboarding_progress import ImportProgressReporter  # noqa: E402
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine, tables=[OnboardingJob.__table__])
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(job_service, "SessionLocal", factory)
+    monkeypatch.setattr(onboarding_api, "SessionLocal", factory)
+    return factory
+
+
+@pytest.fixture
+def job(session_factory):
+    db = session_factory()
+    job = OnboardingJobService.enqueue(
+        db,
+        tenant_id="t1",
+        business_unit_id="bu1",
+        spreadsheet_url="https://example.com/plan.xlsx",
+        reset_data=False,
+        user_id="u1",
+    )
+    db.close()
+    return job
+
+
+def _parse(chunk):
+    lines = chunk.strip().splitlines()
+    return lines[0].split(": ", 1)[1], json.loads(lines[1].split(": ", 1)[1])
+
+
+def test_reporter_computes_rate_eta_and_persists_throttled(job, session_factory, monkeypatch):
+    clock = iter([100.0, 102.0, 102.5, 104.0, 104.5, 105.5])
+    monkeypatch.setattr(onboarding_progress.time, "monotonic", lambda: next(clock))
+    reporter = ImportProgressReporter(job.id, progress_range=(80, 90))
+
+    reporter("Lançamento Diário", rows_parsed=1000, rows_total=1000)
+    event = reporter("Lançamento Diário", rows_parsed=1000, rows_total=1000, rows_done=500, rows_inserted=450)
+    assert (event["rate"], event["eta_seconds"], event["progress"]) == (250.0, 2.0, 85)
+    # Dentro do intervalo de throttling: só publica em memória
+    reporter("Lançamento Diário", rows_parsed=1000, rows_total=1000, rows_done=600, rows_inserted=550)
+
+    db = session_factory()
+    status = OnboardingJobService.to_status(db.get(OnboardingJob, job.id))
+    assert status["live"]["rows_done"] == 500
+    assert status["progress"] == 85
+    db.close()
+
+    reporter("Lançamento Diário", rows_parsed=1000, rows_total=1000, rows_done=1000, rows_inserted=900, final=True)
+    db = session_factory()
+    status = OnboardingJobService.to_status(db.get(OnboardingJob, job.id))
+    assert status["live"]["rows_inserted"] == 900
+    assert status["progress"] == 90
+    stale = datetime(2000, 1, 1)
+    db.get(OnboardingJob, job.id).heartbeat_at = stale
+    db.commit()
+    db.close()
+
+    # Trechos sem eventos de linha renovam só o heartbeat (também com throttling)
+    reporter.heartbeat()
+    db = session_factory()
+    assert db.get(OnboardingJob, job.id).heartbeat_at == stale
+    db.close()
+    reporter.heartbeat()
+    db = session_factory()
+    assert db.get(OnboardingJob, job.id).heartbeat_at > stale
+    db.close()
+
+
+def test_stream_pushes_progress_events_until_job_finishes(job, monkeypatch):
+    monkeypatch.setattr(onboarding_api, "ONBOARDING_STREAM_POLL_SECONDS", 0.05)
+    snapshot = onboarding_api._load_job_status(job.id)
+
+    async def consume():
+        chunks = []
+        stream = onboarding_api._stream_job_events(job.id, snapshot)
+        chunks.append(await stream.__anext__())
+
+        def worker():
+            reporter = ImportProgressReporter(job.id)
+            reporter("Lançamentos Previstos", rows_parsed=10, rows_total=10, rows_done=5, rows_inserted=5)
+            OnboardingJobService.update(job.id, status="completed", progress=100, finished=True)
+
+        await asyncio.get_running_loop().run_in_executor(None, worker)
+        async for chunk in stream:
+            chunks.append(chunk)
+        return chunks
+
+    events = [_parse(chunk) for chunk in asyncio.run(consume())]
+
+    assert events[0][0] == "status"
+    assert events[0][1]["status"] == "queued"
+    progress = [data for name, data in events if name == "progress"]
+    assert progress[0]["sheet"] == "Lançamentos Previstos"
+    assert progress[0]["rows_done"] == 5
+    assert events[-1][0] == "status"
+    assert events[-1][1]["status"] == "completed"
+    # Assinatura removida ao fim do stream
+    assert job.id not in onboarding_progress._SUBSCRIBERS
@@ -0,0 +1,101 @@
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.financial_transactions import FinancialTransaction, TransactionType  # noqa: E402
+from app.models.reference_counter import ReferenceCounter  # noqa: E402
+from app.services.financial_service import FinancialService  # noqa: E402
+from app.services.reference_allocator import ReferenceAllocator  # noqa: E402
+
+
+@pytest.fixture
+def setup():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        FinancialTransaction.__table__,
+        ReferenceCounter.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session_factory = sessionmaker(bind=engine)
+    yield engine, session_factory
+
+
+def test_allocate_reserves_ranges_per_tenant_bu_and_day(setup):
+    _, session_factory = setup
+    db = session_factory()
+    day = date(2025, 3, 1)
+
+    assert ReferenceAllocator.allocate(db, "t1", "bu1", day=day) == ["TX-20250301-0001"]
+    assert ReferenceAllocator.allocate(db, "t1", "bu1", count=3, day=day) == [
+        "TX-20250301-0002",
+        "TX-20250301-0003",
+        "TX-20250301-0004",
+    ]
+    # Chaves independentes: outra BU, outro dia, outro prefixo
+    assert ReferenceAllocator.allocate(db, "t1", "bu2", day=day) == ["TX-20250301-0001"]
+    assert ReferenceAllocator.allocate(db, "t1", "bu1", day=date(2025, 3, 2)) == ["TX-20250302-0001"]
+    assert ReferenceAllocator.allocate(db, "t1", "bu1", day=day, prefix="NF") == ["NF-20250301-0001"]
+    db.commit()
+
+    # Rollback devolve a reserva
+    ReferenceAllocator.allocate(db, "t1", "bu1", count=10, day=day)
+    db.rollback()
+    assert ReferenceAllocator.reserve(db, "t1", "bu1", day=day) == range(5, 6)
+
+    with pytest.raises(ValueError):
+        ReferenceAllocator.reserve(db, "t1", "bu1", count=0)
+    db.close()
+
+
+def test_create_transaction_uses_counter_without_scanning_transactions(setup):
+    engine, session_factory = setup
+    db = session_factory()
+    db.add(ChartAccountGroup(id="g1", code="1", name="Receita", tenant_id="t1"))
+    db.add(ChartAccountSubgroup(id="sg1", code="1.1", name="Vendas", group_id="g1", tenant_id="t1"))
+    db.add(ChartAccount(id="c1", code="1.1.1", name="Produtos", subgroup_id="sg1", account_type="Analítica", tenant_id="t1"))
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda c, cur, stmt, *a: statements.append(stmt))
+
+    data = {
+        "description": "Venda",
+        "amount": "10.00",
+        "transaction_date": "2025-03-01T00:00:00",
+        "transaction_type": TransactionType.RECEITA,
+        "chart_account_id": "c1",
+    }
+    first = FinancialService.create_transaction(db, dict(data), "t1", "bu1", "u1")
+    second = FinancialService.create_transaction(db, dict(data), "t1", "bu1", "u1")
+
+    today = datetime.now().strftime("%Y%m%d")
+    assert first.reference == f"TX-{today}-0001"
+    assert second.reference == f"TX-{today}-0002"
+    assert not [s for s in statements if s.startswith("SELECT") and "FROM financial_transactions" in s and "ORDER BY" in s]
+    db.close()
@@ -0,0 +1,57 @@
+import ast
+import asyncio
+import inspect
+import os
+import sys
+import textwrap
+import threading
+
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+from app.database import run_in_db_threadpool  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def _awaits_something(func) -> bool:
+    tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+    return any(isinstance(node, (ast.Await, ast.AsyncFor, ast.AsyncWith)) for node in ast.walk(tree))
+
+
+def _uses_db_session(func) -> bool:
+    return any(
+        parameter.annotation in (Session, "Session")
+        for parameter in inspect.signature(func).parameters.values()
+    )
+
+
+def test_async_db_routes_only_when_they_await():
+    """Rotas ``async def`` com Session e sem await rodariam SQL no event loop."""
+    offenders = sorted(
+        f"{route.path} -> {route.endpoint.__module__}.{route.endpoint.__name__}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        and inspect.iscoroutinefunction(route.endpoint)
+        and _uses_db_session(route.endpoint)
+        and not _awaits_something(route.endpoint)
+    )
+    assert offenders == []
+
+
+def test_run_in_db_threadpool_leaves_event_loop():
+    loop_thread = threading.get_ident()
+
+    def blocking_call(value):
+        return value * 2, threading.get_ident()
+
+    result, worker_thread = asyncio.run(run_in_db_threadpool(blocking_call, 21))
+
+    assert result == 42
+    assert worker_thread != loop_thread
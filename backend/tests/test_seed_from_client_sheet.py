@@ -0,0 +1,179 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+import scripts.seed_from_client_sheet as seed  # noqa: E402
+import app.services.sheet_columnar_cache as sheet_columnar_cache  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario, TransactionType  # noqa: E402
+from app.models.lancamento_previsto import LancamentoPrevisto  # noqa: E402
+from app.models.lancamento_rollup import LancamentoDiarioRollup  # noqa: E402
+from app.models.liquidation_accounts import LiquidationAccount  # noqa: E402
+
+TENANT = SimpleNamespace(id="t1")
+BU = SimpleNamespace(id="bu1")
+USER = SimpleNamespace(id="u1")
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(sheet_columnar_cache, "SHEET_COLUMNAR_CACHE_DIR", str(tmp_path / "sheet_cache"))
+    path = tmp_path / "fluxo.xlsx"
+    plano = pd.DataFrame(
+        [
+            ["Vendas Balcão", "Receitas de Vendas", "Receita", "Usar"],
+            ["Aluguel", "Despesas Administrativas", "Despesas Operacionais", "Usar"],
+            ["Energia", "", "", "Usar"],
+            ["Descontinuada", "Despesas Administrativas", "Despesas Operacionais", "Não usar"],
+            ["123", "456", "789", "Usar"],
+        ],
+        columns=["Conta", "Subgrupo", "Grupo", "Escolha"],
+    )
+    diario = pd.DataFrame(
+        [
+            [datetime(2025, 1, 5), "Aluguel", "Despesas Administrativas", "Despesas Operacionais", "1.500,00", "cx", "Jan"],
+            ["06/01/2025", "Vendas Balcão", "Receitas de Vendas", "Receita", 200.5, "", ""],
+            ["data?", "Aluguel", "Despesas Administrativas", "Despesas Operacionais", "10,00", "", ""],
+            [None, "Aluguel", "Despesas Administrativas", "Despesas Operacionais", "10,00", "", ""],
+            ["07/01/2025", "Energia", "", "", "R$ 80,00", "CX", ""],
+            ["08/01/2025", "Sem Plano", "", "", "5,00", "", ""],
+        ],
+        columns=["Data Movimentação", "Conta", "Subgrupo", "Grupo", "Valor", "Liquidação", "Observação"],
+    )
+    previsto = pd.DataFrame(
+        [
+            ["01/02/2025", "Aluguel", "Despesas Administrativas", "Despesas Operacionais", "1.500,00"],
+            ["01/03/2025", "Vendas", "", "", "300"],
+            ["", "Aluguel", "", "", "10"],
+        ],
+        columns=["Mês", "Conta", "Subgrupo", "Grupo", "Valor"],
+    )
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        plano.to_excel(writer, sheet_name="Plano de contas", index=False)
+        diario.to_excel(writer, sheet_name="Lançamento Diário", index=False)
+        previsto.to_excel(writer, sheet_name="Lançamentos Previstos", index=False)
+    return path
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoPrevisto.__table__,
+        LancamentoDiarioRollup.__table__,
+        LiquidationAccount.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    monkeypatch.setattr(seed, "logger", seed.SeedLogger())
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _run_seed(db, workbook):
+    grupos, subgrupos, contas = seed.seed_plano_contas(db, TENANT, workbook)
+    seed.seed_lancamentos_previstos(db, TENANT, BU, USER, grupos, subgrupos, contas, workbook)
+    seed.seed_lancamentos_diarios(db, TENANT, BU, USER, grupos, subgrupos, contas, workbook)
+
+
+def test_seed_is_columnar_and_idempotent(db, workbook):
+    inserts = []
+    event.listen(
+        db.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: inserts.append(statement)
+        if statement.startswith("INSERT INTO lancamentos_diarios (")
+        else None,
+    )
+
+    _run_seed(db, workbook)
+    stats = seed.logger.stats
+
+    assert stats["grupos_criados"] == 2
+    assert stats["subgrupos_criados"] == 2
+    # "Energia" herda grupo/subgrupo da linha anterior; "Vendas" (previsto) casa
+    # por aproximação com o subgrupo de "Vendas Balcão" e é criada nele
+    assert stats["contas_criadas"] == 4
+    assert stats["lancamentos_previstos_criados"] == 2
+    assert stats["lancamentos_diarios_criados"] == 3
+    # Diário: data vazia + data inválida + conta sem grupo/subgrupo; previsto: mês vazio
+    assert stats["linhas_ignoradas"] == 4
+    assert stats["erros"] == ["Erro na linha 7: Grupo/Subgrupo não encontrado. Grupo='', Subgrupo=''"]
+    assert len(inserts) == 1
+
+    aluguel = db.query(LancamentoDiario).filter(LancamentoDiario.import_ref == "diario:2").one()
+    assert aluguel.valor == Decimal("1500.00")
+    assert aluguel.observacoes == "Jan"
+    assert aluguel.transaction_type == TransactionType.DESPESA
+    assert aluguel.liquidation_account_id is not None
+    energia = db.query(LancamentoDiario).filter(LancamentoDiario.import_ref == "diario:6").one()
+    assert energia.liquidation_account_id == aluguel.liquidation_account_id
+    vendas = db.query(LancamentoDiario).filter(LancamentoDiario.import_ref == "diario:3").one()
+    assert vendas.transaction_type == TransactionType.RECEITA
+    assert vendas.observacoes == "Lançamento linha 3"
+    assert db.query(LiquidationAccount).count() == 1
+    assert db.query(LancamentoDiarioRollup).count() == 3
+
+    # Segunda execução: anti-join por import_ref, nada é duplicado
+    seed.logger.stats["erros"] = []
+    _run_seed(db, workbook)
+    assert stats["lancamentos_diarios_criados"] == 3
+    assert stats["lancamentos_diarios_existentes"] == 3
+    assert stats["lancamentos_previstos_existentes"] == 2
+    assert stats["grupos_existentes"] == 2
+    assert db.query(LancamentoDiario).count() == 3
+    assert db.query(LancamentoPrevisto).count() == 2
+
+
+def test_vectorized_parsers_match_row_parsers():
+    values = pd.Series(["1.234,56", "1500.0", "R$ 10,5", "abc", "", "12"])
+    assert list(seed.parse_currency_series(values)) == [seed.parse_currency(v) for v in values]
+
+    dates = pd.Series(["2025-09-01 00:00:00.000", "05/01/2025", "01/09/25", "x", ""])
+    parsed = seed.parse_date_series(dates)
+    expected = [seed.parse_date(v) for v in dates]
+    assert [None if pd.isna(v) else v.to_pydatetime() for v in parsed] == expected
+
+
+def test_seed_publishes_progress_events(db, workbook):
+    events = []
+    grupos, subgrupos, contas = seed.seed_plano_contas(db, TENANT, workbook)
+    seed.seed_lancamentos_diarios(
+        db, TENANT, BU, USER, grupos, subgrupos, contas, workbook,
+        progress=lambda sheet, **fields: events.append((sheet, fields)),
+    )
+
+    assert events[0] == ("Lançamento Diário", {"rows_parsed": 4, "rows_total": 3})
+    sheet, last = events[-1]
+    assert sheet == "Lançamento Diário"
+    assert last["final"] is True
+    assert (last["rows_done"], last["rows_inserted"]) == (3, 3)
@@ -0,0 +1,85 @@
+import os
+import sys
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import app.services.sheet_columnar_cache as sheet_columnar_cache  # noqa: E402
+import app.services.spreadsheet_snapshot_store as snapshot_store  # noqa: E402
+from app.services.sheet_columnar_cache import SheetColumnarCache  # noqa: E402
+from app.services.spreadsheet_snapshot_store import SpreadsheetSnapshotStore  # noqa: E402
+
+WORKBOOK_ID = "a" * 64
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sheet_columnar_cache, "SHEET_COLUMNAR_CACHE_DIR", str(tmp_path / "sheet_cache"))
+    return tmp_path / "sheet_cache"
+
+
+def _mixed_frame() -> pd.DataFrame:
+    # Aba lida com header=None: tipos mistos por coluna, como nas planilhas dos clientes
+    return pd.DataFrame(
+        {
+            0: pd.Series(["Receita", datetime(2025, 1, 5), 12, 3.5, None, np.nan, True, date(2025, 2, 1)], dtype=object),
+            1: pd.Series(["Conta", "Aluguel", np.nan, "Energia", "", "x", "y", "z"], dtype=object),
+            2: [1.0, 2.5, np.nan, 4.0, 5.0, 6.0, 7.0, 8.0],
+            3: pd.to_datetime(["2025-01-01", None, "2025-03-01", "2025-04-01", None, None, None, None]),
+            4: range(8),
+        }
+    )
+
+
+def test_sheet_roundtrips_through_arrow_and_skips_xlsx(cache_dir):
+    pytest.importorskip("pyarrow")
+    original = _mixed_frame()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return original
+
+    first = SheetColumnarCache.load(WORKBOOK_ID, "Fluxo de caixa-2025", None, build)
+    second = SheetColumnarCache.load(WORKBOOK_ID, "Fluxo de caixa-2025", None, build)
+
+    assert len(builds) == 1
+    assert len(list((cache_dir / WORKBOOK_ID).glob("*.arrow"))) == 1
+    pd.testing.assert_frame_equal(second, original)
+    assert [type(value) for value in second[0].tolist()[:4]] == [str, datetime, int, float]
+
+    # Colunas nomeadas (header=0) em outro arquivo
+    named = pd.DataFrame({"Conta": ["Aluguel"], "Valor": [10], 2025: ["x"]})
+    SheetColumnarCache.load(WORKBOOK_ID, "Plano", 0, lambda: named)
+    pd.testing.assert_frame_equal(SheetColumnarCache.load(WORKBOOK_ID, "Plano", 0, lambda: None), named)
+
+    # Versão da planilha removida junto com o snapshot
+    SheetColumnarCache.discard(WORKBOOK_ID)
+    assert not (cache_dir / WORKBOOK_ID).exists()
+
+
+def test_snapshot_reads_reuse_arrow_across_processes(cache_dir, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "fluxo.xlsx"
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame({"Conta": ["Aluguel", "Energia"], "Valor": [100, 50]}).to_excel(writer, sheet_name="Plano", index=False)
+
+    expected = SpreadsheetSnapshotStore.read_sheet(path, "Plano")
+    # Novo processo: cache em memória vazio, mas a aba já está em Arrow
+    snapshot_store._PARSE_CACHE.clear()
+    monkeypatch.setattr(snapshot_store.pd, "read_excel", lambda *a, **k: pytest.fail("xlsx relido"))
+
+    pd.testing.assert_frame_equal(SpreadsheetSnapshotStore.read_sheet(path, "Plano"), expected)
+
+
+def test_without_pyarrow_sheets_are_read_directly(cache_dir, monkeypatch):
+    monkeypatch.setattr(sheet_columnar_cache, "pa", None)
+    frame = pd.DataFrame({"Conta": ["Aluguel"]})
+
+    assert SheetColumnarCache.load(WORKBOOK_ID, "Plano", 0, lambda: frame) is frame
+    assert not cache_dir.exists()
@@ -0,0 +1,148 @@
+import os
+import sys
+
+import pytest
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.api.bank_accounts as bank_accounts_api  # noqa: E402
+import app.api.caixa as caixa_api  # noqa: E402
+import app.services.sheet_reader_service as sheet_reader  # noqa: E402
+from app.services.sheet_reader_service import SheetReaderService, daily_sheet_range  # noqa: E402
+
+SUFFIXES = ["Jan2025", "Fev2025", "Mar2025"]
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class _FakeSheetsService:
+    """Imita service.spreadsheets().values().batchGet/get"""
+
+    def __init__(self, sheets, fail_batch=False):
+        self.sheets = sheets
+        self.fail_batch = fail_batch
+        self.calls = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def batchGet(self, spreadsheetId, ranges):
+        self.calls.append(("batchGet", tuple(ranges)))
+
+        def _run():
+            if self.fail_batch:
+                raise RuntimeError("Unable to parse range")
+            return {"valueRanges": [{"values": self.sheets.get(r, [])} for r in ranges]}
+
+        return _Request(_run)
+
+    def get(self, spreadsheetId, range):
+        self.calls.append(("get", range))
+
+        def _run():
+            if range not in self.sheets:
+                raise RuntimeError("Unable to parse range")
+            return {"values": self.sheets[range]}
+
+        return _Request(_run)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    SheetReaderService.invalidate()
+    yield
+    SheetReaderService.invalidate()
+
+
+def test_single_batch_get_is_cached_per_spreadsheet():
+    sheets = {daily_sheet_range(s): [["Caixa", "10"]] for s in SUFFIXES}
+    service = _FakeSheetsService(sheets)
+    factory_calls = []
+
+    def factory():
+        factory_calls.append(1)
+        return service
+
+    grid = SheetReaderService.get_daily_grid(factory, "sheet-1", SUFFIXES)
+    again = SheetReaderService.get_daily_grid(factory, "sheet-1", SUFFIXES)
+
+    assert grid is again
+    assert grid["Fev2025"] == [["Caixa", "10"]]
+    assert [call[0] for call in service.calls] == ["batchGet"]
+    assert len(factory_calls) == 1
+
+
+def test_grid_cache_is_lru_bounded(monkeypatch):
+    monkeypatch.setattr(sheet_reader, "SHEET_READER_CACHE_MAX_SIZE", 2)
+    service = _FakeSheetsService({daily_sheet_range(s): [["Caixa", "10"]] for s in SUFFIXES})
+
+    for sheet_id in ("sheet-1", "sheet-2", "sheet-1", "sheet-3"):
+        SheetReaderService.get_daily_grid(lambda: service, sheet_id, SUFFIXES)
+
+    assert [key[0] for key in sheet_reader._GRID_CACHE] == ["sheet-1", "sheet-3"]
+    assert len(service.calls) == 3
+
+
+def test_falls_back_to_per_sheet_reads_when_a_tab_is_missing():
+    sheets = {daily_sheet_range("Jan2025"): [["Caixa", "10"]]}
+    service = _FakeSheetsService(sheets, fail_batch=True)
+
+    grid = SheetReaderService.get_daily_grid(lambda: service, "sheet-1", SUFFIXES)
+
+    assert grid == {"Jan2025": [["Caixa", "10"]]}
+    assert [call[0] for call in service.calls] == ["batchGet", "get", "get", "get"]
+
+
+def test_caixa_monthly_totals_read_the_sheet_once_for_all_labels(monkeypatch):
+    grid = {
+        "Jan2025": [["Caixa", "100", "150", "120"], ["Caixa/Dinheiro", "0", "10"]],
+    }
+    calls = []
+
+    def fake_grid():
+        calls.append(1)
+        return grid
+
+    monkeypatch.setattr(caixa_api, "_get_daily_grid", fake_grid)
+
+    totals = caixa_api._aggregate_monthly_totals(["Caixa", "caixa/dinheiro", "outro"], 2025)
+
+    assert len(calls) == 1
+    assert totals[0]["entradas"] == 60.0
+    assert totals[0]["saidas"] == 30.0
+    assert totals[0]["quantidade_lancamentos"] == 3
+
+
+def test_bank_extract_authenticates_only_on_cache_miss(monkeypatch):
+    suffixes = [suffix for suffix, _ in bank_accounts_api.MONTH_SHEETS]
+    block = [["Outro"], ["Banco X", "100", "130"]]
+    service = _FakeSheetsService({daily_sheet_range(s): block for s in suffixes})
+    auth_calls = []
+
+    def fake_service():
+        auth_calls.append(1)
+        return service
+
+    monkeypatch.setattr(bank_accounts_api, "_get_sheet_service", fake_service)
+    start, end = bank_accounts_api.datetime(2025, 1, 1), bank_accounts_api.datetime(2025, 1, 2)
+
+    first = bank_accounts_api._build_sheet_extract("Banco X", start, end)
+    second = bank_accounts_api._build_sheet_extract("Banco X", start, end)
+
+    assert first == second
+    assert first[-1]["entradas"] == 30.0
+    assert len(auth_calls) == 1
@@ -0,0 +1,92 @@
+import io
+import os
+import sys
+
+import httpx
+import pandas as pd
+import pytest
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import app.services.sheet_columnar_cache as sheet_columnar_cache  # noqa: E402
+import app.services.spreadsheet_cache as spreadsheet_cache  # noqa: E402
+import app.services.spreadsheet_downloader as spreadsheet_downloader  # noqa: E402
+from app.services.spreadsheet_cache import SpreadsheetCache, normalize_spreadsheet_url  # noqa: E402
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/abc123/edit#gid=0"
+
+
+def _xlsx_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        pd.DataFrame([["Receita", 10], ["Custos", 5]]).to_excel(
+            writer, sheet_name="Fluxo de caixa-2025", header=False, index=False
+        )
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def fake_http(monkeypatch, tmp_path):
+    calls = []
+    content = _xlsx_bytes()
+
+    def handler(request):
+        calls.append({"url": str(request.url), "headers": request.headers})
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=content, headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(
+        spreadsheet_downloader, "_create_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(spreadsheet_cache, "SPREADSHEET_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(sheet_columnar_cache, "SHEET_COLUMNAR_CACHE_DIR", str(tmp_path / "sheet_cache"))
+    SpreadsheetCache.invalidate()
+    yield calls
+    SpreadsheetCache.invalidate()
+
+
+def test_normalize_spreadsheet_url():
+    assert normalize_spreadsheet_url(SHEET_URL) == (
+        "https://docs.google.com/spreadsheets/d/abc123/export?format=xlsx"
+    )
+
+
+def test_frames_are_parsed_once_and_revalidated_conditionally(fake_http, monkeypatch):
+    parses = []
+    original_read_excel = pd.read_excel
+
+    def counting_read_excel(*args, **kwargs):
+        parses.append(kwargs.get("sheet_name"))
+        return original_read_excel(*args, **kwargs)
+
+    monkeypatch.setattr(spreadsheet_cache.pd, "read_excel", counting_read_excel)
+
+    workbook = SpreadsheetCache.get_workbook(SHEET_URL)
+    frame = workbook.frame("Fluxo de caixa-2025", header=None)
+    frame.iloc[0, 0] = "alterado"
+    assert workbook.frame("Fluxo de caixa-2025", header=None).iloc[0, 0] == "Receita"
+    assert SpreadsheetCache.get_workbook(SHEET_URL) is workbook
+    assert len(fake_http) == 1
+    assert parses == ["Fluxo de caixa-2025"]
+
+    # TTL expirado: GET condicional, 304 reaproveita bytes e abas já lidas
+    revalidated = SpreadsheetCache.get_workbook(SHEET_URL, max_age=0)
+    assert revalidated is workbook
+    assert fake_http[-1]["headers"]["If-None-Match"] == '"v1"'
+    revalidated.frame("Fluxo de caixa-2025", header=None)
+    assert parses == ["Fluxo de caixa-2025"]
+
+
+def test_disk_tier_survives_memory_eviction(fake_http):
+    first = SpreadsheetCache.get_workbook(SHEET_URL)
+    SpreadsheetCache.invalidate()
+
+    reloaded = SpreadsheetCache.get_workbook(SHEET_URL)
+
+    assert reloaded is not first
+    assert reloaded.content_hash == first.content_hash
+    assert reloaded.etag == '"v1"'
+    assert reloaded.sheet_names == ["Fluxo de caixa-2025"]
+    assert len(fake_http) == 1
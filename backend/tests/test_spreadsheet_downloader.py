@@ -0,0 +1,95 @@
+import asyncio
+import io
+import os
+import sys
+import threading
+
+import httpx
+import pandas as pd
+import pytest
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import app.services.sheet_columnar_cache as sheet_columnar_cache  # noqa: E402
+import app.services.spreadsheet_downloader as spreadsheet_downloader  # noqa: E402
+import app.services.spreadsheet_snapshot_store as snapshot_store  # noqa: E402
+from app.services.spreadsheet_downloader import (  # noqa: E402
+    SpreadsheetDownloader,
+    SpreadsheetTooLargeError,
+)
+from app.services.spreadsheet_snapshot_store import SpreadsheetSnapshotStore  # noqa: E402
+
+URL = "https://example.com/fluxo.xlsx"
+
+
+def _use_transport(monkeypatch, handler):
+    monkeypatch.setattr(
+        spreadsheet_downloader,
+        "_create_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True),
+    )
+
+
+async def _chunks(count: int, size: int):
+    for _ in range(count):
+        yield b"x" * size
+
+
+def test_download_streams_to_disk_with_progress_and_size_limit(tmp_path, monkeypatch):
+    _use_transport(monkeypatch, lambda request: httpx.Response(200, content=b"abc" * 1000, headers={"ETag": '"v1"'}))
+    progress = []
+    # Escrita fora da thread do event loop (a do teste, via asyncio.run)
+    write_threads = set()
+    write_chunk = spreadsheet_downloader._write_chunk
+    monkeypatch.setattr(
+        spreadsheet_downloader,
+        "_write_chunk",
+        lambda *args: (write_threads.add(threading.get_ident()), write_chunk(*args)),
+    )
+
+    result = SpreadsheetDownloader.download_sync(
+        URL, tmp_path / "fluxo.xlsx", progress=lambda received, total: progress.append((received, total))
+    )
+
+    assert (tmp_path / "fluxo.xlsx").read_bytes() == b"abc" * 1000
+    assert (result.size, result.etag) == (3000, '"v1"')
+    assert progress[-1] == (3000, 3000)
+    assert write_threads and threading.get_ident() not in write_threads
+
+    # Content-Length acima do limite: nem começa a gravar
+    with pytest.raises(SpreadsheetTooLargeError):
+        SpreadsheetDownloader.download_sync(URL, tmp_path / "grande.xlsx", max_bytes=100)
+
+    # Sem Content-Length: interrompe no meio do streaming
+    _use_transport(monkeypatch, lambda request: httpx.Response(200, content=_chunks(10, 64)))
+    with pytest.raises(SpreadsheetTooLargeError):
+        SpreadsheetDownloader.download_sync(URL, tmp_path / "stream.xlsx", max_bytes=300)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["fluxo.xlsx"]
+
+
+def test_snapshot_fetch_async_revalidates_with_conditional_get(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_store, "SPREADSHEET_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(sheet_columnar_cache, "SHEET_COLUMNAR_CACHE_DIR", str(tmp_path / "sheet_cache"))
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        pd.DataFrame({"Conta": ["Aluguel"]}).to_excel(writer, sheet_name="Plano de contas", index=False)
+    content = buffer.getvalue()
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=content, headers={"ETag": '"v1"'})
+
+    _use_transport(monkeypatch, handler)
+
+    first = asyncio.run(SpreadsheetSnapshotStore.fetch_async(URL))
+    second = asyncio.run(SpreadsheetSnapshotStore.fetch_async(URL))
+
+    assert requests_seen == [None, '"v1"']
+    assert second.id == first.id
+    assert second.fetched_at >= first.fetched_at
+    assert second.sheets == ["Plano de contas"]
+    assert sorted(path.suffix for path in (tmp_path / "snapshots").iterdir()) == [".json", ".xlsx"]
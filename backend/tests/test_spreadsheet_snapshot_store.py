@@ -0,0 +1,99 @@
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+import httpx
+import pandas as pd
+import pytest
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.services.sheet_columnar_cache as sheet_columnar_cache  # noqa: E402
+import app.services.spreadsheet_downloader as spreadsheet_downloader  # noqa: E402
+import app.services.spreadsheet_snapshot_store as snapshot_store  # noqa: E402
+from app.services.spreadsheet_snapshot_store import SpreadsheetSnapshotStore  # noqa: E402
+
+URL = "https://example.com/fluxo.xlsx"
+
+
+def _workbook_bytes(value: int) -> bytes:
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        pd.DataFrame({"Conta": ["Aluguel"], "Valor": [value]}).to_excel(writer, sheet_name="Lançamento Diário", index=False)
+        pd.DataFrame({"Conta": ["Aluguel"]}).to_excel(writer, sheet_name="Plano de contas", index=False)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def store_dir(tmp_path, tmp_path_factory, monkeypatch):
+    monkeypatch.setattr(snapshot_store, "SPREADSHEET_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(sheet_columnar_cache, "SHEET_COLUMNAR_CACHE_DIR", str(tmp_path_factory.mktemp("sheet_cache")))
+    return tmp_path
+
+
+def test_one_download_and_one_parse_shared_by_all_readers(store_dir, monkeypatch):
+    content = _workbook_bytes(100)
+    downloads = []
+    transport = httpx.MockTransport(lambda request: downloads.append(str(request.url)) or httpx.Response(200, content=content))
+    monkeypatch.setattr(spreadsheet_downloader, "_create_client", lambda: httpx.AsyncClient(transport=transport))
+    reads = []
+    real_read_excel = pd.read_excel
+    monkeypatch.setattr(snapshot_store.pd, "read_excel", lambda *a, **k: reads.append(k["sheet_name"]) or real_read_excel(*a, **k))
+
+    snapshot = SpreadsheetSnapshotStore.fetch(URL)
+    assert snapshot.id == hashlib.sha256(content).hexdigest()
+    assert snapshot.sheets == ["Lançamento Diário", "Plano de contas"]
+    # Importação logo após a validação: reaproveita o download
+    assert SpreadsheetSnapshotStore.fetch(URL, max_age=600).id == snapshot.id
+    assert downloads == [URL]
+
+    reloaded = SpreadsheetSnapshotStore.get(snapshot.id)
+    assert (reloaded.url, reloaded.size, reloaded.parent_id) == (URL, len(content), None)
+    first = SpreadsheetSnapshotStore.read_sheet(reloaded.path, "Lançamento Diário")
+    first.loc[0, "Valor"] = 0  # cópia: não contamina o cache
+    assert SpreadsheetSnapshotStore.read_sheet(snapshot.path, "Lançamento Diário").loc[0, "Valor"] == 100
+    assert reads == ["Lançamento Diário"]
+
+    # Correções geram um snapshot derivado; o original fica intacto
+    def _edit(path):
+        frame = pd.read_excel(path, sheet_name="Lançamento Diário")
+        frame.loc[0, "Valor"] = 250
+        with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+            frame.to_excel(writer, sheet_name="Lançamento Diário", index=False)
+        return {"applied": 1}
+
+    derived, result = SpreadsheetSnapshotStore.derive(snapshot, _edit)
+    assert result == {"applied": 1}
+    assert derived.id != snapshot.id
+    assert derived.parent_id == snapshot.id
+    assert SpreadsheetSnapshotStore.read_sheet(derived.path, "Lançamento Diário").loc[0, "Valor"] == 250
+    assert SpreadsheetSnapshotStore.latest_for_url(URL).id == snapshot.id
+    assert sorted(p.suffix for p in store_dir.iterdir()) == [".json", ".json", ".xlsx", ".xlsx"]
+
+
+def test_retention_by_age_and_file_count(store_dir, monkeypatch):
+    monkeypatch.setattr(snapshot_store, "SPREADSHEET_SNAPSHOT_MAX_FILES", 2)
+    old = SpreadsheetSnapshotStore.put(_workbook_bytes(1), URL)
+    # Força o snapshot para fora da janela de retenção
+    expired = time.time() - (snapshot_store.SPREADSHEET_SNAPSHOT_RETENTION_DAYS + 1) * 86400
+    old.fetched_at = expired
+    (store_dir / f"{old.id}.json").write_text(json.dumps(old.metadata()))
+
+    recent = SpreadsheetSnapshotStore.put(_workbook_bytes(2), URL)
+    assert SpreadsheetSnapshotStore.get(old.id) is None
+    assert not (store_dir / f"{old.id}.xlsx").exists()
+
+    newer = SpreadsheetSnapshotStore.put(_workbook_bytes(3), URL)
+    newest = SpreadsheetSnapshotStore.put(_workbook_bytes(4), URL)
+    # Limite de arquivos: o mais antigo sai primeiro
+    assert SpreadsheetSnapshotStore.get(recent.id) is None
+    assert {SpreadsheetSnapshotStore.get(s.id).id for s in (newer, newest)} == {newer.id, newest.id}
+    assert SpreadsheetSnapshotStore.get("../../etc/passwd") is None
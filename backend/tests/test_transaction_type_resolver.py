@@ -0,0 +1,130 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import Base  # noqa: E402
+from app.models.chart_of_accounts import (  # noqa: E402
+    ChartAccount,
+    ChartAccountGroup,
+    ChartAccountSubgroup,
+)
+from app.models.lancamento_diario import LancamentoDiario, LancamentoDiarioCreate, TransactionType  # noqa: E402
+from app.models.lancamento_previsto import LancamentoPrevisto  # noqa: E402
+from app.models.lancamento_previsto import TransactionType as PrevistoType  # noqa: E402
+from app.models.lancamento_rollup import LancamentoDiarioRollup  # noqa: E402
+from app.services.lancamento_diario_service import LancamentoDiarioService  # noqa: E402
+from app.services.transaction_type_resolver import TransactionTypeResolver  # noqa: E402
+
+TENANT = "t1"
+BU = "bu1"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        ChartAccountGroup.__table__,
+        ChartAccountSubgroup.__table__,
+        ChartAccount.__table__,
+        LancamentoDiario.__table__,
+        LancamentoPrevisto.__table__,
+        LancamentoDiarioRollup.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+
+    plan = [
+        ("g-rec", "Receita", "sg-rec", "Vendas", "c-rec"),
+        ("g-desp", "Despesas Operacionais", "sg-merc", "Mercadorias para Revenda", "c-merc"),
+        ("g-desp", "Despesas Operacionais", "sg-adm", "Administrativas", "c-adm"),
+        ("g-ded", "Deduções", "sg-ded", "Impostos sobre Vendas", "c-ded"),
+    ]
+    for group_id, group_name, sub_id, sub_name, acc_id in plan:
+        if not session.get(ChartAccountGroup, group_id):
+            session.add(ChartAccountGroup(id=group_id, code=group_id, name=group_name, tenant_id=TENANT))
+            session.flush()
+        session.add(ChartAccountSubgroup(id=sub_id, code=sub_id, name=sub_name, group_id=group_id, tenant_id=TENANT))
+        session.add(
+            ChartAccount(id=acc_id, code=acc_id, name=acc_id, subgroup_id=sub_id, account_type="Analítica", tenant_id=TENANT)
+        )
+    session.commit()
+
+    yield session
+    session.close()
+
+
+def _common(conta):
+    sub = {"c-rec": "sg-rec", "c-merc": "sg-merc", "c-adm": "sg-adm", "c-ded": "sg-ded"}[conta]
+    grupo = {"sg-rec": "g-rec", "sg-ded": "g-ded"}.get(sub, "g-desp")
+    return {
+        "conta_id": conta,
+        "subgrupo_id": sub,
+        "grupo_id": grupo,
+        "tenant_id": TENANT,
+        "business_unit_id": BU,
+        "created_by": "u1",
+    }
+
+
+def test_account_types_are_resolved_once_and_used_on_create(db):
+    assert dict(TransactionTypeResolver.account_types(db, TENANT)) == {
+        "c-rec": "RECEITA",
+        "c-merc": "CUSTO",  # subgrupo de custo dentro de grupo de despesas
+        "c-adm": "DESPESA",
+        "c-ded": "DESPESA",  # não operacional: excluído das visões pelo grupo
+    }
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda c, cur, stmt, *a: statements.append(stmt))
+    result = LancamentoDiarioService.create_lancamento(
+        db,
+        LancamentoDiarioCreate(
+            data_movimentacao="2025-01-10T00:00:00", valor=Decimal("80"), conta_id="c-merc", subgrupo_id="sg-merc", grupo_id="g-desp"
+        ),
+        TENANT,
+        BU,
+        "u1",
+    )
+    assert result["success"] is True
+    assert db.get(LancamentoDiario, result["lancamento_id"]).transaction_type == TransactionType.CUSTO
+    # Tipo vem do mapa em cache: nenhuma leitura do grupo
+    assert not [s for s in statements if "FROM chart_account_groups" in s]
+
+
+def test_backfill_fixes_existing_rows_with_one_update_per_table(db):
+    db.add(LancamentoDiario(id="d1", data_movimentacao=datetime(2025, 1, 5), valor=10, transaction_type=None, **_common("c-rec")))
+    db.add(LancamentoDiario(id="d2", data_movimentacao=datetime(2025, 1, 5), valor=20, transaction_type=TransactionType.DESPESA, **_common("c-merc")))
+    db.add(LancamentoDiario(id="d3", data_movimentacao=datetime(2025, 1, 6), valor=30, transaction_type=TransactionType.DESPESA, **_common("c-adm")))
+    db.add(LancamentoPrevisto(id="p1", data_prevista=datetime(2025, 2, 1), valor=40, transaction_type=PrevistoType.DESPESA, **_common("c-rec")))
+    db.commit()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda c, cur, stmt, *a: statements.append(stmt))
+    updated = TransactionTypeResolver.backfill(db, TENANT)
+    db.commit()
+
+    assert updated == {"lancamentos_diarios": 2, "lancamentos_previstos": 1}
+    assert len([s for s in statements if s.lstrip().upper().startswith("UPDATE LANCAMENTOS")]) == 2
+    types = {row.id: row.transaction_type for row in db.query(LancamentoDiario)}
+    assert types == {"d1": TransactionType.RECEITA, "d2": TransactionType.CUSTO, "d3": TransactionType.DESPESA}
+    assert db.get(LancamentoPrevisto, "p1").transaction_type == PrevistoType.RECEITA
+    # Rollup reconstruído com os tipos corrigidos
+    assert {row.transaction_type for row in db.query(LancamentoDiarioRollup)} == {"RECEITA", "CUSTO", "DESPESA"}
@@ -0,0 +1,142 @@
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("JWT_SECRET", "testing-secret")
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("DATASET", "test-dataset")
+
+import app.main  # noqa: E402,F401  (registra todos os modelos)
+from app.database import Base  # noqa: E402
+from app.models.auth import BusinessUnit, Department, Tenant, User, UserRole, UserStatus  # noqa: E402
+from app.services.dependencies import get_current_user  # noqa: E402
+from app.services.security import SecurityService  # noqa: E402
+import app.services.user_cache as user_cache  # noqa: E402
+from app.services.user_cache import AuthenticatedUserCache  # noqa: E402
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [Tenant.__table__, BusinessUnit.__table__, Department.__table__, User.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+
+    session = sessionmaker(bind=engine)()
+    session.add(Tenant(id="t1", name="Tenant", domain="t1.test"))
+    session.add(
+        User(
+            id="u1",
+            tenant_id="t1",
+            business_unit_id="bu-db",
+            username="ana",
+            email="ana@example.com",
+            hashed_password="x",
+            first_name="Ana",
+            last_name="Silva",
+            role=UserRole.USER,
+            status=UserStatus.ACTIVE,
+        )
+    )
+    session.commit()
+    session.close()
+
+    AuthenticatedUserCache.invalidate()
+    yield engine
+    AuthenticatedUserCache.invalidate()
+
+
+def _credentials(**claims):
+    token = SecurityService.create_access_token(data={"sub": "u1", **claims})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def _count_user_selects(engine):
+    statements = []
+
+    def _listener(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _listener)
+    return statements
+
+
+def test_cached_user_skips_query_and_does_not_leak_token_context(engine):
+    Session = sessionmaker(bind=engine)
+    selects = _count_user_selects(engine)
+
+    first = Session()
+    user = get_current_user(_credentials(business_unit_id="bu-token"), first)
+    assert user.business_unit_id == "bu-token"
+    first.close()
+    assert len(selects) == 1
+
+    second = Session()
+    user = get_current_user(_credentials(), second)
+    assert user.business_unit_id == "bu-db"
+    assert user.username == "ana"
+    # Instância anexada à sessão, como se viesse da consulta
+    assert user in second
+    assert not second.dirty
+    second.close()
+    assert len(selects) == 1
+
+
+def test_invalidate_after_status_change(engine):
+    Session = sessionmaker(bind=engine)
+
+    session = Session()
+    get_current_user(_credentials(), session)
+    session.close()
+
+    admin = Session()
+    db_user = admin.query(User).filter(User.id == "u1").first()
+    db_user.status = UserStatus.INACTIVE
+    admin.commit()
+    admin.close()
+
+    # Sem invalidação o snapshot ainda vale (dentro do TTL)
+    session = Session()
+    assert get_current_user(_credentials(), session).status == UserStatus.ACTIVE
+    session.close()
+
+    AuthenticatedUserCache.invalidate("u1")
+    session = Session()
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(_credentials(), session)
+    assert exc.value.status_code == 401
+    session.close()
+
+
+def test_version_map_is_bounded_and_pruned_versions_are_not_reused(engine, monkeypatch):
+    monkeypatch.setattr(user_cache, "USER_CACHE_MAX_SIZE", 2)
+    Session = sessionmaker(bind=engine)
+    selects = _count_user_selects(engine)
+
+    AuthenticatedUserCache.invalidate("u1")
+    session = Session()
+    get_current_user(_credentials(), session)
+    session.close()
+    for other in ("x1", "x2", "x3"):
+        AuthenticatedUserCache.invalidate(other)
+
+    assert list(user_cache._USER_VERSIONS) == ["x2", "x3"]
+    # A entrada guardada sob a versão descartada sai junto
+    assert not [key for key in user_cache._USER_CACHE if key[0] == "u1"]
+    session = Session()
+    assert get_current_user(_credentials(), session).username == "ana"
+    session.close()
+    assert len(selects) == 2
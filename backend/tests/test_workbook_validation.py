@@ -0,0 +1,127 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+# Ensure the "backend" directory is on the Python path so ``app`` can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import app.services.sheet_columnar_cache as sheet_columnar_cache  # noqa: E402
+import app.services.spreadsheet_snapshot_store as snapshot_store  # noqa: E402
+import app.services.workbook_process_pool as workbook_pool  # noqa: E402
+from app.services.spreadsheet_snapshot_store import SpreadsheetSnapshotStore  # noqa: E402
+from app.services.workbook_process_pool import WorkbookPoolBusyError, WorkbookProcessPool  # noqa: E402
+from app.services.workbook_validation import (  # noqa: E402
+    MONTH_LABELS,
+    WorkbookValidationService,
+    validate_forecast_sheet,
+)
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_store, "SPREADSHEET_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(sheet_columnar_cache, "SHEET_COLUMNAR_CACHE_DIR", str(tmp_path / "sheet_cache"))
+    monkeypatch.setattr(workbook_pool, "WORKBOOK_POOL_WORKERS", 0)
+    WorkbookProcessPool.shutdown()
+    yield
+    WorkbookProcessPool.shutdown()
+
+
+def _snapshot(tmp_path):
+    months = [None, None]
+    labels = [None, None]
+    for month in MONTH_LABELS:
+        months += [month, None]
+        labels += ["Previsto", "Realizado"]
+    receita = [None, "Receita", 100, 90] + [0, 0] * 11
+    fluxo = pd.DataFrame([[None] * len(months), [None] * len(months), months, labels, receita])
+    path = tmp_path / "fluxo.xlsx"
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame({"Conta": ["Vendas"], "Subgrupo": ["Vendas"], "Grupo": ["Receita"]}).to_excel(
+            writer, sheet_name="Plano de contas", index=False
+        )
+        pd.DataFrame(
+            {
+                "Data Movimentação": [datetime(2025, 1, 5), None],
+                "Grupo": ["Receita", "Receita"],
+                "Subgrupo": ["Vendas", "Vendas"],
+                "Valor": [100.0, 5.0],
+            }
+        ).to_excel(writer, sheet_name="Lançamento Diário", index=False)
+        pd.DataFrame(
+            {"Data": ["01/02/2025"], "Conta": ["Aluguel"], "Valor": [10]}
+        ).to_excel(writer, sheet_name="Lançamentos Previstos", index=False)
+        fluxo.to_excel(writer, sheet_name="Fluxo de caixa-2025", header=False, index=False)
+        pd.DataFrame([["sem meses"]]).to_excel(writer, sheet_name="Previsão Fluxo de caixa-2025", header=False, index=False)
+    return SpreadsheetSnapshotStore.put(path.read_bytes(), "https://example.com/fluxo.xlsx")
+
+
+def test_sheets_are_validated_in_parallel_into_one_report(pool, tmp_path):
+    snapshot = _snapshot(tmp_path)
+    found, missing = WorkbookValidationService.find_required_sheets(snapshot.sheets)
+    assert missing == []
+
+    future = WorkbookValidationService.submit(snapshot, found)
+    job_id = WorkbookProcessPool.register_job(future)
+    report = asyncio.run(WorkbookProcessPool.wait(future, timeout=30))
+
+    # Ordem do relatório: diário, previstos, consistência mensal, previsão
+    assert [issue["code"] for issue in report["issues"]] == [
+        "DIARIO_DATA_MISSING",
+        "PREVISTO_CONTA_FORA_PLANO",
+        "MENSAL_DIARIO_DIVERGENCE",
+        "FORECAST_SHEET_INVALID",
+    ]
+    assert report["summary"]["errors"] == 4
+    assert report["valid"] is False
+    assert report["snapshot_id"] == snapshot.id
+    assert WorkbookProcessPool.job_status(job_id) == {"job_id": job_id, "status": "completed", "result": report}
+
+
+def _slow_identity(value, release):
+    release.wait(5)
+    return value
+
+
+def test_pool_is_bounded_and_timeout_leaves_job_running(pool, monkeypatch):
+    monkeypatch.setattr(workbook_pool, "_PENDING", threading.BoundedSemaphore(1))
+    release = threading.Event()
+
+    future = WorkbookProcessPool.submit(_slow_identity, 42, release)
+    with pytest.raises(WorkbookPoolBusyError):
+        WorkbookProcessPool.submit(_slow_identity, 1, release)
+
+    job_id = WorkbookProcessPool.register_job(future)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(WorkbookProcessPool.wait(future, timeout=0.05))
+    assert WorkbookProcessPool.job_status(job_id)["status"] == "running"
+
+    release.set()
+    assert future.result(timeout=5) == 42
+    # Vaga liberada ao concluir (callback roda logo após o resultado)
+    deadline = time.monotonic() + 5
+    while not workbook_pool._PENDING.acquire(blocking=False):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    workbook_pool._PENDING.release()
+
+
+def test_tasks_run_in_spawned_worker_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(workbook_pool, "WORKBOOK_POOL_WORKERS", 1)
+    # O processo filho lê a configuração do ambiente
+    monkeypatch.setenv("SHEET_COLUMNAR_CACHE_DIR", str(tmp_path / "sheet_cache"))
+    path = tmp_path / "previsao.xlsx"
+    pd.DataFrame([["x"], ["JANEIRO"]]).to_excel(path, header=False, index=False, sheet_name="Previsão")
+    WorkbookProcessPool.shutdown()
+    try:
+        future = WorkbookProcessPool.submit(validate_forecast_sheet, str(path), "Previsão")
+        assert future.result(timeout=60) == []
+        assert isinstance(workbook_pool._EXECUTOR, workbook_pool.ProcessPoolExecutor)
+    finally:
+        WorkbookProcessPool.shutdown()
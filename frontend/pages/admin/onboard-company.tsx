@@ -119,7 +119,8 @@ const OnboardSimplePage: React.FC = () => {
           business_unit_code: businessUnitCode || undefined,
           spreadsheet_url: spreadsheetUrl,
           reset_data: false,
-          corrections: correctionsPayload
+          corrections: correctionsPayload,
+          snapshot_id: validation.snapshot_id
         })
       });
 
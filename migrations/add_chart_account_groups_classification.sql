@@ -0,0 +1,62 @@
+-- Migration: Classificação operacional gravada em chart_account_groups
+-- Data: 2026-10-18
+-- Descrição: As agregações de dashboard (rollup, SQL de agregação, drill-down
+--            mensal) excluíam Deduções e Movimentações Não Operacionais com oito
+--            predicados NOT ILIKE '%...%' sobre o nome do grupo em cada consulta.
+--            A classificação passa a ser calculada ao gravar o grupo (evento
+--            before_insert/before_update do ORM, classify_group_name) e guardada em:
+--              is_operational  - falso para Deduções / Movimentações Não Operacionais
+--              sort_ordinal    - posição na ordem da planilha (fluxo de caixa)
+--              type_class      - RECEITA / CUSTO / DESPESA indicada pelo nome, ou nulo
+--            Os filtros viram uma junção por id + comparação booleana.
+--
+-- O backfill abaixo reproduz as regras de classify_group_name para os grupos
+-- existentes. CONCURRENTLY evita bloquear escritas; executar fora de transação
+-- (ex.: psql -f, sem BEGIN/COMMIT).
+
+ALTER TABLE chart_account_groups ADD COLUMN IF NOT EXISTS is_operational BOOLEAN NOT NULL DEFAULT TRUE;
+ALTER TABLE chart_account_groups ADD COLUMN IF NOT EXISTS sort_ordinal SMALLINT NOT NULL DEFAULT 1014;
+ALTER TABLE chart_account_groups ADD COLUMN IF NOT EXISTS type_class VARCHAR(20);
+
+UPDATE chart_account_groups
+SET is_operational = NOT (
+           strpos(lower(name), 'dedução') > 0
+           OR strpos(lower(name), 'deducao') > 0
+           OR strpos(lower(name), 'deduções') > 0
+           OR strpos(lower(name), 'deducoes') > 0
+           OR strpos(lower(name), 'movimentações não operacionais') > 0
+           OR strpos(lower(name), 'movimentacoes nao operacionais') > 0
+           OR strpos(lower(name), 'movimentações nao operacionais') > 0
+           OR strpos(lower(name), 'movimentacoes não operacionais') > 0
+    ),
+    sort_ordinal = CASE
+        WHEN strpos(lower(name), 'receita') > 0 OR strpos('receita', lower(name)) > 0 THEN 0
+        WHEN strpos(lower(name), 'receita operacional') > 0 OR strpos('receita operacional', lower(name)) > 0 THEN 1
+        WHEN strpos(lower(name), 'receita financeira') > 0 OR strpos('receita financeira', lower(name)) > 0 THEN 2
+        WHEN strpos(lower(name), 'deduções') > 0 OR strpos('deduções', lower(name)) > 0 THEN 3
+        WHEN strpos(lower(name), 'custos') > 0 OR strpos('custos', lower(name)) > 0 THEN 4
+        WHEN strpos(lower(name), 'custos com serviços prestados') > 0 OR strpos('custos com serviços prestados', lower(name)) > 0 THEN 5
+        WHEN strpos(lower(name), 'custos com mão de obra') > 0 OR strpos('custos com mão de obra', lower(name)) > 0 THEN 6
+        WHEN strpos(lower(name), 'despesas operacionais') > 0 OR strpos('despesas operacionais', lower(name)) > 0 THEN 7
+        WHEN strpos(lower(name), 'despesas financeiras') > 0 OR strpos('despesas financeiras', lower(name)) > 0 THEN 8
+        WHEN strpos(lower(name), 'despesas com pessoal') > 0 OR strpos('despesas com pessoal', lower(name)) > 0 THEN 9
+        WHEN strpos(lower(name), 'despesas administrativas') > 0 OR strpos('despesas administrativas', lower(name)) > 0 THEN 10
+        WHEN strpos(lower(name), 'despesas comerciais') > 0 OR strpos('despesas comerciais', lower(name)) > 0 THEN 11
+        WHEN strpos(lower(name), 'investimentos') > 0 OR strpos('investimentos', lower(name)) > 0 THEN 12
+        WHEN strpos(lower(name), 'movimentações não operacionais') > 0 OR strpos('movimentações não operacionais', lower(name)) > 0 THEN 13
+        ELSE 1014
+    END;
+
+UPDATE chart_account_groups
+SET type_class = CASE
+        WHEN NOT is_operational THEN NULL
+        WHEN strpos(lower(name), 'receita') > 0 OR strpos(lower(name), 'venda') > 0 OR strpos(lower(name), 'renda') > 0 OR strpos(lower(name), 'faturamento') > 0 OR strpos(lower(name), 'vendas') > 0 THEN 'RECEITA'
+        WHEN strpos(lower(name), 'custo') > 0 OR strpos(lower(name), 'custos') > 0 THEN 'CUSTO'
+        WHEN strpos(lower(name), 'despesa') > 0 OR strpos(lower(name), 'gasto') > 0 OR strpos(lower(name), 'operacional') > 0 OR strpos(lower(name), 'administrativa') > 0 THEN 'DESPESA'
+        ELSE NULL
+    END;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chart_account_groups_tenant_operational
+    ON chart_account_groups (tenant_id, is_operational);
+
+ANALYZE chart_account_groups;
@@ -0,0 +1,22 @@
+-- Migration: Índices compostos para lançamentos diários e previstos
+-- Data: 2026-10-18
+-- Descrição: Cobrir o caminho quente dos dashboards (tenant, BU, ativos, intervalo de data)
+--            sem leitura da tabela (INCLUDE com as colunas somadas/agrupadas).
+--
+-- CONCURRENTLY evita bloquear escritas durante a criação; executar fora de
+-- transação (ex.: psql -f, sem BEGIN/COMMIT).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_lancamentos_diarios_tenant_bu_active_data
+    ON lancamentos_diarios (tenant_id, business_unit_id, is_active, data_movimentacao)
+    INCLUDE (valor, transaction_type, grupo_id, subgrupo_id, conta_id, status);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_lancamentos_previstos_tenant_bu_active_data
+    ON lancamentos_previstos (tenant_id, business_unit_id, is_active, data_prevista, status)
+    INCLUDE (valor, transaction_type, grupo_id, subgrupo_id, conta_id);
+
+-- Os índices de coluna única abaixo passam a ser prefixos/redundantes para as
+-- consultas do dashboard; mantidos por ora para outras rotas.
+-- idx_lancamentos_tenant_bu, idx_lancamentos_data, idx_lancamentos_active
+
+ANALYZE lancamentos_diarios;
+ANALYZE lancamentos_previstos;
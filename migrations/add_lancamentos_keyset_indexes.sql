@@ -0,0 +1,34 @@
+-- Migration: id no fim dos índices compostos para paginação por chave (keyset)
+-- Data: 2026-10-18
+-- Descrição: As listagens de lançamentos diários, previstos e /financial/transactions
+--            paginam por (data, id) decrescente a partir de um cursor, em vez de
+--            OFFSET. Em vez de um segundo índice com o mesmo prefixo, o id passa a
+--            ser a última coluna de chave dos índices compostos do caminho quente
+--            (add_lancamentos_composite_indexes.sql), mantendo o INCLUDE: o mesmo
+--            índice cobre as somas por intervalo e o seek na posição do cursor.
+--            Em previstos, status sai da chave para o INCLUDE (depois do intervalo
+--            de data ele só filtrava, e como chave quebraria a ordem (data, id)).
+--
+-- O índice novo é criado com outro nome, o antigo (e o keyset avulso, se uma
+-- versão anterior desta migração já o criou) é removido e o novo é renomeado.
+-- CONCURRENTLY evita bloquear escritas; executar fora de transação
+-- (ex.: psql -f, sem BEGIN/COMMIT).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_lancamentos_diarios_tenant_bu_active_data_id
+    ON lancamentos_diarios (tenant_id, business_unit_id, is_active, data_movimentacao, id)
+    INCLUDE (valor, transaction_type, grupo_id, subgrupo_id, conta_id, status);
+DROP INDEX CONCURRENTLY IF EXISTS idx_lancamentos_diarios_tenant_bu_active_data;
+DROP INDEX CONCURRENTLY IF EXISTS idx_lancamentos_diarios_keyset;
+ALTER INDEX IF EXISTS idx_lancamentos_diarios_tenant_bu_active_data_id
+    RENAME TO idx_lancamentos_diarios_tenant_bu_active_data;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_lancamentos_previstos_tenant_bu_active_data_id
+    ON lancamentos_previstos (tenant_id, business_unit_id, is_active, data_prevista, id)
+    INCLUDE (valor, transaction_type, grupo_id, subgrupo_id, conta_id, status);
+DROP INDEX CONCURRENTLY IF EXISTS idx_lancamentos_previstos_tenant_bu_active_data;
+DROP INDEX CONCURRENTLY IF EXISTS idx_lancamentos_previstos_keyset;
+ALTER INDEX IF EXISTS idx_lancamentos_previstos_tenant_bu_active_data_id
+    RENAME TO idx_lancamentos_previstos_tenant_bu_active_data;
+
+ANALYZE lancamentos_diarios;
+ANALYZE lancamentos_previstos;
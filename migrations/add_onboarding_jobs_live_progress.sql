@@ -0,0 +1,7 @@
+-- Migration: Progresso em tempo real dos jobs de onboarding
+-- Data: 2026-10-18
+-- Descrição: Último evento de progresso (aba, linhas lidas/gravadas, taxa e
+--            ETA) publicado pelas funções de seed, lido pelo stream SSE
+
+ALTER TABLE onboarding_jobs
+ADD COLUMN IF NOT EXISTS live_progress TEXT;
@@ -0,0 +1,59 @@
+-- Migration: Criar rollup diário de lançamentos
+-- Data: 2026-10-18
+-- Descrição: Totais pré-agregados por (tenant, BU, grupo, subgrupo, conta, tipo, dia)
+--            usados pelos resumos anual, diário e pelo fluxo de caixa mensal
+
+CREATE TABLE IF NOT EXISTS lancamentos_diarios_rollup (
+    tenant_id VARCHAR(36) NOT NULL,
+    business_unit_id VARCHAR(36) NOT NULL,
+    grupo_id VARCHAR(36) NOT NULL,
+    subgrupo_id VARCHAR(36) NOT NULL,
+    conta_id VARCHAR(36) NOT NULL,
+    -- '' representa lançamentos sem tipo
+    transaction_type VARCHAR(20) NOT NULL DEFAULT '',
+    dia DATE NOT NULL,
+
+    valor_total DECIMAL(18,2) NOT NULL DEFAULT 0,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (tenant_id, business_unit_id, grupo_id, subgrupo_id, conta_id, transaction_type, dia)
+);
+
+CREATE INDEX IF NOT EXISTS idx_lancamentos_rollup_tenant_bu_dia
+    ON lancamentos_diarios_rollup(tenant_id, business_unit_id, dia);
+
+-- Backfill a partir dos lançamentos ativos existentes
+INSERT INTO lancamentos_diarios_rollup (
+    tenant_id, business_unit_id, grupo_id, subgrupo_id, conta_id,
+    transaction_type, dia, valor_total, quantidade, updated_at
+)
+SELECT
+    tenant_id,
+    business_unit_id,
+    grupo_id,
+    subgrupo_id,
+    conta_id,
+    COALESCE(CAST(transaction_type AS VARCHAR(20)), ''),
+    DATE(data_movimentacao),
+    SUM(valor),
+    COUNT(id),
+    CURRENT_TIMESTAMP
+FROM lancamentos_diarios
+WHERE is_active = TRUE
+  AND valor IS NOT NULL
+  AND data_movimentacao IS NOT NULL
+  AND grupo_id IS NOT NULL
+  AND subgrupo_id IS NOT NULL
+  AND conta_id IS NOT NULL
+GROUP BY
+    tenant_id,
+    business_unit_id,
+    grupo_id,
+    subgrupo_id,
+    conta_id,
+    COALESCE(CAST(transaction_type AS VARCHAR(20)), ''),
+    DATE(data_movimentacao)
+ON CONFLICT DO NOTHING;
+
+COMMENT ON TABLE lancamentos_diarios_rollup IS 'Totais diários pré-agregados de lançamentos_diarios (mantidos pela aplicação)';
@@ -0,0 +1,41 @@
+-- Migration: Criar tabela de jobs de onboarding
+-- Data: 2026-10-18
+-- Descrição: Estado persistente das importações de planilha (run_id, etapa,
+--            progresso, contadores e checkpoints), consumido por workers com
+--            SELECT ... FOR UPDATE SKIP LOCKED
+
+CREATE TABLE IF NOT EXISTS onboarding_jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    tenant_id VARCHAR(36) NOT NULL REFERENCES tenants(id),
+    business_unit_id VARCHAR(36) NOT NULL REFERENCES business_units(id),
+
+    spreadsheet_url TEXT NOT NULL,
+    reset_data BOOLEAN NOT NULL DEFAULT FALSE,
+    user_id VARCHAR(36),
+    corrections TEXT,
+
+    status VARCHAR(32) NOT NULL DEFAULT 'queued',
+    current_step VARCHAR(120),
+    progress INTEGER NOT NULL DEFAULT 0,
+    message TEXT,
+    errors TEXT,
+    stats TEXT,
+    checkpoints TEXT,
+
+    attempts INTEGER NOT NULL DEFAULT 0,
+    locked_by VARCHAR(120),
+    heartbeat_at TIMESTAMP,
+
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_onboarding_jobs_status_created
+    ON onboarding_jobs(status, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_onboarding_jobs_tenant_bu_created
+    ON onboarding_jobs(tenant_id, business_unit_id, created_at);
+
+COMMENT ON TABLE onboarding_jobs IS 'Jobs de onboarding (importação de planilha) executados por workers';
@@ -0,0 +1,31 @@
+-- Migration: Criar tabela de contadores de referência
+-- Data: 2026-10-18
+-- Descrição: Contador por (tenant, BU, prefixo, dia) usado pelo ReferenceAllocator
+--            para gerar referências TX-YYYYMMDD-NNNN com um único
+--            INSERT ... ON CONFLICT DO UPDATE ... RETURNING (reserva de intervalos)
+
+CREATE TABLE IF NOT EXISTS reference_counters (
+    tenant_id VARCHAR(36) NOT NULL,
+    business_unit_id VARCHAR(36) NOT NULL,
+    prefix VARCHAR(10) NOT NULL,
+    dia DATE NOT NULL,
+    last_value INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, business_unit_id, prefix, dia)
+);
+
+-- Semear os contadores com o maior número já emitido em cada dia, para que
+-- referências novas continuem a sequência existente sem colidir
+INSERT INTO reference_counters (tenant_id, business_unit_id, prefix, dia, last_value, updated_at)
+SELECT
+    tenant_id,
+    business_unit_id,
+    'TX',
+    TO_DATE(SUBSTRING(reference FROM 4 FOR 8), 'YYYYMMDD'),
+    MAX(CAST(SUBSTRING(reference FROM 13) AS INTEGER)),
+    NOW()
+FROM financial_transactions
+WHERE reference ~ '^TX-[0-9]{8}-[0-9]+$'
+GROUP BY tenant_id, business_unit_id, SUBSTRING(reference FROM 4 FOR 8)
+ON CONFLICT (tenant_id, business_unit_id, prefix, dia)
+DO UPDATE SET last_value = GREATEST(reference_counters.last_value, EXCLUDED.last_value);
@@ -0,0 +1,159 @@
+-- Migration (OPCIONAL): Particionamento anual de lançamentos diários e previstos
+-- Data: 2026-10-18
+-- Descrição: Converte lancamentos_diarios e lancamentos_previstos em tabelas
+--            particionadas por intervalo anual (data_movimentacao / data_prevista).
+--            Indicado apenas quando há tenants com vários anos de histórico:
+--            as consultas do dashboard filtram um ano e passam a ler só a partição
+--            correspondente (partition pruning).
+--
+-- ATENÇÃO antes de aplicar:
+--   * Requer PostgreSQL 11+ e uma janela de manutenção (os dados são copiados).
+--   * A chave primária passa a ser (id, <coluna de data>) e as constraints de
+--     import_ref passam a incluir a data, pois o PostgreSQL exige a chave de
+--     partição em toda constraint UNIQUE. Com isso import_ref deixa de ser
+--     único por (tenant, BU) e passa a ser único por (tenant, BU, data):
+--       - A consulta de existência dos importadores e do lote
+--         (LancamentoBatchService) só detecta reenvios sequenciais. Ela não
+--         protege envios concorrentes: dois envios simultâneos do mesmo
+--         import_ref passam ambos pela consulta.
+--       - Nesses envios concorrentes, o ON CONFLICT DO NOTHING do lote só
+--         descarta a cópia quando a data também é igual. Um reenvio com a data
+--         corrigida grava um segundo lançamento, e a idempotência do lote deixa
+--         de valer.
+--       - ON CONFLICT (tenant_id, business_unit_id, import_ref) deixa de ter
+--         índice correspondente.
+--     Não aplique em bases cujos clientes reenviam lotes em paralelo. Se for
+--     preciso particionar mesmo assim, mantenha a deduplicação em uma tabela
+--     não particionada, por exemplo
+--     lancamento_import_refs(tenant_id, business_unit_id, import_ref) com
+--     UNIQUE, gravada na mesma transação do lançamento. Isso exige uma mudança
+--     no LancamentoBatchService e não faz parte desta migration.
+--   * Chaves estrangeiras que apontam para lancamentos_diarios(id)
+--     (movimentacoes_caixa, movimentacoes_bancarias) são removidas: uma FK para
+--     tabela particionada precisaria incluir a coluna de data.
+--   * Executar primeiro migrations/add_lancamentos_composite_indexes.sql não é
+--     necessário: os índices são recriados nas tabelas particionadas.
+
+BEGIN;
+
+-- ----------------------------------------------------------------------------
+-- Função auxiliar: cria a partição anual (idempotente)
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION create_yearly_partition(parent_table TEXT, partition_year INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    partition_name TEXT := format('%s_%s', parent_table, partition_year);
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        parent_table,
+        make_date(partition_year, 1, 1),
+        make_date(partition_year + 1, 1, 1)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- ----------------------------------------------------------------------------
+-- Remover FKs que referenciam lancamentos_diarios(id)
+-- ----------------------------------------------------------------------------
+DO $$
+DECLARE
+    fk RECORD;
+BEGIN
+    FOR fk IN
+        SELECT conrelid::regclass AS table_name, conname
+        FROM pg_constraint
+        WHERE contype = 'f'
+          AND confrelid = 'lancamentos_diarios'::regclass
+    LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.table_name, fk.conname);
+    END LOOP;
+END $$;
+
+-- ----------------------------------------------------------------------------
+-- Lançamentos diários
+-- ----------------------------------------------------------------------------
+ALTER TABLE lancamentos_diarios RENAME TO lancamentos_diarios_unpartitioned;
+
+CREATE TABLE lancamentos_diarios (
+    LIKE lancamentos_diarios_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY RANGE (data_movimentacao);
+
+ALTER TABLE lancamentos_diarios
+    ADD CONSTRAINT lancamentos_diarios_part_pkey PRIMARY KEY (id, data_movimentacao);
+ALTER TABLE lancamentos_diarios
+    ADD CONSTRAINT uq_lancamento_import_ref_part
+    UNIQUE (tenant_id, business_unit_id, import_ref, data_movimentacao);
+
+CREATE INDEX idx_lancamentos_diarios_tenant_bu_active_data_part
+    ON lancamentos_diarios (tenant_id, business_unit_id, is_active, data_movimentacao, id)
+    INCLUDE (valor, transaction_type, grupo_id, subgrupo_id, conta_id, status);
+
+DO $$
+DECLARE
+    y INTEGER;
+BEGIN
+    FOR y IN
+        SELECT DISTINCT EXTRACT(YEAR FROM data_movimentacao)::INTEGER
+        FROM lancamentos_diarios_unpartitioned
+        UNION
+        SELECT EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + offs FROM generate_series(0, 1) AS offs
+    LOOP
+        PERFORM create_yearly_partition('lancamentos_diarios', y);
+    END LOOP;
+END $$;
+
+CREATE TABLE IF NOT EXISTS lancamentos_diarios_default PARTITION OF lancamentos_diarios DEFAULT;
+
+INSERT INTO lancamentos_diarios SELECT * FROM lancamentos_diarios_unpartitioned;
+
+-- ----------------------------------------------------------------------------
+-- Lançamentos previstos
+-- ----------------------------------------------------------------------------
+ALTER TABLE lancamentos_previstos RENAME TO lancamentos_previstos_unpartitioned;
+
+CREATE TABLE lancamentos_previstos (
+    LIKE lancamentos_previstos_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY RANGE (data_prevista);
+
+ALTER TABLE lancamentos_previstos
+    ADD CONSTRAINT lancamentos_previstos_part_pkey PRIMARY KEY (id, data_prevista);
+ALTER TABLE lancamentos_previstos
+    ADD CONSTRAINT uq_lancamento_previsto_import_ref_part
+    UNIQUE (tenant_id, business_unit_id, import_ref, data_prevista);
+
+CREATE INDEX idx_lancamentos_previstos_tenant_bu_active_data_part
+    ON lancamentos_previstos (tenant_id, business_unit_id, is_active, data_prevista, id)
+    INCLUDE (valor, transaction_type, grupo_id, subgrupo_id, conta_id, status);
+
+DO $$
+DECLARE
+    y INTEGER;
+BEGIN
+    FOR y IN
+        SELECT DISTINCT EXTRACT(YEAR FROM data_prevista)::INTEGER
+        FROM lancamentos_previstos_unpartitioned
+        UNION
+        SELECT EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + offs FROM generate_series(0, 1) AS offs
+    LOOP
+        PERFORM create_yearly_partition('lancamentos_previstos', y);
+    END LOOP;
+END $$;
+
+CREATE TABLE IF NOT EXISTS lancamentos_previstos_default PARTITION OF lancamentos_previstos DEFAULT;
+
+INSERT INTO lancamentos_previstos SELECT * FROM lancamentos_previstos_unpartitioned;
+
+COMMIT;
+
+ANALYZE lancamentos_diarios;
+ANALYZE lancamentos_previstos;
+
+-- Após validar os dados, remover as tabelas antigas:
+-- DROP TABLE lancamentos_diarios_unpartitioned;
+-- DROP TABLE lancamentos_previstos_unpartitioned;
+--
+-- Partições de anos futuros (ex.: rotina anual):
+-- SELECT create_yearly_partition('lancamentos_diarios', 2028);
+-- SELECT create_yearly_partition('lancamentos_previstos', 2028);